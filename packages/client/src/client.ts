@@ -5,6 +5,8 @@
 import type {
   SearchRequest,
   SearchResponse,
+  SearchBatchRequest,
+  SearchBatchResponse,
   GetDocumentRequest,
   GetDocumentResponse,
   IndexDocumentRequest,
@@ -63,6 +65,13 @@ export class SearchDocsClient {
     return this.call<SearchResponse>('search', request);
   }
 
+  /**
+   * 複数のクエリを共通のオプションで一括検索（結果はqueriesと同じ順序）
+   */
+  async searchBatch(request: SearchBatchRequest): Promise<SearchBatchResponse> {
+    return this.call<SearchBatchResponse>('searchBatch', request);
+  }
+
   /**
    * 文書を取得
    */
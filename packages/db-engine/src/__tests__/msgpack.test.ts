@@ -0,0 +1,43 @@
+import { describe, it, expect } from 'vitest';
+import { encodeMsgpack, decodeMsgpack } from '../typescript/msgpack.js';
+
+describe('msgpack', () => {
+  it('JSON-RPCメッセージを往復できる', () => {
+    const message = {
+      jsonrpc: '2.0',
+      id: 42,
+      method: 'addSections',
+      params: {
+        sections: [
+          {
+            heading: '見出し',
+            content: '本文'.repeat(5000),
+            depth: 2,
+            parentId: null,
+            isDirty: false,
+            sectionNumber: [1, 2, 3],
+          },
+        ],
+      },
+    };
+
+    expect(decodeMsgpack(encodeMsgpack(message))).toEqual(message);
+  });
+
+  it('数値の範囲ごとに正しくエンコードする', () => {
+    const values = [0, 127, 128, 65535, 65536, 2 ** 32, 2 ** 40, -1, -32, -33, -(2 ** 40), 3.14];
+    expect(decodeMsgpack(encodeMsgpack(values))).toEqual(values);
+  });
+
+  it('JSON.stringifyと同様にundefinedを省略しtoJSONを使う', () => {
+    const date = new Date(0);
+    const decoded = decodeMsgpack(encodeMsgpack({ a: undefined, b: date, c: [undefined] }));
+    expect(decoded).toEqual({ b: date.toISOString(), c: [null] });
+  });
+
+  it('大きな配列とマップを扱える', () => {
+    const array = Array.from({ length: 70000 }, (_, i) => i % 200);
+    const map = Object.fromEntries(Array.from({ length: 20 }, (_, i) => [`key${i}`, i]));
+    expect(decodeMsgpack(encodeMsgpack({ array, map }))).toEqual({ array, map });
+  });
+});
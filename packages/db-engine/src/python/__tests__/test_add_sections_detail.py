@@ -117,6 +117,25 @@ def test_add_sections_then_search(worker):
     assert increase < 100, f"search後に{increase}オブジェクト増加 - add_sectionsの影響が残っている可能性"
 
 
+def test_add_sections_gc_only_over_threshold(worker):
+    """GCはメモリ使用量がしきい値を超えた場合だけ実行され、回数と時間がgetStatsに出る"""
+    worker.gc_policy.every_mb = 1024 * 1024
+    for doc_id in range(3):
+        sections = [create_test_section(f"gc-{doc_id}-{i}", doc_id, f"Content {i} " * 20) for i in range(5)]
+        worker.add_sections({"sections": sections})
+
+    stats = worker.get_stats()["gc"]
+    assert stats["checks"] >= 3
+    assert stats["collections"] == 0
+
+    # 0の場合は従来通り毎回実行する
+    worker.gc_policy.every_mb = 0
+    worker.add_sections({"sections": [create_test_section("gc-last", 9, "Content")]})
+    stats = worker.get_stats()["gc"]
+    assert stats["collections"] >= 1
+    assert stats["gcSeconds"] > 0
+
+
 def test_single_add_sections_object_types(worker):
     """add_sections 1回実行後のオブジェクト型を調査"""
     from collections import Counter
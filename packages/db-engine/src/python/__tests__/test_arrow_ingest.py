@@ -0,0 +1,111 @@
+"""
+セクションの列指向（Arrow）変換のテスト
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from schemas import get_sections_schema
+from utils.arrow_ingest import sections_to_arrow, with_vector_column
+
+SCHEMA = get_sections_schema(4)
+
+
+def make_section(i, **overrides):
+    section = {
+        "id": f"sec-{i}",
+        "document_path": "doc.md",
+        "heading": f"Heading {i}",
+        "depth": 1,
+        "content": "content",
+        "token_count": 10,
+        "parent_id": None,
+        "order": i,
+        "is_dirty": False,
+        "document_hash": "hash",
+        "start_line": 1,
+        "end_line": 10,
+        "section_number": [1, i],
+        "created_at": "2025-01-01T00:00:00.123Z",
+        "updated_at": "2025-01-01T00:00:00.123Z",
+    }
+    section.update(overrides)
+    return section
+
+
+def test_converts_sections_to_schema_types():
+    table = sections_to_arrow([make_section(0), make_section(1)], SCHEMA)
+
+    assert table.schema == SCHEMA.remove(SCHEMA.get_field_index("vector"))
+    assert table.column("section_number").to_pylist() == [[1, 0], [1, 1]]
+    assert table.column("parent_id").to_pylist() == [None, None]
+
+
+@pytest.mark.parametrize("value", [
+    "2025-01-01T09:00:00.123456+09:00",
+    "2025-01-01T00:00:00.123456Z",
+    "2025-01-01T00:00:00.123456",
+    datetime(2025, 1, 1, 0, 0, 0, 123456),
+])
+def test_timestamps_match_pandas_floor(value):
+    """pd.Timestamp(...).floor('ms')（従来の行ごとの変換）と同じ値になる"""
+    table = sections_to_arrow([make_section(0, created_at=value)], SCHEMA)
+    expected = pa.array([pd.Timestamp(value).floor('ms')], type=pa.timestamp('ms'))
+    assert table.column("created_at").to_pylist() == expected.to_pylist()
+
+
+def test_mixed_timezones_are_converted_per_row():
+    sections = [
+        make_section(0, created_at="2025-01-01T09:00:00+09:00"),
+        make_section(1, created_at="2025-01-01T00:00:00"),
+    ]
+    table = sections_to_arrow(sections, SCHEMA)
+    assert table.column("created_at").to_pylist() == [datetime(2025, 1, 1)] * 2
+
+
+def test_missing_required_field():
+    section = make_section(0)
+    del section["document_hash"]
+    with pytest.raises(ValueError, match="Missing required fields: document_hash"):
+        sections_to_arrow([make_section(1), section], SCHEMA)
+
+
+@pytest.mark.parametrize("field,value", [
+    ("depth", "1"),
+    ("depth", 1.5),
+    ("is_dirty", 1),
+    ("heading", None),
+    ("document_path", 123),
+])
+def test_invalid_types(field, value):
+    with pytest.raises(TypeError, match=f"Field '{field}'"):
+        sections_to_arrow([make_section(0), make_section(1, **{field: value})], SCHEMA)
+
+
+@pytest.mark.parametrize("depth", [-1, 4])
+def test_depth_out_of_range(depth):
+    with pytest.raises(ValueError, match="between 0 and 3"):
+        sections_to_arrow([make_section(0), make_section(1, depth=depth)], SCHEMA)
+
+
+def test_invalid_timestamp():
+    with pytest.raises(ValueError, match="Field 'created_at'"):
+        sections_to_arrow([make_section(0, created_at="not a date")], SCHEMA)
+
+
+def test_with_vector_column_places_vector_by_schema():
+    table = sections_to_arrow([make_section(0), make_section(1)], SCHEMA)
+    vectors = np.arange(8, dtype=np.float32).reshape(2, 4)
+
+    result = with_vector_column(table, vectors, SCHEMA)
+
+    assert result.schema == SCHEMA
+    assert result.column("vector").to_pylist() == [[0, 1, 2, 3], [4, 5, 6, 7]]
@@ -0,0 +1,84 @@
+"""
+JSON-RPCバッチ処理のテスト
+1ドキュメント分のIndexRequest操作を1往復で処理できることを確認
+"""
+
+import pytest
+import gc
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from worker import SearchDocsWorker
+from utils.request_dispatcher import READ_LANE, WRITE_LANE
+
+
+@pytest.fixture
+def temp_db():
+    """一時的なDBディレクトリを作成"""
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def worker(temp_db):
+    """テスト用のワーカーインスタンス"""
+    worker = SearchDocsWorker(db_path=temp_db)
+    yield worker
+    del worker
+    gc.collect()
+
+
+def rpc(request_id, method, params=None):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+
+
+def test_batch_runs_in_order_and_returns_array(worker):
+    """バッチ内の呼び出しは順番に実行され、レスポンスは配列で返る"""
+    responses = worker.handle_message([
+        rpc(1, "createIndexRequest", {"document_path": "a.md", "document_hash": "h1"}),
+        rpc(2, "countIndexRequests", {"document_path": "a.md"}),
+    ])
+
+    assert [r["id"] for r in responses] == [1, 2]
+    assert responses[0]["result"]["status"] == "pending"
+    # 先に実行された作成結果が後続の呼び出しから見える
+    assert responses[1]["result"]["count"] == 1
+
+
+def test_batch_errors_are_independent(worker):
+    """1つの呼び出しが失敗しても残りは実行される"""
+    responses = worker.handle_message([
+        rpc(1, "unknownMethod"),
+        rpc(2, "ping"),
+    ])
+
+    assert responses[0]["error"]["code"] == -32601
+    assert responses[1]["result"]["status"] == "ok"
+
+
+def test_batch_omits_notifications(worker):
+    """通知（idなし）にはレスポンスを返さない"""
+    responses = worker.handle_message([
+        {"jsonrpc": "2.0", "method": "ping"},
+        rpc(2, "ping"),
+    ])
+    assert [r["id"] for r in responses] == [2]
+
+    assert worker.handle_message([{"jsonrpc": "2.0", "method": "ping"}]) is None
+
+
+def test_empty_batch_is_invalid_request(worker):
+    """空配列はInvalid Request"""
+    response = worker.handle_message([])
+    assert response["error"]["code"] == -32600
+
+
+def test_batch_lane(worker):
+    """読み取り系のみのバッチは読み取りレーン、書き込みを含むバッチは書き込みレーン"""
+    assert worker.lane_for_request([rpc(1, "search"), rpc(2, "getStats")]) == READ_LANE
+    assert worker.lane_for_request([rpc(1, "search"), rpc(2, "addSections")]) == WRITE_LANE
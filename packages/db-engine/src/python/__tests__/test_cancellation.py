@@ -0,0 +1,146 @@
+"""
+リクエストのキャンセル・期限のテスト
+タイムアウトで諦められたリクエストをワーカーが実行しない / 途中で打ち切ることを確認
+"""
+
+import pytest
+import gc
+import sys
+import time
+import tempfile
+import shutil
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from worker import SearchDocsWorker
+from utils.cancellation import CANCEL_METHOD, REQUEST_CANCELLED, DEADLINE_EXCEEDED
+
+
+@pytest.fixture
+def temp_db():
+    """一時的なDBディレクトリを作成"""
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def worker(temp_db):
+    """テスト用のワーカーインスタンス"""
+    worker = SearchDocsWorker(db_path=temp_db)
+    yield worker
+    del worker
+    gc.collect()
+
+
+def rpc(request_id, method, params=None, deadline=None):
+    request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+    if deadline is not None:
+        request["deadline"] = deadline
+    return request
+
+
+def make_section(i):
+    return {
+        "id": f"s{i}",
+        "document_path": "a.md",
+        "heading": f"Section {i}",
+        "depth": 1,
+        "content": f"content {i} " * 8,
+        "token_count": 10,
+        "parent_id": None,
+        "order": i,
+        "is_dirty": False,
+        "document_hash": "h1",
+        "start_line": i,
+        "end_line": i,
+        "section_number": [i + 1],
+    }
+
+
+def test_cancel_notification_is_not_dispatched(worker):
+    """キャンセル通知はレーンに積まれず、キュー待ちのリクエストを打ち切る"""
+    request = rpc(1, "getStats")
+    assert worker.accept_message(request) is True
+    assert worker.accept_message({"jsonrpc": "2.0", "method": CANCEL_METHOD, "params": {"id": 1}}) is False
+
+    response = worker.handle_message(request)
+
+    assert response["error"]["code"] == REQUEST_CANCELLED
+    assert worker.cancellation.get_stats() == {"cancelled": 1, "shed": 0, "inflight": 0}
+
+
+def test_expired_request_is_shed_without_running(worker):
+    """キュー待ちの間に期限切れになったリクエストは実行されない"""
+    request = rpc(1, "createIndexRequest", {"document_path": "a.md", "document_hash": "h1"},
+                  deadline=time.time() * 1000 - 1)
+    worker.accept_message(request)
+
+    response = worker.handle_message(request)
+
+    assert response["error"]["code"] == DEADLINE_EXCEEDED
+    assert worker.count_index_requests({})["count"] == 0
+    assert worker.get_stats()["cancellation"]["shed"] == 1
+
+
+def test_add_sections_stops_between_encode_batches(worker):
+    """addSectionsはエンコードのバッチ間でキャンセルを確認し、書き込まない"""
+    request = rpc(1, "addSections", {"sections": [make_section(i) for i in range(3)]})
+    worker.accept_message(request)
+
+    encoded = []
+    original_encode = worker._encode_matrix
+
+    def encode_then_cancel(texts, dimension):
+        encoded.append(len(texts))
+        # 最初のバッチを処理している間にキャンセル通知が届く
+        worker.accept_message({"jsonrpc": "2.0", "method": CANCEL_METHOD, "params": {"id": 1}})
+        return original_encode(texts, dimension)
+
+    worker._encode_matrix = encode_then_cancel
+    # 1セクションずつのバッチにする（2セクション分のトークン数に届かない上限）
+    worker._ensure_model()
+    section = make_section(0)
+    worker.max_batch_tokens = worker.token_estimator.count(f"{section['heading']}\n{section['content']}") + 1
+
+    response = worker.handle_message(request)
+
+    assert response["error"]["code"] == REQUEST_CANCELLED
+    assert encoded == [1]
+    assert worker.get_stats()["totalSections"] == 0
+    assert worker.cancellation.get_stats()["cancelled"] == 1
+
+
+def test_add_sections_rolls_back_written_sections(worker):
+    """書き込みスレッドが書き込み済みのセクションは、キャンセル時に削除される（全件か0件）"""
+    request = rpc(1, "addSections", {"sections": [make_section(i) for i in range(3)]})
+    worker.accept_message(request)
+
+    encoded = []
+    original_encode = worker._encode_matrix
+
+    def cancel_on_second_batch(texts, dimension):
+        encoded.append(len(texts))
+        if len(encoded) == 2:
+            # 1バッチ目の書き込みが終わってからキャンセル通知が届く
+            worker.accept_message({"jsonrpc": "2.0", "method": CANCEL_METHOD, "params": {"id": 1}})
+        return original_encode(texts, dimension)
+
+    worker._encode_matrix = cancel_on_second_batch
+    worker._ensure_model()
+    section = make_section(0)
+    worker.max_batch_tokens = worker.token_estimator.count(f"{section['heading']}\n{section['content']}") + 1
+    worker.write_flush_rows = 1
+
+    response = worker.handle_message(request)
+
+    assert response["error"]["code"] == REQUEST_CANCELLED
+    assert encoded == [1, 1]
+    assert worker.get_stats()["totalSections"] == 0
+
+
+def test_untracked_request_runs_normally(worker):
+    """受信ループを経由しない呼び出し（トークンなし）は従来通り実行される"""
+    response = worker.handle_message(rpc(1, "ping", deadline=time.time() * 1000 - 1))
+    assert response["result"]["status"] == "ok"
@@ -0,0 +1,120 @@
+"""
+埋め込みキャッシュのテスト
+文書の一部だけを変更して再登録した場合、変更したセクションだけがエンコードされることを確認
+同じクエリの検索はクエリベクトルキャッシュからベクトルを取得することを確認
+"""
+
+import gc
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from worker import SearchDocsWorker
+
+
+def create_section(section_id, heading, content, document_hash):
+    now = datetime.now().isoformat()
+    return {
+        "id": section_id,
+        "document_path": "doc.md",
+        "heading": heading,
+        "depth": 1,
+        "content": content,
+        "token_count": 10,
+        "parent_id": None,
+        "order": 0,
+        "is_dirty": False,
+        "document_hash": document_hash,
+        "start_line": 1,
+        "end_line": 10,
+        "section_number": [1],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+@pytest.fixture
+def temp_db():
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def worker(temp_db):
+    worker = SearchDocsWorker(db_path=temp_db)
+    yield worker
+    worker.perf_logger.stop()
+    del worker
+    gc.collect()
+
+
+def _count_encoded_texts(worker):
+    """モデルに渡されたテキストを記録する"""
+    encoded = []
+    original_encode = worker._encode
+    original_encode_matrix = worker._encode_matrix
+
+    def encode(texts, dimension):
+        encoded.extend([texts] if isinstance(texts, str) else texts)
+        return original_encode(texts, dimension)
+
+    def encode_matrix(texts, dimension):
+        encoded.extend(texts)
+        return original_encode_matrix(texts, dimension)
+
+    worker._encode = encode
+    worker._encode_matrix = encode_matrix
+    return encoded
+
+
+def test_unchanged_sections_are_not_reencoded(worker):
+    """文書ハッシュが変わっても、テキストが同じセクションはキャッシュのベクトルを使う"""
+    encoded = _count_encoded_texts(worker)
+
+    sections = [create_section(f"v1-{i}", f"見出し{i}", f"本文{i}", "hash-1") for i in range(5)]
+    worker.add_sections({"sections": sections})
+    assert len(encoded) == 5
+
+    # 1セクションだけ変更して再登録（IDは再生成される）
+    encoded.clear()
+    sections = [create_section(f"v2-{i}", f"見出し{i}", f"本文{i}", "hash-2") for i in range(5)]
+    sections[2]["content"] = "変更した本文"
+    worker.add_sections({"sections": sections})
+
+    assert encoded == ["見出し2\n変更した本文"]
+    stats = worker.get_stats()["embeddingCache"]
+    assert stats["hits"] == 4
+    assert stats["misses"] == 6
+
+
+def test_cached_vectors_match_encoded_vectors(worker):
+    """キャッシュから取得したベクトルで検索結果が変わらない"""
+    sections = [create_section("a", "見出し", "本文", "hash-1")]
+    worker.add_sections({"sections": sections})
+    sections = [create_section("b", "見出し", "本文", "hash-2")]
+    worker.add_sections({"sections": sections})
+
+    table = worker._get_sections_table()
+    rows = table.to_arrow().to_pylist()
+    vectors = {row["id"]: row["vector"] for row in rows}
+    assert vectors["a"] == pytest.approx(vectors["b"], abs=1e-6)
+
+
+def test_repeated_query_skips_model(worker):
+    """同じクエリの2回目以降はモデルを通さずに検索する"""
+    worker.add_sections({"sections": [create_section("a", "見出し", "本文", "hash-1")]})
+    encoded = _count_encoded_texts(worker)
+
+    first = worker.search({"query": "見出し", "limit": 5})
+    second = worker.search({"query": "  見出し ", "limit": 5})
+
+    assert encoded == ["見出し"]
+    assert [r["id"] for r in first["results"]] == [r["id"] for r in second["results"]]
+    assert worker.get_stats()["queryCache"]["hits"] == 1
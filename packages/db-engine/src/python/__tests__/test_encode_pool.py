@@ -0,0 +1,130 @@
+"""
+マルチプロセスのエンコードプールのテスト
+子プロセスが共有メモリの行列に書き込んだベクトルが、1プロセスでのエンコード結果と一致することを確認
+"""
+
+import gc
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from embedding import create_embedding_model
+from utils.encode_pool import EncodePool, EncodePoolError, auto_pool_size
+from worker import SearchDocsWorker
+
+MODEL_NAME = 'cl-nagoya/ruri-v3-30m'
+
+
+def create_section(i):
+    now = datetime.now().isoformat()
+    return {
+        "id": f"s{i}",
+        "document_path": f"doc{i // 10}.md",
+        "heading": f"見出し {i}",
+        "depth": 1,
+        "content": f"本文 {i} " * (1 + i % 5),
+        "token_count": 10,
+        "parent_id": None,
+        "order": i % 10,
+        "is_dirty": False,
+        "document_hash": "hash",
+        "start_line": 1,
+        "end_line": 10,
+        "section_number": [1],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = EncodePool(MODEL_NAME, 'torch', processes=2, num_threads=1)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="module")
+def reference_model():
+    model = create_embedding_model(MODEL_NAME)
+    assert model.initialize()
+    return model
+
+
+def test_auto_pool_size():
+    assert auto_pool_size(4, cores=32) == 8
+    assert auto_pool_size(4, cores=6) == 1
+    assert auto_pool_size(0, cores=3) == 3
+
+
+def test_encode_into_matches_single_process(pool, reference_model):
+    texts = [f"テキスト {i}" for i in range(20)]
+    # 行の順序とバッチの順序が一致しなくてもよい
+    batches = [(texts[i:i + 3], list(range(i, min(i + 3, 20)))) for i in range(0, 20, 3)][::-1]
+    out = np.zeros((22, 256), dtype=np.float32)
+    completed = []
+
+    pool.encode_into(batches, out, 256, on_batch=lambda t, r, v: completed.append((list(t), v.copy())))
+
+    expected = reference_model.encode_matrix(texts, 256)
+    np.testing.assert_allclose(out[:20], expected, rtol=1e-6)
+    # バッチに含まれない行は書き込まない
+    np.testing.assert_array_equal(out[20:], 0)
+    assert sorted(t for batch, _ in completed for t in batch) == sorted(texts)
+    assert pool.get_stats()["texts"] >= 20
+
+
+def test_encode_into_stops_on_cancel(pool):
+    batches = [([f"t{i}"], [i]) for i in range(40)]
+    out = np.zeros((40, 256), dtype=np.float32)
+    calls = []
+
+    def cancel_after_first():
+        calls.append(1)
+        raise KeyboardInterrupt("cancelled")
+
+    with pytest.raises(KeyboardInterrupt):
+        pool.encode_into(batches, out, 256, check_cancelled=cancel_after_first)
+
+    assert len(calls) == 1
+    # 打ち切り後に投入済みのバッチを待ってから戻るため、プールは続けて使える
+    pool.encode_into([(["再実行"], [0])], out, 256)
+    assert np.linalg.norm(out[0]) == pytest.approx(1.0, rel=1e-5)
+
+
+def test_encode_into_raises_when_process_dies():
+    pool = EncodePool('unsupported/model', 'torch', processes=1, num_threads=1)
+    try:
+        with pytest.raises(EncodePoolError):
+            pool.encode_into([(["a"], [0])], np.zeros((1, 256), dtype=np.float32), 256)
+    finally:
+        pool.close()
+
+
+def test_worker_add_sections_uses_pool(tmp_path):
+    worker = SearchDocsWorker(db_path=str(tmp_path))
+    worker.embedding_cache = None
+    worker.encode_processes = 2
+    try:
+        worker._ensure_model()
+        # 複数バッチに分かれるように上限を小さくする
+        worker.max_batch_tokens = 40
+        sections = [create_section(i) for i in range(30)]
+        texts = [f"{s['heading']}\n{s['content']}" for s in sections]
+
+        assert worker.add_sections({"sections": sections}) == {"count": 30}
+
+        rows = {row["id"]: row["vector"] for row in worker._get_sections_table().to_arrow().to_pylist()}
+        expected = worker.embedding_model.encode_matrix(texts, worker.vector_dimension)
+        for i in range(30):
+            np.testing.assert_allclose(rows[f"s{i}"], expected[i], rtol=1e-5, atol=1e-6)
+        assert worker.get_stats()["encodePool"]["processes"] == 2
+    finally:
+        worker.close_encode_pool()
+        worker.perf_logger.stop()
+        del worker
+        gc.collect()
@@ -0,0 +1,113 @@
+"""
+全文検索とハイブリッド検索のテスト
+識別子を含むクエリがmode='fts' / 'hybrid'で見つかり、ステージごとの時間が返ることを確認
+"""
+
+import gc
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from worker import SearchDocsWorker
+
+SECTIONS = [
+    ("config", "docs/config.md", "設定ファイル", "worker.maxBatchTokens は1バッチの最大トークン数を指定します。"),
+    ("gc", "docs/gc.md", "GCの実行方針", "gcEveryMB を超えたら gc_policy.maybe_collect() でGCします。"),
+    ("search", "docs/search.md", "検索", "ベクトル検索とキーワード検索を組み合わせて、関連する文書を探します。"),
+    ("index", "notes/index.md", "インデックス", "全文検索インデックスは日本語をn-gramで分割します。"),
+    ("intro", "README.md", "はじめに", "search-docsはMarkdown文書をセクション単位で検索するツールです。"),
+]
+
+
+def create_section(section_id, document_path, heading, content):
+    now = datetime.now().isoformat()
+    return {
+        "id": section_id,
+        "document_path": document_path,
+        "heading": heading,
+        "depth": 1,
+        "content": content,
+        "token_count": 10,
+        "parent_id": None,
+        "order": 0,
+        "is_dirty": False,
+        "document_hash": "hash",
+        "start_line": 1,
+        "end_line": 10,
+        "section_number": [1],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+@pytest.fixture(scope="module")
+def worker():
+    temp_dir = tempfile.mkdtemp()
+    worker = SearchDocsWorker(db_path=temp_dir)
+    worker.add_sections({"sections": [create_section(*section) for section in SECTIONS]})
+    yield worker
+    worker.perf_logger.stop()
+    del worker
+    gc.collect()
+    shutil.rmtree(temp_dir)
+
+
+def test_fts_indexes_created(worker):
+    indices = worker._get_sections_table().list_indices()
+    fts_columns = sorted(index.columns[0] for index in indices if index.index_type == "FTS")
+    assert fts_columns == ["content", "heading"]
+
+
+def test_fts_finds_identifier(worker):
+    result = worker.search({"query": "maxBatchTokens", "mode": "fts", "limit": 3})
+    assert result["results"][0]["id"] == "config"
+    assert set(result["timings"]) == {"ftsMs"}
+
+    result = worker.search({"query": "maybe_collect", "mode": "fts", "limit": 3})
+    assert result["results"][0]["id"] == "gc"
+
+
+def test_fts_japanese_and_filters(worker):
+    result = worker.search({"query": "キーワード検索", "mode": "fts", "limit": 3})
+    assert result["results"][0]["id"] == "search"
+
+    result = worker.search({"query": "全文検索インデックス", "mode": "fts", "excludePaths": ["notes/"]})
+    assert "index" not in [r["id"] for r in result["results"]]
+
+
+def test_hybrid_ranks_identifier_match_and_reports_timings(worker):
+    result = worker.search({"query": "maxBatchTokens", "mode": "hybrid", "limit": 3})
+    assert result["results"][0]["id"] == "config"
+    assert set(result["timings"]) == {"embedMs", "vectorMs", "ftsMs", "fusionMs"}
+    # RRFのスコアは降順
+    scores = [r["score"] for r in result["results"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_vector_mode_is_default(worker):
+    default = worker.search({"query": "ベクトル検索", "limit": 3})
+    vector = worker.search({"query": "ベクトル検索", "mode": "vector", "limit": 3})
+    assert [r["id"] for r in default["results"]] == [r["id"] for r in vector["results"]]
+    assert set(default["timings"]) == {"embedMs", "vectorMs"}
+
+
+def test_search_batch_modes(worker):
+    result = worker.search_batch({"queries": ["maxBatchTokens", "maybe_collect"], "mode": "fts", "limit": 2})
+    assert [response["results"][0]["id"] for response in result["responses"]] == ["config", "gc"]
+    # 全文検索だけの場合はベクトル化しない
+    assert result["timings"] == {}
+
+    result = worker.search_batch({"queries": ["maxBatchTokens", "maybe_collect"], "mode": "hybrid", "limit": 2})
+    assert [response["results"][0]["id"] for response in result["responses"]] == ["config", "gc"]
+    assert "embedMs" in result["timings"]
+
+
+def test_invalid_mode(worker):
+    with pytest.raises(ValueError):
+        worker.search({"query": "検索", "mode": "bm25"})
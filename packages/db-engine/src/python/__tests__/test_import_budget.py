@@ -0,0 +1,33 @@
+"""
+worker.pyのインポートコストのテスト
+最初の応答に不要な重いモジュールがモジュール読み込み時にインポートされないことを確認
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PYTHON_DIR = Path(__file__).parent.parent
+
+# worker.pyの読み込み時にインポートしてはいけないモジュール（最初に使う時点でインポートする）
+LAZY_MODULES = ['duckdb', 'torch', 'sentence_transformers', 'transformers', 'psutil']
+
+
+def test_worker_import_does_not_load_heavy_modules():
+    """worker.pyの読み込みでは遅延インポート対象のモジュールを読み込まない"""
+    code = (
+        "import sys, json\n"
+        "import worker\n"
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PYTHON_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    assert loaded == []
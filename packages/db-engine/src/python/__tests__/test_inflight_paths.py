@@ -0,0 +1,106 @@
+"""
+インデックス中のパスの集合のテスト
+IndexRequestの作成・更新で集合が差分更新され、excludeInflightの検索で除外されること、
+再起動後はindex_requestsから読み込まれることを確認
+"""
+
+import gc
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from worker import SearchDocsWorker
+
+PATHS = ["docs/a.md", "docs/b.md", "docs/it's.md"]
+
+
+def create_section(index, document_path):
+    now = datetime.now().isoformat()
+    return {
+        "id": f"s{index}",
+        "document_path": document_path,
+        "heading": "設定",
+        "depth": 1,
+        "content": "maxBatchTokens を指定します。",
+        "token_count": 10,
+        "parent_id": None,
+        "order": 0,
+        "is_dirty": False,
+        "document_hash": "hash",
+        "start_line": 1,
+        "end_line": 10,
+        "section_number": [1],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def search_paths(worker, **params):
+    result = worker.search({"query": "maxBatchTokens", "mode": "fts", "limit": 10, **params})
+    return {row["document_path"]: row["has_pending_update"] for row in result["results"]}
+
+
+@pytest.fixture
+def db_path():
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    gc.collect()
+    shutil.rmtree(temp_dir)
+
+
+def open_worker(db_path):
+    worker = SearchDocsWorker(db_path=db_path)
+    worker.embedding_cache = None
+    return worker
+
+
+def close_worker(worker):
+    worker.perf_logger.stop()
+    del worker
+    gc.collect()
+
+
+def test_inflight_paths_excluded_until_completed(db_path):
+    worker = open_worker(db_path)
+    worker.add_sections({"sections": [create_section(i, path) for i, path in enumerate(PATHS)]})
+
+    request = worker.create_index_request({"document_path": "docs/a.md", "document_hash": "h1"})
+    worker.create_index_request({"document_path": "docs/it's.md", "document_hash": "h2"})
+
+    assert search_paths(worker) == {"docs/a.md": True, "docs/b.md": False, "docs/it's.md": True}
+    assert search_paths(worker, excludeInflight=True) == {"docs/b.md": False}
+    assert sorted(worker.get_paths_with_status({"statuses": ["pending"]})["paths"]) == ["docs/a.md", "docs/it's.md"]
+
+    worker.update_index_request({"id": request["id"], "updates": {"status": "processing"}})
+    assert worker.get_paths_with_status({"statuses": ["processing"]})["paths"] == ["docs/a.md"]
+
+    worker.update_index_request({"id": request["id"], "updates": {"status": "completed"}})
+    assert search_paths(worker, excludeInflight=True) == {"docs/a.md": False, "docs/b.md": False}
+
+    worker.update_many_index_requests({"filter": {"status": "pending"}, "updates": {"status": "skipped"}})
+    assert worker.get_paths_with_status({"statuses": ["pending", "processing"]})["paths"] == []
+    assert len(search_paths(worker, excludeInflight=True)) == 3
+
+    # pending / processing以外はテーブルから取得する
+    assert worker.get_paths_with_status({"statuses": ["skipped"]})["paths"] == ["docs/it's.md"]
+
+    assert worker.get_stats()["inflightPaths"] == {"paths": 0, "requests": 0, "updates": 5}
+    close_worker(worker)
+
+
+def test_inflight_paths_loaded_on_restart(db_path):
+    worker = open_worker(db_path)
+    worker.add_sections({"sections": [create_section(i, path) for i, path in enumerate(PATHS)]})
+    worker.create_index_request({"document_path": "docs/b.md", "document_hash": "h1"})
+    close_worker(worker)
+
+    worker = open_worker(db_path)
+    assert search_paths(worker, excludeInflight=True) == {"docs/a.md": False, "docs/it's.md": False}
+    assert worker.get_stats()["inflightPaths"]["paths"] == 1
+    close_worker(worker)
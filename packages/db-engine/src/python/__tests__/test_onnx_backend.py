@@ -0,0 +1,77 @@
+"""
+ONNX Runtimeバックエンドのテスト
+
+パリティテストはtorchバックエンドとのコサイン類似度を比較する。
+onnxruntime / optimum（`uv sync --extra onnx`）が未インストールの場合、モデルをダウンロードできない場合はスキップ。
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from embedding import (
+    BACKEND_ONNX,
+    BACKEND_ONNX_INT8,
+    BACKEND_TORCH,
+    RuriEmbedding,
+    create_embedding_model,
+)
+
+MODEL_NAME = 'cl-nagoya/ruri-v3-30m'
+
+TEXTS = [
+    "検索クエリ: LanceDBのインデックスを再構築する方法",
+    "文章: ワーカーは標準入出力を介してTypeScriptと通信する。",
+    "文章: 埋め込みベクトルはセクションの見出しと本文から作成される。",
+    "文章: The worker batches sections by estimated token count before encoding.",
+    "短い",
+]
+
+# バックエンドごとのコサイン類似度の下限
+MIN_COSINE = {
+    BACKEND_ONNX: 0.999,
+    BACKEND_ONNX_INT8: 0.97,
+}
+
+
+def test_cache_key_includes_backend():
+    """torch以外のバックエンドはキャッシュのキーを分ける"""
+    assert RuriEmbedding(MODEL_NAME).cache_key == MODEL_NAME
+    assert RuriEmbedding(MODEL_NAME, backend=BACKEND_ONNX_INT8).cache_key == f"{MODEL_NAME}#onnx-int8"
+
+
+def test_unsupported_backend():
+    with pytest.raises(ValueError, match="Unsupported backend"):
+        create_embedding_model(MODEL_NAME, backend='tensorrt')
+
+
+@pytest.fixture(scope="module")
+def torch_vectors():
+    pytest.importorskip("torch")
+    model = RuriEmbedding(MODEL_NAME, backend=BACKEND_TORCH)
+    if not model.load():
+        pytest.skip("torch backend could not be loaded")
+    return model.encode_matrix(TEXTS)
+
+
+@pytest.mark.parametrize("backend", [BACKEND_ONNX, BACKEND_ONNX_INT8])
+def test_onnx_parity_with_torch(backend, torch_vectors, tmp_path_factory, monkeypatch):
+    """ONNXバックエンドのベクトルはtorchバックエンドとほぼ同じ方向を向く"""
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("optimum")
+    monkeypatch.setenv("SEARCH_DOCS_ONNX_DIR", str(tmp_path_factory.getbasetemp() / "onnx"))
+
+    model = RuriEmbedding(MODEL_NAME, backend=backend, num_threads=2)
+    if not model.load():
+        pytest.skip(f"{backend} backend could not be loaded")
+    vectors = model.encode_matrix(TEXTS)
+
+    assert vectors.shape == torch_vectors.shape
+    cosine = np.sum(vectors * torch_vectors, axis=1) / (
+        np.linalg.norm(vectors, axis=1) * np.linalg.norm(torch_vectors, axis=1)
+    )
+    assert cosine.min() >= MIN_COSINE[backend], cosine
@@ -0,0 +1,119 @@
+"""
+replaceDocumentSectionsのテスト
+1回のコミットで、内容が同じセクションは既存のIDとベクトルを引き継ぎ、変更・追加されたセクションは追加され、
+なくなったセクションだけが削除されることを確認
+"""
+
+import gc
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from worker import SearchDocsWorker
+
+
+def create_section(section_id, document_path, document_hash, heading, content, rng, depth=1, order=0, parent_id=None):
+    now = datetime.now().isoformat()
+    vector = rng.standard_normal(256).astype(np.float32)
+    return {
+        "id": section_id,
+        "document_path": document_path,
+        "heading": heading,
+        "depth": depth,
+        "content": content,
+        "token_count": 10,
+        "parent_id": parent_id,
+        "order": order,
+        "is_dirty": False,
+        "document_hash": document_hash,
+        "start_line": order + 1,
+        "end_line": order + 1,
+        "section_number": [order + 1],
+        "created_at": now,
+        "updated_at": now,
+        "vector": (vector / np.linalg.norm(vector)).tolist(),
+    }
+
+
+def rows_by_id(worker, document_path):
+    table = worker._get_sections_table()
+    return {row["id"]: row for row in table.search().where(f"document_path = '{document_path}'").to_list()}
+
+
+@pytest.fixture
+def worker():
+    temp_dir = tempfile.mkdtemp()
+    worker = SearchDocsWorker(db_path=temp_dir)
+    worker.embedding_cache = None
+    rng = np.random.default_rng(0)
+    worker.add_sections({"sections": [
+        create_section("old-a", "a.md", "v1", "概要", "変わらない本文", rng, order=0),
+        create_section("old-b", "a.md", "v1", "詳細", "古い本文", rng, depth=2, order=1, parent_id="old-a"),
+        create_section("old-c", "a.md", "v1", "削除", "消える本文", rng, order=2),
+        create_section("other", "b.md", "v1", "別の文書", "本文", rng),
+    ]})
+    yield worker
+    worker.perf_logger.stop()
+    del worker
+    gc.collect()
+    shutil.rmtree(temp_dir)
+
+
+def test_replace_reuses_unchanged_sections_in_one_commit(worker):
+    before = rows_by_id(worker, "a.md")
+    table = worker._get_sections_table()
+    version = table.version
+
+    rng = np.random.default_rng(1)
+    sections = [
+        create_section("new-a", "a.md", "v2", "概要", "変わらない本文", rng, order=0),
+        create_section("new-b", "a.md", "v2", "詳細", "新しい本文", rng, depth=2, order=1, parent_id="new-a"),
+        create_section("new-d", "a.md", "v2", "追加", "新しいセクション", rng, order=2),
+    ]
+    # 内容が同じセクションのベクトルは既存のものが使われる（渡したベクトルは使わない）
+    del sections[0]["vector"]
+
+    result = worker.replace_document_sections({"documentPath": "a.md", "documentHash": "v2", "sections": sections})
+    assert (result["count"], result["reused"], result["inserted"], result["deleted"]) == (3, 1, 2, 2)
+
+    # 1回のコミット
+    assert table.version == version + 1
+
+    after = rows_by_id(worker, "a.md")
+    assert set(after) == {"old-a", "new-b", "new-d"}
+    assert after["old-a"]["document_hash"] == "v2"
+    np.testing.assert_allclose(after["old-a"]["vector"], before["old-a"]["vector"])
+    # 引き継いだ親のIDに置き換えられる
+    assert after["new-b"]["parent_id"] == "old-a"
+    np.testing.assert_allclose(after["new-d"]["vector"], sections[2]["vector"], rtol=1e-6)
+
+    # 他の文書は変わらない
+    assert set(rows_by_id(worker, "b.md")) == {"other"}
+
+
+def test_replace_with_no_sections_deletes_document(worker):
+    result = worker.replace_document_sections({"documentPath": "a.md", "documentHash": "v2", "sections": []})
+    assert (result["count"], result["deleted"]) == (0, 3)
+    assert rows_by_id(worker, "a.md") == {}
+    assert set(rows_by_id(worker, "b.md")) == {"other"}
+
+
+def test_replace_rejects_sections_of_other_documents(worker):
+    rng = np.random.default_rng(2)
+    section = create_section("x", "b.md", "v2", "見出し", "本文", rng)
+    with pytest.raises(ValueError):
+        worker.replace_document_sections({"documentPath": "a.md", "documentHash": "v2", "sections": [section]})
+
+    response = worker.handle_request({
+        "jsonrpc": "2.0", "id": 1, "method": "replaceDocumentSections",
+        "params": {"documentPath": "a.md", "documentHash": "v2", "sections": [section]},
+    })
+    assert "error" in response
+    assert len(rows_by_id(worker, "a.md")) == 3
@@ -0,0 +1,92 @@
+"""
+index_requestsの削除とコンパクションのテスト
+保持期間を過ぎた終了済みのリクエストが削除され、パスごとの最新とインデックス中のリクエストは残り、
+コンパクションで古いバージョンが削除されることを確認
+"""
+
+import gc
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.request_retention import RequestRetentionPolicy
+from worker import SearchDocsWorker
+
+
+@pytest.fixture
+def worker():
+    temp_dir = tempfile.mkdtemp()
+    worker = SearchDocsWorker(db_path=temp_dir)
+    worker.embedding_cache = None
+    # テストでは古いバージョンをすぐに削除する
+    worker.request_retention = RequestRetentionPolicy(retention_days=7, version_retention_seconds=0)
+    yield worker
+    worker.perf_logger.stop()
+    del worker
+    gc.collect()
+    shutil.rmtree(temp_dir)
+
+
+def create_request(worker, path, status, days_ago):
+    request = worker.create_index_request({"document_path": path, "document_hash": f"{path}-{days_ago}"})
+    if status != "pending":
+        worker.update_index_request({"id": request["id"], "updates": {"status": status}})
+    created_at = pd.Timestamp.now(tz="UTC").tz_localize(None).floor("ms") - pd.Timedelta(days=days_ago)
+    worker._get_index_requests_table().update(where=f"id = '{request['id']}'", values={"created_at": created_at})
+    return request["id"]
+
+
+def remaining_ids(worker):
+    return {row["id"] for row in worker._get_index_requests_table().search().select(["id"]).to_list()}
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_purge_keeps_latest_and_inflight_requests(worker):
+    old_a = [create_request(worker, "a.md", "completed", days) for days in (30, 20)]
+    latest_a = create_request(worker, "a.md", "failed", 10)
+    recent_a = create_request(worker, "a.md", "completed", 1)
+    latest_b = create_request(worker, "b.md", "skipped", 30)
+    pending_b = create_request(worker, "b.md", "pending", 40)
+
+    result = worker.purge_index_requests({})
+    # 保持期間内のrecent_aが最新なので、latest_aは期間を過ぎた古いリクエストとして削除される
+    assert result["purgedRows"] == 3
+    assert remaining_ids(worker) == {recent_a, latest_b, pending_b}
+    assert not set(old_a + [latest_a]) & remaining_ids(worker)
+
+    # statusの更新ごとのバージョンが削除され、ディスク上のサイズが減る
+    assert result["removedVersions"] > 0
+    assert result["reclaimedBytes"] > 0
+
+    stats = worker.get_stats()["requestRetention"]
+    assert stats["purges"] == 1
+    assert stats["purgedRows"] == 3
+    assert stats["lastPurge"] == result
+
+    # 検索・集計は削除後も使える
+    assert worker.count_index_requests({"document_path": "b.md"})["count"] == 2
+    assert worker.get_paths_with_status({"statuses": ["pending"]})["paths"] == ["b.md"]
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_purge_with_retention_override(worker):
+    create_request(worker, "a.md", "completed", 2)
+    latest = create_request(worker, "a.md", "completed", 1)
+
+    assert worker.purge_index_requests({})["purgedRows"] == 0
+    assert worker.purge_index_requests({"retentionDays": 0})["purgedRows"] == 1
+    assert remaining_ids(worker) == {latest}
+
+    with pytest.raises(ValueError):
+        worker.purge_index_requests({"retentionDays": -1})
+
+
+def test_purge_rpc(worker):
+    response = worker.handle_request({"jsonrpc": "2.0", "id": 1, "method": "purgeIndexRequests", "params": {}})
+    assert response["result"]["purgedRows"] == 0
@@ -0,0 +1,105 @@
+"""
+searchBatchのテスト
+複数のクエリを1回の推論でベクトル化し、クエリごとにsearchと同じ結果を返すことを確認
+"""
+
+import gc
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from worker import SearchDocsWorker
+
+
+def create_section(section_id, document_path, depth, content):
+    now = datetime.now().isoformat()
+    return {
+        "id": section_id,
+        "document_path": document_path,
+        "heading": f"見出し {section_id}",
+        "depth": depth,
+        "content": content,
+        "token_count": 10,
+        "parent_id": None,
+        "order": 0,
+        "is_dirty": False,
+        "document_hash": "hash",
+        "start_line": 1,
+        "end_line": 10,
+        "section_number": [1],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+@pytest.fixture
+def worker():
+    temp_dir = tempfile.mkdtemp()
+    worker = SearchDocsWorker(db_path=temp_dir)
+    worker.add_sections({"sections": [
+        create_section(f"s{i}", "docs/a.md" if i % 2 else "notes/b.md", i % 3, f"本文 {i} " * (1 + i % 4))
+        for i in range(12)
+    ]})
+    yield worker
+    worker.perf_logger.stop()
+    del worker
+    gc.collect()
+    shutil.rmtree(temp_dir)
+
+
+def test_search_batch_matches_search(worker):
+    """クエリごとの結果はsearchと同じ（共通のフィルタが全クエリに適用される）"""
+    queries = ["本文 1", "見出し s4", "本文 7 本文 7"]
+    filters = {"limit": 3, "depth": 1, "excludePaths": ["notes/"]}
+
+    batch = worker.search_batch({"queries": queries, **filters})
+
+    assert len(batch["responses"]) == len(queries)
+    for query, response in zip(queries, batch["responses"]):
+        single = worker.search({"query": query, **filters})
+        assert [r["id"] for r in response["results"]] == [r["id"] for r in single["results"]]
+        assert response["total"] == single["total"]
+        assert all(r["depth"] <= 1 and r["document_path"].startswith("docs/") for r in response["results"])
+
+
+def test_search_batch_encodes_missing_queries_once(worker):
+    """キャッシュにないクエリだけを重複なしで1回の推論に渡す"""
+    worker.search({"query": "cached"})
+    calls = []
+    original_encode_matrix = worker._encode_matrix
+
+    def encode_matrix(texts, dimension):
+        calls.append(list(texts))
+        return original_encode_matrix(texts, dimension)
+
+    worker._encode_matrix = encode_matrix
+
+    response = worker.handle_message({
+        "jsonrpc": "2.0", "id": 1, "method": "searchBatch",
+        "params": {"queries": ["alpha", "cached", " alpha ", "beta"], "limit": 2},
+    })
+
+    assert calls == [["alpha", "beta"]]
+    responses = response["result"]["responses"]
+    assert len(responses) == 4
+    assert [r["id"] for r in responses[0]["results"]] == [r["id"] for r in responses[2]["results"]]
+    # 2回目はキャッシュから取得する
+    worker.search_batch({"queries": ["alpha", "beta"]})
+    assert len(calls) == 1
+
+
+def test_search_batch_requires_queries(worker):
+    with pytest.raises(ValueError):
+        worker.search_batch({"queries": []})
+    with pytest.raises(ValueError):
+        worker.search_batch({"queries": ["ok", ""]})
+
+
+def test_search_batch_runs_on_read_lane(worker):
+    assert worker.lane_for_request({"method": "searchBatch"}) == "read"
@@ -0,0 +1,199 @@
+"""
+ワーカーの非ブロッキング起動のテスト
+モデルロード・インデックス構築の完了前でもpingとメタデータ参照に応答することを確認
+"""
+
+import pytest
+import gc
+import sys
+import threading
+import tempfile
+import shutil
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from worker import SearchDocsWorker, MODEL_PHASE, INDEXES_PHASE, FTS_INDEX_PHASE, VECTOR_INDEX_PHASE
+from utils.startup import PHASE_NOT_READY
+from utils.request_dispatcher import RequestDispatcher
+
+
+@pytest.fixture
+def temp_db():
+    """一時的なDBディレクトリを作成"""
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def blocked_worker(temp_db, monkeypatch):
+    """モデルロードとインデックス構築が止まった状態のワーカー"""
+    release = threading.Event()
+    original_build = SearchDocsWorker.build_scalar_indexes
+    original_load = SearchDocsWorker._load_model
+
+    def blocked_build(self):
+        release.wait(timeout=10)
+        return original_build(self)
+
+    def blocked_load(self):
+        release.wait(timeout=10)
+        return original_load(self)
+
+    monkeypatch.setattr(SearchDocsWorker, 'build_scalar_indexes', blocked_build)
+    monkeypatch.setattr(SearchDocsWorker, '_load_model', blocked_load)
+
+    worker = SearchDocsWorker(db_path=temp_db, background_startup=True)
+    yield worker, release
+    release.set()
+    worker.startup.wait(MODEL_PHASE, timeout=10)
+    worker.startup.wait(INDEXES_PHASE, timeout=10)
+    worker.startup.wait(VECTOR_INDEX_PHASE, timeout=10)
+    del worker
+    gc.collect()
+
+
+def rpc(request_id, method, params=None):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+
+
+def test_ping_answers_before_background_phases(blocked_worker):
+    """バックグラウンドのフェーズが終わる前でもpingは起動状況を返す"""
+    worker, release = blocked_worker
+
+    result = worker.handle_request(rpc(1, "ping"))["result"]
+
+    assert result["status"] == "ok"
+    assert result["ready"] is False
+    phases = result["startup"]["phases"]
+    assert phases["tables"]["status"] == "done"
+    assert phases[MODEL_PHASE]["status"] == "running"
+    assert phases[INDEXES_PHASE]["status"] == "running"
+    assert "durationMs" in phases["imports"]
+
+
+def test_metadata_reads_do_not_wait(blocked_worker):
+    """メタデータ参照はインデックス構築を待たない"""
+    worker, release = blocked_worker
+
+    response = worker.handle_request(rpc(1, "countIndexRequests"))
+
+    assert response["result"]["count"] == 0
+    assert not release.is_set()
+
+
+def test_writes_wait_for_indexes(blocked_worker):
+    """書き込み系はインデックス構築の完了を待ってから実行される"""
+    worker, release = blocked_worker
+    responses = []
+
+    thread = threading.Thread(target=lambda: responses.append(worker.handle_request(
+        rpc(1, "createIndexRequest", {"document_path": "a.md", "document_hash": "h1"})
+    )))
+    thread.start()
+    thread.join(timeout=0.5)
+    assert responses == []
+
+    release.set()
+    thread.join(timeout=10)
+    assert responses[0]["result"]["status"] == "pending"
+
+    result = worker.handle_request(rpc(2, "ping"))["result"]
+    assert result["startup"]["phases"][INDEXES_PHASE]["status"] == "done"
+
+
+def test_search_does_not_block_read_lane_while_model_loads(blocked_worker):
+    """モデルのロード中のベクトル検索は保留され、後続のpingは読み取りレーンですぐに処理される"""
+    worker, release = blocked_worker
+    dispatcher = RequestDispatcher(handler=worker.handle_message, lane_for=worker.lane_for_request)
+    worker.dispatcher = dispatcher
+    dispatcher.start()
+    responses = {}
+    received = threading.Event()
+
+    def reply(response):
+        responses[response["id"]] = response
+        received.set()
+
+    try:
+        worker.submit_message(rpc(1, "search", {"query": "設定", "limit": 1}), reply)
+        worker.submit_message(rpc(2, "ping"), reply)
+        assert received.wait(timeout=5)
+        assert list(responses) == [2]
+        assert not release.is_set()
+
+        # ロードが終わると保留していた検索がレーンに積まれる
+        release.set()
+        worker.startup.wait(MODEL_PHASE, timeout=10)
+        for _ in range(100):
+            if 1 in responses:
+                break
+            threading.Event().wait(0.1)
+        assert responses[1]["result"]["results"] == []
+    finally:
+        dispatcher.shutdown(wait=True)
+
+
+def test_writes_do_not_wait_for_vector_index(temp_db, monkeypatch):
+    """ベクトルインデックスの確認・作成は別のフェーズで、書き込み系はその完了を待たない"""
+    release = threading.Event()
+    original_update = SearchDocsWorker.update_vector_index
+
+    def blocked_update(self, *args, **kwargs):
+        release.wait(timeout=10)
+        return original_update(self, *args, **kwargs)
+
+    monkeypatch.setattr(SearchDocsWorker, 'update_vector_index', blocked_update)
+    worker = SearchDocsWorker(db_path=temp_db, background_startup=True)
+    try:
+        worker.startup.wait(INDEXES_PHASE, timeout=10)
+        response = worker.handle_request(
+            rpc(1, "createIndexRequest", {"document_path": "a.md", "document_hash": "h1"})
+        )
+        assert response["result"]["status"] == "pending"
+        assert not release.is_set()
+        assert worker.handle_request(rpc(2, "ping"))["result"]["startup"]["phases"][VECTOR_INDEX_PHASE]["status"] == "running"
+    finally:
+        release.set()
+        worker.startup.wait(MODEL_PHASE, timeout=10)
+        worker.startup.wait(VECTOR_INDEX_PHASE, timeout=10)
+        worker.perf_logger.stop()
+        del worker
+        gc.collect()
+
+
+def test_fts_search_does_not_wait_for_fts_index(temp_db, monkeypatch):
+    """全文検索インデックスの作成中は、全文検索は再試行を求め、ハイブリッド検索はベクトル検索だけで返す"""
+    release = threading.Event()
+    original_maintain = SearchDocsWorker._maintain_fts_indexes
+
+    def blocked_maintain(self):
+        release.wait(timeout=10)
+        return original_maintain(self)
+
+    monkeypatch.setattr(SearchDocsWorker, '_maintain_fts_indexes', blocked_maintain)
+    worker = SearchDocsWorker(db_path=temp_db, background_startup=True)
+    try:
+        response = worker.handle_request(rpc(1, "search", {"query": "maxBatchTokens", "mode": "fts"}))
+        assert response["error"]["code"] == PHASE_NOT_READY
+        assert not release.is_set()
+
+        worker.startup.wait(MODEL_PHASE, timeout=10)
+        response = worker.handle_request(rpc(2, "search", {"query": "maxBatchTokens", "mode": "hybrid"}))
+        assert response["result"]["ftsIndexPending"] is True
+        assert "ftsMs" not in response["result"]["timings"]
+
+        release.set()
+        worker.startup.wait(FTS_INDEX_PHASE, timeout=10)
+        assert worker.startup.is_done(FTS_INDEX_PHASE)
+        response = worker.handle_request(rpc(3, "search", {"query": "maxBatchTokens", "mode": "hybrid"}))
+        assert "ftsIndexPending" not in response["result"]
+        assert "ftsMs" in response["result"]["timings"]
+    finally:
+        release.set()
+        worker.startup.wait(MODEL_PHASE, timeout=10)
+        worker.startup.wait(VECTOR_INDEX_PHASE, timeout=10)
+        worker.perf_logger.stop()
+        del worker
+        gc.collect()
@@ -0,0 +1,121 @@
+"""
+ベクトルインデックスのテスト
+セクション数がしきい値を超えたらadd_sectionsの後にインデックスが作成・追加・再学習され、
+インデックスを使った検索（nprobes / refineFactor）で最近傍のセクションが見つかることを確認
+"""
+
+import gc
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.vector_index import VectorIndexPolicy
+from worker import SearchDocsWorker
+
+
+def create_sections(rng, start, count, dimension):
+    """ベクトル付きのセクション（エンコードしない）"""
+    now = datetime.now().isoformat()
+    vectors = rng.standard_normal((count, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        {
+            "id": f"s{start + i}",
+            "document_path": f"doc{(start + i) // 50}.md",
+            "heading": f"見出し {start + i}",
+            "depth": 1,
+            "content": f"本文 {start + i}",
+            "token_count": 10,
+            "parent_id": None,
+            "order": i,
+            "is_dirty": False,
+            "document_hash": "hash",
+            "start_line": 1,
+            "end_line": 10,
+            "section_number": [1],
+            "created_at": now,
+            "updated_at": now,
+            "vector": vectors[i].tolist(),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def worker():
+    temp_dir = tempfile.mkdtemp()
+    worker = SearchDocsWorker(db_path=temp_dir)
+    worker.embedding_cache = None
+    worker.vector_index_policy = VectorIndexPolicy(min_rows=600, update_rows=100)
+    yield worker
+    worker.perf_logger.stop()
+    del worker
+    gc.collect()
+    shutil.rmtree(temp_dir)
+
+
+def test_vector_index_created_updated_and_retrained(worker):
+    rng = np.random.default_rng(0)
+    dimension = worker.vector_dimension
+
+    worker.add_sections({"sections": create_sections(rng, 0, 400, dimension)})
+    assert worker.get_stats()["vectorIndex"]["builds"] == 0
+
+    # しきい値を超えたら作成
+    worker.add_sections({"sections": create_sections(rng, 400, 300, dimension)})
+    stats = worker.get_stats()["vectorIndex"]
+    assert stats["builds"] == 1
+    assert stats["indexedRows"] == 700
+    assert stats["trainedRows"] == 700
+
+    # インデックスに入っていない行が溜まったら追加（学習し直さない）
+    worker.add_sections({"sections": create_sections(rng, 700, 150, dimension)})
+    stats = worker.get_stats()["vectorIndex"]
+    assert (stats["builds"], stats["updates"]) == (1, 1)
+    assert stats["indexedRows"] == 850
+    assert stats["unindexedRows"] == 0
+    assert stats["trainedRows"] == 700
+
+    # 学習時から2倍になったら再学習
+    worker.add_sections({"sections": create_sections(rng, 850, 550, dimension)})
+    stats = worker.get_stats()["vectorIndex"]
+    assert stats["builds"] == 2
+    assert stats["trainedRows"] == 1400
+
+
+def test_search_with_vector_index(worker):
+    rng = np.random.default_rng(1)
+    sections = create_sections(rng, 0, 700, worker.vector_dimension)
+    target = sections[123]
+    query_vector = list(target["vector"])
+    worker.add_sections({"sections": sections})
+    assert worker.get_stats()["vectorIndex"]["builds"] == 1
+
+    # クエリのベクトルはキャッシュに入れておく（モデルを通さない）
+    worker.query_cache.put(worker.model_key, worker.vector_dimension, "target", query_vector)
+
+    result = worker.search({"query": "target", "limit": 5, "nprobes": 26, "refineFactor": 10})
+    assert result["results"][0]["id"] == target["id"]
+    assert result["results"][0]["score"] == pytest.approx(0.0, abs=1e-4)
+
+    batch = worker.search_batch({"queries": ["target"], "limit": 5, "nprobes": 26, "refineFactor": 10})
+    assert batch["responses"][0]["results"][0]["id"] == target["id"]
+
+    with pytest.raises(ValueError):
+        worker.search({"query": "target", "nprobes": 0})
+
+
+def test_vector_index_disabled(worker):
+    worker.vector_index_policy = VectorIndexPolicy(min_rows=0)
+    worker.add_sections({"sections": create_sections(np.random.default_rng(2), 0, 700, worker.vector_dimension)})
+
+    assert worker.update_vector_index() is None
+    table = worker._get_sections_table()
+    assert not any(index.columns == ["vector"] for index in table.list_indices())
@@ -0,0 +1,167 @@
+"""
+float32行列によるベクトル化とArrowへの書き込みのテスト
+"""
+
+import gc
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from embedding import adjust_dimensions, pool_embeddings
+from utils.token_windows import DEFAULT_MAX_WINDOWS, plan_token_windows
+from worker import SearchDocsWorker
+
+
+def create_section(section_id, content, vector=None):
+    now = datetime.now().isoformat()
+    section = {
+        "id": section_id,
+        "document_path": "doc.md",
+        "heading": f"見出し {section_id}",
+        "depth": 1,
+        "content": content,
+        "token_count": 10,
+        "parent_id": None,
+        "order": 0,
+        "is_dirty": False,
+        "document_hash": "hash",
+        "start_line": 1,
+        "end_line": 10,
+        "section_number": [1, 2],
+        "created_at": now,
+        "updated_at": now,
+    }
+    if vector is not None:
+        section["vector"] = vector
+    return section
+
+
+@pytest.fixture
+def worker():
+    temp_dir = tempfile.mkdtemp()
+    # 行列のまま書き込まれることを確認するため、埋め込みキャッシュは使わない
+    worker = SearchDocsWorker(db_path=temp_dir)
+    worker.embedding_cache = None
+    yield worker
+    worker.perf_logger.stop()
+    del worker
+    gc.collect()
+    shutil.rmtree(temp_dir)
+
+
+def test_adjust_dimensions_truncates_and_renormalizes_rows():
+    matrix = np.array([[3.0, 4.0, 12.0], [0.0, 0.0, 1.0]], dtype=np.float32)
+
+    adjusted = adjust_dimensions(matrix, 2)
+
+    assert adjusted.dtype == np.float32
+    assert adjusted.flags['C_CONTIGUOUS']
+    np.testing.assert_allclose(adjusted[0], [0.6, 0.8], rtol=1e-6)
+    # ノルムが0の行はそのまま
+    np.testing.assert_array_equal(adjusted[1], [0.0, 0.0])
+
+
+def test_adjust_dimensions_pads_with_zeros():
+    adjusted = adjust_dimensions(np.ones((1, 2), dtype=np.float32), 4)
+    np.testing.assert_array_equal(adjusted, [[1.0, 1.0, 0.0, 0.0]])
+
+
+def test_add_sections_writes_encoded_matrix(worker):
+    """エンコード結果がそのままFixedSizeListとして書き込まれる"""
+    given = [0.5] * worker.vector_dimension
+    sections = [
+        create_section("a", "本文A"),
+        create_section("b", "本文B", vector=given),
+        create_section("c", "本文C"),
+    ]
+    worker.add_sections({"sections": sections})
+
+    table = worker._get_sections_table().to_arrow()
+    assert table.schema.field("vector").type == pa.list_(pa.float32(), worker.vector_dimension)
+
+    rows = {row["id"]: row for row in table.to_pylist()}
+    expected = worker.embedding_model.encode_matrix(["見出し a\n本文A"], worker.vector_dimension)[0]
+    np.testing.assert_allclose(rows["a"]["vector"], expected, rtol=1e-6)
+    # 呼び出し元が指定したベクトルはエンコードしない
+    np.testing.assert_allclose(rows["b"]["vector"], given)
+    assert rows["c"]["section_number"] == [1, 2]
+
+
+def test_encode_matches_encode_matrix(worker):
+    """encode()（リストを返す）とencode_matrix()は同じベクトルを返す"""
+    worker._ensure_model()
+    texts = ["テキスト1", "テキスト2"]
+    as_lists = worker.embedding_model.encode(texts, worker.vector_dimension)
+    as_matrix = worker.embedding_model.encode_matrix(texts, worker.vector_dimension)
+    np.testing.assert_allclose(np.array(as_lists, dtype=np.float32), as_matrix)
+
+
+def test_pool_embeddings_weights_and_normalizes():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+    pooled = pool_embeddings(vectors, [3, 1])
+
+    assert pooled.dtype == np.float32
+    np.testing.assert_allclose(pooled, np.array([3.0, 1.0]) / np.sqrt(10), rtol=1e-6)
+    np.testing.assert_allclose(pool_embeddings(vectors), [np.sqrt(0.5), np.sqrt(0.5)], rtol=1e-6)
+
+
+def test_add_sections_pools_oversized_section(worker):
+    """max_batch_tokensを超えるセクションはウィンドウのベクトルをまとめた正規化済みベクトルになる"""
+    worker._ensure_model()
+    worker.max_batch_tokens = 40
+    large = create_section("large", "長い本文の段落です。\n" * 40)
+    small = create_section("small", "短い本文")
+
+    result = worker.add_sections({"sections": [large, small]})
+
+    text = f"{large['heading']}\n{large['content']}"
+    windows = plan_token_windows(text, 40, worker.token_estimator.count)
+    assert 1 < len(windows) <= DEFAULT_MAX_WINDOWS
+    assert result == {"count": 2, "pooledSections": {"large": len(windows)}}
+
+    rows = {row["id"]: row for row in worker._get_sections_table().to_arrow().to_pylist()}
+    window_vectors = worker.embedding_model.encode_matrix(
+        [window for window, _ in windows], worker.vector_dimension
+    )
+    expected = pool_embeddings(window_vectors, [tokens for _, tokens in windows])
+    np.testing.assert_allclose(rows["large"]["vector"], expected, rtol=1e-5, atol=1e-6)
+    assert np.linalg.norm(rows["large"]["vector"]) == pytest.approx(1.0, rel=1e-5)
+    # ウィンドウの行は書き込まない
+    assert len(rows) == 2
+
+
+def test_adaptive_batch_budget_does_not_change_vectors(monkeypatch):
+    """自動調整の予算でバッチの分け方が変わっても、書き込まれるベクトルは変わらない"""
+    monkeypatch.setattr(sys, "argv", ["worker.py", "--max-batch-tokens=400", "--min-batch-tokens=20"])
+    temp_dir = tempfile.mkdtemp()
+    worker = SearchDocsWorker(db_path=temp_dir)
+    worker.embedding_cache = None
+    try:
+        worker.batch_controller.window = 1
+        sections = [create_section(f"s{i}", f"本文 {i} " * (1 + i % 4)) for i in range(12)]
+
+        worker.add_sections({"sections": sections})
+
+        stats = worker.get_stats()["adaptiveBatch"]
+        assert stats["minTokens"] == 20 and stats["maxTokens"] == 400
+        assert 20 <= stats["batchTokens"] <= 400
+        assert stats["adjustments"] > 0
+        rows = {row["id"]: row["vector"] for row in worker._get_sections_table().to_arrow().to_pylist()}
+        texts = [f"{s['heading']}\n{s['content']}" for s in sections]
+        expected = worker.embedding_model.encode_matrix(texts, worker.vector_dimension)
+        for i in range(12):
+            np.testing.assert_allclose(rows[f"s{i}"], expected[i], rtol=1e-5, atol=1e-6)
+    finally:
+        worker.perf_logger.stop()
+        del worker
+        gc.collect()
+        shutil.rmtree(temp_dir)
@@ -4,21 +4,58 @@
 search-docs用にsebas-chanのRuriEmbeddingを利用
 """
 
+import os
+import platform
 import sys
-from typing import List, Union
+from pathlib import Path
+from typing import Any, List, Optional, Union
 import numpy as np
 
+# 推論バックエンド
+# - torch: SentenceTransformer（PyTorch fp32、GPU/MPSがあれば使う）
+# - onnx: ONNX Runtime（CPU、fp32）
+# - onnx-int8: ONNX Runtime（CPU、動的int8量子化）
+BACKEND_TORCH = 'torch'
+BACKEND_ONNX = 'onnx'
+BACKEND_ONNX_INT8 = 'onnx-int8'
+BACKENDS = (BACKEND_TORCH, BACKEND_ONNX, BACKEND_ONNX_INT8)
+
+
+def onnx_export_dir(model_name: str) -> Path:
+    """ONNXにエクスポートしたモデルの保存先
+
+    環境変数 SEARCH_DOCS_ONNX_DIR で変更できる（デフォルト: ~/.cache/search-docs/onnx）
+    """
+    base = os.getenv('SEARCH_DOCS_ONNX_DIR') or str(Path.home() / '.cache' / 'search-docs' / 'onnx')
+    return Path(base) / model_name.replace('/', '--')
+
+
+def _quantization_config() -> str:
+    """動的量子化の設定（sentence_transformersのquantization_config）"""
+    if platform.machine().lower() in ('arm64', 'aarch64'):
+        return 'arm64'
+    return 'avx2'
+
 
 class EmbeddingModel:
     """Embedding model base class"""
     def encode(self, text: str, dimension: int = None) -> List[float]:
         raise NotImplementedError
 
+    def encode_matrix(self, texts: List[str], dimension: int = None, batch_size: int = None) -> np.ndarray:
+        """(N, dimension) のfloat32行列でベクトル化（batch_sizeはバッチ推論に対応するモデルのみ使う）"""
+        return np.asarray(self.encode(texts, dimension), dtype=np.float32).reshape(len(texts), -1)
+
     @property
     def dimension(self) -> int:
         """モデルの出力次元数"""
         raise NotImplementedError
 
+    @property
+    def tokenizer(self) -> Optional[Any]:
+        """トークン数の計測に使うトークナイザ（使用できない場合はNone）"""
+        return None
+
 
 class RuriEmbedding(EmbeddingModel):
     """Japanese-optimized Ruri model with configurable variants"""
@@ -37,15 +74,25 @@ class RuriEmbedding(EmbeddingModel):
         }
     }
 
-    def __init__(self, model_name: str = 'cl-nagoya/ruri-v3-30m', dimension: int = None):
+    def __init__(
+        self,
+        model_name: str = 'cl-nagoya/ruri-v3-30m',
+        dimension: int = None,
+        backend: str = BACKEND_TORCH,
+        num_threads: Optional[int] = None
+    ):
         """
         Initialize Ruri embedding model
 
         Args:
             model_name: モデル名（デフォルト: 'cl-nagoya/ruri-v3-30m'）
             dimension: 出力次元数（Noneの場合はモデルのデフォルト次元）
+            backend: 推論バックエンド（'torch' | 'onnx' | 'onnx-int8'）
+            num_threads: ONNX Runtimeのスレッド数（Noneの場合はONNX Runtimeのデフォルト）
         """
         self.model_name = model_name
+        self.backend = backend
+        self.num_threads = num_threads
         self.available = False
         self.model = None
         self.device = None
@@ -55,19 +102,31 @@ class RuriEmbedding(EmbeddingModel):
                 f"Unsupported model: {model_name}. "
                 f"Supported models: {list(self.MODEL_CONFIGS.keys())}"
             )
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}. Supported backends: {list(BACKENDS)}")
 
         config = self.MODEL_CONFIGS[model_name]
         self._dimension = dimension if dimension is not None else config['dimension']
         self.model_dimension = config['dimension']
 
         # 遅延ロード: load() を呼ぶまでモデルをロードしない
-        sys.stderr.write(f"RuriEmbedding initialized: {model_name} ({config['description']})\n")
+        sys.stderr.write(f"RuriEmbedding initialized: {model_name} ({config['description']}, backend={backend})\n")
+
+    @property
+    def cache_key(self) -> str:
+        """埋め込みキャッシュのキーに使うモデル名（バックエンドごとにベクトルがわずかに異なるため区別する）"""
+        if self.backend == BACKEND_TORCH:
+            return self.model_name
+        return f"{self.model_name}#{self.backend}"
 
     def load(self) -> bool:
         """モデルを実際にロード"""
         if self.available:
             return True
 
+        if self.backend != BACKEND_TORCH:
+            return self._load_onnx()
+
         try:
             from sentence_transformers import SentenceTransformer
 
@@ -103,6 +162,71 @@ class RuriEmbedding(EmbeddingModel):
             self.model = None
             return False
 
+    def _load_onnx(self) -> bool:
+        """ONNX Runtimeのモデルをロード（初回はONNXへのエクスポートと量子化を行う）"""
+        try:
+            from sentence_transformers import SentenceTransformer
+
+            config = self.MODEL_CONFIGS[self.model_name]
+            export_dir = onnx_export_dir(self.model_name)
+            file_name = self._find_onnx_file(export_dir)
+            if file_name is None:
+                self._export_onnx(export_dir)
+                file_name = self._find_onnx_file(export_dir)
+                if file_name is None:
+                    raise RuntimeError(f"ONNX model was not exported to {export_dir}")
+
+            model_kwargs = {'file_name': file_name, 'provider': 'CPUExecutionProvider'}
+            if self.num_threads:
+                import onnxruntime as ort
+                session_options = ort.SessionOptions()
+                session_options.intra_op_num_threads = self.num_threads
+                session_options.inter_op_num_threads = 1
+                model_kwargs['session_options'] = session_options
+
+            self.device = 'cpu'
+            self.model = SentenceTransformer(
+                str(export_dir), backend='onnx', device='cpu', model_kwargs=model_kwargs
+            )
+            self.available = True
+            sys.stderr.write(
+                f"Ruri model loaded: {self.model_name} - {config['description']} "
+                f"on CPU (ONNX Runtime, {file_name}, threads={self.num_threads or 'default'})\n"
+            )
+            return True
+
+        except (ImportError, Exception) as e:
+            sys.stderr.write(f"Warning: Could not load Ruri ONNX model ({self.backend}): {e}\n")
+            self.available = False
+            self.model = None
+            return False
+
+    def _onnx_file_pattern(self) -> str:
+        if self.backend == BACKEND_ONNX_INT8:
+            return f"model_qint8_{_quantization_config()}.onnx"
+        return "model.onnx"
+
+    def _find_onnx_file(self, export_dir: Path) -> Optional[str]:
+        """エクスポート済みのONNXファイル（export_dirからの相対パス）を探す"""
+        if not export_dir.exists():
+            return None
+        for path in sorted(export_dir.rglob(self._onnx_file_pattern())):
+            return path.relative_to(export_dir).as_posix()
+        return None
+
+    def _export_onnx(self, export_dir: Path) -> None:
+        """HuggingFaceのモデルをONNXにエクスポートし、int8の場合は動的量子化する"""
+        from sentence_transformers import SentenceTransformer
+
+        sys.stderr.write(f"Exporting {self.model_name} to ONNX: {export_dir}\n")
+        sys.stderr.flush()
+        model = SentenceTransformer(self.model_name, backend='onnx', device='cpu')
+        model.save(str(export_dir))
+
+        if self.backend == BACKEND_ONNX_INT8:
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+            export_dynamic_quantized_onnx_model(model, _quantization_config(), str(export_dir))
+
     def initialize(self) -> bool:
         """モデルを初期化（loadのエイリアス）"""
         return self.load()
@@ -112,6 +236,13 @@ class RuriEmbedding(EmbeddingModel):
         """モデルの出力次元数"""
         return self._dimension
 
+    @property
+    def tokenizer(self) -> Optional[Any]:
+        """ロード済みモデルのトークナイザ（ロード前はNone）"""
+        if not self.available or self.model is None:
+            return None
+        return getattr(self.model, 'tokenizer', None)
+
     def encode(
         self,
         text: Union[str, List[str]],
@@ -131,16 +262,41 @@ class RuriEmbedding(EmbeddingModel):
             - 入力が単一文字列の場合: List[float]
             - 入力がリストの場合: List[List[float]]
         """
+        is_single = isinstance(text, str)
+
+        # 単一文字列の場合はリストに変換
+        texts = [text] if is_single else text
+        matrix = self.encode_matrix(texts, dimension, batch_size)
+
+        # 単一入力の場合は単一の結果を返す（後方互換性）
+        return matrix[0].tolist() if is_single else matrix.tolist()
+
+    def encode_matrix(
+        self,
+        texts: List[str],
+        dimension: int = None,
+        batch_size: int = 128
+    ) -> np.ndarray:
+        """
+        テキストをベクトル化し、(N, dimension) のfloat32行列で返す
+
+        encode()と異なりPythonのfloatのリストに変換しないため、
+        大量のセクションをArrow（FixedSizeList）に渡す場合にメモリと変換時間を節約できる。
+
+        Args:
+            texts: 変換対象のテキストのリスト
+            dimension: 出力次元数（Noneの場合はコンストラクタで指定した次元）
+            batch_size: バッチサイズ
+
+        Returns:
+            C連続のfloat32行列（行がテキストに対応）
+        """
         if not self.available:
             raise RuntimeError("Model not loaded. Call load() first.")
 
         target_dim = dimension if dimension is not None else self._dimension
-        is_single = isinstance(text, str)
 
         try:
-            # 単一文字列の場合はリストに変換
-            texts = [text] if is_single else text
-
             # SentenceTransformerでバッチエンコード
             embeddings = self.model.encode(
                 texts,
@@ -149,14 +305,8 @@ class RuriEmbedding(EmbeddingModel):
                 show_progress_bar=False
             )
 
-            # 各ベクトルの次元を調整
-            adjusted = [self._adjust_dimensions(vec, target_dim) for vec in embeddings]
-
-            # リストに変換
-            result = [vec.tolist() for vec in adjusted]
-
-            # 単一入力の場合は単一の結果を返す（後方互換性）
-            return result[0] if is_single else result
+            # 次元を行列単位で調整
+            return adjust_dimensions(embeddings, target_dim)
 
         except Exception as e:
             sys.stderr.write(f"Error encoding text: {e}\n")
@@ -173,39 +323,83 @@ class RuriEmbedding(EmbeddingModel):
         Returns:
             調整されたベクトル
         """
-        current_dim = len(vector)
-
-        if current_dim == target_dim:
-            return vector
-
-        if current_dim > target_dim:
-            # 高次元 → 低次元: 切り詰めてL2正規化
-            vector = vector[:target_dim]
-            norm = np.linalg.norm(vector)
-            if norm > 0:
-                vector = vector / norm
-            return vector
-        else:
-            # 低次元 → 高次元: ゼロパディング
-            padded = np.zeros(target_dim, dtype=vector.dtype)
-            padded[:current_dim] = vector
-            return padded
-
-
-def create_embedding_model(model_name: str) -> EmbeddingModel:
+        return adjust_dimensions(np.asarray(vector)[np.newaxis, :], target_dim)[0]
+
+
+def adjust_dimensions(matrix: np.ndarray, target_dim: int) -> np.ndarray:
+    """
+    ベクトル行列の次元を調整（全行をまとめて処理）
+
+    Args:
+        matrix: (N, D) の行列
+        target_dim: 目標次元数
+
+    Returns:
+        (N, target_dim) のC連続float32行列
+        - D > target_dim: 切り詰めて各行をL2正規化（Matryoshka表現）
+        - D < target_dim: ゼロパディング
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    current_dim = matrix.shape[1]
+
+    if current_dim == target_dim:
+        return np.ascontiguousarray(matrix)
+
+    if current_dim > target_dim:
+        # 高次元 → 低次元: 切り詰めてL2正規化
+        truncated = np.ascontiguousarray(matrix[:, :target_dim])
+        norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+        np.divide(truncated, norms, out=truncated, where=norms > 0)
+        return truncated
+
+    # 低次元 → 高次元: ゼロパディング
+    padded = np.zeros((matrix.shape[0], target_dim), dtype=np.float32)
+    padded[:, :current_dim] = matrix
+    return padded
+
+
+def pool_embeddings(vectors: np.ndarray, weights: Optional[List[float]] = None) -> np.ndarray:
+    """
+    複数のベクトル（大きなセクションのウィンドウなど）を1本のベクトルにまとめる
+
+    Args:
+        vectors: (N, D) の行列
+        weights: 各行の重み（ウィンドウのトークン数など。Noneの場合は等しい重み）
+
+    Returns:
+        重み付き平均をL2正規化した (D,) のfloat32ベクトル
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if weights is None:
+        pooled = matrix.mean(axis=0)
+    else:
+        pooled = np.asarray(weights, dtype=np.float32) @ matrix
+    norm = np.linalg.norm(pooled)
+    if norm > 0:
+        pooled /= norm
+    return pooled
+
+
+def create_embedding_model(
+    model_name: str,
+    backend: str = BACKEND_TORCH,
+    num_threads: Optional[int] = None
+) -> EmbeddingModel:
     """
     埋め込みモデルのファクトリー関数
 
+    モデルはロードしない（ワーカーの起動をブロックしないよう、load()/initialize()で明示的にロードする）
+
     Args:
         model_name: モデル名
+        backend: 推論バックエンド（'torch' | 'onnx' | 'onnx-int8'）
+        num_threads: ONNX Runtimeのスレッド数
 
     Returns:
-        EmbeddingModelインスタンス
+        EmbeddingModelインスタンス（未ロード）
     """
     # Ruriモデルの場合
     if model_name.startswith('cl-nagoya/ruri'):
-        model = RuriEmbedding(model_name=model_name)
-        model.load()
-        return model
+        return RuriEmbedding(model_name=model_name, backend=backend, num_threads=num_threads)
     else:
         raise ValueError(f"Unsupported model: {model_name}")
@@ -60,6 +60,14 @@ INDEX_REQUESTS_TABLE = "index_requests"
 # 全テーブルのリスト
 ALL_TABLES = [SECTIONS_TABLE, INDEX_REQUESTS_TABLE]
 
+# Sectionの必須フィールド
+# Note: vectorはPython側で生成されるため、受信時には不要
+SECTION_REQUIRED_FIELDS = [
+    'id', 'document_path', 'heading', 'depth', 'content',
+    'token_count', 'order', 'is_dirty', 'document_hash',
+    'start_line', 'end_line', 'section_number'  # Task 14: 新フィールド
+]
+
 
 def validate_section(section_data: dict) -> None:
     """Sectionデータのバリデーション
@@ -72,13 +80,7 @@ def validate_section(section_data: dict) -> None:
         TypeError: フィールドの型が不正な場合
     """
     # 必須フィールドの検証
-    # Note: vectorはPython側で生成されるため、受信時には不要
-    required_fields = [
-        'id', 'document_path', 'heading', 'depth', 'content',
-        'token_count', 'order', 'is_dirty', 'document_hash',
-        'start_line', 'end_line', 'section_number'  # Task 14: 新フィールド
-    ]
-    missing_fields = [field for field in required_fields if field not in section_data]
+    missing_fields = [field for field in SECTION_REQUIRED_FIELDS if field not in section_data]
 
     if missing_fields:
         raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
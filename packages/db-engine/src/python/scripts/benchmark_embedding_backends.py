@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+埋め込みバックエンドのベンチマーク
+
+torch（SentenceTransformer fp32）/ onnx（ONNX Runtime fp32）/ onnx-int8（動的int8量子化）で
+同じセクション群をエンコードし、スループット（texts/sec）とtorchに対するコサイン類似度を比較する。
+
+ONNXバックエンドには `uv sync --extra onnx` が必要（初回はONNXへのエクスポートと量子化を行う）。
+
+使い方:
+    uv run python src/python/scripts/benchmark_embedding_backends.py \\
+        [--model=cl-nagoya/ruri-v3-30m] [--texts=512] [--num-threads=4]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+
+def _num_threads_from_argv(default: int = 4) -> int:
+    for arg in sys.argv[1:]:
+        if arg.startswith('--num-threads='):
+            return int(arg.split('=', 1)[1])
+    return default
+
+
+# torchのインポート前にスレッド数を設定する（worker.pyと同じ）
+for _var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+    os.environ[_var] = str(_num_threads_from_argv())
+
+import numpy as np
+
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from embedding import BACKENDS, BACKEND_TORCH, RuriEmbedding
+from generate_test_data import generate_paragraph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--model", default="cl-nagoya/ruri-v3-30m", help="モデル名")
+    parser.add_argument("--texts", type=int, default=512, help="エンコードするテキスト数")
+    parser.add_argument("--batch-size", type=int, default=32, help="バッチサイズ")
+    parser.add_argument("--num-threads", type=int, default=4, help="推論のスレッド数")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="計測するバックエンド（カンマ区切り）")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    texts = [f"Section {i}\n{generate_paragraph(50, 300)}" for i in range(args.texts)]
+
+    print(f"{'Backend':<10} {'Load(s)':>8} {'Encode(s)':>10} {'Texts/sec':>10} {'MinCos':>8} {'MeanCos':>8}")
+    reference = None
+    for backend in args.backends.split(","):
+        model = RuriEmbedding(args.model, backend=backend, num_threads=args.num_threads)
+
+        start = time.perf_counter()
+        if not model.load():
+            print(f"{backend:<10} (not available)")
+            continue
+        load_seconds = time.perf_counter() - start
+
+        # ウォームアップ
+        model.encode_matrix(texts[:args.batch_size], batch_size=args.batch_size)
+
+        start = time.perf_counter()
+        vectors = model.encode_matrix(texts, batch_size=args.batch_size)
+        encode_seconds = time.perf_counter() - start
+
+        if backend == BACKEND_TORCH:
+            reference = vectors
+        if reference is not None:
+            cosine = np.sum(vectors * reference, axis=1) / (
+                np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1)
+            )
+            min_cos, mean_cos = f"{cosine.min():.4f}", f"{cosine.mean():.4f}"
+        else:
+            min_cos = mean_cos = "-"
+
+        print(
+            f"{backend:<10} {load_seconds:>8.1f} {encode_seconds:>10.2f} "
+            f"{len(texts) / encode_seconds:>10.1f} {min_cos:>8} {mean_cos:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
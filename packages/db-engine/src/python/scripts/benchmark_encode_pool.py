@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+マルチプロセスのエンコードプールのベンチマーク
+
+同じセクション群を、1プロセス（--num-threadsスレッド）と、プロセス数を変えたEncodePoolでエンコードし、
+スループット（texts/sec）と1プロセスに対する倍率を比較する。
+各プロセスのスレッド数は--num-threadsで固定する（プロセス数 × スレッド数 ≒ コア数が目安）。
+
+使い方:
+    uv run python src/python/scripts/benchmark_encode_pool.py \\
+        [--model=cl-nagoya/ruri-v3-30m] [--texts=4096] [--num-threads=4] [--processes=1,2,4,auto]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+
+def _num_threads_from_argv(default: int = 4) -> int:
+    for arg in sys.argv[1:]:
+        if arg.startswith('--num-threads='):
+            return int(arg.split('=', 1)[1])
+    return default
+
+
+# torchのインポート前にスレッド数を設定する（worker.pyと同じ）
+for _var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+    os.environ[_var] = str(_num_threads_from_argv())
+
+import numpy as np
+
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from embedding import BACKEND_TORCH, create_embedding_model
+from generate_test_data import generate_paragraph
+from utils.batch_utils import create_length_bucketed_batches
+from utils.encode_pool import EncodePool, auto_pool_size, available_cores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-process encode pool")
+    parser.add_argument("--model", default="cl-nagoya/ruri-v3-30m", help="モデル名")
+    parser.add_argument("--backend", default=BACKEND_TORCH, help="推論バックエンド")
+    parser.add_argument("--texts", type=int, default=4096, help="エンコードするテキスト数")
+    parser.add_argument("--max-batch-tokens", type=int, default=4000, help="1バッチあたりの最大トークン数")
+    parser.add_argument("--num-threads", type=int, default=4, help="プロセスあたりの推論のスレッド数")
+    parser.add_argument("--processes", default="1,2,4,auto", help="計測するプロセス数（カンマ区切り、autoはコア数から決定）")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    texts = [f"Section {i}\n{generate_paragraph(50, 300)}" for i in range(args.texts)]
+    batches = create_length_bucketed_batches(texts, list(range(len(texts))), args.max_batch_tokens)
+    dimension = create_embedding_model(args.model, backend=args.backend).dimension
+
+    counts = []
+    for value in args.processes.split(","):
+        count = auto_pool_size(args.num_threads) if value == "auto" else int(value)
+        if count not in counts:
+            counts.append(count)
+
+    print(f"cores={available_cores()} threads/process={args.num_threads} texts={len(texts)} batches={len(batches)}")
+    print(f"{'Processes':>9} {'Encode(s)':>10} {'Texts/sec':>10} {'Speedup':>8}")
+
+    baseline = None
+    reference = None
+    for count in counts:
+        out = np.zeros((len(texts), dimension), dtype=np.float32)
+        if count == 1:
+            # 1プロセス（プールを使わないワーカーと同じ）
+            model = create_embedding_model(args.model, backend=args.backend, num_threads=args.num_threads)
+            model.initialize()
+            model.encode_matrix(texts[:32])  # ウォームアップ
+            start = time.perf_counter()
+            for batch_texts, rows in batches:
+                out[rows] = model.encode_matrix(batch_texts, dimension)
+            elapsed = time.perf_counter() - start
+        else:
+            pool = EncodePool(args.model, args.backend, processes=count, num_threads=args.num_threads)
+            try:
+                # ウォームアップ（全プロセスのモデルのロードを待つ）
+                warmup = [([text], [i]) for i, text in enumerate(texts[:count * 2])]
+                pool.encode_into(warmup, np.zeros_like(out), dimension)
+                start = time.perf_counter()
+                pool.encode_into(batches, out, dimension)
+                elapsed = time.perf_counter() - start
+            finally:
+                pool.close()
+
+        if reference is None:
+            reference = out
+        elif not np.allclose(out, reference, atol=1e-4):
+            raise SystemExit(f"{count} processes produced different vectors")
+
+        throughput = len(texts) / elapsed
+        baseline = baseline or throughput
+        print(f"{count:>9} {elapsed:>10.2f} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+GCの実行方針のベンチマーク
+
+generate_test_data.pyのPattern A/B/Cの文書を1ファイルずつaddSectionsで取り込み、
+従来の「バッチ・呼び出しごとに毎回GC」（--gc-every-mb=0相当）と、
+メモリ使用量がしきい値を超えた場合だけGCする方針（デフォルト）のスループットを比較する。
+GCに使った時間・回数と、取り込み後のRSSも表示する。
+
+使い方:
+    uv run python src/python/scripts/benchmark_gc_policy.py [--patterns=a,b,c] [--seed=42]
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pyarrow as pa
+
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from generate_test_data import generate_pattern_a, generate_pattern_b, generate_pattern_c
+from utils.gc_policy import GcPolicy
+from worker import SearchDocsWorker
+
+PATTERNS = {
+    'a': generate_pattern_a,
+    'b': generate_pattern_b,
+    'c': generate_pattern_c,
+}
+
+HEADING = re.compile(r'^(#{1,4})\s+(.*)$')
+
+
+def split_sections(path: Path) -> List[Dict[str, Any]]:
+    """Markdownを見出しごとのセクションに分割（DBEngineから届く形式）"""
+    text = path.read_text(encoding='utf-8')
+    document_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    now = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+    sections = []
+    current = None
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        match = HEADING.match(line)
+        if match:
+            current = {
+                "id": f"{path.stem}-{len(sections)}",
+                "document_path": str(path),
+                "heading": match.group(2),
+                "depth": min(len(match.group(1)), 3),
+                "content": "",
+                "token_count": 0,
+                "parent_id": None,
+                "order": len(sections),
+                "is_dirty": False,
+                "document_hash": document_hash,
+                "start_line": line_number,
+                "end_line": line_number,
+                "section_number": [len(sections) + 1],
+                "created_at": now,
+                "updated_at": now,
+            }
+            sections.append(current)
+        elif current is not None:
+            current["content"] += line + "\n"
+            current["end_line"] = line_number
+    for section in sections:
+        section["token_count"] = len(section["content"]) // 4
+    return sections
+
+
+def run(files: List[Path], every_mb: float) -> Dict[str, float]:
+    """全ファイルを取り込み、時間・GCの統計・RSSを返す"""
+    db_dir = tempfile.mkdtemp()
+    try:
+        worker = SearchDocsWorker(db_path=db_dir)
+        # 同じテキストを両方の方針でエンコードするため、埋め込みキャッシュは使わない
+        worker.embedding_cache = None
+        worker.gc_policy = GcPolicy(
+            rss_mb=worker.perf_logger.sample_rss_mb,
+            arrow_mb=lambda: pa.total_allocated_bytes() / 1024 / 1024,
+            rss_threshold_mb=worker.gc_policy.rss_threshold_mb,
+            arrow_threshold_mb=worker.gc_policy.arrow_threshold_mb,
+            every_mb=every_mb,
+            on_collect=[worker.clear_gpu_cache],
+        )
+        worker._ensure_model()
+
+        documents = [split_sections(path) for path in files]
+        sections = sum(len(document) for document in documents)
+        start = time.perf_counter()
+        for document in documents:
+            worker.add_sections({"sections": document})
+        elapsed = time.perf_counter() - start
+
+        stats = worker.gc_policy.get_stats()
+        rss_mb = worker.perf_logger.sample_rss_mb()
+        worker.perf_logger.stop()
+        return {
+            'sections': sections,
+            'seconds': elapsed,
+            'gc_seconds': stats['gcSeconds'],
+            'collections': stats['collections'],
+            'rss_mb': rss_mb or 0.0,
+        }
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory-budget GC policy")
+    parser.add_argument("--patterns", default="a,b,c", help="計測するパターン（カンマ区切り）")
+    parser.add_argument("--every-mb", type=float, default=256.0, help="しきい値方針の--gc-every-mb")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp())
+    try:
+        print(f"{'Pattern':>7} {'Policy':>9} {'Sections':>8} {'Total(s)':>9} {'Sec/s':>8} "
+              f"{'GC(s)':>7} {'GCs':>5} {'RSS(MB)':>8}")
+        for pattern in args.patterns.split(","):
+            random.seed(args.seed)
+            pattern_dir = data_dir / f"pattern-{pattern}"
+            PATTERNS[pattern](pattern_dir)
+            files = sorted(pattern_dir.glob("*.md"))
+
+            baseline = None
+            for policy, every_mb in (("always", 0.0), ("budget", args.every_mb)):
+                result = run(files, every_mb)
+                throughput = result['sections'] / result['seconds']
+                baseline = baseline or throughput
+                print(
+                    f"{pattern.upper():>7} {policy:>9} {result['sections']:>8} {result['seconds']:>9.2f} "
+                    f"{throughput:>8.1f} {result['gc_seconds']:>7.2f} {result['collections']:>5} "
+                    f"{result['rss_mb']:>8.0f}  ({throughput / baseline:.2f}x)"
+                )
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
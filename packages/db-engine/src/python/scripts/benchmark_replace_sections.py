@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+文書の再インデックスの書き込み方法ごとのフラグメント数のベンチマーク
+
+同じ文書群を何回か再インデックスし、次の2つの方法でsectionsテーブルに残るフラグメント・削除ファイル・
+バージョンの数と、ディスク上のサイズ・所要時間を比較する。
+
+- add+delete: addSections の後に deleteSectionsByPathExceptHash（文書ごとに2回のコミット）
+- replace: replaceDocumentSections（文書ごとに1回のmerge_insert、内容が同じセクションは行を引き継ぐ）
+
+各回で、文書ごとに --change-ratio の割合のセクションの本文を変更する。
+ベクトルはモデルを通さずに生成して渡す（エンコードの時間は含まない）。
+
+使い方:
+    uv run python src/python/scripts/benchmark_replace_sections.py \\
+        [--documents=100] [--sections=20] [--rounds=5] [--change-ratio=0.1]
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.request_retention import directory_size
+from worker import SearchDocsWorker
+
+METHODS = ('add+delete', 'replace')
+
+
+def create_sections(rng: np.random.Generator, path: str, version: int, contents: List[str], dimension: int) -> List[Dict[str, Any]]:
+    """1文書のセクション（IDは毎回振り直す）"""
+    now = datetime.now().isoformat()
+    document_hash = f"{path}-v{version}"
+    vectors = rng.standard_normal((len(contents), dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        {
+            "id": f"{path}-v{version}-{i}",
+            "document_path": path,
+            "heading": f"見出し {i}",
+            "depth": 1,
+            "content": content,
+            "token_count": 10,
+            "parent_id": None,
+            "order": i,
+            "is_dirty": False,
+            "document_hash": document_hash,
+            "start_line": i + 1,
+            "end_line": i + 1,
+            "section_number": [i + 1],
+            "created_at": now,
+            "updated_at": now,
+            "vector": vectors[i].tolist(),
+        }
+        for i, content in enumerate(contents)
+    ]
+
+
+def count_files(path: Path, directory: str) -> int:
+    """テーブルのディレクトリ直下のサブディレクトリにあるファイル数"""
+    target = path / directory
+    return sum(len(files) for _, _, files in os.walk(target)) if target.exists() else 0
+
+
+def run(method: str, args) -> Dict[str, Any]:
+    rng = np.random.default_rng(args.seed)
+    temp_dir = tempfile.mkdtemp()
+    worker = SearchDocsWorker(db_path=temp_dir)
+    worker.embedding_cache = None
+    try:
+        dimension = worker.vector_dimension
+        paths = [f"docs/{i:04d}.md" for i in range(args.documents)]
+        contents = {path: [f"{path} の本文 {i}" for i in range(args.sections)] for path in paths}
+
+        # 最初のインデックスはどちらもaddSections
+        for path in paths:
+            worker.add_sections({"sections": create_sections(rng, path, 0, contents[path], dimension)})
+
+        table = worker._get_sections_table()
+        start = time.perf_counter()
+        for version in range(1, args.rounds + 1):
+            for path in paths:
+                changed = rng.choice(args.sections, size=max(1, int(args.sections * args.change_ratio)), replace=False)
+                for i in changed:
+                    contents[path][i] = f"{path} の本文 {i} (v{version})"
+                sections = create_sections(rng, path, version, contents[path], dimension)
+                document_hash = sections[0]["document_hash"]
+                if method == 'replace':
+                    worker.replace_document_sections(
+                        {"documentPath": path, "documentHash": document_hash, "sections": sections}
+                    )
+                else:
+                    worker.add_sections({"sections": sections})
+                    worker.delete_sections_by_path_except_hash({"documentPath": path, "documentHash": document_hash})
+        seconds = time.perf_counter() - start
+
+        stats = table.stats()
+        table_path = Path(table.uri)
+        return {
+            "rows": table.count_rows(),
+            "fragments": stats["fragment_stats"]["num_fragments"],
+            "small": stats["fragment_stats"]["num_small_fragments"],
+            "deletions": count_files(table_path, "_deletions"),
+            "versions": len(table.list_versions()),
+            "mb": directory_size(str(table_path)) / 1024 / 1024,
+            "seconds": seconds,
+        }
+    finally:
+        worker.perf_logger.stop()
+        del worker
+        gc.collect()
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fragment counts of addSections+delete vs replaceDocumentSections")
+    parser.add_argument("--documents", type=int, default=100, help="文書数")
+    parser.add_argument("--sections", type=int, default=20, help="1文書あたりのセクション数")
+    parser.add_argument("--rounds", type=int, default=5, help="全文書を再インデックスする回数")
+    parser.add_argument("--change-ratio", type=float, default=0.1, help="1回の再インデックスで変更するセクションの割合")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    print(f"{args.documents} documents x {args.sections} sections, {args.rounds} rounds, "
+          f"{args.change_ratio:.0%} of sections changed per round")
+    print(f"{'Method':>10} {'rows':>7} {'fragments':>9} {'small':>6} {'deletions':>9} {'versions':>8} "
+          f"{'size MB':>8} {'seconds':>8}")
+    for method in METHODS:
+        result = run(method, args)
+        print(f"{method:>10} {result['rows']:>7} {result['fragments']:>9} {result['small']:>6} "
+              f"{result['deletions']:>9} {result['versions']:>8} {result['mb']:>8.1f} {result['seconds']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
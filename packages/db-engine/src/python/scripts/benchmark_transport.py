@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+ワーカートランスポートのベンチマーク
+
+JSON行とMessagePackフレームで、セクションを多く含むペイロードの
+エンコード/デコード時間とサイズを比較する。
+
+generate_test_data.pyと同じ3パターンのセクション構成を使う：
+- Pattern A: 多数の小さなファイル（100個、各500-1000トークン）
+- Pattern B: 大きな少数のファイル（5個、各5000-10000トークン）
+- Pattern C: 組み合わせ（50個の小 + 5個の大）
+
+使い方:
+    uv run python src/python/scripts/benchmark_transport.py [--iterations=20]
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from generate_test_data import generate_paragraph
+from utils.transport import (
+    MessageChannel,
+    MSGPACK_AVAILABLE,
+    TRANSPORT_JSON,
+    TRANSPORT_MSGPACK,
+)
+
+
+def build_sections(doc_count: int, sections_per_doc: int, min_tokens: int, max_tokens: int) -> List[Dict[str, Any]]:
+    """getSectionsByPath / addSectionsで送受信されるセクション配列を生成"""
+    sections = []
+    for doc in range(doc_count):
+        for i in range(sections_per_doc):
+            sections.append({
+                "id": f"doc{doc:03d}-sec{i:03d}",
+                "documentPath": f"/docs/doc{doc:03d}.md",
+                "heading": f"Section {i}",
+                "depth": 1 if i == 0 else 2,
+                "content": generate_paragraph(min_tokens, max_tokens),
+                "tokenCount": max_tokens,
+                "parentId": None if i == 0 else f"doc{doc:03d}-sec000",
+                "order": i,
+                "isDirty": False,
+                "documentHash": f"{doc:064x}",
+                "createdAt": "2025-01-01T00:00:00",
+                "updatedAt": "2025-01-01T00:00:00",
+                "summary": None,
+                "documentSummary": None,
+                "startLine": i * 10,
+                "endLine": i * 10 + 9,
+                "sectionNumber": [i],
+            })
+    return sections
+
+
+PATTERNS = {
+    # ファイルあたり約5セクションに分割される想定
+    "A": lambda: build_sections(100, 5, 100, 200),
+    "B": lambda: build_sections(5, 10, 500, 1000),
+    "C": lambda: build_sections(50, 5, 100, 200) + build_sections(5, 10, 500, 1000),
+}
+
+
+def measure(transport: str, message: Dict[str, Any], iterations: int) -> Dict[str, float]:
+    """1メッセージの書き込み（エンコード）と読み込み（デコード）の時間を計測"""
+    encode_total = 0.0
+    decode_total = 0.0
+    size = 0
+
+    for _ in range(iterations):
+        wfile = io.BytesIO()
+        start = time.perf_counter()
+        MessageChannel(io.BytesIO(), wfile, transport).write_message(message)
+        encode_total += time.perf_counter() - start
+
+        data = wfile.getvalue()
+        size = len(data)
+
+        start = time.perf_counter()
+        MessageChannel(io.BytesIO(data), io.BytesIO(), transport).read_message()
+        decode_total += time.perf_counter() - start
+
+    return {
+        "bytes": size,
+        "encode_ms": encode_total / iterations * 1000,
+        "decode_ms": decode_total / iterations * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark worker transports")
+    parser.add_argument("--iterations", type=int, default=20, help="計測回数")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    transports = [TRANSPORT_JSON]
+    if MSGPACK_AVAILABLE:
+        transports.append(TRANSPORT_MSGPACK)
+    else:
+        print("msgpack is not installed; only json is measured")
+
+    print(f"{'Pattern':<8} {'Sections':>8} {'Transport':<10} {'Size(KB)':>10} {'Encode(ms)':>11} {'Decode(ms)':>11}")
+    for name, build in PATTERNS.items():
+        sections = build()
+        message = {"jsonrpc": "2.0", "id": 1, "result": sections}
+        for transport in transports:
+            result = measure(transport, message, args.iterations)
+            print(
+                f"{name:<8} {len(sections):>8} {transport:<10} "
+                f"{result['bytes'] / 1024:>10.1f} {result['encode_ms']:>11.2f} {result['decode_ms']:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
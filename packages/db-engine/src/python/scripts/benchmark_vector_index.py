@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+ベクトルインデックスの再現率とレイテンシのベンチマーク
+
+セクション数ごとに、フラットスキャン（インデックスなし）と、ワーカーが作成するのと同じパラメータの
+ベクトルインデックスで検索し、recall@10（フラットスキャンの上位10件のうち見つかった割合）と
+1クエリあたりのレイテンシ（p50/p95）を nprobes × refine_factor の組み合わせごとに比較する。
+
+ベクトルはモデルを通さずに生成する（クラスタに分かれた正規化済みの256次元ベクトル。
+実際の文書の埋め込みもトピックごとにまとまるため、一様な乱数より実データに近い）。
+100万件では生成とインデックスの作成に数GBのメモリと数分かかる。
+
+使い方:
+    uv run python src/python/scripts/benchmark_vector_index.py \\
+        [--sizes=10000,100000,1000000] [--index-type=IVF_PQ] [--nprobes=10,20,50] [--refine-factors=0,5,10]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import lancedb
+import numpy as np
+import pyarrow as pa
+
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.vector_index import INDEX_TYPES, INDEX_IVF_PQ, build_vector_index, index_params
+
+DIMENSION = 256
+TOP_K = 10
+
+
+def generate_vectors(rng: np.random.Generator, count: int, centers: np.ndarray, spread: float) -> np.ndarray:
+    """クラスタの中心の周りに正規化済みのベクトルを生成"""
+    vectors = centers[rng.integers(0, len(centers), size=count)]
+    vectors = vectors + rng.standard_normal((count, DIMENSION), dtype=np.float32) * spread
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def ground_truth(vectors: np.ndarray, queries: np.ndarray, chunk: int = 100000) -> np.ndarray:
+    """正確な上位TOP_K件の行番号（正規化済みなので内積の降順 = L2距離の昇順）"""
+    candidate_scores = []
+    candidate_rows = []
+    for start in range(0, len(vectors), chunk):
+        # チャンクごとに上位TOP_K件の候補を残す
+        scores = queries @ vectors[start:start + chunk].T
+        top = np.argpartition(-scores, min(TOP_K, scores.shape[1]) - 1, axis=1)[:, :TOP_K]
+        candidate_scores.append(np.take_along_axis(scores, top, axis=1))
+        candidate_rows.append(top + start)
+    scores = np.concatenate(candidate_scores, axis=1)
+    rows = np.concatenate(candidate_rows, axis=1)
+    top = np.argpartition(-scores, TOP_K - 1, axis=1)[:, :TOP_K]
+    return np.take_along_axis(rows, top, axis=1)
+
+
+def measure(table, queries: np.ndarray, truth: np.ndarray, nprobes: Optional[int] = None,
+            refine_factor: Optional[int] = None, flat: bool = False):
+    """recall@10とレイテンシ（ミリ秒、p50/p95）"""
+    latencies: List[float] = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        search = table.search(query).limit(TOP_K).select(["row", "_distance"])
+        if flat:
+            search = search.bypass_vector_index()
+        if nprobes:
+            search = search.nprobes(nprobes)
+        if refine_factor:
+            search = search.refine_factor(refine_factor)
+        start = time.perf_counter()
+        rows = search.to_arrow()["row"].to_pylist()
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(set(rows) & set(expected.tolist()))
+    return hits / truth.size, float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+
+
+def run(size: int, args, rng: np.random.Generator) -> None:
+    centers = rng.standard_normal((max(16, size // 500), DIMENSION), dtype=np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    vectors = generate_vectors(rng, size, centers, args.spread)
+    queries = generate_vectors(rng, args.queries, centers, args.spread)
+    truth = ground_truth(vectors, queries)
+
+    db_dir = tempfile.mkdtemp()
+    try:
+        db = lancedb.connect(db_dir)
+        table = db.create_table("sections", pa.table({
+            "row": pa.array(np.arange(size, dtype=np.int64)),
+            "vector": pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), DIMENSION),
+        }))
+        del vectors
+
+        recall, p50, p95 = measure(table, queries, truth, flat=True)
+        print(f"{size:>9} {'flat':>12} {'-':>7} {'-':>7} {recall:>10.3f} {p50:>9.2f} {p95:>9.2f}")
+
+        start = time.perf_counter()
+        build_vector_index(table, args.index_type, size, DIMENSION)
+        params = index_params(args.index_type, size, DIMENSION)
+        print(f"{size:>9} {'build':>12} {time.perf_counter() - start:.1f}s {params}")
+
+        for nprobes in args.nprobes:
+            for refine_factor in args.refine_factors:
+                recall, p50, p95 = measure(table, queries, truth, nprobes, refine_factor)
+                print(f"{size:>9} {args.index_type:>12} {nprobes:>7} {refine_factor or '-':>7} "
+                      f"{recall:>10.3f} {p50:>9.2f} {p95:>9.2f}")
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recall@10 and latency of the vector index")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="セクション数（カンマ区切り）")
+    parser.add_argument("--index-type", default=INDEX_IVF_PQ, choices=INDEX_TYPES, help="インデックスの種類")
+    parser.add_argument("--nprobes", default="10,20,50", help="計測するnprobes（カンマ区切り）")
+    parser.add_argument("--refine-factors", default="0,5,10", help="計測するrefine_factor（カンマ区切り、0はなし）")
+    parser.add_argument("--queries", type=int, default=100, help="クエリ数")
+    parser.add_argument("--spread", type=float, default=0.08, help="クラスタ内のばらつき（大きいほど一様に近い）")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+    args.nprobes = [int(n) for n in args.nprobes.split(",")]
+    args.refine_factors = [int(n) for n in args.refine_factors.split(",")]
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'Sections':>9} {'Index':>12} {'nprobes':>7} {'refine':>7} {'recall@10':>10} "
+          f"{'p50(ms)':>9} {'p95(ms)':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+バッチのトークン数の自動調整のユニットテスト
+
+重要原則: スループット・RSSは計測値の代わりに決まった値を渡して検証
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.adaptive_batch import AdaptiveBatchController
+
+
+def run_window(controller, tokens_per_second, rss_mb=100.0, growth_mb=0.0):
+    """1ウィンドウ分のバッチを、予算に比例したトークン数・指定のスループットで記録"""
+    for _ in range(controller.window):
+        tokens = controller.budget
+        controller.observe(tokens, tokens / tokens_per_second, rss_mb - growth_mb, rss_mb)
+    return controller.budget
+
+
+class TestAdaptiveBatchController(unittest.TestCase):
+    """AdaptiveBatchControllerのテスト"""
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            AdaptiveBatchController(2000, 1000)
+        with self.assertRaises(ValueError):
+            AdaptiveBatchController(0, 1000)
+
+    def test_starts_at_minimum(self):
+        controller = AdaptiveBatchController(1000, 8000)
+        self.assertEqual(controller.budget, 1000)
+        self.assertEqual(AdaptiveBatchController(1000, 8000, initial_tokens=20000).budget, 8000)
+
+    def test_adjusts_once_per_window(self):
+        controller = AdaptiveBatchController(1000, 8000, window=4)
+        for _ in range(3):
+            controller.observe(1000, 1.0)
+        self.assertEqual(controller.budget, 1000)
+        controller.observe(1000, 1.0)
+        self.assertEqual(controller.budget, 1250)
+
+    def test_grows_while_throughput_improves_up_to_maximum(self):
+        controller = AdaptiveBatchController(1000, 4000, window=1)
+        throughput = 100.0
+        for _ in range(20):
+            throughput *= 1.1
+            run_window(controller, throughput)
+        self.assertEqual(controller.budget, 4000)
+
+    def test_reverses_when_throughput_drops(self):
+        controller = AdaptiveBatchController(1000, 8000, window=1)
+        run_window(controller, 100.0)
+        run_window(controller, 120.0)
+        self.assertEqual(controller.budget, 1562)
+        # 予算を増やしたらスループットが下がった
+        self.assertEqual(run_window(controller, 90.0), 1249)
+
+    def test_small_fluctuation_keeps_direction(self):
+        controller = AdaptiveBatchController(1000, 8000, window=1)
+        run_window(controller, 100.0)
+        self.assertEqual(run_window(controller, 97.0), 1562)
+
+    def test_backs_off_over_memory_limit(self):
+        controller = AdaptiveBatchController(1000, 8000, memory_limit_mb=500.0, initial_tokens=4000)
+        controller.observe(4000, 1.0, 300.0, 520.0)
+        self.assertEqual(controller.budget, 2000)
+        self.assertEqual(controller.get_stats()["memoryBackoffs"], 1)
+
+    def test_does_not_grow_into_memory_limit(self):
+        controller = AdaptiveBatchController(1000, 8000, memory_limit_mb=500.0, window=1)
+        # 1バッチで200MB増える場合、480MBから予算を25%増やすと上限を超える見込み
+        self.assertEqual(run_window(controller, 100.0, rss_mb=480.0, growth_mb=200.0), 1000)
+        self.assertEqual(run_window(controller, 100.0, rss_mb=300.0, growth_mb=50.0), 1250)
+
+    def test_ignores_memory_without_limit(self):
+        controller = AdaptiveBatchController(1000, 8000, window=1)
+        self.assertEqual(run_window(controller, 100.0, rss_mb=100000.0), 1250)
+
+    def test_stats(self):
+        controller = AdaptiveBatchController(1000, 8000, memory_limit_mb=500.0, window=1)
+        controller.observe(1000, 2.0, 100.0, 110.0)
+        stats = controller.get_stats()
+        self.assertEqual(stats["batchTokens"], 1250)
+        self.assertEqual(stats["tokensPerSecond"], 500.0)
+        self.assertEqual(stats["rssMB"], 110.0)
+        self.assertEqual(stats["adjustments"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
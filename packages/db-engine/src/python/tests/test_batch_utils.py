@@ -12,7 +12,7 @@ from pathlib import Path
 python_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(python_dir))
 
-from utils.batch_utils import create_token_aware_batches, get_batch_stats
+from utils.batch_utils import create_length_bucketed_batches, create_token_aware_batches, get_batch_stats
 
 
 class TestCreateTokenAwareBatches(unittest.TestCase):
@@ -204,5 +204,104 @@ class TestGetBatchStats(unittest.TestCase):
         self.assertEqual(batch_info['estimated_tokens'], 50)
 
 
+class TestCreateLengthBucketedBatches(unittest.TestCase):
+    """create_length_bucketed_batches関数のテスト"""
+
+    def test_empty_list(self):
+        """空のリストは空のバッチを返す"""
+        self.assertEqual(create_length_bucketed_batches([], [], max_tokens_per_batch=100), [])
+
+    def test_length_mismatch_raises_error(self):
+        """textsとindicesの長さが異なる場合はエラー"""
+        with self.assertRaises(ValueError):
+            create_length_bucketed_batches(["a" * 40], [0, 1], max_tokens_per_batch=100)
+
+    def test_groups_similar_lengths(self):
+        """長いテキストと短いテキストは別のバッチになる"""
+        # 10, 100, 10, 10トークン
+        texts = ["a" * 40, "a" * 400, "a" * 40, "a" * 40]
+        batches = create_length_bucketed_batches(texts, [0, 1, 2, 3], max_tokens_per_batch=100)
+
+        self.assertEqual([indices for _, indices in batches], [[1], [0, 2, 3]])
+
+    def test_padded_tokens_within_limit(self):
+        """各バッチのテキスト数 × 最長のトークン数が上限以下になる"""
+        texts = ["a" * (4 * n) for n in [5, 30, 12, 25, 8, 30, 3, 18]]
+        batches = create_length_bucketed_batches(texts, list(range(len(texts))), max_tokens_per_batch=60)
+
+        for batch_texts, _ in batches:
+            longest = max(len(text) // 4 for text in batch_texts)
+            self.assertLessEqual(len(batch_texts) * longest, 60)
+
+    def test_single_text_over_limit(self):
+        """制限を超えるテキストは単独で1バッチになる"""
+        texts = ["a" * 600, "a" * 40]  # 150, 10トークン
+        batches = create_length_bucketed_batches(texts, [0, 1], max_tokens_per_batch=100)
+
+        self.assertEqual([indices for _, indices in batches], [[0], [1]])
+
+    def test_indices_map_back_to_texts(self):
+        """全てのテキストがちょうど1回、元のインデックスと対応して含まれる"""
+        texts = [f"{i}" + "a" * (i * 13 % 97) for i in range(50)]
+        indices = [f"id-{i}" for i in range(50)]
+        batches = create_length_bucketed_batches(texts, indices, max_tokens_per_batch=80)
+
+        seen = {}
+        for batch_texts, batch_indices in batches:
+            self.assertEqual(len(batch_texts), len(batch_indices))
+            for text, idx in zip(batch_texts, batch_indices):
+                self.assertNotIn(idx, seen)
+                seen[idx] = text
+        self.assertEqual(seen, dict(zip(indices, texts)))
+
+    def test_equal_lengths_keep_order(self):
+        """同じ長さのテキストは元の順序を保つ"""
+        texts = ["a" * 40] * 5
+        batches = create_length_bucketed_batches(texts, [4, 3, 2, 1, 0], max_tokens_per_batch=1000)
+
+        self.assertEqual(batches[0][1], [4, 3, 2, 1, 0])
+
+    def test_custom_token_counter(self):
+        """count_tokensでトークン数の推定方法を差し替えられる"""
+        texts = ["x", "yy", "zzz"]
+        batches = create_length_bucketed_batches(
+            texts, [0, 1, 2], max_tokens_per_batch=4, count_tokens=len
+        )
+
+        self.assertEqual([indices for _, indices in batches], [[2], [1, 0]])
+
+    def test_less_padding_than_arrival_order(self):
+        """到着順のバッチよりパディング効率が高い"""
+        texts = ["a" * (400 if i % 4 == 0 else 40) for i in range(16)]
+        indices = list(range(16))
+
+        greedy = get_batch_stats(create_token_aware_batches(texts, indices, max_tokens_per_batch=400))
+        bucketed = get_batch_stats(create_length_bucketed_batches(texts, indices, max_tokens_per_batch=400))
+
+        self.assertLess(greedy['padding_efficiency'], 0.5)
+        self.assertEqual(bucketed['padding_efficiency'], 1.0)
+
+
+class TestBatchStatsPadding(unittest.TestCase):
+    """get_batch_statsのパディング効率のテスト"""
+
+    def test_padding_efficiency(self):
+        """パディング込みのトークン数と効率を返す"""
+        batches = [(["a" * 400, "a" * 40], [0, 1])]  # 100 + 10トークン、パディング込み200
+        stats = get_batch_stats(batches)
+
+        self.assertEqual(stats['estimated_tokens'], 110)
+        self.assertEqual(stats['padded_tokens'], 200)
+        self.assertEqual(stats['padding_efficiency'], 0.55)
+        self.assertEqual(stats['batches_info'][0]['padded_tokens'], 200)
+        self.assertEqual(stats['batches_info'][0]['padding_efficiency'], 0.55)
+
+    def test_empty_batches_efficiency(self):
+        """空のバッチは効率1.0"""
+        stats = get_batch_stats([])
+        self.assertEqual(stats['padded_tokens'], 0)
+        self.assertEqual(stats['padding_efficiency'], 1.0)
+
+
 if __name__ == '__main__':
     unittest.main()
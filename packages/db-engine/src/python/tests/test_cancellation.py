@@ -0,0 +1,93 @@
+"""
+リクエストのキャンセルと期限のユニットテスト
+"""
+
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.cancellation import (
+    CancellationRegistry,
+    CancellationToken,
+    DeadlineExceededError,
+    RequestCancelledError,
+    REQUEST_CANCELLED,
+    DEADLINE_EXCEEDED,
+)
+
+
+class TestCancellationToken(unittest.TestCase):
+    """CancellationTokenのテスト"""
+
+    def test_no_deadline_never_expires(self):
+        token = CancellationToken(1)
+        self.assertFalse(token.expired())
+        token.raise_if_cancelled()
+
+    def test_cancel(self):
+        token = CancellationToken(1)
+        token.cancel()
+        with self.assertRaises(RequestCancelledError) as ctx:
+            token.raise_if_cancelled()
+        self.assertEqual(ctx.exception.code, REQUEST_CANCELLED)
+
+    def test_deadline(self):
+        past = time.time() * 1000 - 1
+        token = CancellationToken(1, deadline=past)
+        self.assertTrue(token.expired())
+        with self.assertRaises(DeadlineExceededError) as ctx:
+            token.raise_if_cancelled()
+        self.assertEqual(ctx.exception.code, DEADLINE_EXCEEDED)
+
+        future = CancellationToken(2, deadline=time.time() * 1000 + 60_000)
+        self.assertFalse(future.expired())
+
+
+class TestCancellationRegistry(unittest.TestCase):
+    """CancellationRegistryのテスト"""
+
+    def test_register_message_skips_notifications(self):
+        registry = CancellationRegistry()
+        registry.register_message([
+            {"id": 1, "method": "search", "deadline": 123},
+            {"method": "notify"},
+            {"id": 2, "method": "addSections", "deadline": "invalid"},
+        ])
+
+        self.assertEqual(registry.get(1).deadline, 123)
+        self.assertIsNone(registry.get(2).deadline)
+        self.assertEqual(registry.get_stats()["inflight"], 2)
+
+    def test_cancel_unknown_request(self):
+        registry = CancellationRegistry()
+        self.assertFalse(registry.cancel(99))
+
+        token = registry.register(1)
+        self.assertTrue(registry.cancel(1))
+        self.assertTrue(token.cancelled)
+
+        registry.release(1)
+        self.assertFalse(registry.cancel(1))
+        self.assertEqual(registry.get_stats()["inflight"], 0)
+
+    def test_record_counts_shed_and_cancelled(self):
+        registry = CancellationRegistry()
+        # 実行前に期限切れ → shed
+        registry.record(DeadlineExceededError("x"), started=False)
+        # 処理中に期限切れ → cancelled
+        registry.record(DeadlineExceededError("x"), started=True)
+        # キャンセル通知 → 実行前でもcancelled
+        registry.record(RequestCancelledError("x"), started=False)
+
+        stats = registry.get_stats()
+        self.assertEqual(stats["shed"], 1)
+        self.assertEqual(stats["cancelled"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+埋め込みベクトルキャッシュのユニットテスト
+"""
+
+import shutil
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.embedding_cache import CACHE_FILENAME, EmbeddingCache, open_embedding_cache
+from utils.section_filter import get_texts_to_encode
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """EmbeddingCacheのテスト"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = EmbeddingCache(self.tmpdir, 'model-a', 3)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_miss_then_hit(self):
+        """保存したテキストはヒットし、ベクトルはfloat32精度で戻る"""
+        self.assertEqual(self.cache.get_many(['A\ntext']), {})
+        self.cache.put_many(['A\ntext'], [[0.1, 0.2, 0.3]])
+
+        result = self.cache.get_many(['B\nother', 'A\ntext'])
+        self.assertEqual(list(result.keys()), [1])
+        self.assertEqual(result[1].typecode, 'f')
+        for actual, expected in zip(result[1], [0.1, 0.2, 0.3]):
+            self.assertAlmostEqual(actual, expected, places=6)
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+
+    def test_key_includes_model_and_dimension(self):
+        """モデル名・次元数が異なるキャッシュとは共有しない"""
+        self.cache.put_many(['A\ntext'], [[0.1, 0.2, 0.3]])
+
+        other_model = EmbeddingCache(self.tmpdir, 'model-b', 3)
+        other_dimension = EmbeddingCache(self.tmpdir, 'model-a', 2)
+        try:
+            self.assertEqual(other_model.get_many(['A\ntext']), {})
+            self.assertEqual(other_dimension.get_many(['A\ntext']), {})
+        finally:
+            other_model.close()
+            other_dimension.close()
+
+    def test_persists_across_instances(self):
+        """インデックスと同じディレクトリに保存され、再起動後も使える"""
+        self.cache.put_many(['A\ntext'], [[0.1, 0.2, 0.3]])
+        self.assertTrue((Path(self.tmpdir) / CACHE_FILENAME).exists())
+
+        reopened = EmbeddingCache(self.tmpdir, 'model-a', 3)
+        try:
+            self.assertIn(0, reopened.get_many(['A\ntext']))
+        finally:
+            reopened.close()
+
+    def test_evicts_least_recently_used(self):
+        """上限を超えた場合は最後に使われた時刻が古いものから削除する"""
+        cache = EmbeddingCache(self.tmpdir, 'model-lru', 3, max_entries=2)
+        try:
+            cache.put_many(['a'], [[1, 1, 1]])
+            cache.put_many(['b'], [[2, 2, 2]])
+            cache.get_many(['a'])  # aを最近使ったことにする
+            cache.put_many(['c'], [[3, 3, 3]])
+
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(sorted(cache.get_many(['a', 'b', 'c']).keys()), [0, 2])
+            self.assertEqual(cache.get_stats()['evictions'], 1)
+        finally:
+            cache.close()
+
+    def test_disabled_when_size_is_zero(self):
+        """最大件数が0の場合はキャッシュを開かない"""
+        self.assertIsNone(open_embedding_cache(self.tmpdir, 'model-a', 3, max_entries=0))
+
+
+class TestGetTextsToEncodeWithCache(unittest.TestCase):
+    """get_texts_to_encodeとキャッシュの連携テスト"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = EmbeddingCache(self.tmpdir, 'model-a', 2)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_cached_sections_are_filled_and_not_returned(self):
+        """キャッシュにあるセクションはvectorが設定され、エンコード対象から外れる"""
+        self.cache.put_many(['B\ntext2'], [[0.5, 0.25]])
+        sections = [
+            {'heading': 'A', 'content': 'text1', 'vector': None},
+            {'heading': 'B', 'content': 'text2', 'vector': None},
+            {'heading': 'C', 'content': 'text3', 'vector': [0.1, 0.2]},
+            {'heading': 'D', 'content': 'text4', 'vector': None},
+        ]
+
+        texts, indices = get_texts_to_encode(sections, cache=self.cache)
+
+        self.assertEqual(texts, ['A\ntext1', 'D\ntext4'])
+        self.assertEqual(indices, [0, 3])
+        self.assertEqual(list(sections[1]['vector']), [0.5, 0.25])
+        self.assertEqual(sections[2]['vector'], [0.1, 0.2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+メモリ使用量に基づくGCの実行判断のユニットテスト
+
+重要原則: RSS・Arrowの確保量は計測値の代わりに決まった値を返す関数で検証
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.gc_policy import GcPolicy
+
+
+class FakeMemory:
+    """RSSとArrowの確保量（MB）を外から設定できる計測関数"""
+
+    def __init__(self, rss=100.0, arrow=0.0):
+        self.rss = rss
+        self.arrow = arrow
+
+    def rss_mb(self):
+        return self.rss
+
+    def arrow_mb(self):
+        return self.arrow
+
+
+def create_policy(memory, **kwargs):
+    collected = []
+    policy = GcPolicy(memory.rss_mb, memory.arrow_mb, on_collect=[lambda: collected.append(1)], **kwargs)
+    return policy, collected
+
+
+class TestGcPolicy(unittest.TestCase):
+    """GcPolicyのテスト"""
+
+    def test_skips_when_below_thresholds(self):
+        memory = FakeMemory()
+        policy, collected = create_policy(memory, rss_threshold_mb=1000.0, every_mb=256.0)
+        memory.rss = 200.0
+        self.assertFalse(policy.maybe_collect())
+        self.assertEqual(collected, [])
+        self.assertEqual(policy.get_stats()["checks"], 1)
+
+    def test_collects_after_growth(self):
+        memory = FakeMemory()
+        policy, collected = create_policy(memory, every_mb=256.0)
+        memory.rss = 300.0
+        memory.arrow = 60.0
+        self.assertTrue(policy.maybe_collect())
+        self.assertEqual(collected, [1])
+        self.assertEqual(policy.get_stats()["reasons"], {"allocated": 1})
+        # GC後の使用量が基準になる
+        self.assertFalse(policy.maybe_collect())
+
+    def test_collects_over_rss_threshold(self):
+        memory = FakeMemory(rss=990.0)
+        policy, _ = create_policy(memory, rss_threshold_mb=1000.0, every_mb=256.0)
+        memory.rss = 1020.0
+        self.assertTrue(policy.maybe_collect())
+        self.assertEqual(policy.get_stats()["reasons"], {"rss": 1})
+
+    def test_collects_over_arrow_threshold(self):
+        memory = FakeMemory(arrow=1000.0)
+        policy, _ = create_policy(memory, arrow_threshold_mb=1024.0, every_mb=256.0)
+        memory.arrow = 1040.0
+        self.assertTrue(policy.maybe_collect())
+        self.assertEqual(policy.get_stats()["reasons"], {"arrow": 1})
+
+    def test_does_not_repeat_without_growth_over_threshold(self):
+        """GCで回収できないメモリでしきい値を超えている場合は毎回GCしない"""
+        memory = FakeMemory(rss=1500.0)
+        policy, collected = create_policy(memory, rss_threshold_mb=1000.0, every_mb=256.0)
+        for _ in range(5):
+            memory.rss += 1.0
+            policy.maybe_collect()
+        self.assertEqual(collected, [])
+
+    def test_growth_counts_from_lowest_usage(self):
+        memory = FakeMemory(rss=500.0)
+        policy, _ = create_policy(memory, every_mb=256.0)
+        memory.rss = 300.0
+        self.assertFalse(policy.maybe_collect())
+        memory.rss = 560.0
+        self.assertTrue(policy.maybe_collect())
+
+    def test_every_zero_collects_always(self):
+        memory = FakeMemory()
+        policy, collected = create_policy(memory, every_mb=0)
+        policy.maybe_collect()
+        policy.maybe_collect()
+        self.assertEqual(len(collected), 2)
+
+    def test_forced_collect_and_timing(self):
+        memory = FakeMemory(rss=None, arrow=None)
+        policy, collected = create_policy(memory)
+        self.assertFalse(policy.maybe_collect())
+        policy.collect()
+        stats = policy.get_stats()
+        self.assertEqual(collected, [1])
+        self.assertEqual(stats["collections"], 1)
+        self.assertEqual(stats["reasons"], {"forced": 1})
+        self.assertGreaterEqual(stats["gcSeconds"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
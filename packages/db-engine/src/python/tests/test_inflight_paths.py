@@ -0,0 +1,78 @@
+"""
+インデックス中のパスの集合のユニットテスト
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.inflight_paths import InflightPaths
+
+
+class TestInflightPaths(unittest.TestCase):
+    """InflightPathsのテスト"""
+
+    def setUp(self):
+        self.inflight = InflightPaths()
+        self.inflight.load([
+            ('r1', 'a.md', 'pending'),
+            ('r2', 'b.md', 'processing'),
+            ('r3', 'c.md', 'completed'),
+            ('r4', 'd.md', 'failed'),
+        ])
+
+    def test_load_keeps_only_inflight_statuses(self):
+        self.assertTrue(self.inflight.loaded)
+        self.assertEqual(sorted(self.inflight.paths()), ['a.md', 'b.md'])
+        self.assertIn('a.md', self.inflight)
+        self.assertNotIn('c.md', self.inflight)
+
+    def test_paths_filtered_by_status(self):
+        self.assertEqual(self.inflight.paths(['pending']), ['a.md'])
+        self.assertEqual(self.inflight.paths(['processing']), ['b.md'])
+
+    def test_created_request_is_added(self):
+        self.inflight.update('r5', 'e.md', 'pending')
+        self.assertIn('e.md', self.inflight)
+
+    def test_completed_request_is_removed(self):
+        self.inflight.update('r1', 'a.md', 'processing')
+        self.assertIn('a.md', self.inflight)
+        self.inflight.update('r1', 'a.md', 'completed')
+        self.assertNotIn('a.md', self.inflight)
+
+    def test_path_stays_until_all_requests_finish(self):
+        """同じパスに複数のリクエストがある場合は、すべて完了するまで残る"""
+        self.inflight.update('r5', 'a.md', 'pending')
+        self.inflight.update('r1', 'a.md', 'skipped')
+        self.assertIn('a.md', self.inflight)
+        self.inflight.update('r5', 'a.md', 'completed')
+        self.assertNotIn('a.md', self.inflight)
+
+    def test_update_without_path_uses_known_path(self):
+        self.inflight.update('r2', None, 'failed')
+        self.assertNotIn('b.md', self.inflight)
+        # インデックス中でないリクエストの完了は何もしない
+        self.inflight.update('r3', None, 'completed')
+        with self.assertRaises(ValueError):
+            self.inflight.update('unknown', None, 'pending')
+
+    def test_remove(self):
+        self.inflight.remove(['r1', 'r3'])
+        self.assertEqual(self.inflight.paths(), ['b.md'])
+
+    def test_load_replaces_contents(self):
+        self.inflight.load([('r9', 'z.md', 'pending')])
+        self.assertEqual(self.inflight.paths(), ['z.md'])
+
+    def test_stats(self):
+        self.inflight.update('r5', 'a.md', 'pending')
+        self.assertEqual(self.inflight.get_stats(), {'paths': 2, 'requests': 3, 'updates': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+遅延インポートとインポート時間計測のユニットテスト
+"""
+
+import io
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.lazy_import import ImportProfiler, LazyModule, is_available, lazy_import
+
+
+class TestLazyImport(unittest.TestCase):
+    """lazy_import関数のテスト"""
+
+    def setUp(self):
+        # 未インポートの標準ライブラリモジュールで確認する
+        sys.modules.pop('colorsys', None)
+
+    def test_imports_on_first_attribute_access(self):
+        module = lazy_import('colorsys')
+        self.assertIsInstance(module, LazyModule)
+        self.assertFalse(module.is_loaded)
+        self.assertNotIn('colorsys', sys.modules)
+
+        self.assertEqual(module.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertTrue(module.is_loaded)
+        self.assertIn('colorsys', sys.modules)
+
+    def test_attributes_are_not_copied_to_proxy(self):
+        module = lazy_import('colorsys')
+        module.rgb_to_hsv(1.0, 0.0, 0.0)
+        self.assertNotIn('rgb_to_hsv', module.__dict__)
+        self.assertIs(module.rgb_to_hsv, sys.modules['colorsys'].rgb_to_hsv)
+
+    def test_already_imported_module_is_returned_as_is(self):
+        self.assertIs(lazy_import('json'), sys.modules['json'])
+
+    def test_missing_module_raises_on_use(self):
+        module = lazy_import('no_such_module_for_test')
+        with self.assertRaises(ImportError):
+            module.anything
+
+    def test_is_available(self):
+        self.assertTrue(is_available('json'))
+        self.assertFalse(is_available('no_such_module_for_test'))
+
+
+class TestImportProfiler(unittest.TestCase):
+    """ImportProfilerのテスト"""
+
+    def test_records_new_imports(self):
+        sys.modules.pop('colorsys', None)
+        profiler = ImportProfiler().install()
+        try:
+            import colorsys  # noqa: F401
+            import json  # noqa: F401  インポート済みのモジュールは記録しない
+        finally:
+            profiler.uninstall()
+
+        modules = [r['module'] for r in profiler.records]
+        self.assertIn('colorsys', modules)
+        self.assertNotIn('json', modules)
+
+        out = io.StringIO()
+        profiler.report('test', out=out)
+        self.assertIn('colorsys', out.getvalue())
+
+    def test_uninstall_restores_import(self):
+        import builtins
+        original = builtins.__import__
+        profiler = ImportProfiler().install()
+        self.assertIsNot(builtins.__import__, original)
+        profiler.uninstall()
+        self.assertIs(builtins.__import__, original)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+クエリベクトルキャッシュのユニットテスト
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.query_cache import QueryVectorCache, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNormalizeQuery(unittest.TestCase):
+    """normalize_query関数のテスト"""
+
+    def test_collapses_whitespace(self):
+        self.assertEqual(normalize_query('  a   b\tc\n'), 'a b c')
+
+    def test_keeps_case(self):
+        """大文字・小文字はベクトルが変わりうるため区別する"""
+        self.assertEqual(normalize_query('LanceDB'), 'LanceDB')
+
+
+class TestQueryVectorCache(unittest.TestCase):
+    """QueryVectorCacheのテスト"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = QueryVectorCache(max_entries=2, ttl_seconds=60, clock=self.clock)
+
+    def test_hit_after_put(self):
+        self.assertIsNone(self.cache.get('m', 256, 'query'))
+        self.cache.put('m', 256, 'query', [0.1])
+        self.assertEqual(self.cache.get('m', 256, '  query '), [0.1])
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hitRate'], 0.5)
+
+    def test_key_includes_model_and_dimension(self):
+        self.cache.put('m', 256, 'query', [0.1])
+        self.assertIsNone(self.cache.get('other', 256, 'query'))
+        self.assertIsNone(self.cache.get('m', 128, 'query'))
+
+    def test_expires_after_ttl(self):
+        self.cache.put('m', 256, 'query', [0.1])
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get('m', 256, 'query'))
+        self.assertEqual(self.cache.get_stats()['expired'], 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put('m', 256, 'a', [1])
+        self.cache.put('m', 256, 'b', [2])
+        self.cache.get('m', 256, 'a')  # aを最近使ったことにする
+        self.cache.put('m', 256, 'c', [3])
+
+        self.assertEqual(self.cache.get('m', 256, 'a'), [1])
+        self.assertIsNone(self.cache.get('m', 256, 'b'))
+        self.assertEqual(self.cache.get_stats()['evictions'], 1)
+
+    def test_disabled_when_size_is_zero(self):
+        cache = QueryVectorCache(max_entries=0)
+        cache.put('m', 256, 'query', [0.1])
+        self.assertIsNone(cache.get('m', 256, 'query'))
+
+
+if __name__ == '__main__':
+    unittest.main()
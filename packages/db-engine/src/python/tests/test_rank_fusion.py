@@ -0,0 +1,57 @@
+"""
+Reciprocal Rank Fusionのユニットテスト
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.rank_fusion import DEFAULT_RRF_K, reciprocal_rank_fusion
+
+
+class TestReciprocalRankFusion(unittest.TestCase):
+    """reciprocal_rank_fusionのテスト"""
+
+    def test_scores_sum_over_rankings(self):
+        fused = dict(reciprocal_rank_fusion([['a', 'b'], ['b', 'c']]))
+        k = DEFAULT_RRF_K
+        self.assertAlmostEqual(fused['a'], 1 / (k + 1))
+        self.assertAlmostEqual(fused['b'], 1 / (k + 2) + 1 / (k + 1))
+        self.assertAlmostEqual(fused['c'], 1 / (k + 2))
+
+    def test_key_found_by_both_ranks_first(self):
+        """両方の結果に含まれるキーは、片方だけの1位より上になる"""
+        fused = reciprocal_rank_fusion([['vector-only', 'both'], ['fts-only', 'both']])
+        self.assertEqual(fused[0][0], 'both')
+
+    def test_ties_keep_first_appearance(self):
+        fused = reciprocal_rank_fusion([['a'], ['b']])
+        self.assertEqual([key for key, _ in fused], ['a', 'b'])
+
+    def test_weights(self):
+        fused = reciprocal_rank_fusion([['a'], ['b']], weights=[1.0, 2.0])
+        self.assertEqual([key for key, _ in fused], ['b', 'a'])
+
+    def test_weights_length_must_match(self):
+        with self.assertRaises(ValueError):
+            reciprocal_rank_fusion([['a'], ['b']], weights=[1.0])
+
+    def test_limit(self):
+        fused = reciprocal_rank_fusion([['a', 'b', 'c', 'd']], limit=2)
+        self.assertEqual([key for key, _ in fused], ['a', 'b'])
+
+    def test_duplicates_in_one_ranking_count_once(self):
+        fused = dict(reciprocal_rank_fusion([['a', 'a', 'b']], k=0))
+        self.assertAlmostEqual(fused['a'], 1.0)
+        self.assertAlmostEqual(fused['b'], 1 / 3)
+
+    def test_empty(self):
+        self.assertEqual(reciprocal_rank_fusion([[], []]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
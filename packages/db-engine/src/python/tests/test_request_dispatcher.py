@@ -0,0 +1,114 @@
+"""
+リクエストディスパッチャのユニットテスト
+"""
+
+import unittest
+import sys
+import threading
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.request_dispatcher import RequestDispatcher, READ_LANE, WRITE_LANE
+
+
+def lane_for(request):
+    return READ_LANE if request["method"] == "search" else WRITE_LANE
+
+
+class TestRequestDispatcher(unittest.TestCase):
+    """RequestDispatcherのテスト"""
+
+    def test_read_lane_is_not_blocked_by_write_lane(self):
+        """書き込みレーンの処理中でも読み取りレーンのリクエストが先に完了する"""
+        release_write = threading.Event()
+        responses = []
+        read_done = threading.Event()
+
+        def handler(request):
+            if request["method"] == "addSections":
+                release_write.wait(timeout=5)
+            return {"jsonrpc": "2.0", "id": request["id"], "result": request["method"]}
+
+        def reply(response):
+            responses.append(response["id"])
+            if response["id"] == 2:
+                read_done.set()
+
+        dispatcher = RequestDispatcher(handler, lane_for)
+        dispatcher.start()
+        dispatcher.submit({"id": 1, "method": "addSections"}, reply)
+        dispatcher.submit({"id": 2, "method": "search"}, reply)
+
+        # 書き込みが止まっている間に検索が返る（順不同のレスポンス）
+        self.assertTrue(read_done.wait(timeout=5))
+        self.assertEqual(responses, [2])
+
+        release_write.set()
+        dispatcher.shutdown(wait=True)
+        self.assertEqual(responses, [2, 1])
+
+    def test_fifo_within_lane(self):
+        """同じレーン内ではFIFO順に処理される"""
+        order = []
+        dispatcher = RequestDispatcher(
+            lambda request: order.append(request["id"]) or None,
+            lane_for
+        )
+        dispatcher.start()
+        for i in range(5):
+            dispatcher.submit({"id": i, "method": "addSections"}, lambda response: None)
+        dispatcher.shutdown(wait=True)
+
+        self.assertEqual(order, [0, 1, 2, 3, 4])
+
+    def test_none_response_is_not_sent(self):
+        """handlerがNoneを返した場合はレスポンスを送らない（通知）"""
+        responses = []
+        dispatcher = RequestDispatcher(lambda request: None, lane_for)
+        dispatcher.start()
+        dispatcher.submit({"method": "search"}, responses.append)
+        dispatcher.shutdown(wait=True)
+
+        self.assertEqual(responses, [])
+
+    def test_stats_report_queue_depth_per_lane(self):
+        """レーンごとのキュー深さと処理件数を報告する"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def handler(request):
+            started.set()
+            release.wait(timeout=5)
+            return None
+
+        dispatcher = RequestDispatcher(handler, lane_for)
+        dispatcher.start()
+        for i in range(3):
+            dispatcher.submit({"id": i, "method": "addSections"}, lambda response: None)
+        self.assertTrue(started.wait(timeout=5))
+
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats[WRITE_LANE]["active"], 1)
+        self.assertEqual(stats[WRITE_LANE]["queued"], 2)
+        self.assertEqual(stats[READ_LANE]["queued"], 0)
+
+        release.set()
+        dispatcher.shutdown(wait=True)
+
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats[WRITE_LANE]["completed"], 3)
+        self.assertEqual(stats[WRITE_LANE]["queued"], 0)
+        self.assertEqual(stats[WRITE_LANE]["active"], 0)
+
+    def test_unknown_lane_falls_back_to_write_lane(self):
+        """未知のレーン名は書き込みレーンに振り分ける"""
+        dispatcher = RequestDispatcher(lambda request: None, lambda request: "unknown")
+        lane = dispatcher.submit({"id": 1, "method": "x"}, lambda response: None)
+        self.assertEqual(lane, WRITE_LANE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+index_requestsの保持期間と定期実行のユニットテスト
+"""
+
+import threading
+import unittest
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.request_retention import PeriodicTask, RequestRetentionPolicy, directory_size
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+
+def request(request_id, path, status, days_ago):
+    return {
+        'id': request_id,
+        'document_path': path,
+        'status': status,
+        'created_at': NOW - timedelta(days=days_ago),
+    }
+
+
+class TestSelectPurgeable(unittest.TestCase):
+    """RequestRetentionPolicy.select_purgeableのテスト"""
+
+    def test_keeps_latest_terminal_request_per_path(self):
+        policy = RequestRetentionPolicy(retention_days=7)
+        rows = [
+            request('a1', 'a.md', 'completed', 30),
+            request('a2', 'a.md', 'completed', 20),
+            request('a3', 'a.md', 'failed', 10),
+            request('b1', 'b.md', 'skipped', 30),
+        ]
+        self.assertEqual(policy.select_purgeable(rows, NOW), ['a1', 'a2'])
+
+    def test_keeps_superseded_requests_within_retention(self):
+        policy = RequestRetentionPolicy(retention_days=7)
+        rows = [
+            request('a1', 'a.md', 'completed', 8),
+            request('a2', 'a.md', 'completed', 6),
+            request('a3', 'a.md', 'completed', 1),
+        ]
+        self.assertEqual(policy.select_purgeable(rows, NOW), ['a1'])
+
+    def test_zero_retention_purges_all_superseded(self):
+        policy = RequestRetentionPolicy(retention_days=0)
+        rows = [
+            request('a1', 'a.md', 'completed', 0.5),
+            request('a2', 'a.md', 'completed', 0.1),
+        ]
+        self.assertEqual(policy.select_purgeable(rows, NOW), ['a1'])
+
+    def test_never_purges_inflight_requests(self):
+        policy = RequestRetentionPolicy(retention_days=0)
+        rows = [
+            request('a1', 'a.md', 'pending', 100),
+            request('a2', 'a.md', 'processing', 90),
+            request('a3', 'a.md', 'completed', 80),
+        ]
+        self.assertEqual(policy.select_purgeable(rows, NOW), [])
+
+    def test_retention_override(self):
+        policy = RequestRetentionPolicy(retention_days=30)
+        rows = [request('a1', 'a.md', 'completed', 10), request('a2', 'a.md', 'completed', 5)]
+        self.assertEqual(policy.select_purgeable(rows, NOW), [])
+        self.assertEqual(policy.select_purgeable(rows, NOW, timedelta(days=1)), ['a1'])
+
+    def test_missing_created_at_counts_as_oldest(self):
+        policy = RequestRetentionPolicy(retention_days=1)
+        rows = [
+            {'id': 'a1', 'document_path': 'a.md', 'status': 'completed', 'created_at': None},
+            request('a2', 'a.md', 'completed', 0),
+        ]
+        self.assertEqual(policy.select_purgeable(rows, NOW), ['a1'])
+
+    def test_invalid_retention(self):
+        with self.assertRaises(ValueError):
+            RequestRetentionPolicy(retention_days=-1)
+
+
+class TestRetentionStats(unittest.TestCase):
+    """RequestRetentionPolicy.record / get_statsのテスト"""
+
+    def test_record_accumulates(self):
+        policy = RequestRetentionPolicy(retention_days=7)
+        self.assertIsNone(policy.get_stats()['lastPurge'])
+
+        first = policy.record(10, bytes_before=5000, bytes_after=2000, versions_before=30, versions_after=1, seconds=0.5)
+        self.assertEqual(first['reclaimedBytes'], 3000)
+        self.assertEqual(first['removedVersions'], 29)
+        policy.record(0, bytes_before=2000, bytes_after=2100, versions_before=3, versions_after=1, seconds=0.25)
+
+        stats = policy.get_stats()
+        self.assertEqual(stats['retentionDays'], 7)
+        self.assertEqual(stats['purges'], 2)
+        self.assertEqual(stats['purgedRows'], 10)
+        self.assertEqual(stats['reclaimedBytes'], 3000)
+        self.assertEqual(stats['removedVersions'], 31)
+        self.assertAlmostEqual(stats['purgeSeconds'], 0.75)
+        self.assertEqual(stats['lastPurge']['reclaimedBytes'], 0)
+
+
+class TestDirectorySize(unittest.TestCase):
+    """directory_sizeのテスト"""
+
+    def test_sums_nested_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / 'a').write_bytes(b'x' * 10)
+            (Path(temp_dir) / 'sub').mkdir()
+            (Path(temp_dir) / 'sub' / 'b').write_bytes(b'x' * 5)
+            self.assertEqual(directory_size(temp_dir), 15)
+            self.assertEqual(directory_size(str(Path(temp_dir) / 'missing')), 0)
+
+
+class TestPeriodicTask(unittest.TestCase):
+    """PeriodicTaskのテスト"""
+
+    def test_runs_repeatedly_until_stopped(self):
+        calls = []
+        done = threading.Event()
+
+        def run():
+            calls.append(1)
+            if len(calls) == 3:
+                done.set()
+
+        task = PeriodicTask('test', 0.01, run)
+        task.start()
+        self.assertTrue(done.wait(2.0))
+        task.stop()
+        self.assertGreaterEqual(len(calls), 3)
+
+    def test_failures_do_not_stop_the_task(self):
+        done = threading.Event()
+        calls = []
+
+        def run():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            done.set()
+
+        task = PeriodicTask('test', 0.01, run)
+        task.start()
+        self.assertTrue(done.wait(2.0))
+        task.stop()
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            PeriodicTask('test', 0, lambda: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
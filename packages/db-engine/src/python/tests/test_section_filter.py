@@ -13,6 +13,7 @@ python_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(python_dir))
 
 from utils.section_filter import filter_sections_by_token_limit, get_texts_to_encode
+from utils.token_utils import estimate_tokens_by_script
 
 
 class TestFilterSectionsByTokenLimit(unittest.TestCase):
@@ -133,6 +134,20 @@ class TestFilterSectionsByTokenLimit(unittest.TestCase):
         self.assertEqual(skipped[0]['heading'], '(document root)')
         self.assertGreater(skipped[0]['estimated_tokens'], 7500)
 
+    def test_custom_token_counter(self):
+        """count_tokensで推定方法を差し替えられる（日本語のセクションを少なく見積もらない）"""
+        sections = [
+            {'heading': '見出し', 'content': 'あ' * 200, 'vector': None},  # 文字数 / 4 では50トークン
+        ]
+        valid, _ = filter_sections_by_token_limit(sections, max_tokens=100)
+        self.assertEqual(len(valid), 1)
+
+        valid, skipped = filter_sections_by_token_limit(
+            sections, max_tokens=100, count_tokens=estimate_tokens_by_script
+        )
+        self.assertEqual(len(valid), 0)
+        self.assertEqual(skipped[0]['estimated_tokens'], estimate_tokens_by_script('見出し\nあ' + 'あ' * 199))
+
 
 class TestGetTextsToEncode(unittest.TestCase):
     """get_texts_to_encode関数のテスト"""
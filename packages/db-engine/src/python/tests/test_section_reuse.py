@@ -0,0 +1,74 @@
+"""
+再インデックス時のセクションの対応付けのユニットテスト
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.section_reuse import match_unchanged_sections, remap_section_ids
+
+
+def section(section_id, heading, content, depth=1, order=0, parent_id=None):
+    return {
+        'id': section_id,
+        'heading': heading,
+        'content': content,
+        'depth': depth,
+        'order': order,
+        'parent_id': parent_id,
+    }
+
+
+class TestMatchUnchangedSections(unittest.TestCase):
+    """match_unchanged_sectionsのテスト"""
+
+    def test_matches_same_heading_content_and_depth(self):
+        existing = [section('old-a', 'A', 'x'), section('old-b', 'B', 'y', order=1)]
+        sections = [section('new-b', 'B', 'y'), section('new-a', 'A', 'x2'), section('new-c', 'C', 'z')]
+        self.assertEqual(match_unchanged_sections(existing, sections), {0: 1})
+
+    def test_depth_must_match(self):
+        existing = [section('old-a', 'A', 'x', depth=1)]
+        sections = [section('new-a', 'A', 'x', depth=2)]
+        self.assertEqual(match_unchanged_sections(existing, sections), {})
+
+    def test_duplicates_match_in_order(self):
+        existing = [
+            section('old-2', 'Note', 'same', order=2),
+            section('old-1', 'Note', 'same', order=1),
+        ]
+        sections = [section('new-1', 'Note', 'same'), section('new-2', 'Note', 'same'), section('new-3', 'Note', 'same')]
+        # 既存の行はorderの順に使われ、足りない分は対応なし
+        self.assertEqual(match_unchanged_sections(existing, sections), {0: 1, 1: 0})
+
+    def test_empty(self):
+        self.assertEqual(match_unchanged_sections([], [section('a', 'A', 'x')]), {})
+        self.assertEqual(match_unchanged_sections([section('a', 'A', 'x')], []), {})
+
+
+class TestRemapSectionIds(unittest.TestCase):
+    """remap_section_idsのテスト"""
+
+    def test_ids_and_parent_ids_are_remapped(self):
+        sections = [
+            section('new-a', 'A', 'x'),
+            section('new-b', 'B', 'changed', depth=2, parent_id='new-a'),
+            section('new-c', 'C', 'z', depth=3, parent_id='new-b'),
+        ]
+        remapped, id_map = remap_section_ids(sections, ['old-a'], {0: 0})
+
+        self.assertEqual(id_map, {'new-a': 'old-a'})
+        self.assertEqual([s['id'] for s in remapped], ['old-a', 'new-b', 'new-c'])
+        self.assertEqual([s['parent_id'] for s in remapped], [None, 'old-a', 'new-b'])
+        # 元のセクションは変更しない
+        self.assertEqual(sections[0]['id'], 'new-a')
+        self.assertEqual(sections[1]['parent_id'], 'new-a')
+
+
+if __name__ == '__main__':
+    unittest.main()
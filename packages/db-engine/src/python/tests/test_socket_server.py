@@ -0,0 +1,148 @@
+"""
+Unixドメインソケットサーバーのユニットテスト
+"""
+
+import itertools
+import json
+import os
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.socket_server import ClientSession, WorkerSocketServer, parse_listen_address
+from utils.cancellation import CANCEL_METHOD
+
+
+class TestParseListenAddress(unittest.TestCase):
+    """parse_listen_address関数のテスト"""
+
+    def test_unix(self):
+        self.assertEqual(parse_listen_address('unix:/tmp/worker.sock'), '/tmp/worker.sock')
+
+    def test_invalid(self):
+        for value in ('tcp://localhost:1234', 'unix:', '/tmp/worker.sock'):
+            with self.assertRaises(ValueError):
+                parse_listen_address(value)
+
+
+class TestClientSession(unittest.TestCase):
+    """ClientSessionのテスト"""
+
+    def test_ids_are_unique_across_sessions(self):
+        ids = itertools.count(1)
+        a = ClientSession(ids)
+        b = ClientSession(ids)
+
+        request_a = a.inbound({"id": 1, "method": "search"})
+        request_b = b.inbound({"id": 1, "method": "search"})
+        self.assertNotEqual(request_a["id"], request_b["id"])
+
+        # レスポンスはそれぞれのクライアントのIDに戻る
+        self.assertEqual(a.outbound({"id": request_a["id"], "result": "a"}), {"id": 1, "result": "a"})
+        self.assertEqual(b.outbound({"id": request_b["id"], "result": "b"}), {"id": 1, "result": "b"})
+        self.assertEqual(a.pending_ids(), [])
+
+    def test_batch_and_cancel(self):
+        session = ClientSession(itertools.count(100))
+        batch = session.inbound([
+            {"id": 1, "method": "search"},
+            {"method": "notify"},
+            {"id": 2, "method": "ping"},
+        ])
+        self.assertEqual([item.get("id") for item in batch], [100, None, 101])
+
+        cancel = session.inbound({"method": CANCEL_METHOD, "params": {"id": 2}})
+        self.assertEqual(cancel["params"]["id"], 101)
+        self.assertEqual(sorted(session.pending_ids()), [100, 101])
+
+        responses = session.outbound([{"id": 100}, {"id": 101}])
+        self.assertEqual([r["id"] for r in responses], [1, 2])
+
+
+class TestWorkerSocketServer(unittest.TestCase):
+    """WorkerSocketServerのテスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'worker.sock')
+        self.cancelled = []
+        self.hold = threading.Event()
+
+        def serve(message, reply):
+            # "hold"メソッドは応答しない（切断時のキャンセルを確認するため）
+            if message.get("method") != "hold":
+                reply({"jsonrpc": "2.0", "id": message["id"], "result": message["params"]})
+            else:
+                self.hold.set()
+
+        self.server = WorkerSocketServer(self.path, serve=serve, cancel=self.cancelled.append)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(timeout=5)
+        os.rmdir(self.temp_dir)
+
+    def _connect(self):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(self.path)
+        return client, client.makefile('rb')
+
+    def test_multiple_clients(self):
+        clients = [self._connect() for _ in range(2)]
+        for i, (client, _) in enumerate(clients):
+            client.sendall((json.dumps({"jsonrpc": "2.0", "id": 1, "method": "echo", "params": i}) + "\n").encode())
+
+        for i, (client, rfile) in enumerate(clients):
+            response = json.loads(rfile.readline())
+            self.assertEqual(response, {"jsonrpc": "2.0", "id": 1, "result": i})
+            rfile.close()
+            client.close()
+
+    def test_disconnect_cancels_pending_requests(self):
+        client, rfile = self._connect()
+        client.sendall(b'{"jsonrpc": "2.0", "id": 7, "method": "hold", "params": {}}\n')
+        self.assertTrue(self.hold.wait(timeout=5))
+        rfile.close()
+        client.close()
+
+        for _ in range(50):
+            if self.cancelled:
+                break
+            threading.Event().wait(0.05)
+        self.assertEqual(len(self.cancelled), 1)
+
+    def test_socket_is_private_before_listening(self):
+        """listen()の時点でソケットファイルは所有者だけが読み書きできる"""
+        modes = []
+
+        class RecordingServer(WorkerSocketServer):
+            def server_activate(self):
+                modes.append(stat.S_IMODE(os.stat(self.path).st_mode))
+                super().server_activate()
+
+        path = os.path.join(self.temp_dir, 'private.sock')
+        server = RecordingServer(path, serve=lambda message, reply: None)
+        try:
+            self.assertEqual(modes, [0o600])
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        finally:
+            server.server_close()
+
+    def test_socket_in_use_is_rejected(self):
+        with self.assertRaises(FileExistsError):
+            WorkerSocketServer(self.path, serve=lambda message, reply: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
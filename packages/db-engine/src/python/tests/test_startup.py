@@ -0,0 +1,82 @@
+"""
+起動フェーズ追跡のユニットテスト
+"""
+
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.startup import StartupPhases, PhaseNotReadyError, DONE, FAILED, RUNNING, PHASE_NOT_READY
+
+
+class TestStartupPhases(unittest.TestCase):
+    """StartupPhasesのテスト"""
+
+    def test_phase_context_records_duration(self):
+        phases = StartupPhases()
+        with phases.phase('tables'):
+            time.sleep(0.01)
+
+        snapshot = phases.snapshot()
+        self.assertTrue(snapshot['ready'])
+        self.assertEqual(snapshot['phases']['tables']['status'], DONE)
+        self.assertGreaterEqual(snapshot['phases']['tables']['durationMs'], 10)
+
+    def test_phase_context_records_failure(self):
+        phases = StartupPhases()
+        with self.assertRaises(RuntimeError):
+            with phases.phase('connect'):
+                raise RuntimeError('boom')
+
+        entry = phases.snapshot()['phases']['connect']
+        self.assertEqual(entry['status'], FAILED)
+        self.assertEqual(entry['error'], 'boom')
+
+    def test_background_phase_can_be_waited(self):
+        phases = StartupPhases()
+        release = threading.Event()
+        phases.run_in_background('model', lambda: release.wait(timeout=5))
+
+        # 実行中は未完了として報告される
+        snapshot = phases.snapshot()
+        self.assertFalse(snapshot['ready'])
+        self.assertEqual(snapshot['phases']['model']['status'], RUNNING)
+        self.assertFalse(phases.wait('model', timeout=0.01))
+
+        release.set()
+        self.assertTrue(phases.wait('model', timeout=5))
+        self.assertTrue(phases.is_done('model'))
+
+    def test_background_phase_returning_false_is_failure(self):
+        phases = StartupPhases()
+        phases.run_in_background('model', lambda: False)
+
+        self.assertTrue(phases.wait('model', timeout=5))
+        self.assertFalse(phases.is_done('model'))
+        self.assertEqual(phases.snapshot()['phases']['model']['status'], FAILED)
+
+    def test_unknown_phase_does_not_block(self):
+        self.assertTrue(StartupPhases().wait('indexes', timeout=None))
+
+    def test_record(self):
+        phases = StartupPhases(origin=100.0)
+        phases.record('imports', 100.0, 100.5)
+
+        entry = phases.snapshot()['phases']['imports']
+        self.assertEqual(entry, {'status': DONE, 'startMs': 0.0, 'durationMs': 500.0})
+
+    def test_phase_not_ready_error(self):
+        error = PhaseNotReadyError('fts_index')
+        self.assertEqual(error.code, PHASE_NOT_READY)
+        self.assertEqual(error.phase, 'fts_index')
+        self.assertIn('fts_index', str(error))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,14 @@ from pathlib import Path
 python_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(python_dir))
 
-from utils.token_utils import estimate_tokens, estimate_total_tokens
+import threading
+
+from utils.token_utils import (
+    TokenEstimator,
+    estimate_tokens,
+    estimate_tokens_by_script,
+    estimate_total_tokens,
+)
 
 
 class TestEstimateTokens(unittest.TestCase):
@@ -97,5 +104,153 @@ class TestEstimateTotalTokens(unittest.TestCase):
         self.assertEqual(estimate_total_tokens(texts), 250)
 
 
+class FakeTokenizer:
+    """空白区切りの語数をトークン数とするトークナイザ（HuggingFaceのtokenizerと同じ呼び出し方）"""
+
+    def __init__(self, fail: bool = False, failures: int = 0):
+        self.calls = []
+        self.fail = fail
+        # 最初のfailures回だけ失敗する
+        self.failures = failures
+
+    def __call__(self, texts, add_special_tokens=True, verbose=True):
+        self.calls.append(list(texts))
+        if self.fail or len(self.calls) <= self.failures:
+            raise RuntimeError("Already borrowed")
+        return {'input_ids': [list(range(len(text.split()))) for text in texts]}
+
+
+class TestEstimateTokensByScript(unittest.TestCase):
+    """estimate_tokens_by_script関数のテスト"""
+
+    def test_empty_string(self):
+        """空文字列は0トークン"""
+        self.assertEqual(estimate_tokens_by_script(""), 0)
+
+    def test_ascii(self):
+        """ASCIIは1文字0.3トークン（切り上げ）"""
+        self.assertEqual(estimate_tokens_by_script("a" * 100), 30)
+        self.assertEqual(estimate_tokens_by_script("a"), 1)
+
+    def test_japanese_is_not_undercounted(self):
+        """日本語は文字数 / 4 の2倍以上に見積もる"""
+        text = "検索エンジンのインデックスを更新する手順について説明します。" * 10
+        self.assertGreaterEqual(estimate_tokens_by_script(text), 2 * estimate_tokens(text))
+
+    def test_kana_and_kanji(self):
+        """かなは0.6、漢字は0.8トークン"""
+        self.assertEqual(estimate_tokens_by_script("あ" * 10), 6)
+        self.assertEqual(estimate_tokens_by_script("カ" * 10), 6)
+        self.assertEqual(estimate_tokens_by_script("漢" * 10), 8)
+
+    def test_other_characters(self):
+        """記号・全角文字などは1トークン"""
+        self.assertEqual(estimate_tokens_by_script("。、！" * 2), 6)
+
+
+class TestTokenEstimator(unittest.TestCase):
+    """TokenEstimatorのテスト"""
+
+    def test_fallback_without_tokenizer(self):
+        """トークナイザがない場合は文字種ごとの推定"""
+        estimator = TokenEstimator()
+        self.assertEqual(estimator.count_many(["あ" * 10, "a" * 10]), [6, 3])
+        self.assertEqual(estimator.get_stats()['estimated'], 2)
+
+    def test_counts_with_tokenizer(self):
+        """トークナイザがある場合は実際のトークン数"""
+        tokenizer = FakeTokenizer()
+        estimator = TokenEstimator(lambda: tokenizer)
+
+        self.assertEqual(estimator.count_many(["a b c", "d e"]), [3, 2])
+        self.assertEqual(estimator.count("x y z w"), 4)
+
+    def test_memoizes_per_text(self):
+        """同じテキストはトークナイザに渡さない（1回の呼び出し内の重複も含む）"""
+        tokenizer = FakeTokenizer()
+        estimator = TokenEstimator(lambda: tokenizer)
+
+        self.assertEqual(estimator.count_many(["a b", "c", "a b"]), [2, 1, 2])
+        self.assertEqual(estimator.count_many(["a b", "c d e"]), [2, 3])
+
+        self.assertEqual(tokenizer.calls, [["a b", "c"], ["c d e"]])
+        stats = estimator.get_stats()
+        self.assertEqual(stats['memoHits'], 1)
+        self.assertEqual(stats['tokenized'], 3)
+        self.assertEqual(stats['size'], 3)
+
+    def test_switches_to_tokenizer_after_load(self):
+        """トークナイザが使えるようになったら推定値ではなく実際の値を返す（推定値はメモしない）"""
+        state = {'tokenizer': None}
+        estimator = TokenEstimator(lambda: state['tokenizer'])
+
+        self.assertEqual(estimator.count("a b c d e f g h i j"), 6)
+        state['tokenizer'] = FakeTokenizer()
+        self.assertEqual(estimator.count("a b c d e f g h i j"), 10)
+
+    def test_memo_is_bounded(self):
+        """メモは最大件数を超えた分を古い順に削除"""
+        tokenizer = FakeTokenizer()
+        estimator = TokenEstimator(lambda: tokenizer, max_entries=2)
+
+        estimator.count_many(["a", "b", "c"])
+        self.assertEqual(estimator.get_stats()['size'], 2)
+        estimator.count("a")
+        self.assertEqual(tokenizer.calls[-1], ["a"])
+
+    def test_tokenizer_failure_falls_back(self):
+        """トークナイザが失敗した場合は推定値を返す（推定値はメモしない）"""
+        tokenizer = FakeTokenizer(fail=True)
+        estimator = TokenEstimator(lambda: tokenizer)
+
+        self.assertEqual(estimator.count("a" * 10), 3)
+        self.assertEqual(estimator.count("a" * 10), 3)
+        self.assertEqual(estimator.get_stats()['tokenizerErrors'], 2)
+        self.assertEqual(estimator.get_stats()['size'], 0)
+
+    def test_transient_failure_is_not_permanent(self):
+        """一時的な失敗の後は、再びトークナイザで数える"""
+        tokenizer = FakeTokenizer(failures=1)
+        estimator = TokenEstimator(lambda: tokenizer)
+
+        self.assertEqual(estimator.count("a b c d e f g h i j"), 6)
+        self.assertEqual(estimator.count("a b c d e f g h i j"), 10)
+        self.assertEqual(len(tokenizer.calls), 2)
+
+    def test_tokenizer_lock_is_shared(self):
+        """トークナイザは渡したロックを取って呼ぶ（トークナイザを共有する処理と同時に呼ばない）"""
+        lock = threading.Lock()
+        held = []
+
+        class LockCheckingTokenizer(FakeTokenizer):
+            def __call__(self, texts, add_special_tokens=True, verbose=True):
+                held.append(lock.locked())
+                return super().__call__(texts, add_special_tokens, verbose)
+
+        estimator = TokenEstimator(lambda: LockCheckingTokenizer(), tokenizer_lock=lock)
+        self.assertEqual(estimator.count("a b"), 2)
+        self.assertEqual(held, [True])
+        self.assertFalse(lock.locked())
+
+    def test_concurrent_counts(self):
+        """複数スレッドから呼んでも結果が一致する"""
+        tokenizer = FakeTokenizer()
+        estimator = TokenEstimator(lambda: tokenizer)
+        texts = [" ".join(["w"] * (i % 17 + 1)) for i in range(200)]
+        results = []
+
+        def worker():
+            results.append(estimator.count_many(texts))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = [i % 17 + 1 for i in range(200)]
+        self.assertEqual(results, [expected] * 4)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,106 @@
+"""
+トークンウィンドウ分割ユーティリティのユニットテスト
+
+重要原則: 小さな値（100トークンなど）でロジックの正しさを検証
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.token_windows import DEFAULT_MAX_WINDOWS, plan_token_windows, split_token_windows
+
+
+def count_chars(text):
+    """1文字1トークンとして数える"""
+    return len(text)
+
+
+class TestSplitTokenWindows(unittest.TestCase):
+    """split_token_windows関数のテスト"""
+
+    def test_text_under_limit(self):
+        """上限以下のテキストは分割しない"""
+        self.assertEqual(split_token_windows("abc", 10, count_chars), [("abc", 3)])
+
+    def test_windows_cover_text_within_limit(self):
+        """ウィンドウを連結すると元のテキストになり、各ウィンドウは上限以下"""
+        text = "\n".join(f"line {i} " + "x" * (i % 7) for i in range(60))
+        windows = split_token_windows(text, 50, count_chars)
+
+        self.assertGreater(len(windows), 1)
+        self.assertEqual("".join(window for window, _ in windows), text)
+        for window, tokens in windows:
+            self.assertEqual(tokens, len(window))
+            self.assertLessEqual(tokens, 50)
+
+    def test_cuts_after_newline(self):
+        """改行の直後で区切る"""
+        text = "aaaa\nbbbb\ncccc"
+        windows = split_token_windows(text, 10, count_chars)
+        self.assertEqual([window for window, _ in windows], ["aaaa\nbbbb\n", "cccc"])
+
+    def test_cuts_after_japanese_period(self):
+        """日本語は句点の直後で区切る"""
+        text = "あいうえお。かきくけこ。さしすせそ。"
+        windows = split_token_windows(text, 13, count_chars)
+        self.assertEqual([window for window, _ in windows], ["あいうえお。かきくけこ。", "さしすせそ。"])
+
+    def test_hard_cut_without_separator(self):
+        """区切りがない場合は上限の位置で切る"""
+        windows = split_token_windows("a" * 25, 10, count_chars)
+        self.assertEqual([tokens for _, tokens in windows], [10, 10, 5])
+
+    def test_shrinks_when_estimate_is_low(self):
+        """後半ほどトークン数が多いテキストでも上限を超えない"""
+        text = "a" * 40 + "漢" * 40
+
+        def weighted(t):
+            return sum(3 if c == "漢" else 1 for c in t)
+
+        windows = split_token_windows(text, 30, weighted)
+        self.assertEqual("".join(window for window, _ in windows), text)
+        for _, tokens in windows:
+            self.assertLessEqual(tokens, 30)
+
+    def test_skips_blank_windows(self):
+        """空白だけのウィンドウは含めない"""
+        windows = split_token_windows("aaaa\n\n\n\n\n\n\n\nbbbb", 5, count_chars)
+        self.assertTrue(all(window.strip() for window, _ in windows))
+
+
+class TestPlanTokenWindows(unittest.TestCase):
+    """plan_token_windows関数のテスト"""
+
+    def test_under_max_windows(self):
+        """ウィンドウ数が上限以下の場合は全て使う"""
+        text = "aaa bbb ccc"
+        self.assertEqual(plan_token_windows(text, 4, count_chars), split_token_windows(text, 4, count_chars))
+
+    def test_bounded_windows_include_first_and_last(self):
+        """上限を超える場合は先頭・末尾を含めて等間隔に選ぶ"""
+        text = " ".join(f"w{i:02d}" for i in range(40))
+        all_windows = split_token_windows(text, 4, count_chars)
+        windows = plan_token_windows(text, 4, count_chars, max_windows=5)
+
+        self.assertEqual(len(windows), 5)
+        self.assertEqual(windows[0], all_windows[0])
+        self.assertEqual(windows[-1], all_windows[-1])
+
+    def test_default_max_windows(self):
+        """デフォルトの上限"""
+        windows = plan_token_windows("x " * 1000, 10, count_chars)
+        self.assertEqual(len(windows), DEFAULT_MAX_WINDOWS)
+
+    def test_single_window(self):
+        """max_windows=1の場合は先頭のウィンドウのみ"""
+        windows = plan_token_windows("aaa bbb ccc", 4, count_chars, max_windows=1)
+        self.assertEqual(windows, [("aaa ", 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+メッセージトランスポートのユニットテスト
+"""
+
+import io
+import json
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.transport import (
+    MessageChannel,
+    MSGPACK_AVAILABLE,
+    TRANSPORT_JSON,
+    TRANSPORT_MSGPACK,
+    HANDSHAKE_METHOD,
+    encode_frame,
+    negotiate_transport,
+)
+
+
+class TestNegotiateTransport(unittest.TestCase):
+    """negotiate_transport関数のテスト"""
+
+    def test_default_is_json(self):
+        self.assertEqual(negotiate_transport(None), TRANSPORT_JSON)
+        self.assertEqual(negotiate_transport('json'), TRANSPORT_JSON)
+
+    def test_unknown_falls_back_to_json(self):
+        self.assertEqual(negotiate_transport('arrow'), TRANSPORT_JSON)
+
+    def test_msgpack_when_available(self):
+        expected = TRANSPORT_MSGPACK if MSGPACK_AVAILABLE else TRANSPORT_JSON
+        self.assertEqual(negotiate_transport('msgpack'), expected)
+
+
+class TestJsonChannel(unittest.TestCase):
+    """JSON行トランスポートのテスト"""
+
+    def test_read_skips_blank_lines(self):
+        rfile = io.BytesIO(b'\n{"id": 1, "method": "ping"}\n[{"id": 2}]\n')
+        channel = MessageChannel(rfile, io.BytesIO())
+
+        self.assertEqual(channel.read_message(), {"id": 1, "method": "ping"})
+        self.assertEqual(channel.read_message(), [{"id": 2}])
+        with self.assertRaises(EOFError):
+            channel.read_message()
+
+    def test_invalid_json_raises_value_error(self):
+        channel = MessageChannel(io.BytesIO(b'{broken\n{"id": 1}\n'), io.BytesIO())
+
+        with self.assertRaises(ValueError):
+            channel.read_message()
+        # 壊れた行の後も読み続けられる
+        self.assertEqual(channel.read_message(), {"id": 1})
+
+    def test_write_keeps_non_ascii(self):
+        wfile = io.BytesIO()
+        MessageChannel(io.BytesIO(), wfile).write_message({"content": "日本語"})
+
+        self.assertEqual(wfile.getvalue(), '{"content": "日本語"}\n'.encode('utf-8'))
+
+
+@unittest.skipUnless(MSGPACK_AVAILABLE, "msgpack is not installed")
+class TestMsgpackChannel(unittest.TestCase):
+    """MessagePackフレームトランスポートのテスト"""
+
+    def test_roundtrip(self):
+        message = {"jsonrpc": "2.0", "id": 1, "result": {"content": "本文" * 100, "depth": 2}}
+        channel = MessageChannel(io.BytesIO(encode_frame(message)), io.BytesIO(), TRANSPORT_MSGPACK)
+
+        self.assertEqual(channel.read_message(), message)
+        with self.assertRaises(EOFError):
+            channel.read_message()
+
+    def test_truncated_frame_is_eof(self):
+        frame = encode_frame({"id": 1})
+        channel = MessageChannel(io.BytesIO(frame[:-1]), io.BytesIO(), TRANSPORT_MSGPACK)
+
+        with self.assertRaises(EOFError):
+            channel.read_message()
+
+    def test_handshake_is_json_then_switches(self):
+        wfile = io.BytesIO()
+        channel = MessageChannel(io.BytesIO(), wfile)
+        channel.send_handshake(TRANSPORT_MSGPACK)
+        channel.write_message({"id": 1})
+
+        data = wfile.getvalue()
+        line, rest = data.split(b'\n', 1)
+        handshake = json.loads(line)
+        self.assertEqual(handshake["method"], HANDSHAKE_METHOD)
+        self.assertEqual(handshake["params"], {"transport": TRANSPORT_MSGPACK})
+        # ハンドシェイク後はフレームで送信される
+        self.assertEqual(rest, encode_frame({"id": 1}))
+
+
+if __name__ == '__main__':
+    unittest.main()
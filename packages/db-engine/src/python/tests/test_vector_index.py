@@ -0,0 +1,171 @@
+"""
+ベクトルインデックスの作成・追加・再学習の判断のユニットテスト
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.vector_index import (
+    ACTION_CREATE,
+    ACTION_RETRAIN,
+    ACTION_UPDATE,
+    VectorIndexPolicy,
+    build_vector_index,
+    index_params,
+)
+
+
+class RecordingTable:
+    """create_indexの引数を記録するテーブル"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create_index(self, **kwargs):
+        self.calls.append(kwargs)
+
+
+class TestIndexParams(unittest.TestCase):
+    """index_paramsのテスト"""
+
+    def test_ivf_pq_partitions_grow_with_sqrt_of_rows(self):
+        self.assertEqual(index_params('IVF_PQ', 10000, 256)['num_partitions'], 100)
+        self.assertEqual(index_params('IVF_PQ', 1000000, 256)['num_partitions'], 1000)
+
+    def test_ivf_pq_sub_vectors_divide_dimension(self):
+        self.assertEqual(index_params('IVF_PQ', 10000, 256)['num_sub_vectors'], 32)
+        self.assertEqual(index_params('IVF_PQ', 10000, 100)['num_sub_vectors'], 25)
+        self.assertEqual(index_params('IVF_PQ', 10000, 7)['num_sub_vectors'], 7)
+
+    def test_hnsw_uses_few_partitions(self):
+        self.assertEqual(index_params('IVF_HNSW_SQ', 50000, 256), {'num_partitions': 1})
+        self.assertEqual(index_params('IVF_HNSW_SQ', 1000000, 256), {'num_partitions': 10})
+
+    def test_build_vector_index_replaces_with_l2(self):
+        table = RecordingTable()
+        build_vector_index(table, 'IVF_PQ', 10000, 256)
+        self.assertEqual(table.calls, [{
+            'metric': 'l2',
+            'vector_column_name': 'vector',
+            'index_type': 'IVF_PQ',
+            'replace': True,
+            'num_partitions': 100,
+            'num_sub_vectors': 32,
+        }])
+
+
+class TestVectorIndexPolicy(unittest.TestCase):
+    """VectorIndexPolicyのテスト"""
+
+    def test_no_index_below_min_rows(self):
+        policy = VectorIndexPolicy(min_rows=1000)
+        self.assertIsNone(policy.plan(total_rows=999, indexed_rows=None, unindexed_rows=999))
+
+    def test_create_at_min_rows(self):
+        policy = VectorIndexPolicy(min_rows=1000)
+        self.assertEqual(policy.plan(total_rows=1000, indexed_rows=None, unindexed_rows=1000), ACTION_CREATE)
+
+    def test_disabled_never_plans(self):
+        policy = VectorIndexPolicy(min_rows=0)
+        self.assertFalse(policy.enabled)
+        self.assertIsNone(policy.plan(total_rows=10 ** 6, indexed_rows=None, unindexed_rows=10 ** 6))
+        self.assertIsNone(policy.get_stats()['indexType'])
+
+    def test_update_when_unindexed_rows_accumulate(self):
+        policy = VectorIndexPolicy(min_rows=1000, update_rows=100)
+        policy.record(ACTION_CREATE, rows=1000, seconds=1.0)
+
+        self.assertIsNone(policy.plan(total_rows=1099, indexed_rows=1000, unindexed_rows=99))
+        self.assertEqual(policy.plan(total_rows=1100, indexed_rows=1000, unindexed_rows=100), ACTION_UPDATE)
+
+    def test_retrain_after_growth_since_training(self):
+        policy = VectorIndexPolicy(min_rows=1000, update_rows=100, retrain_growth=2.0)
+        policy.record(ACTION_CREATE, rows=1000, seconds=1.0)
+        # 追加では学習時の行数は変わらない
+        policy.record(ACTION_UPDATE, rows=1500, seconds=0.1)
+
+        self.assertEqual(policy.plan(total_rows=1900, indexed_rows=1500, unindexed_rows=400), ACTION_UPDATE)
+        self.assertEqual(policy.plan(total_rows=2000, indexed_rows=1500, unindexed_rows=500), ACTION_RETRAIN)
+
+        policy.record(ACTION_RETRAIN, rows=2000, seconds=2.0)
+        self.assertIsNone(policy.plan(total_rows=2050, indexed_rows=2000, unindexed_rows=50))
+
+    def test_existing_index_uses_indexed_rows_as_trained_rows(self):
+        """起動前からあるインデックスは、インデックス済みの行数で学習したとみなす"""
+        policy = VectorIndexPolicy(min_rows=1000, update_rows=10 ** 6)
+        self.assertIsNone(policy.plan(total_rows=5000, indexed_rows=4000, unindexed_rows=1000))
+        self.assertEqual(policy.get_stats()['trainedRows'], 4000)
+        self.assertEqual(policy.plan(total_rows=8000, indexed_rows=4000, unindexed_rows=4000), ACTION_RETRAIN)
+
+    def test_stats(self):
+        policy = VectorIndexPolicy(min_rows=1000)
+        policy.record(ACTION_CREATE, rows=1200, seconds=1.5)
+        policy.record(ACTION_UPDATE, rows=3300, seconds=0.25)
+
+        stats = policy.get_stats()
+        self.assertEqual(stats['indexType'], 'IVF_PQ')
+        self.assertEqual(stats['builds'], 1)
+        self.assertEqual(stats['updates'], 1)
+        self.assertEqual(stats['indexedRows'], 3300)
+        self.assertEqual(stats['unindexedRows'], 0)
+        self.assertEqual(stats['trainedRows'], 1200)
+        self.assertAlmostEqual(stats['indexSeconds'], 1.75)
+
+    def test_due_before_first_check(self):
+        """行数を確認するまでは判断が必要"""
+        policy = VectorIndexPolicy(min_rows=1000)
+        self.assertTrue(policy.due())
+        policy.record_write(10)
+        self.assertTrue(policy.due())
+
+    def test_not_due_below_min_rows(self):
+        """書き込んだ行数の見積もりがmin_rowsに届くまでは確認しない"""
+        policy = VectorIndexPolicy(min_rows=1000)
+        policy.plan(total_rows=900, indexed_rows=None, unindexed_rows=900)
+        policy.record_write(99)
+        self.assertFalse(policy.due())
+        policy.record_write(1)
+        self.assertTrue(policy.due())
+
+    def test_row_delta_for_replaced_rows(self):
+        """置き換えでは書き込んだ行数と行数の増減が異なる"""
+        policy = VectorIndexPolicy(min_rows=1000, update_rows=100)
+        policy.plan(total_rows=990, indexed_rows=None, unindexed_rows=990)
+        policy.record_write(50, row_delta=0)
+        self.assertFalse(policy.due())
+        policy.record_write(20, row_delta=10)
+        self.assertTrue(policy.due())
+
+    def test_due_when_unindexed_rows_or_growth_reach_limits(self):
+        policy = VectorIndexPolicy(min_rows=1000, update_rows=100, retrain_growth=2.0)
+        policy.plan(total_rows=1000, indexed_rows=None, unindexed_rows=1000)
+        policy.record(ACTION_CREATE, rows=1000, seconds=1.0)
+
+        policy.record_write(99)
+        self.assertFalse(policy.due())
+        policy.record_write(1)
+        self.assertTrue(policy.due())
+
+        # 更新で書き直した行はインデックスから外れるが、行数は増えない
+        policy.plan(total_rows=1100, indexed_rows=1100, unindexed_rows=0)
+        policy.record_write(50, row_delta=0)
+        self.assertFalse(policy.due())
+        policy.plan(total_rows=1999, indexed_rows=1999, unindexed_rows=0)
+        policy.record_write(1)
+        self.assertTrue(policy.due())
+
+    def test_disabled_is_never_due(self):
+        self.assertFalse(VectorIndexPolicy(min_rows=0).due())
+
+    def test_invalid_index_type(self):
+        with self.assertRaises(ValueError):
+            VectorIndexPolicy(index_type='FLAT')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+エンコードと書き込みのパイプラインのユニットテスト
+"""
+
+import threading
+import unittest
+import weakref
+import sys
+from pathlib import Path
+
+# プロジェクトルートのpythonディレクトリをパスに追加
+python_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(python_dir))
+
+from utils.write_pipeline import PipelinedWriter, RowCompletion, StageTimings
+
+
+class TestRowCompletion(unittest.TestCase):
+    """RowCompletionのテスト"""
+
+    def test_plain_rows_are_ready_immediately(self):
+        completion = RowCompletion(3, {})
+        self.assertEqual(completion.complete([2, 0]), [2, 0])
+        self.assertEqual(completion.pending, 1)
+
+    def test_windowed_section_waits_for_all_windows(self):
+        completion = RowCompletion(2, {1: ([2, 3, 4], [10, 10, 5])})
+        self.assertEqual(completion.complete([2, 0]), [0])
+        self.assertEqual(completion.complete([4]), [])
+        self.assertEqual(completion.complete([3]), [1])
+        self.assertEqual(completion.pending, 0)
+
+    def test_windowed_section_row_itself_is_ignored(self):
+        completion = RowCompletion(1, {0: ([1], [10])})
+        self.assertEqual(completion.complete([0]), [])
+        self.assertEqual(completion.complete([1]), [0])
+
+    def test_rows_are_returned_once(self):
+        completion = RowCompletion(2, {1: ([2], [10])})
+        self.assertEqual(completion.complete([0, 2]), [0, 1])
+        self.assertEqual(completion.complete([0, 2]), [])
+
+
+class TestPipelinedWriter(unittest.TestCase):
+    """PipelinedWriterのテスト"""
+
+    def test_writes_in_flush_sized_chunks(self):
+        chunks = []
+        writer = PipelinedWriter(chunks.append, flush_rows=2)
+        writer.submit([3, 1, 0])
+        writer.submit([2])
+        writer.submit([4])
+        writer.close()
+
+        self.assertEqual(chunks, [[1, 3], [0, 2], [4]])
+        self.assertEqual(sorted(writer.written_rows), [0, 1, 2, 3, 4])
+        self.assertEqual(writer.writes, 3)
+
+    def test_writes_on_background_thread(self):
+        threads = []
+        writer = PipelinedWriter(lambda rows: threads.append(threading.current_thread().name), flush_rows=1)
+        writer.submit([0])
+        writer.close()
+        self.assertEqual(threads, ['section-writer'])
+
+    def test_close_raises_write_error(self):
+        def fail(rows):
+            raise OSError("disk full")
+
+        writer = PipelinedWriter(fail, flush_rows=1)
+        writer.submit([0])
+        with self.assertRaises(OSError):
+            writer.close()
+        self.assertEqual(writer.written_rows, [])
+
+    def test_submit_blocks_while_queue_is_full(self):
+        release = threading.Event()
+        chunks = []
+
+        def slow_write(rows):
+            release.wait()
+            chunks.append(rows)
+
+        writer = PipelinedWriter(slow_write, flush_rows=1, max_pending=1)
+        # 1チャンク目は書き込み中、2チャンク目はキュー、3チャンク目は空きを待つ
+        submitter = threading.Thread(target=writer.submit, args=([0, 1, 2],))
+        submitter.start()
+        submitter.join(0.2)
+        self.assertTrue(submitter.is_alive())
+
+        release.set()
+        submitter.join()
+        writer.close()
+        self.assertEqual(chunks, [[0], [1], [2]])
+        self.assertGreater(writer.wait_seconds, 0)
+
+    def test_abort_drops_buffered_rows(self):
+        chunks = []
+        writer = PipelinedWriter(chunks.append, flush_rows=2)
+        writer.submit([0, 1, 2])
+        writer.abort()
+        # キュー待ちのチャンクは書き込まないことがあるが、書き込んだ行はwritten_rowsに残る
+        # flush_rowsに満たない行は書き込まない
+        self.assertIn(chunks, ([], [[0, 1]]))
+        self.assertEqual(writer.written_rows, [row for chunk in chunks for row in chunk])
+        # 中断後のcloseは何もしない
+        writer.close()
+        self.assertNotIn([2], chunks)
+
+    def test_releases_write_function_after_close(self):
+        """close / abortの後は書き込み関数（が参照するバッファ）を保持しない"""
+        class Sink:
+            def __call__(self, rows):
+                pass
+
+        for finish in ('close', 'abort'):
+            sink = Sink()
+            ref = weakref.ref(sink)
+            writer = PipelinedWriter(sink, flush_rows=1)
+            writer.submit([0])
+            del sink
+            getattr(writer, finish)()
+            self.assertIsNone(ref(), finish)
+
+
+class TestStageTimings(unittest.TestCase):
+    """StageTimingsのテスト"""
+
+    def test_accumulates(self):
+        timings = StageTimings()
+        timings.record(1.0, 0.5, 0.25, 2)
+        timings.record(1.0, 0.5, 0.0, 1)
+        self.assertEqual(timings.get_stats(), {
+            'calls': 2,
+            'writes': 3,
+            'encodeSeconds': 2.0,
+            'writeSeconds': 1.0,
+            'writeWaitSeconds': 0.25,
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+エンコードのバッチのトークン数の自動調整
+
+--max-batch-tokens（1バッチのパディング込みのトークン数）は大きいほどスループットが上がるが、
+推論の中間テンソルが大きくなりRSSが増える。最適値はマシン（コア数・メモリ・GPU）ごとに異なるため、
+バッチごとのスループット（トークン/秒）とRSSの増加を計測し、上限・下限の範囲で予算を動かす。
+
+- 山登り: window バッチごとにスループットを比べ、下がったら動かす向きを反転する
+- メモリ上限: RSSが上限を超えたら予算を半分にし、次に増やすとRSSが上限を超えそうなら増やさない
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+# 1回の調整で予算を変える倍率
+DEFAULT_STEP = 1.25
+
+# 何バッチごとに調整するか（1バッチごとではテキストの長さの偏りによるばらつきが大きい）
+DEFAULT_WINDOW = 4
+
+# スループットの低下とみなす割合（これ以内のばらつきでは向きを変えない）
+_TOLERANCE = 0.05
+
+# RSSが上限を超えた場合に予算を縮める割合
+_BACKOFF = 0.5
+
+
+class AdaptiveBatchController:
+    """
+    計測したスループットとRSSからバッチのトークン数の予算を決める
+
+    Examples:
+        >>> controller = AdaptiveBatchController(min_tokens=1000, max_tokens=16000, memory_limit_mb=6000)
+        >>> budget = controller.budget
+        >>> controller.observe(tokens=3800, seconds=1.2, rss_before_mb=900.0, rss_after_mb=950.0)
+    """
+
+    def __init__(
+        self,
+        min_tokens: int,
+        max_tokens: int,
+        memory_limit_mb: Optional[float] = None,
+        initial_tokens: Optional[int] = None,
+        step: float = DEFAULT_STEP,
+        window: int = DEFAULT_WINDOW
+    ):
+        """
+        Args:
+            min_tokens: 予算の下限
+            max_tokens: 予算の上限
+            memory_limit_mb: RSSの上限（MB、Noneの場合はメモリを見ない）
+            initial_tokens: 最初の予算（Noneの場合は下限から始める）
+            step: 1回の調整で予算を変える倍率
+            window: 何バッチごとに調整するか
+        """
+        if min_tokens <= 0 or max_tokens < min_tokens:
+            raise ValueError(f"invalid batch token range: {min_tokens}-{max_tokens}")
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.memory_limit_mb = memory_limit_mb
+        self.step = step
+        self.window = max(1, window)
+
+        self._lock = threading.Lock()
+        self._budget = self._clamp(initial_tokens if initial_tokens is not None else min_tokens)
+        self._direction = 1
+        self._last_throughput: Optional[float] = None
+
+        # 調整中のウィンドウの計測値
+        self._batches = 0
+        self._tokens = 0
+        self._seconds = 0.0
+        self._peak_rss_mb = 0.0
+        self._peak_growth_mb = 0.0
+
+        # 統計
+        self.adjustments = 0
+        self.memory_backoffs = 0
+        self.last_rss_mb: Optional[float] = None
+
+    def _clamp(self, tokens: float) -> int:
+        return int(min(self.max_tokens, max(self.min_tokens, tokens)))
+
+    @property
+    def budget(self) -> int:
+        """現在の1バッチあたりのトークン数の予算"""
+        return self._budget
+
+    def observe(
+        self,
+        tokens: int,
+        seconds: float,
+        rss_before_mb: Optional[float] = None,
+        rss_after_mb: Optional[float] = None
+    ) -> int:
+        """
+        1バッチの計測値を記録し、必要なら予算を調整する
+
+        Args:
+            tokens: バッチのトークン数
+            seconds: バッチのエンコード時間
+            rss_before_mb: エンコード前のRSS（MB、計測できない場合はNone）
+            rss_after_mb: エンコード後のRSS（MB、計測できない場合はNone）
+
+        Returns:
+            調整後の予算
+        """
+        with self._lock:
+            self._batches += 1
+            self._tokens += tokens
+            self._seconds += seconds
+            if rss_after_mb is not None:
+                self.last_rss_mb = rss_after_mb
+                self._peak_rss_mb = max(self._peak_rss_mb, rss_after_mb)
+                if rss_before_mb is not None:
+                    self._peak_growth_mb = max(self._peak_growth_mb, rss_after_mb - rss_before_mb)
+
+            over_limit = self.memory_limit_mb is not None and self._peak_rss_mb >= self.memory_limit_mb
+            if over_limit:
+                # メモリ上限を超えた場合はウィンドウを待たずに縮める
+                self._budget = self._clamp(self._budget * _BACKOFF)
+                self._direction = -1
+                self._last_throughput = None
+                self.memory_backoffs += 1
+                self.adjustments += 1
+                self._reset_window()
+            elif self._batches >= self.window:
+                self._adjust()
+            return self._budget
+
+    def _adjust(self) -> None:
+        throughput = self._tokens / self._seconds if self._seconds > 0 else 0.0
+        if self._last_throughput is not None and throughput < self._last_throughput * (1 - _TOLERANCE):
+            self._direction = -self._direction
+        self._last_throughput = throughput
+
+        if self._direction > 0 and self.memory_limit_mb is not None:
+            # 予算に比例してバッチ中のRSSの増加が大きくなると見込み、上限を超えそうなら増やさない
+            projected = self._peak_rss_mb + self._peak_growth_mb * (self.step - 1)
+            if projected >= self.memory_limit_mb:
+                self._reset_window()
+                return
+
+        factor = self.step if self._direction > 0 else 1 / self.step
+        # 上限・下限に達した場合はそのまま（スループットが下がるまで向きを変えない）
+        budget = self._clamp(self._budget * factor)
+        if budget != self._budget:
+            self._budget = budget
+            self.adjustments += 1
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        self._batches = 0
+        self._tokens = 0
+        self._seconds = 0.0
+        self._peak_rss_mb = 0.0
+        self._peak_growth_mb = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """現在の予算・範囲・直近のスループットと調整回数"""
+        with self._lock:
+            return {
+                'batchTokens': self._budget,
+                'minTokens': self.min_tokens,
+                'maxTokens': self.max_tokens,
+                'memoryLimitMB': self.memory_limit_mb,
+                'tokensPerSecond': round(self._last_throughput, 1) if self._last_throughput is not None else None,
+                'rssMB': round(self.last_rss_mb, 1) if self.last_rss_mb is not None else None,
+                'adjustments': self.adjustments,
+                'memoryBackoffs': self.memory_backoffs,
+            }
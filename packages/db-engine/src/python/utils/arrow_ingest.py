@@ -0,0 +1,172 @@
+"""
+セクションの列指向（Arrow）変換
+
+addSectionsで受け取ったセクション（辞書のリスト）を、Sectionsテーブルのスキーマに沿った
+Arrowテーブルへ列単位で変換する。
+
+- 列ごとに値を取り出してArrow配列にし、型の確認とキャストはpyarrow.computeで行う
+  （行ごとにpd.Timestampやnp.int32を作らない）
+- 必須フィールド・型・depthの範囲をスキーマ上の列単位で検証する（validate_sectionと同じ条件）
+- ベクトル列は最後に (N, dim) のfloat32行列から追加する（with_vector_column）
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from schemas import SECTION_REQUIRED_FIELDS
+
+VECTOR_FIELD = 'vector'
+
+# validate_sectionでnullを許さないフィールド
+_NON_NULL_FIELDS = ('document_path', 'heading', 'depth', 'is_dirty')
+
+# タイムゾーン付きのISO 8601文字列（TypeScriptのtoISOString()は末尾がZ）
+_ZONE_OFFSET_PATTERN = r'(Z|[+-]\d{2}:?\d{2})$'
+
+_MISSING = object()
+
+
+def _type_name(arrow_type: pa.DataType) -> str:
+    if pa.types.is_string(arrow_type):
+        return 'a string'
+    if pa.types.is_integer(arrow_type):
+        return 'an integer'
+    if pa.types.is_boolean(arrow_type):
+        return 'a boolean'
+    if pa.types.is_timestamp(arrow_type):
+        return 'an ISO 8601 timestamp'
+    if pa.types.is_list(arrow_type):
+        return 'a list of integers'
+    return str(arrow_type)
+
+
+def _accepts(source: pa.DataType, target: pa.DataType) -> bool:
+    """推論された型をスキーマの型へキャストしてよいか（暗黙の型変換はしない）"""
+    if pa.types.is_null(source):
+        return True
+    if pa.types.is_string(target):
+        return pa.types.is_string(source)
+    if pa.types.is_integer(target):
+        return pa.types.is_integer(source)
+    if pa.types.is_boolean(target):
+        return pa.types.is_boolean(source)
+    if pa.types.is_timestamp(target):
+        return pa.types.is_string(source) or pa.types.is_timestamp(source)
+    if pa.types.is_list(target):
+        return pa.types.is_list(source) and (
+            pa.types.is_null(source.value_type) or _accepts(source.value_type, target.value_type)
+        )
+    return True
+
+
+def _to_timestamp(name: str, values: pa.Array, target: pa.DataType) -> pa.Array:
+    """ISO 8601文字列の列をタイムスタンプ（ミリ秒に切り捨て）に変換
+
+    タイムゾーン付きの値はUTCに変換する（pd.Timestamp(...).floor('ms')と同じ結果）。
+    """
+    try:
+        if pa.types.is_timestamp(values.type):
+            return pc.cast(values, target, safe=False)
+        if pa.types.is_null(values.type):
+            return pa.nulls(len(values), target)
+
+        has_zone = pc.match_substring_regex(values, _ZONE_OFFSET_PATTERN)
+        zoned = pc.sum(has_zone).as_py() or 0
+        non_null = len(values) - values.null_count
+        if zoned == 0:
+            parsed = pc.cast(values, pa.timestamp('ns'))
+        elif zoned == non_null:
+            parsed = pc.cast(values, pa.timestamp('ns', tz='UTC'))
+        else:
+            # タイムゾーンの有無が混在する場合は行ごとに変換する
+            import pandas as pd
+            return pa.array(
+                [None if v is None else pd.Timestamp(v).floor('ms') for v in values.to_pylist()],
+                type=target
+            )
+        return pc.cast(parsed, target, safe=False)
+    except (pa.ArrowInvalid, ValueError) as e:
+        raise ValueError(f"Field '{name}' must be {_type_name(target)}: {e}") from e
+
+
+def _column(name: str, values: List[Any], field: pa.Field) -> pa.Array:
+    """1列分の値をスキーマの型のArrow配列に変換"""
+    try:
+        inferred = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise TypeError(f"Field '{name}' must be {_type_name(field.type)}") from e
+
+    if not _accepts(inferred.type, field.type):
+        raise TypeError(f"Field '{name}' must be {_type_name(field.type)}")
+
+    if pa.types.is_timestamp(field.type):
+        return _to_timestamp(name, inferred, field.type)
+
+    try:
+        return pc.cast(inferred, field.type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"Field '{name}' is out of range for {field.type}: {e}") from e
+
+
+def sections_to_arrow(sections: Sequence[Dict[str, Any]], schema: pa.Schema) -> pa.Table:
+    """セクションをベクトル列を除くArrowテーブルに変換して検証
+
+    Args:
+        sections: addSectionsで受け取ったセクションのリスト（vectorは読まない）
+        schema: Sectionsテーブルのスキーマ
+
+    Returns:
+        スキーマの順序に並んだ、ベクトル列を除くArrowテーブル
+
+    Raises:
+        ValueError: 必須フィールドが不足している場合、depthが0〜3の範囲外の場合
+        TypeError: フィールドの型が不正な場合
+    """
+    fields = [field for field in schema if field.name != VECTOR_FIELD]
+    columns: Dict[str, List[Any]] = {
+        field.name: [section.get(field.name, _MISSING) for section in sections]
+        for field in fields
+    }
+
+    missing = [
+        name for name in SECTION_REQUIRED_FIELDS
+        if name not in columns or columns[name].count(_MISSING)
+    ]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    arrays = []
+    for field in fields:
+        values = columns[field.name]
+        if field.name not in SECTION_REQUIRED_FIELDS and values.count(_MISSING):
+            values = [None if value is _MISSING else value for value in values]
+        arrays.append(_column(field.name, values, field))
+    table = pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+    for name in _NON_NULL_FIELDS:
+        if name in table.column_names and table.column(name).null_count:
+            raise TypeError(f"Field '{name}' must be {_type_name(table.schema.field(name).type)}")
+
+    if 'depth' in table.column_names and len(table):
+        depth_range = pc.min_max(table.column('depth')).as_py()
+        if depth_range['min'] < 0 or depth_range['max'] > 3:
+            raise ValueError("Field 'depth' must be between 0 and 3")
+
+    return table
+
+
+def with_vector_column(table: pa.Table, vectors: np.ndarray, schema: pa.Schema) -> pa.Table:
+    """ベクトル行列をスキーマの位置にFixedSizeList列として追加
+
+    ベクトル行列はコピーせずにFixedSizeListArrayの値バッファとして使う。
+    """
+    vector_index = schema.get_field_index(VECTOR_FIELD)
+    vector_field = schema.field(vector_index)
+    vector_array = pa.FixedSizeListArray.from_arrays(
+        pa.array(np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1)),
+        vectors.shape[1]
+    )
+    return table.add_column(vector_index, vector_field, vector_array)
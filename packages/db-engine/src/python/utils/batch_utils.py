@@ -4,7 +4,7 @@
 トークン数を考慮してテキストを適切なバッチに分割する。
 """
 
-from typing import List, Tuple, Generic, TypeVar
+from typing import Callable, List, Optional, Tuple, Generic, TypeVar
 from .token_utils import estimate_tokens
 
 T = TypeVar('T')
@@ -78,18 +78,93 @@ def create_token_aware_batches(
     return batches
 
 
-def get_batch_stats(batches: List[Tuple[List[str], List[T]]]) -> dict:
+def create_length_bucketed_batches(
+    texts: List[str],
+    indices: List[T],
+    max_tokens_per_batch: int = 8000,
+    count_tokens: Callable[[str], int] = estimate_tokens
+) -> List[Tuple[List[str], List[T]]]:
+    """
+    長さの近いテキスト同士でバッチを作成（パディングの無駄を減らす）
+
+    Transformerはバッチ内の最長テキストに合わせてパディングするため、
+    到着順に詰めると長いテキスト1つと短いテキスト多数が同じバッチになり、計算の大半がパディングになる。
+    テキストを推定トークン数の降順に並べ、パディング後のトークン数（テキスト数 × バッチ内の最長）が
+    max_tokens_per_batchを超えない範囲でバッチを作る。
+
+    各バッチのindicesは元のインデックスのままなので、ベクトルはindicesで元の位置に戻す。
+
+    Args:
+        texts: エンコードするテキストのリスト
+        indices: 各テキストに対応するインデックス（任意の型）
+        max_tokens_per_batch: 1バッチあたりの最大トークン数（パディング込み）
+        count_tokens: トークン数の推定関数
+
+    Returns:
+        (texts, indices)のタプルのリスト（長いテキストのバッチから順に並ぶ）
+
+    Examples:
+        >>> texts = ["a" * 40, "a" * 400, "a" * 40, "a" * 40]  # 10, 100, 10, 10トークン
+        >>> batches = create_length_bucketed_batches(texts, [0, 1, 2, 3], max_tokens_per_batch=100)
+        >>> [batch_indices for _, batch_indices in batches]
+        [[1], [0, 2, 3]]
+
+    Notes:
+        - 1つのテキストがmax_tokens_per_batchを超える場合、そのテキスト単独で1バッチとなる
+        - 推定トークン数が同じテキストは元の順序を保つ
+    """
+    if not texts:
+        return []
+
+    if len(texts) != len(indices):
+        raise ValueError(f"texts and indices must have the same length: {len(texts)} != {len(indices)}")
+
+    token_counts = [count_tokens(text) for text in texts]
+    order = sorted(range(len(texts)), key=lambda i: token_counts[i], reverse=True)
+
+    batches = []
+    current: List[int] = []
+    current_max = 0
+
+    for position in order:
+        tokens = max(token_counts[position], 1)
+        # 降順に並べているため、バッチ内の最長は最初のテキスト
+        longest = current_max if current else tokens
+        if current and (len(current) + 1) * longest > max_tokens_per_batch:
+            batches.append(current)
+            current = []
+            longest = tokens
+        current.append(position)
+        current_max = longest
+
+    if current:
+        batches.append(current)
+
+    return [
+        ([texts[position] for position in batch], [indices[position] for position in batch])
+        for batch in batches
+    ]
+
+
+def get_batch_stats(
+    batches: List[Tuple[List[str], List[T]]],
+    count_tokens: Optional[Callable[[str], int]] = None
+) -> dict:
     """
     バッチの統計情報を取得
 
     Args:
-        batches: create_token_aware_batches()の戻り値
+        batches: create_token_aware_batches()などの戻り値
+        count_tokens: トークン数の推定関数（デフォルト: estimate_tokens）
 
     Returns:
         統計情報の辞書
         {
             'num_batches': バッチ数,
             'total_texts': 全テキスト数,
+            'estimated_tokens': 全テキストの推定トークン数,
+            'padded_tokens': パディング込みのトークン数（各バッチのテキスト数 × 最長）,
+            'padding_efficiency': estimated_tokens / padded_tokens（1.0でパディングなし）,
             'batches_info': 各バッチの情報のリスト
         }
 
@@ -103,22 +178,37 @@ def get_batch_stats(batches: List[Tuple[List[str], List[T]]]) -> dict:
         >>> stats['total_texts']
         3
     """
-    from .token_utils import estimate_total_tokens
+    count = count_tokens or estimate_tokens
 
     batches_info = []
     total_texts = 0
+    total_tokens = 0
+    total_padded = 0
 
     for i, (batch_texts, batch_indices) in enumerate(batches):
-        batch_tokens = estimate_total_tokens(batch_texts)
+        token_counts = [count(text) for text in batch_texts]
+        batch_tokens = sum(token_counts)
+        padded_tokens = len(batch_texts) * max(token_counts, default=0)
         batches_info.append({
             'batch_num': i + 1,
             'num_texts': len(batch_texts),
-            'estimated_tokens': batch_tokens
+            'estimated_tokens': batch_tokens,
+            'padded_tokens': padded_tokens,
+            'padding_efficiency': _efficiency(batch_tokens, padded_tokens),
         })
         total_texts += len(batch_texts)
+        total_tokens += batch_tokens
+        total_padded += padded_tokens
 
     return {
         'num_batches': len(batches),
         'total_texts': total_texts,
+        'estimated_tokens': total_tokens,
+        'padded_tokens': total_padded,
+        'padding_efficiency': _efficiency(total_tokens, total_padded),
         'batches_info': batches_info
     }
+
+
+def _efficiency(tokens: int, padded_tokens: int) -> float:
+    return round(tokens / padded_tokens, 4) if padded_tokens else 1.0
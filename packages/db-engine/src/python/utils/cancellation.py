@@ -0,0 +1,163 @@
+"""
+リクエストのキャンセルと期限
+
+DBEngine（TypeScript）がタイムアウトで諦めたリクエストをワーカー側でも打ち切るための仕組み。
+
+- `$/cancelRequest` 通知（params: {"id": <リクエストID>}）で、キュー待ち・処理中のリクエストをキャンセルする
+- リクエストの `deadline`（エポックミリ秒）を過ぎた場合:
+  - キュー待ちの間に期限切れになったものは実行せずに破棄する（shed）
+  - 処理中に期限切れになったものは、チェックポイント（エンコードのバッチ間など）で打ち切る
+
+キャンセル通知は受信ループのスレッドで処理されるため、レーンが処理中でもすぐに反映される。
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# キャンセル通知のメソッド名
+CANCEL_METHOD = '$/cancelRequest'
+
+# エラーコード（-32800はLSPのRequestCancelledに合わせる）
+REQUEST_CANCELLED = -32800
+DEADLINE_EXCEEDED = -32001
+
+
+class RequestCancelledError(Exception):
+    """リクエストがキャンセルされた"""
+
+    code = REQUEST_CANCELLED
+
+
+class DeadlineExceededError(RequestCancelledError):
+    """リクエストの期限を過ぎた"""
+
+    code = DEADLINE_EXCEEDED
+
+
+def _now_ms() -> float:
+    return time.time() * 1000
+
+
+class CancellationToken:
+    """1リクエストのキャンセル状態"""
+
+    def __init__(self, request_id: Any, deadline: Optional[float] = None):
+        """
+        Args:
+            request_id: JSON-RPCリクエストID
+            deadline: 期限（エポックミリ秒）。Noneの場合は期限なし
+        """
+        self.request_id = request_id
+        self.deadline = deadline
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """キャンセルを要求"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def expired(self, now_ms: Optional[float] = None) -> bool:
+        """期限を過ぎているか"""
+        if self.deadline is None:
+            return False
+        return (now_ms if now_ms is not None else _now_ms()) >= self.deadline
+
+    def raise_if_cancelled(self) -> None:
+        """キャンセル済みまたは期限切れなら例外を送出
+
+        Raises:
+            RequestCancelledError: キャンセル通知を受け取っている場合
+            DeadlineExceededError: 期限を過ぎている場合
+        """
+        if self.cancelled:
+            raise RequestCancelledError(f"Request {self.request_id} was cancelled")
+        if self.expired():
+            raise DeadlineExceededError(f"Request {self.request_id} exceeded its deadline")
+
+
+class CancellationRegistry:
+    """受信済み（キュー待ち・処理中）リクエストのトークンを管理
+
+    Examples:
+        >>> registry = CancellationRegistry()
+        >>> token = registry.register(1, deadline=None)
+        >>> registry.cancel(1)
+        True
+        >>> token.cancelled
+        True
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: Dict[Any, CancellationToken] = {}
+        self.cancelled = 0  # キャンセル通知または処理中の期限切れで打ち切った件数
+        self.shed = 0  # キュー待ちの間に期限切れになり実行しなかった件数
+
+    def register(self, request_id: Any, deadline: Optional[float] = None) -> CancellationToken:
+        """リクエストのトークンを登録"""
+        token = CancellationToken(request_id, deadline)
+        with self._lock:
+            self._tokens[request_id] = token
+        return token
+
+    def register_message(self, message: Any) -> None:
+        """受信メッセージ（単一リクエストまたはバッチ配列）内のリクエストを登録
+
+        idを持たない通知は対象外。
+        """
+        requests = message if isinstance(message, list) else [message]
+        for request in requests:
+            if isinstance(request, dict) and request.get("id") is not None:
+                deadline = request.get("deadline")
+                self.register(
+                    request["id"],
+                    deadline if isinstance(deadline, (int, float)) else None
+                )
+
+    def get(self, request_id: Any) -> Optional[CancellationToken]:
+        """登録済みのトークンを取得"""
+        with self._lock:
+            return self._tokens.get(request_id)
+
+    def cancel(self, request_id: Any) -> bool:
+        """リクエストをキャンセル
+
+        Returns:
+            対象のリクエストが見つかった場合True（処理済みの場合はFalse）
+        """
+        token = self.get(request_id)
+        if token is None:
+            return False
+        token.cancel()
+        return True
+
+    def release(self, request_id: Any) -> None:
+        """処理を終えたリクエストのトークンを削除"""
+        with self._lock:
+            self._tokens.pop(request_id, None)
+
+    def record(self, error: RequestCancelledError, started: bool) -> None:
+        """打ち切ったリクエストを集計
+
+        Args:
+            error: 打ち切りの理由
+            started: 処理を開始していたか（Falseかつ期限切れの場合はshedとして数える）
+        """
+        with self._lock:
+            if isinstance(error, DeadlineExceededError) and not started:
+                self.shed += 1
+            else:
+                self.cancelled += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """キャンセル・破棄の件数と、現在追跡中のリクエスト数を取得"""
+        with self._lock:
+            return {
+                'cancelled': self.cancelled,
+                'shed': self.shed,
+                'inflight': len(self._tokens),
+            }
@@ -0,0 +1,223 @@
+"""
+埋め込みベクトルの永続キャッシュ
+
+文書のハッシュが変わるとadd_sectionsはその文書の全セクションを再エンコードするが、
+実際に変更されたのは一部の見出しだけであることが多い。
+そこでセクションのテキスト（`heading\\ncontent`）のハッシュをキーにベクトルを保存し、
+同じテキストはモデルに渡さずにキャッシュから取り出す。
+
+- キー: (モデル名, 次元数, テキストのSHA-256)
+- 保存先: LanceDBのインデックスと同じディレクトリの `embedding_cache.sqlite`
+- ベクトルはfloat32のバイト列で保存し、array('f')で返す（Pythonのfloatのリストを作らない）
+- 件数の上限を超えた場合は最後に使われた時刻が古いものから削除する（LRU）
+"""
+
+import hashlib
+from array import array
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+CACHE_FILENAME = 'embedding_cache.sqlite'
+
+# デフォルトの最大件数（ruri-v3-30m・256次元で約1KB/件）
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+def text_hash(text: str) -> str:
+    """キャッシュキーに使うテキストのハッシュ"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _to_float32_bytes(vector: Any) -> bytes:
+    """ベクトルをfloat32のバイト列に変換（float32のバッファはコピーのみで変換する）"""
+    try:
+        view = memoryview(vector)
+    except TypeError:
+        return array('f', vector).tobytes()
+    if view.format == 'f' and view.c_contiguous:
+        return view.tobytes()
+    return array('f', view.tolist()).tobytes()
+
+
+class EmbeddingCache:
+    """テキストのハッシュをキーにした埋め込みベクトルのキャッシュ
+
+    Examples:
+        >>> cache = EmbeddingCache('/path/to/index', 'cl-nagoya/ruri-v3-30m', 256)
+        >>> cache.get_many(['見出し\\n本文'])
+        {}
+        >>> cache.put_many(['見出し\\n本文'], [vector])
+        >>> cache.get_many(['見出し\\n本文'])
+        {0: array('f', [...])}
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        model_name: str,
+        dimension: int,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        Args:
+            db_path: キャッシュファイルを置くディレクトリ（LanceDBのインデックスパス）
+            model_name: 埋め込みモデル名
+            dimension: ベクトルの次元数
+            max_entries: 保持する最大件数（全モデル・次元の合計）
+        """
+        self.path = str(Path(db_path) / CACHE_FILENAME)
+        self.model_name = model_name
+        self.dimension = dimension
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # 書き込みレーンと読み取りレーンの両方から使われるため、1接続をロックで共有する
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, dimension, text_hash)
+            )
+            """
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)')
+        self._conn.commit()
+
+    def get_many(self, texts: Sequence[str]) -> Dict[int, array]:
+        """キャッシュ済みのベクトルを取得
+
+        Args:
+            texts: エンコード対象のテキスト
+
+        Returns:
+            キャッシュにあったテキストの位置 -> ベクトル（float32のarray。np.asarrayでコピーせずに参照できる）
+        """
+        if not texts:
+            return {}
+
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            # SQLiteのパラメータ数上限（999）を超えないように分割して検索
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dimension = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, self.dimension, *chunk]
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND dimension = ? AND text_hash = ?",
+                    [(now, self.model_name, self.dimension, h) for h in found]
+                )
+                self._conn.commit()
+
+            result = {}
+            for i, h in enumerate(hashes):
+                blob = found.get(h)
+                if blob is not None:
+                    result[i] = array('f', blob)
+            self.hits += len(result)
+            self.misses += len(texts) - len(result)
+        return result
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Any]) -> None:
+        """エンコードしたベクトルを保存し、上限を超えた分を削除
+
+        Args:
+            texts: エンコードしたテキスト
+            vectors: 各テキストのベクトル（floatのリスト、またはfloat32のndarray行・array('f')）
+        """
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [
+            (
+                self.model_name,
+                self.dimension,
+                text_hash(text),
+                _to_float32_bytes(vector),
+                now,
+            )
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, dimension, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """最大件数を超えた分を最後に使われた時刻が古い順に削除（ロック取得済みで呼ぶ）"""
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (excess,)
+        )
+        self.evictions += excess
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, float]:
+        """ヒット・ミス件数とヒット率"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+
+def open_embedding_cache(
+    db_path: str,
+    model_name: str,
+    dimension: int,
+    max_entries: int = DEFAULT_MAX_ENTRIES
+) -> Optional[EmbeddingCache]:
+    """キャッシュを開く（max_entriesが0以下の場合、または開けない場合はNone）"""
+    if max_entries <= 0:
+        return None
+    try:
+        return EmbeddingCache(db_path, model_name, dimension, max_entries)
+    except sqlite3.Error as e:
+        sys.stderr.write(f"[EmbeddingCache] Warning: cache disabled ({e})\n")
+        sys.stderr.flush()
+        return None
@@ -0,0 +1,262 @@
+"""
+埋め込みのマルチプロセスエンコードプール
+
+1プロセスのSentenceTransformerはOMP_NUM_THREADS（--num-threads）の範囲でしかCPUを使わないため、
+大量のセクションを再インデックスする場合はコア数に比べてエンコードが遅い。
+プールモードでは子プロセスごとにモデルをロードし、エンコードのバッチを子プロセスに振り分ける。
+
+- 子プロセスはspawnで起動する（torchのスレッドプールをforkで引き継がない）
+- 出力の (N, dim) 行列は共有メモリに置き、子プロセスは自分のバッチの行に直接書き込む
+  （ベクトルをpickleして親プロセスへ送り返さない）
+- プロセス数の自動設定は「利用可能なコア数 / プロセスあたりのスレッド数」
+"""
+
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 子プロセスで推論のスレッド数を制限する環境変数（torchのインポート前に設定する）
+_THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+# 子プロセスの生存確認の間隔（秒）
+_POLL_INTERVAL = 0.5
+
+
+def available_cores() -> int:
+    """このプロセスが使えるCPUコア数"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def auto_pool_size(num_threads: int, cores: Optional[int] = None) -> int:
+    """
+    コア数とプロセスあたりのスレッド数からプロセス数を決める
+
+    Examples:
+        >>> auto_pool_size(4, cores=32)
+        8
+        >>> auto_pool_size(4, cores=2)
+        1
+    """
+    cores = cores if cores is not None else available_cores()
+    return max(1, cores // max(1, num_threads))
+
+
+def _pool_process_main(model_name: str, backend: str, num_threads: int, tasks, results) -> None:
+    """子プロセスのエントリポイント: モデルをロードし、タスクを順に処理する"""
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(num_threads)
+
+    from embedding import create_embedding_model
+
+    model = create_embedding_model(model_name, backend=backend, num_threads=num_threads)
+    load_error = None if model.initialize() else f"could not load {model_name} ({backend})"
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, segment_name, shape, rows, texts, dimension = task
+        if load_error is not None:
+            results.put((task_id, load_error))
+            continue
+        try:
+            segment = shared_memory.SharedMemory(name=segment_name)
+            try:
+                shared = np.ndarray(shape, dtype=np.float32, buffer=segment.buf)
+                shared[rows] = model.encode_matrix(texts, dimension, batch_size=len(texts))
+                del shared
+            finally:
+                segment.close()
+            results.put((task_id, None))
+        except Exception as e:
+            results.put((task_id, f"{type(e).__name__}: {e}"))
+
+
+class EncodePoolError(RuntimeError):
+    """プールでのエンコードに失敗した（子プロセスの異常終了・モデルのロード失敗など）"""
+
+
+class EncodePool:
+    """
+    エンコードのバッチを複数プロセスに振り分けるプール
+
+    Examples:
+        >>> pool = EncodePool('cl-nagoya/ruri-v3-30m', 'torch', processes=8, num_threads=4)
+        >>> vectors = np.zeros((len(texts), 256), dtype=np.float32)
+        >>> pool.encode_into([(texts[:64], list(range(64))), (texts[64:], list(range(64, len(texts))))], vectors, 256)
+        >>> pool.close()
+    """
+
+    def __init__(self, model_name: str, backend: str, processes: int, num_threads: int):
+        """
+        Args:
+            model_name: 埋め込みモデル名
+            backend: 推論バックエンド（'torch' | 'onnx' | 'onnx-int8'）
+            processes: 子プロセス数
+            num_threads: 子プロセスあたりの推論のスレッド数
+        """
+        self.model_name = model_name
+        self.backend = backend
+        self.num_threads = num_threads
+
+        context = multiprocessing.get_context('spawn')
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._processes = [
+            context.Process(
+                target=_pool_process_main,
+                args=(model_name, backend, num_threads, self._tasks, self._results),
+                name=f"encode-pool-{i}",
+                daemon=True,
+            )
+            for i in range(processes)
+        ]
+        for process in self._processes:
+            process.start()
+
+        # 1回のencode_intoの間、結果キューを占有する
+        self._lock = threading.Lock()
+        self._next_task_id = 0
+        self._closed = False
+
+        self.batches = 0
+        self.texts = 0
+        self.seconds = 0.0
+
+        sys.stderr.write(
+            f"[EncodePool] Started {processes} processes ({num_threads} threads each, model={model_name}, "
+            f"backend={backend})\n"
+        )
+        sys.stderr.flush()
+
+    @property
+    def processes(self) -> int:
+        return len(self._processes)
+
+    def _check_alive(self) -> None:
+        dead = [process.name for process in self._processes if not process.is_alive()]
+        if dead:
+            raise EncodePoolError(f"encode pool process exited: {', '.join(dead)}")
+
+    def encode_into(
+        self,
+        batches: Sequence[Tuple[List[str], List[int]]],
+        out: np.ndarray,
+        dimension: int,
+        check_cancelled: Optional[Callable[[], None]] = None,
+        on_batch: Optional[Callable[[List[str], List[int], np.ndarray], None]] = None
+    ) -> None:
+        """
+        バッチを子プロセスでエンコードし、out[rows] に書き込む
+
+        Args:
+            batches: (texts, rows) のリスト（rowsはoutの行番号）
+            out: 書き込み先の (N, dimension) のfloat32行列
+            dimension: 出力次元数
+            check_cancelled: バッチの完了ごとに呼ぶ関数（例外を送出すると残りのバッチを投入せずに打ち切る）
+            on_batch: バッチの完了ごとに (texts, rows, vectors) で呼ぶ関数（埋め込みキャッシュへの保存など）
+
+        Raises:
+            EncodePoolError: 子プロセスが異常終了した場合、エンコードに失敗した場合
+        """
+        if not batches:
+            return
+        if self._closed:
+            raise EncodePoolError("encode pool is closed")
+
+        with self._lock:
+            start = time.perf_counter()
+            segment = shared_memory.SharedMemory(create=True, size=max(out.nbytes, 1))
+            try:
+                shared = np.ndarray(out.shape, dtype=np.float32, buffer=segment.buf)
+                self._run(batches, shared, out, dimension, segment.name, check_cancelled, on_batch)
+                del shared
+            finally:
+                segment.close()
+                segment.unlink()
+
+            elapsed = time.perf_counter() - start
+            texts = sum(len(batch_texts) for batch_texts, _ in batches)
+            self.batches += len(batches)
+            self.texts += texts
+            self.seconds += elapsed
+            sys.stderr.write(
+                f"[EncodePool] Encoded {texts} texts in {len(batches)} batches with {self.processes} processes "
+                f"({elapsed:.2f}s, {texts / elapsed if elapsed > 0 else 0:.1f} texts/sec)\n"
+            )
+            sys.stderr.flush()
+
+    def _run(self, batches, shared, out, dimension, segment_name, check_cancelled, on_batch) -> None:
+        pending: Dict[int, Tuple[List[str], List[int]]] = {}
+        remaining = iter(batches)
+        # 打ち切りに時間がかからないよう、投入済みのバッチはプロセス数の2倍までにする
+        max_inflight = self.processes * 2
+        stop: Optional[BaseException] = None
+
+        def submit() -> None:
+            for batch_texts, rows in remaining:
+                task_id = self._next_task_id
+                self._next_task_id += 1
+                pending[task_id] = (batch_texts, rows)
+                self._tasks.put((task_id, segment_name, shared.shape, rows, batch_texts, dimension))
+                if len(pending) >= max_inflight:
+                    return
+
+        submit()
+        while pending:
+            try:
+                task_id, error = self._results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                self._check_alive()
+                continue
+
+            batch_texts, rows = pending.pop(task_id)
+            if error is not None:
+                stop = stop or EncodePoolError(error)
+            elif stop is None:
+                out[rows] = shared[rows]
+                if on_batch is not None:
+                    on_batch(batch_texts, rows, out[rows])
+
+            if stop is None and check_cancelled is not None:
+                try:
+                    check_cancelled()
+                except BaseException as e:
+                    stop = e
+            # 失敗・打ち切り後は新しいバッチを投入せず、投入済みのバッチの完了だけを待つ
+            if stop is None:
+                submit()
+
+        if stop is not None:
+            raise stop
+
+    def get_stats(self) -> Dict[str, float]:
+        """プロセス数・エンコードしたバッチ数とテキスト数・スループット"""
+        return {
+            'processes': self.processes,
+            'batches': self.batches,
+            'texts': self.texts,
+            'textsPerSecond': round(self.texts / self.seconds, 1) if self.seconds > 0 else 0.0,
+        }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """子プロセスを終了する"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,149 @@
+"""
+メモリ使用量に基づくGCの実行判断
+
+add_sectionsはエンコードのバッチごとにgc.collect()、呼び出しごとにgc.collect(2)と
+MPSキャッシュのクリアを無条件に実行していたため、大量の文書のインデックスでは
+文書あたり数百ミリ秒がGCだけに使われていた。
+GcPolicyはチェックポイント（バッチ・呼び出しの区切り）でメモリ使用量を見て、
+次のいずれかの場合にだけGCを実行する。
+
+- RSSがrss_threshold_mbを超えている
+- Arrowのメモリプールの確保量がarrow_threshold_mbを超えている
+- 前回のGCからRSSとArrowの確保量がevery_mb以上増えた（確保量の目安）
+
+しきい値を超えていても、前回のGCから使用量がほとんど増えていない場合は実行しない。
+
+every_mb=0の場合は従来通り毎回実行する（ベンチマークの比較用）。
+"""
+
+import gc
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# 前回のGCからこれだけ増えたらGCする（MB）
+DEFAULT_EVERY_MB = 256.0
+
+# Arrowのメモリプールの確保量の上限（MB）
+DEFAULT_ARROW_THRESHOLD_MB = 1024.0
+
+# しきい値を超えていても、前回のGCからこれだけ増えていなければ実行しない（MB）
+# （GCで回収できないメモリでしきい値を超えている場合に毎回GCしない）
+_MIN_GROWTH_MB = 16.0
+
+# GCを実行した理由
+REASON_RSS = 'rss'
+REASON_ARROW = 'arrow'
+REASON_ALLOCATED = 'allocated'
+REASON_FORCED = 'forced'
+
+
+class GcPolicy:
+    """
+    メモリ使用量がしきい値を超えた場合だけGCを実行する
+
+    Examples:
+        >>> policy = GcPolicy(rss_mb=sample_rss_mb, arrow_mb=arrow_allocated_mb, rss_threshold_mb=4096)
+        >>> policy.maybe_collect()  # バッチの区切りで呼ぶ
+        False
+        >>> policy.collect()  # compact後など、必ず実行する場合
+    """
+
+    def __init__(
+        self,
+        rss_mb: Callable[[], Optional[float]],
+        arrow_mb: Callable[[], Optional[float]],
+        rss_threshold_mb: Optional[float] = None,
+        arrow_threshold_mb: Optional[float] = DEFAULT_ARROW_THRESHOLD_MB,
+        every_mb: float = DEFAULT_EVERY_MB,
+        on_collect: Optional[List[Callable[[], None]]] = None
+    ):
+        """
+        Args:
+            rss_mb: 現在のRSS（MB）を返す関数（計測できない場合はNone）
+            arrow_mb: Arrowのメモリプールの確保量（MB）を返す関数（計測できない場合はNone）
+            rss_threshold_mb: RSSの上限（Noneの場合は見ない）
+            arrow_threshold_mb: Arrowの確保量の上限（Noneの場合は見ない）
+            every_mb: 前回のGCからの増加量の上限（0の場合は毎回GCする）
+            on_collect: GCの後に呼ぶ関数（MPSキャッシュのクリアなど）
+        """
+        self._rss_mb = rss_mb
+        self._arrow_mb = arrow_mb
+        self.rss_threshold_mb = rss_threshold_mb
+        self.arrow_threshold_mb = arrow_threshold_mb
+        self.every_mb = every_mb
+        self._on_collect = list(on_collect or [])
+
+        self._lock = threading.Lock()
+        self._baseline_mb = self._usage_mb()
+
+        self.checks = 0
+        self.collections = 0
+        self.seconds = 0.0
+        self.collected_objects = 0
+        self.reasons: Dict[str, int] = {}
+
+    def _usage_mb(self) -> float:
+        """RSSとArrowの確保量の合計（前回のGCからの増加量の計算用）"""
+        return (self._rss_mb() or 0.0) + (self._arrow_mb() or 0.0)
+
+    def _reason(self) -> Optional[str]:
+        if self.every_mb <= 0:
+            return REASON_ALLOCATED
+        rss = self._rss_mb()
+        arrow = self._arrow_mb()
+        usage = (rss or 0.0) + (arrow or 0.0)
+        # GC以外で使用量が減った場合はそこから数える
+        self._baseline_mb = min(self._baseline_mb, usage)
+        growth = usage - self._baseline_mb
+        if growth >= self.every_mb:
+            return REASON_ALLOCATED
+        if growth < _MIN_GROWTH_MB:
+            return None
+        if self.rss_threshold_mb is not None and rss is not None and rss >= self.rss_threshold_mb:
+            return REASON_RSS
+        if self.arrow_threshold_mb is not None and arrow is not None and arrow >= self.arrow_threshold_mb:
+            return REASON_ARROW
+        return None
+
+    def maybe_collect(self) -> bool:
+        """
+        しきい値を超えている場合だけGCを実行する
+
+        Returns:
+            GCを実行した場合はTrue
+        """
+        with self._lock:
+            self.checks += 1
+            reason = self._reason()
+            if reason is None:
+                return False
+            self._collect(reason)
+            return True
+
+    def collect(self) -> None:
+        """しきい値によらずGCを実行する"""
+        with self._lock:
+            self._collect(REASON_FORCED)
+
+    def _collect(self, reason: str) -> None:
+        start = time.perf_counter()
+        self.collected_objects += gc.collect(2)
+        for callback in self._on_collect:
+            callback()
+        self.seconds += time.perf_counter() - start
+        self.collections += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        # 解放後の使用量を基準にする（回収できないメモリで毎回GCしない）
+        self._baseline_mb = self._usage_mb()
+
+    def get_stats(self) -> Dict[str, object]:
+        """チェック回数・GCの実行回数・理由別の回数・GCに使った時間"""
+        with self._lock:
+            return {
+                'checks': self.checks,
+                'collections': self.collections,
+                'gcSeconds': round(self.seconds, 3),
+                'collectedObjects': self.collected_objects,
+                'reasons': dict(self.reasons),
+            }
@@ -0,0 +1,141 @@
+"""
+インデックス中（pending / processing）の文書パスの集合
+
+indexStatus: 'latest_only' / 'completed_only' の検索では、インデックスの更新待ちの文書を除外するため、
+検索のたびにindex_requestsテーブルをstatusで走査し、パスの一覧をTypeScript側でNOT LIKEの条件に
+変換していた。大量の再インデックス中はパスが数千件になり、検索ごとに走査と数千の条件の評価が発生する。
+
+InflightPathsはindex_requestsの作成・更新のRPCで差分更新するメモリ上の集合で、
+検索ではこの集合からワーカー内でフィルタを作る（テーブルを走査しない）。
+
+- キーはリクエストID（同じパスに複数のリクエストがあっても、すべて完了するまで集合に残る）
+- 起動時（最初に使う時）にテーブルから1回だけ読み込む
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# インデックス中のstatus
+INFLIGHT_STATUSES = frozenset(['pending', 'processing'])
+
+
+class InflightPaths:
+    """
+    インデックス中のリクエストのパスを、リクエストIDごとに保持する
+
+    Examples:
+        >>> inflight = InflightPaths()
+        >>> inflight.load([('r1', 'docs/a.md', 'pending')])
+        >>> inflight.update('r1', 'docs/a.md', 'processing')
+        >>> inflight.paths()
+        ['docs/a.md']
+        >>> inflight.update('r1', 'docs/a.md', 'completed')
+        >>> inflight.paths()
+        []
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # リクエストID -> (パス, status)
+        self._requests: Dict[str, Tuple[str, str]] = {}
+        # パス -> インデックス中のリクエスト数
+        self._counts: Dict[str, int] = {}
+        self._loaded = False
+
+        self.updates = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, requests: Iterable[Tuple[str, str, str]]) -> None:
+        """
+        テーブルから読み込んだリクエストで集合を作り直す
+
+        Args:
+            requests: (リクエストID, パス, status) の列（インデックス中以外のstatusは無視する）
+        """
+        with self._lock:
+            self._requests.clear()
+            self._counts.clear()
+            for request_id, path, status in requests:
+                self._set(request_id, path, status)
+            self._loaded = True
+
+    def update(self, request_id: str, path: Optional[str], status: str) -> None:
+        """
+        リクエストの作成・statusの更新を反映する
+
+        Args:
+            request_id: リクエストID
+            path: 文書パス（Noneの場合は既知のパスを使う）
+            status: 更新後のstatus
+        """
+        with self._lock:
+            if path is None:
+                known = self._requests.get(request_id)
+                if known is None:
+                    # インデックス中でないリクエストが、インデックス中以外のstatusに更新された
+                    if status not in INFLIGHT_STATUSES:
+                        return
+                    raise ValueError(f"unknown path for index request: {request_id}")
+                path = known[0]
+            self._set(request_id, path, status)
+            self.updates += 1
+
+    def remove(self, request_ids: Iterable[str]) -> None:
+        """削除されたリクエストを集合から除く"""
+        with self._lock:
+            for request_id in request_ids:
+                self._discard(request_id)
+
+    def _set(self, request_id: str, path: str, status: str) -> None:
+        self._discard(request_id)
+        if status in INFLIGHT_STATUSES:
+            self._requests[request_id] = (path, status)
+            self._counts[path] = self._counts.get(path, 0) + 1
+
+    def _discard(self, request_id: str) -> None:
+        previous = self._requests.pop(request_id, None)
+        if previous is None:
+            return
+        path = previous[0]
+        remaining = self._counts[path] - 1
+        if remaining:
+            self._counts[path] = remaining
+        else:
+            del self._counts[path]
+
+    def paths(self, statuses: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        インデックス中のパス
+
+        Args:
+            statuses: 絞り込むstatus（Noneの場合はpending / processingの両方）
+
+        Returns:
+            パスのリスト（順不同）
+        """
+        with self._lock:
+            if statuses is None:
+                return list(self._counts)
+            wanted = set(statuses)
+            return list({path for path, status in self._requests.values() if status in wanted})
+
+    def __contains__(self, path: str) -> bool:
+        with self._lock:
+            return path in self._counts
+
+    def snapshot(self) -> Set[str]:
+        """検索中に変わらないパスの集合のコピー"""
+        with self._lock:
+            return set(self._counts)
+
+    def get_stats(self) -> Dict[str, int]:
+        """インデックス中のパス数・リクエスト数と、差分更新の回数"""
+        with self._lock:
+            return {
+                'paths': len(self._counts),
+                'requests': len(self._requests),
+                'updates': self.updates,
+            }
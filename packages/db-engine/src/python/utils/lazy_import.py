@@ -0,0 +1,178 @@
+"""
+重いモジュールの遅延インポートとインポート時間の計測
+
+ワーカーの最初の応答までの時間を短くするため、pandas / duckdb / psutil などは
+最初に属性へアクセスした時点でインポートする（`lazy_import`）。
+
+`ImportProfiler` は `builtins.__import__` をフックしてモジュールごとのインポート時間
+（自身の時間と、依存モジュールを含む累積時間）を記録する。
+`worker.py --profile-imports` で起動時のインポートコスト表を出力する。
+
+標準ライブラリのみに依存する（重いモジュールより先にインポートされるため）。
+"""
+
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+import types
+from typing import Any, Dict, List, Optional, TextIO
+
+_load_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """最初の属性アクセスでインポートされるモジュールのプロキシ"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_target']
+        if module is None:
+            with _load_lock:
+                module = self.__dict__['_lazy_target']
+                if module is None:
+                    # builtins.__import__経由でインポートする（ImportProfilerで計測されるように）
+                    __import__(self.__name__)
+                    module = sys.modules[self.__name__]
+                    # 属性はプロキシに写さず、毎回__getattr__でモジュールから引く
+                    # （写すとモジュールの属性がプロキシからも参照され、終了時に拡張モジュールの後始末より
+                    # 後まで残る。duckdbではインタプリタの終了時にセグメンテーション違反になる）
+                    self.__dict__['_lazy_target'] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        """インポート済みか"""
+        return self.__dict__['_lazy_target'] is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """モジュールを遅延インポート
+
+    インポート済みの場合はモジュールそのものを、未インポートの場合はプロキシを返す。
+
+    Examples:
+        >>> pd = lazy_import('pandas')  # まだインポートしない
+        >>> pd.Timestamp.now()          # ここでインポートされる
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_available(name: str) -> bool:
+    """モジュールがインストールされているか（インポートせずに確認）"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class ImportProfiler:
+    """モジュールごとのインポート時間を記録
+
+    `python -X importtime` と同様に、自身の時間（self）と依存モジュールを含む累積時間（cumulative）を記録する。
+    """
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self._local = threading.local()
+        self._original_import = None
+        self._reported = 0  # report()で出力済みのレコード数
+        self._live = False  # report()以降のトップレベルのインポートを都度出力する
+
+    def install(self) -> "ImportProfiler":
+        """builtins.__import__をフック"""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+        return self
+
+    def uninstall(self) -> None:
+        """フックを解除"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        module_name = self._resolve(name, globals, level)
+        if module_name is None or module_name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            if module_name in sys.modules:
+                self.records.append({
+                    'module': module_name,
+                    'self_ms': (elapsed - children) * 1000,
+                    'cumulative_ms': elapsed * 1000,
+                    'depth': len(stack),
+                })
+                if self._live and not stack:
+                    sys.stderr.write(f"[ImportProfile] late import {module_name}: {elapsed * 1000:.1f} ms\n")
+                    sys.stderr.flush()
+
+    @staticmethod
+    def _resolve(name: str, globals: Optional[dict], level: int) -> Optional[str]:
+        if level == 0:
+            return name
+        package = (globals or {}).get('__package__')
+        if not package:
+            return None
+        try:
+            return importlib.util.resolve_name('.' * level + name, package)
+        except (ImportError, ValueError):
+            return None
+
+    def top_level_ms(self, since: int = 0) -> float:
+        """トップレベル（他のインポートの内側でない）インポートの合計時間"""
+        return sum(r['cumulative_ms'] for r in self.records[since:] if r['depth'] == 0)
+
+    def report(self, title: str, limit: int = 25, out: Optional[TextIO] = None) -> None:
+        """前回のreport()以降に記録したインポートのコスト表を出力（累積時間の降順）
+
+        以降のトップレベルのインポート（遅延インポートなど）は発生するたびに1行で出力する。
+        """
+        out = out or sys.stderr
+        records = self.records[self._reported:]
+        total_ms = self.top_level_ms(self._reported)
+        self._reported = len(self.records)
+        self._live = True
+
+        out.write(f"[ImportProfile] {title}: {len({r['module'] for r in records})} modules, {total_ms:.1f} ms total\n")
+        out.write(f"[ImportProfile] {'self(ms)':>10} {'cumulative(ms)':>15}  module\n")
+        # 循環インポートなどで同じモジュールが複数回記録された場合は累積時間が最大のものを表示
+        largest: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            current = largest.get(record['module'])
+            if current is None or record['cumulative_ms'] > current['cumulative_ms']:
+                largest[record['module']] = record
+        for record in sorted(largest.values(), key=lambda r: r['cumulative_ms'], reverse=True)[:limit]:
+            out.write(
+                f"[ImportProfile] {record['self_ms']:>10.1f} {record['cumulative_ms']:>15.1f}  "
+                f"{'  ' * record['depth']}{record['module']}\n"
+            )
+        out.flush()
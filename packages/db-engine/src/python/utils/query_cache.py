@@ -0,0 +1,118 @@
+"""
+検索クエリのベクトルキャッシュ
+
+エージェントは1セッション内で同じクエリを繰り返し検索することが多い。
+クエリのベクトルをメモリ上に保持し、同じクエリはモデルを通さずに検索（ANN）へ進む。
+
+- キー: (モデル名, 次元数, 正規化したクエリ)。正規化は前後の空白除去と連続する空白の圧縮
+- 件数の上限を超えた場合は最後に使われたのが古いものから削除する（LRU）
+- TTLを過ぎたエントリは使わない（モデルの再ロードなどで古いベクトルを使い続けないように）
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_QUERY_CACHE_SIZE = 1024
+DEFAULT_QUERY_CACHE_TTL = 600.0
+
+
+def normalize_query(query: str) -> str:
+    """キャッシュキーとエンコードに使うクエリの正規化
+
+    Examples:
+        >>> normalize_query('  LanceDB   の\\tインデックス ')
+        'LanceDB の インデックス'
+    """
+    return ' '.join(query.split())
+
+
+class QueryVectorCache:
+    """クエリベクトルのLRUキャッシュ（TTL付き）
+
+    Examples:
+        >>> cache = QueryVectorCache(max_entries=2, ttl_seconds=60)
+        >>> cache.get('model', 256, 'query') is None
+        True
+        >>> cache.put('model', 256, 'query', [0.1, 0.2])
+        >>> cache.get('model', 256, ' query ')
+        [0.1, 0.2]
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_QUERY_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_QUERY_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_entries: 保持する最大件数
+            ttl_seconds: エントリの有効期間（秒）。0以下の場合は期限なし
+            clock: 現在時刻の取得関数（テスト用）
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int, str], Tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, model_name: str, dimension: int, query: str) -> Optional[Any]:
+        """キャッシュ済みのベクトルを取得（ない場合・期限切れの場合はNone）"""
+        key = (model_name, dimension, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, vector = entry
+            if self.ttl_seconds > 0 and self._clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, model_name: str, dimension: int, query: str, vector: Any) -> None:
+        """ベクトルを保存し、上限を超えた分を削除"""
+        if self.max_entries <= 0:
+            return
+        key = (model_name, dimension, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (self._clock(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, float]:
+        """ヒット・ミス件数とヒット率"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,56 @@
+"""
+複数の検索結果の順位の統合（Reciprocal Rank Fusion）
+
+ベクトル検索は言い換えに強いが、設定キーや関数名のような識別子は埋め込みで近くならず上位に来ないことがある。
+全文検索（BM25）は識別子に強いが、言い換えには弱い。
+ハイブリッド検索では両方の結果を順位だけで統合する（スコアの尺度が異なるため値は足し合わせない）。
+
+    score(d) = Σ weight_i / (k + rank_i(d))    （rankは1始まり、結果に含まれない場合は0）
+
+kが大きいほど上位と下位の差が小さくなる。k=60は元の論文（Cormack et al., 2009）の値。
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+DEFAULT_RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]],
+    k: int = DEFAULT_RRF_K,
+    weights: Optional[Sequence[float]] = None,
+    limit: Optional[int] = None
+) -> List[Tuple[Hashable, float]]:
+    """
+    順位のリストを統合し、スコアの降順に並べる
+
+    Args:
+        rankings: 検索方法ごとの結果のキー（上位から順）
+        k: 順位の平滑化の定数
+        weights: 検索方法ごとの重み（Noneの場合はすべて1）
+        limit: 返す件数（Noneの場合はすべて）
+
+    Returns:
+        (キー, スコア)のリスト。スコアが同じ場合は先に現れたキーが先
+
+    Examples:
+        >>> reciprocal_rank_fusion([['a', 'b', 'c'], ['c', 'a']], k=1)
+        [('a', 0.8333333333333333), ('c', 0.75), ('b', 0.3333333333333333)]
+    """
+    if weights is not None and len(weights) != len(rankings):
+        raise ValueError("weights must have the same length as rankings")
+
+    scores: Dict[Hashable, float] = {}
+    for i, ranking in enumerate(rankings):
+        weight = weights[i] if weights is not None else 1.0
+        seen = set()
+        for rank, key in enumerate(ranking, start=1):
+            # 同じ結果の中の重複は最上位だけ数える
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+
+    # sortedは安定なので、同じスコアは最初に現れた順になる
+    fused = sorted(scores.items(), key=lambda item: -item[1])
+    return fused[:limit] if limit is not None else fused
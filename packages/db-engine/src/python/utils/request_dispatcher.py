@@ -0,0 +1,157 @@
+"""
+リクエストディスパッチャ
+
+JSON-RPCリクエストをレーン（読み取り系 / 書き込み・埋め込み系）に振り分け、
+レーンごとのスレッドで並行に処理する。
+同じレーン内ではFIFO順に処理し、レスポンスは完了した順に返す
+（クライアントはJSON-RPCのidで対応付ける）。
+"""
+
+import queue
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+# レーン名
+READ_LANE = 'read'
+WRITE_LANE = 'write'
+
+# レスポンス送信コールバック: (response) -> None
+ReplyFn = Callable[[Any], None]
+
+# キュー終了を表すセンチネル
+_STOP = object()
+
+
+class _Lane:
+    """1つのレーン（キュー + 処理スレッド）"""
+
+    def __init__(self, name: str, num_threads: int):
+        self.name = name
+        self.queue: "queue.Queue[Any]" = queue.Queue()
+        self.threads: List[threading.Thread] = []
+        self.num_threads = num_threads
+        self.lock = threading.Lock()
+        self.active = 0
+        self.completed = 0
+        self.max_depth = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'queued': self.queue.qsize(),
+                'active': self.active,
+                'completed': self.completed,
+                'maxQueued': self.max_depth,
+            }
+
+
+class RequestDispatcher:
+    """レーン別にリクエストを並行処理するディスパッチャ
+
+    Examples:
+        >>> dispatcher = RequestDispatcher(
+        ...     handler=worker.handle_message,
+        ...     lane_for=lambda request: 'read' if request['method'] == 'search' else 'write',
+        ... )
+        >>> dispatcher.start()
+        >>> dispatcher.submit(request, reply=send_response)
+        >>> dispatcher.shutdown()
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Optional[Any]],
+        lane_for: Callable[[Any], str],
+        lane_threads: Optional[Dict[str, int]] = None
+    ):
+        """
+        Args:
+            handler: メッセージ（単一リクエストまたはバッチ配列）を処理してレスポンスを返す関数
+                （Noneならレスポンスなし）
+            lane_for: メッセージからレーン名を決める関数
+            lane_threads: レーンごとのスレッド数（デフォルト: read=1, write=1）
+        """
+        self.handler = handler
+        self.lane_for = lane_for
+        threads = lane_threads or {READ_LANE: 1, WRITE_LANE: 1}
+        self.lanes: Dict[str, _Lane] = {
+            name: _Lane(name, count) for name, count in threads.items()
+        }
+        self._started = False
+
+    def start(self) -> None:
+        """各レーンの処理スレッドを起動"""
+        if self._started:
+            return
+        for lane in self.lanes.values():
+            for i in range(lane.num_threads):
+                thread = threading.Thread(
+                    target=self._run_lane,
+                    args=(lane,),
+                    name=f"lane-{lane.name}-{i}",
+                    daemon=True
+                )
+                thread.start()
+                lane.threads.append(thread)
+        self._started = True
+
+    def submit(self, request: Any, reply: ReplyFn) -> str:
+        """リクエストをレーンのキューに積む
+
+        Args:
+            request: JSON-RPCリクエスト（バッチ配列を含む）
+            reply: レスポンス送信コールバック（レーンのスレッドから呼ばれる）
+
+        Returns:
+            振り分け先のレーン名
+        """
+        lane_name = self.lane_for(request)
+        lane = self.lanes.get(lane_name) or self.lanes[WRITE_LANE]
+        lane.queue.put((request, reply))
+        with lane.lock:
+            lane.max_depth = max(lane.max_depth, lane.queue.qsize())
+        return lane.name
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """レーンごとのキュー深さと処理件数を取得"""
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """キューに積まれた処理を終えてからスレッドを停止
+
+        Args:
+            wait: Trueの場合、全スレッドの終了を待つ
+        """
+        for lane in self.lanes.values():
+            for _ in lane.threads:
+                lane.queue.put(_STOP)
+        if wait:
+            for lane in self.lanes.values():
+                for thread in lane.threads:
+                    thread.join()
+
+    def _run_lane(self, lane: _Lane) -> None:
+        """レーンの処理ループ"""
+        while True:
+            item = lane.queue.get()
+            if item is _STOP:
+                break
+
+            request, reply = item
+            with lane.lock:
+                lane.active += 1
+            try:
+                response = self.handler(request)
+                if response is not None:
+                    reply(response)
+            except Exception as e:
+                # handler内で処理されなかった例外（レスポンス送信失敗など）
+                sys.stderr.write(f"[Dispatcher] Error in lane '{lane.name}': {e}\n")
+                sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
+                sys.stderr.flush()
+            finally:
+                with lane.lock:
+                    lane.active -= 1
+                    lane.completed += 1
@@ -0,0 +1,205 @@
+"""
+index_requestsテーブルの保持期間と定期的な削除・コンパクション
+
+create_index_requestはファイルの変更ごとに1行追加し、statusの更新（table.update）のたびに
+Lanceの新しいバージョンが書かれる。完了した行を削除しないと、find_index_requests /
+count_index_requestsが遅くなり、index_requests.lanceが際限なく大きくなる。
+
+保持の方針:
+- インデックス中（pending / processing）のリクエストは削除しない
+- パスごとに最新の終了済み（completed / failed / skipped）のリクエストは残す
+  （最後のインデックスの結果・エラーを参照できるように）
+- それ以外の終了済みのリクエストは、作成から保持期間を過ぎたら削除する
+
+削除の後はコンパクションと古いバージョンの削除を行う（RequestRetentionPolicyは判断と統計だけを持ち、
+テーブル操作はワーカーが行う）。PeriodicTaskは一定間隔で処理を呼ぶバックグラウンドスレッド。
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+# 終了済みのstatus
+TERMINAL_STATUSES = ('completed', 'failed', 'skipped')
+
+# 終了済みのリクエストの保持期間（日、パスごとの最新は期間を過ぎても残す）
+DEFAULT_RETENTION_DAYS = 7.0
+# 定期削除の間隔（秒、0で定期削除しない）
+DEFAULT_PURGE_INTERVAL_SECONDS = 3600.0
+# コンパクション後に残す古いバージョンの期間（秒）
+# 同時に実行中の読み取り（読み取りレーン）が古いバージョンを参照していても失敗しないように少し残す
+DEFAULT_VERSION_RETENTION_SECONDS = 60.0
+
+
+def directory_size(path: str) -> int:
+    """ディレクトリ以下のファイルサイズの合計（バイト、存在しない場合は0）"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                # 走査中に削除されたファイル
+                pass
+    return total
+
+
+def _created_at(row: Mapping[str, Any]) -> datetime:
+    """行の作成時刻（ない場合は最も古いとみなす）"""
+    return row['created_at'] if row['created_at'] is not None else datetime.min
+
+
+class RequestRetentionPolicy:
+    """
+    削除するindex_requestsの行の選択と、削除・コンパクションの統計
+
+    Examples:
+        >>> policy = RequestRetentionPolicy(retention_days=0)
+        >>> now = datetime(2024, 1, 2)
+        >>> policy.select_purgeable([
+        ...     {'id': 'r1', 'document_path': 'a.md', 'status': 'completed', 'created_at': datetime(2024, 1, 1)},
+        ...     {'id': 'r2', 'document_path': 'a.md', 'status': 'completed', 'created_at': datetime(2024, 1, 2)},
+        ... ], now)
+        ['r1']
+    """
+
+    def __init__(
+        self,
+        retention_days: float = DEFAULT_RETENTION_DAYS,
+        version_retention_seconds: float = DEFAULT_VERSION_RETENTION_SECONDS
+    ):
+        """
+        Args:
+            retention_days: 終了済みのリクエストの保持期間（日、0で最新以外をすぐに削除する）
+            version_retention_seconds: コンパクション後に残す古いバージョンの期間（秒）
+        """
+        if retention_days < 0:
+            raise ValueError("retention_days must be non-negative")
+        if version_retention_seconds < 0:
+            raise ValueError("version_retention_seconds must be non-negative")
+        self.retention = timedelta(days=retention_days)
+        self.version_retention = timedelta(seconds=version_retention_seconds)
+
+        self._lock = threading.Lock()
+        self.purges = 0
+        self.purged_rows = 0
+        self.reclaimed_bytes = 0
+        self.removed_versions = 0
+        self.purge_seconds = 0.0
+        self.last_purge: Optional[Dict[str, Any]] = None
+
+    def select_purgeable(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        now: datetime,
+        retention: Optional[timedelta] = None
+    ) -> List[str]:
+        """
+        削除するリクエストのIDを選ぶ
+
+        Args:
+            rows: リクエストの行（id / document_path / status / created_at）
+            now: 現在時刻（created_atと同じく、タイムゾーンなしのUTC）
+            retention: 保持期間（Noneの場合はポリシーの値）
+
+        Returns:
+            削除するID（行の順序）
+        """
+        retention = self.retention if retention is None else retention
+        cutoff = now - retention
+
+        terminal = [row for row in rows if row['status'] in TERMINAL_STATUSES]
+
+        # パスごとの最新の終了済みのリクエスト（作成時刻が同じ場合はIDの大きい方）
+        latest: Dict[str, Mapping[str, Any]] = {}
+        for row in terminal:
+            current = latest.get(row['document_path'])
+            if current is None or (_created_at(row), row['id']) > (_created_at(current), current['id']):
+                latest[row['document_path']] = row
+
+        return [
+            row['id']
+            for row in terminal
+            if latest[row['document_path']] is not row and _created_at(row) < cutoff
+        ]
+
+    def record(
+        self,
+        purged_rows: int,
+        bytes_before: int,
+        bytes_after: int,
+        versions_before: int,
+        versions_after: int,
+        seconds: float
+    ) -> Dict[str, Any]:
+        """削除・コンパクションの結果を記録し、今回の結果を返す"""
+        result = {
+            'purgedRows': purged_rows,
+            'bytesBefore': bytes_before,
+            'bytesAfter': bytes_after,
+            'reclaimedBytes': max(0, bytes_before - bytes_after),
+            'removedVersions': max(0, versions_before - versions_after),
+            'seconds': round(seconds, 3),
+        }
+        with self._lock:
+            self.purges += 1
+            self.purged_rows += purged_rows
+            self.reclaimed_bytes += result['reclaimedBytes']
+            self.removed_versions += result['removedVersions']
+            self.purge_seconds += seconds
+            self.last_purge = result
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """保持期間と、これまでの削除・コンパクションの累計"""
+        with self._lock:
+            return {
+                'retentionDays': self.retention.total_seconds() / 86400,
+                'purges': self.purges,
+                'purgedRows': self.purged_rows,
+                'reclaimedBytes': self.reclaimed_bytes,
+                'removedVersions': self.removed_versions,
+                'purgeSeconds': round(self.purge_seconds, 3),
+                'lastPurge': dict(self.last_purge) if self.last_purge is not None else None,
+            }
+
+
+class PeriodicTask:
+    """
+    一定間隔で処理を呼ぶバックグラウンドスレッド
+
+    最初の呼び出しは開始から1間隔後。処理の例外はログに出力して次の間隔で再実行する。
+
+    Examples:
+        >>> task = PeriodicTask('purge', 3600, run=lambda: None)
+        >>> task.start()
+        >>> task.stop()
+    """
+
+    def __init__(self, name: str, interval_seconds: float, run: Callable[[], None]):
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.run = run
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run()
+            except Exception as e:
+                sys.stderr.write(f"[PeriodicTask] {self.name} failed: {e}\n")
+                sys.stderr.flush()
@@ -4,13 +4,17 @@
 トークン数制限を超えるセクションをスキップする機能を提供。
 """
 
-from typing import List, Dict, Any, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from .token_utils import estimate_tokens
 
+if TYPE_CHECKING:
+    from .embedding_cache import EmbeddingCache
+
 
 def filter_sections_by_token_limit(
     sections: List[Dict[str, Any]],
-    max_tokens: int = 7500
+    max_tokens: int = 7500,
+    count_tokens: Callable[[str], int] = estimate_tokens
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
     トークン数制限を超えるセクションをフィルタリング
@@ -21,6 +25,7 @@ def filter_sections_by_token_limit(
     Args:
         sections: セクションのリスト（各セクションはheading, contentを含む辞書）
         max_tokens: 1セクションあたりの最大トークン数
+        count_tokens: トークン数の推定関数（TokenEstimator.countなど）
 
     Returns:
         (valid_sections, skipped_sections)のタプル
@@ -57,7 +62,7 @@ def filter_sections_by_token_limit(
 
         # テキストを結合してトークン数を推定
         text = f"{section['heading']}\n{section['content']}"
-        estimated_tokens = estimate_tokens(text)
+        estimated_tokens = count_tokens(text)
 
         # トークン数が制限以下の場合は有効
         if estimated_tokens <= max_tokens:
@@ -73,13 +78,18 @@ def filter_sections_by_token_limit(
 
 
 def get_texts_to_encode(
-    sections: List[Dict[str, Any]]
+    sections: List[Dict[str, Any]],
+    cache: Optional["EmbeddingCache"] = None
 ) -> Tuple[List[str], List[int]]:
     """
     ベクトル化が必要なセクションからテキストとインデックスを抽出
 
+    cacheを指定した場合、キャッシュにあるテキストはそのセクションのvectorに設定し、
+    キャッシュにないテキストだけを返す。
+
     Args:
         sections: セクションのリスト
+        cache: 埋め込みベクトルのキャッシュ（Noneの場合はキャッシュを使わない）
 
     Returns:
         (texts, indices)のタプル
@@ -110,4 +120,12 @@ def get_texts_to_encode(
             texts.append(text)
             indices.append(i)
 
+    if cache is not None and texts:
+        cached = cache.get_many(texts)
+        if cached:
+            for position, vector in cached.items():
+                sections[indices[position]]["vector"] = vector
+            texts = [text for position, text in enumerate(texts) if position not in cached]
+            indices = [index for position, index in enumerate(indices) if position not in cached]
+
     return texts, indices
@@ -0,0 +1,84 @@
+"""
+文書の再インデックスで変更のないセクションを既存の行に対応付ける
+
+セクションのIDは分割のたびにランダムに振られるため、IDでは既存の行と対応付けられない。
+見出し・本文・深さが同じセクションは埋め込みのテキストも同じなので、既存の行のIDとベクトルを引き継ぐ
+（エンコードせず、merge_insertでは同じ行の更新になる）。
+
+- 同じ内容のセクションが複数ある場合は、文書内の順序（order）の順に対応付ける
+- 対応付けたセクションのIDを既存のIDに置き換えるため、子セクションのparent_idも置き換える
+"""
+
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Hashable, List, Mapping, Sequence, Tuple
+
+
+def _section_key(section: Mapping[str, Any]) -> Hashable:
+    """同じベクトルになるセクションのキー（埋め込みのテキストと深さ）"""
+    return (section['heading'], section['content'], section['depth'])
+
+
+def match_unchanged_sections(
+    existing: Sequence[Mapping[str, Any]],
+    sections: Sequence[Mapping[str, Any]]
+) -> Dict[int, int]:
+    """
+    新しいセクションと、内容が同じ既存の行を対応付ける
+
+    Args:
+        existing: 既存の行（heading / content / depth / order）
+        sections: 新しいセクション（heading / content / depth）
+
+    Returns:
+        新しいセクションの位置 -> 既存の行の位置（対応する行がないセクションは含まない）
+
+    Examples:
+        >>> existing = [
+        ...     {'heading': 'A', 'content': 'x', 'depth': 1, 'order': 0},
+        ...     {'heading': 'B', 'content': 'y', 'depth': 1, 'order': 1},
+        ... ]
+        >>> sections = [
+        ...     {'heading': 'A', 'content': 'x', 'depth': 1},
+        ...     {'heading': 'B', 'content': 'changed', 'depth': 1},
+        ... ]
+        >>> match_unchanged_sections(existing, sections)
+        {0: 0}
+    """
+    candidates: Dict[Hashable, Deque[int]] = defaultdict(deque)
+    for position in sorted(range(len(existing)), key=lambda i: existing[i].get('order') or 0):
+        candidates[_section_key(existing[position])].append(position)
+
+    matches = {}
+    for position, section in enumerate(sections):
+        queue = candidates.get(_section_key(section))
+        if queue:
+            matches[position] = queue.popleft()
+    return matches
+
+
+def remap_section_ids(
+    sections: List[Dict[str, Any]],
+    existing_ids: Sequence[str],
+    matches: Mapping[int, int]
+) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    対応付けたセクションのIDを既存の行のIDに置き換え、parent_idも合わせて置き換える
+
+    Args:
+        sections: 新しいセクション（変更しない）
+        existing_ids: 既存の行のID
+        matches: match_unchanged_sectionsの結果
+
+    Returns:
+        (IDを置き換えたセクションのコピー, 新しいID -> 既存のID)のタプル
+    """
+    id_map = {sections[position]['id']: existing_ids[row] for position, row in matches.items()}
+    remapped = []
+    for section in sections:
+        section = dict(section)
+        section['id'] = id_map.get(section['id'], section['id'])
+        parent_id = section.get('parent_id')
+        if parent_id is not None:
+            section['parent_id'] = id_map.get(parent_id, parent_id)
+        remapped.append(section)
+    return remapped, id_map
@@ -0,0 +1,244 @@
+"""
+Unixドメインソケットのサーバーモード
+
+`worker.py --listen=unix:/path/to/worker.sock` で起動すると、1つのワーカー（ロード済みのモデルと
+LanceDBのテーブルハンドル）を複数のクライアント（CLI・MCPサーバー・スクリプトなど）で共有できる。
+
+- 接続ごとにスレッドで受信し、リクエストは全接続で共有するディスパッチャのレーンに積む
+- メッセージ形式は標準入出力と同じ（デフォルトはJSON行）。
+  接続直後に `$/transport` リクエストを送るとトランスポートを切り替えられる
+- リクエストIDは接続ごとにワーカー全体で一意なIDへ付け替える（キャンセル通知も同様）
+- 接続が切れた場合、その接続のキュー待ち・処理中のリクエストはキャンセルする
+"""
+
+import itertools
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from utils.cancellation import CANCEL_METHOD
+from utils.transport import HANDSHAKE_METHOD, MessageChannel, negotiate_transport
+
+# 受信メッセージの処理関数: (message, reply) -> None
+ServeFn = Callable[[Any, Callable[[Any], None]], None]
+
+UNIX_SCHEME = 'unix:'
+
+
+def parse_listen_address(value: str) -> str:
+    """--listenの値からソケットパスを取得
+
+    Args:
+        value: 'unix:/path/to/worker.sock' 形式の文字列
+
+    Returns:
+        ソケットファイルの絶対パス
+
+    Raises:
+        ValueError: 対応していない形式の場合
+
+    Examples:
+        >>> parse_listen_address('unix:/tmp/worker.sock')
+        '/tmp/worker.sock'
+    """
+    if not value.startswith(UNIX_SCHEME) or len(value) == len(UNIX_SCHEME):
+        raise ValueError(f"Unsupported listen address: {value} (expected unix:/path)")
+    return os.path.abspath(value[len(UNIX_SCHEME):])
+
+
+class ClientSession:
+    """1接続分のリクエストIDの付け替え
+
+    クライアントはそれぞれ1から連番のIDを使うため、ワーカー内（キャンセルの追跡など）で
+    衝突しないようにワーカー全体で一意なIDに付け替え、レスポンスで元に戻す。
+    """
+
+    def __init__(self, id_source: Iterable[int]):
+        """
+        Args:
+            id_source: ワーカー全体で共有する連番の供給元（itertools.count()）
+        """
+        self._id_source = iter(id_source)
+        self._lock = threading.Lock()
+        self._to_client: Dict[int, Any] = {}  # 付け替え後のID -> クライアントのID
+        self._to_worker: Dict[Any, int] = {}  # クライアントのID -> 付け替え後のID
+
+    def inbound(self, message: Any) -> Any:
+        """受信メッセージのIDを付け替える"""
+        if isinstance(message, list):
+            return [self._inbound_one(item) for item in message]
+        return self._inbound_one(message)
+
+    def outbound(self, message: Any) -> Any:
+        """送信メッセージのIDをクライアントのIDに戻す"""
+        if isinstance(message, list):
+            return [self._outbound_one(item) for item in message]
+        return self._outbound_one(message)
+
+    def pending_ids(self) -> list:
+        """レスポンスを返していない（付け替え後の）IDの一覧"""
+        with self._lock:
+            return list(self._to_client.keys())
+
+    def _inbound_one(self, request: Any) -> Any:
+        if not isinstance(request, dict):
+            return request
+
+        if request.get("method") == CANCEL_METHOD:
+            params = request.get("params") or {}
+            with self._lock:
+                worker_id = self._to_worker.get(params.get("id"))
+            if worker_id is None:
+                # 既に完了したリクエスト
+                return request
+            return {**request, "params": {**params, "id": worker_id}}
+
+        client_id = request.get("id")
+        if client_id is None:
+            return request
+
+        with self._lock:
+            worker_id = next(self._id_source)
+            self._to_client[worker_id] = client_id
+            self._to_worker[client_id] = worker_id
+        return {**request, "id": worker_id}
+
+    def _outbound_one(self, response: Any) -> Any:
+        if not isinstance(response, dict) or response.get("id") is None:
+            return response
+
+        with self._lock:
+            client_id = self._to_client.pop(response["id"], None)
+            if client_id is None:
+                return response
+            self._to_worker.pop(client_id, None)
+        return {**response, "id": client_id}
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    """1接続分の受信ループ"""
+
+    server: "WorkerSocketServer"
+
+    def handle(self) -> None:
+        server = self.server
+        channel = MessageChannel(self.rfile, self.wfile)
+        session = ClientSession(server.id_source)
+        first_message = True
+
+        def reply(response: Any) -> None:
+            try:
+                channel.write_message(session.outbound(response))
+            except (BrokenPipeError, ConnectionResetError):
+                # 応答前に切断したクライアント（リクエストは切断時にキャンセル済み）
+                pass
+
+        sys.stderr.write("[SocketServer] Client connected\n")
+        sys.stderr.flush()
+
+        try:
+            while True:
+                try:
+                    message = channel.read_message()
+                except EOFError:
+                    break
+                except ValueError as e:
+                    sys.stderr.write(f"[SocketServer] Invalid message: {e}\n")
+                    sys.stderr.flush()
+                    continue
+
+                # 最初のメッセージでのみトランスポートを切り替えられる
+                if first_message and isinstance(message, dict) and message.get("method") == HANDSHAKE_METHOD:
+                    requested = (message.get("params") or {}).get("transport")
+                    channel.send_handshake(negotiate_transport(requested))
+                    first_message = False
+                    continue
+                first_message = False
+
+                server.serve(session.inbound(message), reply)
+        except (ConnectionError, OSError) as e:
+            sys.stderr.write(f"[SocketServer] Connection error: {e}\n")
+            sys.stderr.flush()
+        finally:
+            # 切断したクライアントのリクエストは結果を受け取れないため打ち切る
+            pending = session.pending_ids()
+            if pending and server.cancel is not None:
+                for worker_id in pending:
+                    server.cancel(worker_id)
+            sys.stderr.write(f"[SocketServer] Client disconnected (cancelled {len(pending)} pending requests)\n")
+            sys.stderr.flush()
+
+
+class WorkerSocketServer(socketserver.ThreadingUnixStreamServer):
+    """複数クライアントを受け付けるUnixドメインソケットサーバー
+
+    Examples:
+        >>> server = WorkerSocketServer('/tmp/worker.sock', serve=serve_message)
+        >>> server.serve_forever()
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str,
+        serve: ServeFn,
+        cancel: Optional[Callable[[Any], Any]] = None
+    ):
+        """
+        Args:
+            path: ソケットファイルのパス
+            serve: 受信メッセージを処理する関数（ディスパッチャに積む）
+            cancel: 切断時に未完了のリクエストをキャンセルする関数
+        """
+        self.path = path
+        self.serve = serve
+        self.cancel = cancel
+        self.id_source = itertools.count(1)
+        _remove_stale_socket(path)
+        super().__init__(path, _ConnectionHandler, bind_and_activate=False)
+        try:
+            self.server_bind()
+            # 同一ユーザーのプロセスからのみ接続できるようにする
+            # listen()の前に変更し、umaskのパーミッションのまま接続を受け付ける期間をなくす
+            os.chmod(path, 0o600)
+            self.server_activate()
+        except BaseException:
+            self.server_close()
+            raise
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(path: str) -> None:
+    """前回の異常終了で残ったソケットファイルを削除
+
+    Raises:
+        FileExistsError: ソケット以外のファイルが存在する場合、または別のワーカーが使用中の場合
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+
+    # 接続できる場合は稼働中のワーカーのソケット
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise FileExistsError(f"{path} is already in use by another worker")
+    finally:
+        probe.close()
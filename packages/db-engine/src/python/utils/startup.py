@@ -0,0 +1,184 @@
+"""
+ワーカー起動フェーズの追跡
+
+起動処理をフェーズ（インポート・DB接続・テーブル作成・モデルロード・インデックス構築）に分け、
+各フェーズの状態と所要時間を記録する。
+時間のかかるフェーズ（モデルロード・スカラーインデックス構築）はバックグラウンドで実行し、
+それを必要とする処理だけが `wait()` で完了を待つ。
+"""
+
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+# フェーズの状態
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# 必要な起動フェーズが完了していない場合のエラーコード（完了後に再試行できる）
+PHASE_NOT_READY = -32002
+
+
+class PhaseNotReadyError(Exception):
+    """必要な起動フェーズが完了していないため、待たずに打ち切った"""
+
+    code = PHASE_NOT_READY
+
+    def __init__(self, phase: str, message: Optional[str] = None):
+        super().__init__(message or f"Startup phase '{phase}' is not ready yet; retry later")
+        self.phase = phase
+
+
+class _Phase:
+    def __init__(self, name: str):
+        self.name = name
+        self.status = PENDING
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+        self.event = threading.Event()
+
+
+class StartupPhases:
+    """起動フェーズの状態と所要時間
+
+    Examples:
+        >>> phases = StartupPhases()
+        >>> with phases.phase('tables'):
+        ...     create_tables()
+        >>> phases.run_in_background('model', load_model)
+        >>> phases.wait('model', timeout=300)
+        True
+    """
+
+    def __init__(self, origin: Optional[float] = None):
+        """
+        Args:
+            origin: 経過時間の基準となるtime.perf_counter()の値（デフォルト: 生成時刻）
+        """
+        self.origin = origin if origin is not None else time.perf_counter()
+        self._lock = threading.Lock()
+        self._phases: Dict[str, _Phase] = {}
+
+    def _get(self, name: str) -> _Phase:
+        with self._lock:
+            phase = self._phases.get(name)
+            if phase is None:
+                phase = _Phase(name)
+                self._phases[name] = phase
+            return phase
+
+    def begin(self, name: str) -> None:
+        """フェーズを開始"""
+        phase = self._get(name)
+        with self._lock:
+            phase.status = RUNNING
+            phase.started = time.perf_counter()
+
+    def end(self, name: str, error: Optional[str] = None) -> None:
+        """フェーズを終了（errorを指定した場合は失敗として記録）"""
+        phase = self._get(name)
+        with self._lock:
+            phase.finished = time.perf_counter()
+            if phase.started is None:
+                phase.started = phase.finished
+            phase.status = FAILED if error else DONE
+            phase.error = error
+        phase.event.set()
+
+    def record(self, name: str, started: float, finished: float) -> None:
+        """完了済みのフェーズを記録（モジュールのインポートなど、計測済みの区間）"""
+        phase = self._get(name)
+        with self._lock:
+            phase.started = started
+            phase.finished = finished
+            phase.status = DONE
+        phase.event.set()
+
+    def phase(self, name: str) -> "_PhaseContext":
+        """フェーズを計測するコンテキストマネージャ（例外は失敗として記録して再送出）"""
+        return _PhaseContext(self, name)
+
+    def run_in_background(self, name: str, fn: Callable[[], Any]) -> threading.Thread:
+        """フェーズをバックグラウンドスレッドで実行
+
+        fnが例外を送出した場合、またはFalseを返した場合は失敗として記録する。
+        """
+        self.begin(name)
+
+        def run():
+            try:
+                result = fn()
+                self.end(name, error="returned False" if result is False else None)
+            except Exception as e:
+                sys.stderr.write(f"[Startup] Phase '{name}' failed: {e}\n")
+                sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
+                sys.stderr.flush()
+                self.end(name, error=str(e))
+
+        thread = threading.Thread(target=run, name=f"startup-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """フェーズの完了（成功・失敗を問わない）を待つ
+
+        Returns:
+            タイムアウトまでに完了した場合True（登録されていないフェーズは待たずにTrue）
+        """
+        with self._lock:
+            phase = self._phases.get(name)
+        if phase is None:
+            return True
+        return phase.event.wait(timeout)
+
+    def is_done(self, name: str) -> bool:
+        """フェーズが成功して完了しているか"""
+        with self._lock:
+            phase = self._phases.get(name)
+            return phase is not None and phase.status == DONE
+
+    @property
+    def ready(self) -> bool:
+        """全フェーズが完了しているか（失敗を含む）"""
+        with self._lock:
+            return all(phase.event.is_set() for phase in self._phases.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """フェーズごとの状態と所要時間（ミリ秒、originからの相対時刻）を取得"""
+        now = time.perf_counter()
+        with self._lock:
+            phases = {}
+            for name, phase in self._phases.items():
+                entry: Dict[str, Any] = {'status': phase.status}
+                if phase.started is not None:
+                    end = phase.finished if phase.finished is not None else now
+                    entry['startMs'] = round((phase.started - self.origin) * 1000, 1)
+                    entry['durationMs'] = round((end - phase.started) * 1000, 1)
+                if phase.error:
+                    entry['error'] = phase.error
+                phases[name] = entry
+            ready = all(phase.event.is_set() for phase in self._phases.values())
+        return {
+            'ready': ready,
+            'elapsedMs': round((now - self.origin) * 1000, 1),
+            'phases': phases,
+        }
+
+
+class _PhaseContext:
+    def __init__(self, phases: StartupPhases, name: str):
+        self.phases = phases
+        self.name = name
+
+    def __enter__(self):
+        self.phases.begin(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.phases.end(self.name, error=str(exc) if exc is not None else None)
+        return False
@@ -1,11 +1,36 @@
 """
 トークン数推定ユーティリティ
 
-Ruri Embeddingモデル（cl-nagoya/ruri-v3-30m）のトークン数を
-文字数ベースで保守的に推定する。
+Ruri Embeddingモデル（cl-nagoya/ruri-v3-30m）のトークン数を推定する。
+
+- estimate_tokens: 文字数 / 4 の単純な推定（英語向け。日本語では実際のトークン数を大きく下回る）
+- estimate_tokens_by_script: 文字種（ASCII・かな・漢字・その他）ごとの係数による推定
+- TokenEstimator: ロード済みモデルのトークナイザで数え、テキストのハッシュごとにメモ化する
+  （モデルのロード前は estimate_tokens_by_script で推定する）
 """
 
-from typing import List
+import hashlib
+import math
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# 文字種ごとの1文字あたりのトークン数（Ruri v3のトークナイザで多めに見積もる値）
+# 日本語は1〜2文字で1トークン程度になることが多く、文字数 / 4 では2〜4倍少なく見積もってしまう
+ASCII_TOKENS_PER_CHAR = 0.3
+KANA_TOKENS_PER_CHAR = 0.6
+KANJI_TOKENS_PER_CHAR = 0.8
+OTHER_TOKENS_PER_CHAR = 1.0
+
+# ひらがな・カタカナ（半角カナを含む）・長音記号
+_KANA_PATTERN = re.compile('[\u3040-\u30ff\uff66-\uff9f]')
+# CJK統合漢字（拡張A・互換漢字を含む）
+_KANJI_PATTERN = re.compile('[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+
+# トークン数のメモの最大件数
+DEFAULT_TOKEN_MEMO_SIZE = 100_000
 
 
 def estimate_tokens(text: str) -> int:
@@ -31,6 +56,38 @@ def estimate_tokens(text: str) -> int:
     return len(text) // 4
 
 
+def estimate_tokens_by_script(text: str) -> int:
+    """
+    文字種ごとの係数でトークン数を推定する（トークナイザを使えない場合の推定）
+
+    Args:
+        text: 推定対象のテキスト
+
+    Returns:
+        推定トークン数（切り上げ）
+
+    Examples:
+        >>> estimate_tokens_by_script("a" * 10)
+        3
+        >>> estimate_tokens_by_script("あ" * 10)
+        6
+        >>> estimate_tokens_by_script("")
+        0
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    kana_chars = len(_KANA_PATTERN.findall(text))
+    kanji_chars = len(_KANJI_PATTERN.findall(text))
+    other_chars = len(text) - ascii_chars - kana_chars - kanji_chars
+    return math.ceil(
+        ascii_chars * ASCII_TOKENS_PER_CHAR
+        + kana_chars * KANA_TOKENS_PER_CHAR
+        + kanji_chars * KANJI_TOKENS_PER_CHAR
+        + other_chars * OTHER_TOKENS_PER_CHAR
+    )
+
+
 def estimate_total_tokens(texts: List[str]) -> int:
     """
     複数のテキストの合計トークン数を推定する
@@ -48,3 +105,131 @@ def estimate_total_tokens(texts: List[str]) -> int:
         0
     """
     return sum(estimate_tokens(text) for text in texts)
+
+
+def _memo_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class TokenEstimator:
+    """
+    トークナイザによるトークン数の計測（テキストのハッシュごとにメモ化）
+
+    トークナイザ（HuggingFaceのfast tokenizer）を取得できる場合は実際のトークン数を数え、
+    取得できない場合（モデルのロード前など）は estimate_tokens_by_script で推定する。
+    推定値はメモしないため、モデルのロード後は実際のトークン数に切り替わる。
+
+    Examples:
+        >>> estimator = TokenEstimator(lambda: model.tokenizer if model.available else None)
+        >>> estimator.count_many(["見出し\\n本文", "Heading\\nBody"])
+        [4, 3]
+    """
+
+    def __init__(
+        self,
+        tokenizer_provider: Optional[Callable[[], Any]] = None,
+        max_entries: int = DEFAULT_TOKEN_MEMO_SIZE,
+        tokenizer_lock: Optional[threading.Lock] = None
+    ):
+        """
+        Args:
+            tokenizer_provider: 使用可能なトークナイザを返す関数（使用できない場合はNoneを返す）
+            max_entries: メモの最大件数
+            tokenizer_lock: トークナイザの呼び出しを保護するロック
+                （トークナイザを他の処理と共有する場合はそのロックを渡す。デフォルト: 専用のロック）
+        """
+        self._tokenizer_provider = tokenizer_provider
+        self.max_entries = max_entries
+        # メモと統計のロック（トークナイザの呼び出し中は保持しない）
+        self._lock = threading.Lock()
+        # fast tokenizerは複数スレッドから同時に呼ぶと失敗する（"Already borrowed"）
+        self._tokenizer_lock = tokenizer_lock if tokenizer_lock is not None else threading.Lock()
+        self._memo: "OrderedDict[bytes, int]" = OrderedDict()
+
+        self.memo_hits = 0
+        self.tokenized = 0
+        self.estimated = 0
+        self.tokenizer_errors = 0
+
+    def _get_tokenizer(self) -> Optional[Any]:
+        if self._tokenizer_provider is None:
+            return None
+        return self._tokenizer_provider()
+
+    def count(self, text: str) -> int:
+        """1つのテキストのトークン数"""
+        return self.count_many([text])[0]
+
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        """
+        複数のテキストのトークン数（メモにないテキストはまとめてトークナイザに渡す）
+
+        Args:
+            texts: 対象のテキストのリスト
+
+        Returns:
+            各テキストのトークン数（特殊トークンを含まない）
+        """
+        tokenizer = self._get_tokenizer()
+        if tokenizer is None:
+            with self._lock:
+                self.estimated += len(texts)
+            return [estimate_tokens_by_script(text) for text in texts]
+
+        keys = [_memo_key(text) for text in texts]
+        with self._lock:
+            counts: Dict[bytes, int] = {}
+            missing: Dict[bytes, str] = {}
+            for key, text in zip(keys, texts):
+                if key in counts or key in missing:
+                    continue
+                memo = self._memo.get(key)
+                if memo is None:
+                    missing[key] = text
+                else:
+                    self._memo.move_to_end(key)
+                    counts[key] = memo
+                    self.memo_hits += 1
+
+        if missing:
+            tokenized = self._tokenize(tokenizer, list(missing.values()))
+            with self._lock:
+                if tokenized is None:
+                    self.estimated += len(missing)
+                    counts.update((key, estimate_tokens_by_script(text)) for key, text in missing.items())
+                else:
+                    self.tokenized += len(missing)
+                    for key, token_count in zip(missing, tokenized):
+                        counts[key] = token_count
+                        self._memo[key] = token_count
+                    while len(self._memo) > self.max_entries:
+                        self._memo.popitem(last=False)
+
+        return [counts[key] for key in keys]
+
+    def _tokenize(self, tokenizer: Any, texts: List[str]) -> Optional[List[int]]:
+        """トークナイザでトークン数を数える（失敗した場合はNoneを返し、次の呼び出しでは再びトークナイザを使う）"""
+        try:
+            with self._tokenizer_lock:
+                encoded = tokenizer(texts, add_special_tokens=False, verbose=False)
+            return [len(ids) for ids in encoded['input_ids']]
+        except Exception as e:
+            with self._lock:
+                self.tokenizer_errors += 1
+                first_error = self.tokenizer_errors == 1
+            # 失敗が続く場合にログが溢れないよう、最初の1回だけ出力する（以降はget_statsの件数）
+            if first_error:
+                sys.stderr.write(f"[TokenEstimator] Warning: tokenizer failed, falling back to estimation ({e})\n")
+                sys.stderr.flush()
+            return None
+
+    def get_stats(self) -> Dict[str, int]:
+        """メモのヒット件数・トークナイザで数えた件数・推定した件数・トークナイザの失敗回数"""
+        with self._lock:
+            return {
+                'memoHits': self.memo_hits,
+                'tokenized': self.tokenized,
+                'estimated': self.estimated,
+                'tokenizerErrors': self.tokenizer_errors,
+                'size': len(self._memo),
+            }
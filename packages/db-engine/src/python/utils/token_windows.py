@@ -0,0 +1,116 @@
+"""
+大きすぎるセクションのトークンウィンドウ分割
+
+max_batch_tokensを超えるセクションは1回のエンコードに収まらないため、
+収まる大きさのウィンドウ（連続した部分テキスト）に分割して通常のバッチでエンコードし、
+ウィンドウのベクトルをプーリングして1本のベクトルにする（プーリングはembedding.pool_embeddings）。
+
+- ウィンドウの境界は改行 → 句点 → 空白の順で探し、できるだけ文の途中で切らないようにする
+- 1セクションあたりのウィンドウ数はmax_windowsまで。超える場合は先頭・末尾を含めて
+  等間隔にウィンドウを選び、巨大なセクション1つでエンコード時間が際限なく増えないようにする
+"""
+
+from typing import Callable, List, Tuple
+
+from .token_utils import estimate_tokens_by_script
+
+# 1セクションあたりの最大ウィンドウ数
+DEFAULT_MAX_WINDOWS = 8
+
+# ウィンドウが上限を超えた場合に縮める割合（見積もりとの差を見込んで少し多めに縮める）
+_SHRINK_MARGIN = 0.9
+
+
+def _find_cut(text: str, start: int, end: int) -> int:
+    """start〜endの後半で、改行・句点・空白の直後の位置を探す（見つからない場合はend）"""
+    if end >= len(text):
+        return len(text)
+    lower = start + (end - start) // 2
+    for separator in ('\n', '。', ' '):
+        position = text.rfind(separator, lower, end)
+        if position >= 0:
+            return position + 1
+    return end
+
+
+def split_token_windows(
+    text: str,
+    max_tokens: int,
+    count_tokens: Callable[[str], int] = estimate_tokens_by_script
+) -> List[Tuple[str, int]]:
+    """
+    テキストをmax_tokens以下のウィンドウに分割
+
+    Args:
+        text: 分割するテキスト
+        max_tokens: 1ウィンドウあたりの最大トークン数
+        count_tokens: トークン数の計測関数（TokenEstimator.countなど）
+
+    Returns:
+        (ウィンドウのテキスト, トークン数) のリスト（テキストの先頭から順に並ぶ）
+
+    Examples:
+        >>> split_token_windows("aaaa bbbb cccc", max_tokens=10, count_tokens=len)
+        [('aaaa bbbb ', 10), ('cccc', 4)]
+
+    Notes:
+        - 1文字でmax_tokensを超える場合もその1文字を1ウィンドウとする
+        - 空白だけのウィンドウは含めない
+    """
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return [(text, total)]
+
+    windows = []
+    start = 0
+    chars_per_token = len(text) / max(total, 1)
+    while start < len(text):
+        target = max(int(max_tokens * chars_per_token), 1)
+        end = _find_cut(text, start, min(start + target, len(text)))
+        window = text[start:end]
+        tokens = count_tokens(window)
+        # 見積もりより多い場合は比率で縮める
+        while tokens > max_tokens and end - start > 1:
+            shrunk = start + max(int((end - start) * max_tokens / tokens * _SHRINK_MARGIN), 1)
+            end = _find_cut(text, start, shrunk)
+            window = text[start:end]
+            tokens = count_tokens(window)
+        if window.strip():
+            windows.append((window, tokens))
+        start = end
+    return windows
+
+
+def plan_token_windows(
+    text: str,
+    max_tokens: int,
+    count_tokens: Callable[[str], int] = estimate_tokens_by_script,
+    max_windows: int = DEFAULT_MAX_WINDOWS
+) -> List[Tuple[str, int]]:
+    """
+    大きすぎるテキストのエンコードに使うウィンドウを選ぶ
+
+    split_token_windowsで分割し、ウィンドウ数がmax_windowsを超える場合は
+    先頭・末尾を含めて等間隔に選ぶ（1セクションのエンコードはmax_windowsウィンドウ分まで）。
+
+    Args:
+        text: 対象のテキスト
+        max_tokens: 1ウィンドウあたりの最大トークン数
+        count_tokens: トークン数の計測関数
+        max_windows: 1セクションあたりの最大ウィンドウ数
+
+    Returns:
+        (ウィンドウのテキスト, トークン数) のリスト
+
+    Examples:
+        >>> windows = plan_token_windows("aaa bbb ccc ddd eee", max_tokens=4, count_tokens=len, max_windows=3)
+        >>> [window for window, _ in windows]
+        ['aaa ', 'ccc ', 'eee']
+    """
+    windows = split_token_windows(text, max_tokens, count_tokens)
+    if len(windows) <= max_windows:
+        return windows
+    if max_windows <= 1:
+        return windows[:1]
+    last = len(windows) - 1
+    return [windows[round(i * last / (max_windows - 1))] for i in range(max_windows)]
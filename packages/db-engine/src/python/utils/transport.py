@@ -0,0 +1,159 @@
+"""
+ワーカーのメッセージトランスポート
+
+DBEngine（TypeScript）とワーカー間のメッセージの読み書きを扱う。
+
+- json: 改行区切りのJSON（デフォルト・フォールバック）
+- msgpack: 4バイト長プレフィックス（ビッグエンディアン）付きのMessagePackフレーム
+  セクション本文のJSONエスケープ／アンエスケープが不要になり、
+  大きなgetSectionsByPath / getDirtySections / addSectionsのペイロードで両プロセスのCPUを削減する
+
+トランスポートは起動時に決定する。DBEngineが `--transport=msgpack` を指定した場合、
+ワーカーは採用したトランスポートをJSON行のハンドシェイク通知（`$/transport`）で返し、
+以降のメッセージはそのトランスポートで送受信する。msgpackが利用できない場合はjsonにフォールバックする。
+"""
+
+import json
+import struct
+import threading
+from typing import Any, BinaryIO, Optional
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+TRANSPORT_JSON = 'json'
+TRANSPORT_MSGPACK = 'msgpack'
+
+# ハンドシェイク通知のメソッド名
+HANDSHAKE_METHOD = '$/transport'
+
+# フレームヘッダ（ペイロード長: uint32 big-endian）
+_FRAME_HEADER = struct.Struct('>I')
+
+# 1フレームの最大サイズ（壊れたヘッダで巨大な領域を確保しないための上限）
+MAX_FRAME_BYTES = 1024 * 1024 * 1024
+
+
+def negotiate_transport(requested: Optional[str]) -> str:
+    """要求されたトランスポートから実際に使うトランスポートを決定
+
+    Args:
+        requested: 要求されたトランスポート（None / 'json' / 'msgpack'）
+
+    Returns:
+        採用するトランスポート名（msgpackが使えない場合は'json'）
+
+    Examples:
+        >>> negotiate_transport(None)
+        'json'
+        >>> negotiate_transport('unknown')
+        'json'
+    """
+    if requested == TRANSPORT_MSGPACK and MSGPACK_AVAILABLE:
+        return TRANSPORT_MSGPACK
+    return TRANSPORT_JSON
+
+
+def encode_frame(message: Any) -> bytes:
+    """メッセージをMessagePackフレーム（長さプレフィックス付き）にエンコード"""
+    payload = msgpack.packb(message, use_bin_type=True)
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+
+def encode_json_line(message: Any) -> bytes:
+    """メッセージをJSON行（UTF-8、改行終端）にエンコード"""
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+class MessageChannel:
+    """バイナリストリーム上のメッセージチャネル
+
+    読み込みは1スレッド（受信ループ）から、書き込みは複数のレーンから行われる前提で、
+    書き込みのみロックで排他する。
+    """
+
+    def __init__(self, rfile: BinaryIO, wfile: BinaryIO, transport: str = TRANSPORT_JSON):
+        """
+        Args:
+            rfile: 受信用のバイナリストリーム
+            wfile: 送信用のバイナリストリーム
+            transport: 初期トランスポート
+        """
+        self.rfile = rfile
+        self.wfile = wfile
+        self.transport = transport
+        self._write_lock = threading.Lock()
+
+    def send_handshake(self, transport: str) -> None:
+        """採用したトランスポートを通知し、以降の送受信を切り替える
+
+        ハンドシェイク自体は常にJSON行で送る（クライアントはまだトランスポートを知らないため）。
+        """
+        notification = {
+            "jsonrpc": "2.0",
+            "method": HANDSHAKE_METHOD,
+            "params": {"transport": transport},
+        }
+        with self._write_lock:
+            self.wfile.write(encode_json_line(notification))
+            self.wfile.flush()
+            self.transport = transport
+
+    def read_message(self) -> Any:
+        """次のメッセージを読み取る
+
+        Returns:
+            デコードされたメッセージ（dictまたはバッチのlist）
+
+        Raises:
+            EOFError: ストリームが閉じられた場合
+            ValueError: メッセージをデコードできない場合（ストリームは継続可能）
+        """
+        if self.transport == TRANSPORT_MSGPACK:
+            return self._read_frame()
+        return self._read_json_line()
+
+    def write_message(self, message: Any) -> None:
+        """メッセージを送信（スレッドセーフ）"""
+        if self.transport == TRANSPORT_MSGPACK:
+            data = encode_frame(message)
+        else:
+            data = encode_json_line(message)
+        with self._write_lock:
+            self.wfile.write(data)
+            self.wfile.flush()
+
+    def _read_json_line(self) -> Any:
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                raise EOFError()
+            if line.strip():
+                return json.loads(line.decode('utf-8'))
+
+    def _read_frame(self) -> Any:
+        header = self._read_exact(_FRAME_HEADER.size)
+        (length,) = _FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_BYTES:
+            # 同期が崩れたストリームは復旧できないため終了扱いにする
+            raise EOFError(f"Frame too large: {length} bytes")
+        payload = self._read_exact(length)
+        try:
+            return msgpack.unpackb(payload, raw=False)
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack frame: {e}") from e
+
+    def _read_exact(self, size: int) -> bytes:
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = self.rfile.read(remaining)
+            if not chunk:
+                raise EOFError()
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
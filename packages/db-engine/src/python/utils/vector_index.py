@@ -0,0 +1,245 @@
+"""
+sections.vectorのANNインデックスの作成・更新の判断
+
+ベクトルインデックスがない場合、search()は全セクションとの距離を計算する（フラットスキャン）ため、
+検索のレイテンシはセクション数に比例して増える。
+VectorIndexPolicyは書き込みの後にテーブルの行数とインデックスの状態を見て、次の処理を決める。
+
+- 作成: 行数がmin_rowsを超えたらIVF_PQ（またはIVF_HNSW_SQ）のインデックスを作成する
+- 追加: インデックスに入っていない行がupdate_rowsを超えたら、既存のパーティション（学習済みの重心）に追加する
+- 再学習: 学習時から行数がretrain_growth倍になったら、行数に合わせたパーティション数で作り直す
+
+追加だけではパーティションの数と重心が学習時のままになり、データが増えるとパーティションが偏って再現率が下がる。
+インデックスに入っていない行は検索時にフラットスキャンで補われるため、結果から漏れることはない。
+
+テーブルの行数とインデックスの状態の確認（count_rows / list_indices / index_stats）は書き込みのたびに
+行うと無駄が大きいため、書き込んだ行数から見積もりを更新し、判断が必要になった時だけ確認する（due）。
+"""
+
+import math
+import threading
+from typing import Any, Dict, Optional
+
+# IVF_PQ: パーティションごとにPQで圧縮する（メモリが少なく、refine_factorで精度を補う）
+INDEX_IVF_PQ = 'IVF_PQ'
+# IVF_HNSW_SQ: パーティションごとにHNSWグラフを作る（メモリは多いが、少ないnprobesで再現率が高い）
+INDEX_IVF_HNSW_SQ = 'IVF_HNSW_SQ'
+INDEX_TYPES = (INDEX_IVF_PQ, INDEX_IVF_HNSW_SQ)
+
+# これより少ない行数ではフラットスキャンで十分速い（256次元で数ミリ秒）
+DEFAULT_MIN_ROWS = 10000
+
+# インデックスに入っていない行がこれだけ溜まったら既存のインデックスに追加する
+DEFAULT_UPDATE_ROWS = 2000
+
+# 学習時からこの倍率まで行数が増えたら再学習する
+DEFAULT_RETRAIN_GROWTH = 2.0
+
+# 検索時のrefine_factorのデフォルト（圧縮したベクトルの距離で limit × N 件を選び、元のベクトルで並べ直す）
+# scripts/benchmark_vector_index.pyでrecall@10が0.9を超える値（10万件: IVF_PQ 0.92、IVF_HNSW_SQ 0.95）
+DEFAULT_REFINE_FACTORS = {
+    INDEX_IVF_PQ: 10,
+    INDEX_IVF_HNSW_SQ: 2,
+}
+
+# IVF_HNSW_SQの1パーティションあたりの行数の目安（HNSWはパーティションが大きくても速い）
+_HNSW_PARTITION_ROWS = 100000
+
+# PQの1サブベクトルあたりの次元数の候補（小さいほど精度が高く、インデックスが大きい）
+_PQ_SUB_DIMENSIONS = (8, 16, 4, 2, 1)
+
+# 判断の結果
+ACTION_CREATE = 'create'
+ACTION_UPDATE = 'update'
+ACTION_RETRAIN = 'retrain'
+
+
+def index_params(index_type: str, rows: int, dimension: int) -> Dict[str, int]:
+    """
+    行数と次元数からインデックスのパラメータを決める
+
+    - IVF_PQ: パーティション数は√行数、サブベクトルは8次元ずつ
+    - IVF_HNSW_SQ: パーティション数は10万行に1つ
+
+    Examples:
+        >>> index_params('IVF_PQ', 100000, 256)
+        {'num_partitions': 316, 'num_sub_vectors': 32}
+        >>> index_params('IVF_HNSW_SQ', 100000, 256)
+        {'num_partitions': 1}
+    """
+    if index_type == INDEX_IVF_HNSW_SQ:
+        return {'num_partitions': max(1, rows // _HNSW_PARTITION_ROWS)}
+    sub_dimension = next(d for d in _PQ_SUB_DIMENSIONS if dimension % d == 0)
+    return {
+        'num_partitions': max(1, int(math.sqrt(rows))),
+        'num_sub_vectors': dimension // sub_dimension,
+    }
+
+
+def build_vector_index(table, index_type: str, rows: int, dimension: int, column: str = 'vector') -> None:
+    """
+    ベクトルインデックスを作成する（既存のインデックスは置き換える）
+
+    距離はL2（検索の既定と同じ。ベクトルは正規化済みなので順位はコサイン類似度と一致する）
+
+    Args:
+        table: LanceDBのテーブル
+        index_type: インデックスの種類
+        rows: 学習に使う行数（パラメータの決定用）
+        dimension: ベクトルの次元数
+        column: ベクトルの列名
+    """
+    table.create_index(
+        metric='l2',
+        vector_column_name=column,
+        index_type=index_type,
+        replace=True,
+        **index_params(index_type, rows, dimension),
+    )
+
+
+class VectorIndexPolicy:
+    """
+    テーブルの行数とインデックスの状態から、ベクトルインデックスの作成・追加・再学習を決める
+
+    Examples:
+        >>> policy = VectorIndexPolicy(min_rows=10000)
+        >>> policy.plan(total_rows=5000, indexed_rows=None, unindexed_rows=5000) is None
+        True
+        >>> policy.plan(total_rows=12000, indexed_rows=None, unindexed_rows=12000)
+        'create'
+        >>> policy.record(ACTION_CREATE, rows=12000, seconds=3.2)
+        >>> policy.record_write(500)
+        >>> policy.due()
+        False
+    """
+
+    def __init__(
+        self,
+        min_rows: int = DEFAULT_MIN_ROWS,
+        index_type: str = INDEX_IVF_PQ,
+        update_rows: int = DEFAULT_UPDATE_ROWS,
+        retrain_growth: float = DEFAULT_RETRAIN_GROWTH
+    ):
+        """
+        Args:
+            min_rows: インデックスを作成する行数（0以下の場合はインデックスを作成しない）
+            index_type: インデックスの種類（'IVF_PQ' | 'IVF_HNSW_SQ'）
+            update_rows: 既存のインデックスに追加する、インデックスに入っていない行数
+            retrain_growth: 再学習する、学習時からの行数の倍率
+        """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"unsupported vector index type: {index_type}")
+        self.min_rows = min_rows
+        self.index_type = index_type
+        self.update_rows = max(1, update_rows)
+        self.retrain_growth = max(1.0, retrain_growth)
+
+        self._lock = threading.Lock()
+        # 学習時の行数（起動前からあるインデックスはインデックス済みの行数で代用する）
+        self._trained_rows: Optional[int] = None
+        # テーブルの行数の見積もり（planで実際の値に合わせ、record_writeで増減する。Noneは未確認）
+        self._total_rows: Optional[int] = None
+
+        self.builds = 0
+        self.updates = 0
+        self.seconds = 0.0
+        self.indexed_rows: Optional[int] = None
+        self.unindexed_rows: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.min_rows > 0
+
+    def record_write(self, written_rows: int, row_delta: Optional[int] = None) -> None:
+        """
+        書き込んだ行数を見積もりに反映する
+
+        Args:
+            written_rows: 書き込んだ行数（追加・更新した行はインデックスに入っていない）
+            row_delta: テーブルの行数の増減（デフォルト: written_rows）
+        """
+        with self._lock:
+            if self._total_rows is not None:
+                self._total_rows = max(0, self._total_rows + (written_rows if row_delta is None else row_delta))
+            if self.unindexed_rows is not None:
+                self.unindexed_rows += written_rows
+
+    def due(self) -> bool:
+        """
+        テーブルの行数とインデックスの状態を確認して判断する必要があるか
+
+        見積もりがしきい値に届かない間はFalse。削除による行数の減少は見積もりに含めないため、
+        見積もりは実際より多くなることがあるが、その場合は確認（plan）で実際の値に合わせる。
+        """
+        with self._lock:
+            if not self.enabled:
+                return False
+            if self._total_rows is None:
+                return True
+            if self.indexed_rows is None:
+                return self._total_rows >= self.min_rows
+            if self._total_rows >= max(self._trained_rows or 0, 1) * self.retrain_growth:
+                return True
+            return (self.unindexed_rows or 0) >= self.update_rows
+
+    def plan(self, total_rows: int, indexed_rows: Optional[int], unindexed_rows: int) -> Optional[str]:
+        """
+        必要な処理を決める
+
+        Args:
+            total_rows: テーブルの行数
+            indexed_rows: インデックス済みの行数（インデックスがない場合はNone）
+            unindexed_rows: インデックスに入っていない行数
+
+        Returns:
+            'create' | 'update' | 'retrain'、何もしない場合はNone
+        """
+        with self._lock:
+            self._total_rows = total_rows
+            self.indexed_rows = indexed_rows
+            self.unindexed_rows = unindexed_rows
+            if not self.enabled:
+                return None
+            if indexed_rows is None:
+                return ACTION_CREATE if total_rows >= self.min_rows else None
+            if self._trained_rows is None:
+                self._trained_rows = indexed_rows
+            if total_rows >= max(self._trained_rows, 1) * self.retrain_growth:
+                return ACTION_RETRAIN
+            if unindexed_rows >= self.update_rows:
+                return ACTION_UPDATE
+            return None
+
+    def record(self, action: str, rows: int, seconds: float) -> None:
+        """
+        実行した処理を記録する
+
+        Args:
+            action: 実行した処理
+            rows: 処理後のインデックス済みの行数
+            seconds: 処理時間
+        """
+        with self._lock:
+            if action == ACTION_UPDATE:
+                self.updates += 1
+            else:
+                self.builds += 1
+                self._trained_rows = rows
+            self.indexed_rows = rows
+            self.unindexed_rows = 0
+            self.seconds += seconds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """インデックスの種類・行数と、作成・追加の回数と時間"""
+        with self._lock:
+            return {
+                'indexType': self.index_type if self.enabled else None,
+                'minRows': self.min_rows,
+                'indexedRows': self.indexed_rows,
+                'unindexedRows': self.unindexed_rows,
+                'trainedRows': self._trained_rows,
+                'builds': self.builds,
+                'updates': self.updates,
+                'indexSeconds': round(self.seconds, 3),
+            }
@@ -0,0 +1,224 @@
+"""
+エンコードと書き込みのパイプライン
+
+add_sectionsはエンコードのバッチが全て終わってからtable.addで書き込んでいたため、
+推論中はディスクが、書き込み中はCPUが遊んでいた。
+エンコードが終わった行を書き込みスレッドに渡し、次のバッチのエンコードと並行して書き込む。
+
+- RowCompletion: バッチの完了ごとに書き込める行（セクション）を求める
+  （ウィンドウに分割したセクションは全ウィンドウが揃った時点で書き込める）
+- PipelinedWriter: 書き込める行をflush_rows行ずつ書き込みスレッドで書き込む。
+  書き込み待ちはmax_pendingチャンクまで（超えるとエンコード側が待つ）
+- StageTimings: ステージ（エンコード・書き込み・書き込み待ち）ごとの累計時間
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 1回のtable.addで書き込む行数の目安（小さすぎるとLanceのフラグメントとバージョンが増える）
+DEFAULT_FLUSH_ROWS = 512
+
+# 書き込みスレッドに渡せる未処理のチャンク数
+DEFAULT_MAX_PENDING = 2
+
+
+class RowCompletion:
+    """
+    エンコードが完了した行から、書き込めるセクションの行を求める
+
+    Examples:
+        >>> completion = RowCompletion(num_sections=3, windowed={2: ([3, 4], [100, 80])})
+        >>> completion.complete([0, 3])
+        [0]
+        >>> completion.complete([1, 4])
+        [1, 2]
+    """
+
+    def __init__(self, num_sections: int, windowed: Dict[int, Tuple[List[int], List[int]]]):
+        """
+        Args:
+            num_sections: セクション数（0〜num_sections-1がセクションの行、それ以降はウィンドウの行）
+            windowed: セクションの行 -> (ウィンドウの行リスト, 各ウィンドウのトークン数リスト)
+        """
+        self.num_sections = num_sections
+        self._done = bytearray(num_sections)
+        self._window_owner = {row: idx for idx, (rows, _) in windowed.items() for row in rows}
+        self._windows_left = {idx: set(rows) for idx, (rows, _) in windowed.items()}
+
+    def complete(self, rows: Iterable[int]) -> List[int]:
+        """
+        エンコードが完了した行を記録
+
+        Args:
+            rows: 完了した行（セクションの行・ウィンドウの行）
+
+        Returns:
+            新たに書き込めるようになったセクションの行（同じ行は2度返さない）
+        """
+        ready = []
+        for row in rows:
+            row = int(row)
+            if row >= self.num_sections:
+                owner = self._window_owner[row]
+                left = self._windows_left[owner]
+                left.discard(row)
+                if left:
+                    continue
+                row = owner
+            elif row in self._windows_left:
+                # ウィンドウに分割したセクションはウィンドウが揃うまで書き込まない
+                continue
+            if not self._done[row]:
+                self._done[row] = 1
+                ready.append(row)
+        return ready
+
+    @property
+    def pending(self) -> int:
+        """まだ書き込めないセクション数"""
+        return self.num_sections - sum(self._done)
+
+
+class StageTimings:
+    """ステージごとの累計時間（秒）と呼び出し回数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.encode_seconds = 0.0
+        self.write_seconds = 0.0
+        self.write_wait_seconds = 0.0
+        self.writes = 0
+        self.calls = 0
+
+    def record(self, encode: float, write: float, write_wait: float, writes: int) -> None:
+        with self._lock:
+            self.encode_seconds += encode
+            self.write_seconds += write
+            self.write_wait_seconds += write_wait
+            self.writes += writes
+            self.calls += 1
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'writes': self.writes,
+                'encodeSeconds': round(self.encode_seconds, 3),
+                'writeSeconds': round(self.write_seconds, 3),
+                'writeWaitSeconds': round(self.write_wait_seconds, 3),
+            }
+
+
+class PipelinedWriter:
+    """
+    書き込める行を別スレッドで書き込む
+
+    Examples:
+        >>> writer = PipelinedWriter(lambda rows: table.add(build(rows)), flush_rows=512)
+        >>> writer.submit([0, 1, 2])
+        >>> writer.close()  # 残りの行を書き込み、書き込みスレッドの終了を待つ
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[int]], None],
+        flush_rows: int = DEFAULT_FLUSH_ROWS,
+        max_pending: int = DEFAULT_MAX_PENDING
+    ):
+        """
+        Args:
+            write: 行番号のリストを受け取って書き込む関数（書き込みスレッドで呼ばれる）
+            flush_rows: この行数がたまったら書き込みスレッドに渡す
+            max_pending: 書き込みスレッドに渡せる未処理のチャンク数
+        """
+        self._write = write
+        self.flush_rows = max(1, flush_rows)
+        self._queue: "queue.Queue[Optional[List[int]]]" = queue.Queue(maxsize=max(1, max_pending))
+        self._buffer: List[int] = []
+        self._error: Optional[BaseException] = None
+        self._aborted = False
+        self._closed = False
+
+        self.written_rows: List[int] = []
+        self.writes = 0
+        self.write_seconds = 0.0
+        # エンコード側が書き込みスレッドの空きを待った時間
+        self.wait_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='section-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            # 失敗・中断後は残りのチャンクを読み捨てる（エンコード側を待たせない）
+            if self._error is not None or self._aborted:
+                continue
+            start = time.perf_counter()
+            try:
+                self._write(chunk)
+                self.written_rows.extend(chunk)
+                self.writes += 1
+            except BaseException as e:
+                self._error = e
+            finally:
+                self.write_seconds += time.perf_counter() - start
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, chunk: List[int]) -> None:
+        start = time.perf_counter()
+        self._queue.put(sorted(chunk))
+        self.wait_seconds += time.perf_counter() - start
+
+    def submit(self, rows: Iterable[int]) -> None:
+        """
+        書き込める行を追加（flush_rows行たまったら書き込みスレッドに渡す）
+
+        Raises:
+            書き込みスレッドで発生した例外
+        """
+        self._raise_if_failed()
+        self._buffer.extend(rows)
+        while len(self._buffer) >= self.flush_rows:
+            chunk, self._buffer = self._buffer[:self.flush_rows], self._buffer[self.flush_rows:]
+            self._put(chunk)
+
+    def close(self) -> None:
+        """
+        残りの行を書き込み、書き込みスレッドの終了を待つ
+
+        Raises:
+            書き込みスレッドで発生した例外
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._buffer and self._error is None:
+            self._put(self._buffer)
+            self._buffer = []
+        self._queue.put(None)
+        self._thread.join()
+        self._release()
+        self._raise_if_failed()
+
+    def abort(self) -> None:
+        """書き込みを中断し、書き込み中のチャンクの完了を待つ（書き込み済みの行はwritten_rowsに残る）"""
+        if self._closed:
+            return
+        self._closed = True
+        self._aborted = True
+        self._buffer = []
+        self._queue.put(None)
+        self._thread.join()
+        self._release()
+
+    def _release(self) -> None:
+        """書き込みスレッドの終了後、書き込み関数（が参照するバッファ）を手放す"""
+        self._write = None
@@ -5,45 +5,81 @@ search-docs LanceDB JSON-RPC Worker
 """
 
 import os
+import signal
 import sys
-import io
 import json
 import traceback
 import uuid
-import gc
 import time
+
+# 起動時間の計測基準（重いモジュールのインポート前）
+_PROCESS_START = time.perf_counter()
+
+# --profile-imports: モジュールごとのインポート時間を計測（重いモジュールより先にフックする）
+from utils.lazy_import import ImportProfiler, lazy_import, is_available
+_import_profiler = ImportProfiler().install() if '--profile-imports' in sys.argv[1:] else None
+
 import threading
 import copy
-from typing import Any, Dict, Optional, List, Tuple
-from datetime import datetime, timedelta
+import functools
+from typing import Any, Callable, Dict, Optional, List, Tuple
+from datetime import datetime, timedelta, timezone
 import lancedb
 import pyarrow as pa
-import pandas as pd
 import numpy as np
-import duckdb
 from pathlib import Path
 
+# 最初の応答に不要な重いモジュールは、最初に使う時点でインポートする
+pd = lazy_import('pandas')
+duckdb = lazy_import('duckdb')
+
 # PyTorch（MPSキャッシュクリア用）
-try:
-    import torch
-    TORCH_AVAILABLE = torch.backends.mps.is_available() if hasattr(torch.backends, 'mps') else False
-except ImportError:
-    TORCH_AVAILABLE = False
+# torchはモデルのロード時（sentence_transformers）にインポートされるため、ここではインポートしない
+_mps_available: Optional[bool] = None
+
+
+def _torch_mps_available() -> bool:
+    """MPSが利用可能か（torchがインポート済みの場合のみ確認する）"""
+    global _mps_available
+    if _mps_available is None:
+        torch = sys.modules.get('torch')
+        if torch is None:
+            # モデル未ロードならGPUキャッシュもない
+            return False
+        _mps_available = hasattr(torch.backends, 'mps') and torch.backends.mps.is_available()
+        if _mps_available:
+            sys.stderr.write("[MemoryOptimization] PyTorch MPS available, will clear cache after batches\n")
+            sys.stderr.flush()
+    return _mps_available
+
 
 # パフォーマンス監視用
-try:
-    import psutil
-    PSUTIL_AVAILABLE = True
-except ImportError:
-    PSUTIL_AVAILABLE = False
+PSUTIL_AVAILABLE = is_available('psutil')
+if PSUTIL_AVAILABLE:
+    psutil = lazy_import('psutil')
+else:
     sys.stderr.write("[WARNING] psutil not available, performance logging disabled\n")
 
+
+def _get_num_threads_arg() -> int:
+    """コマンドライン引数から推論のスレッド数を取得（--num-threads=N、デフォルト: 4）"""
+    for arg in sys.argv[1:]:
+        if arg.startswith('--num-threads='):
+            try:
+                return max(1, int(arg.split('=', 1)[1]))
+            except ValueError:
+                pass
+    return 4
+
+
 # スレッド数を制限（メモリ使用量削減）
-# PyTorch/Transformers/NumPyのスレッドプールを制限
-os.environ['OMP_NUM_THREADS'] = '4'
-os.environ['MKL_NUM_THREADS'] = '4'
-os.environ['NUMEXPR_NUM_THREADS'] = '4'
-os.environ['OPENBLAS_NUM_THREADS'] = '4'
+# PyTorch/Transformers/NumPyのスレッドプールを制限（torchのインポート前に設定する）
+# ONNX Runtimeバックエンドのスレッド数にも同じ値を使う
+NUM_THREADS = _get_num_threads_arg()
+os.environ['OMP_NUM_THREADS'] = str(NUM_THREADS)
+os.environ['MKL_NUM_THREADS'] = str(NUM_THREADS)
+os.environ['NUMEXPR_NUM_THREADS'] = str(NUM_THREADS)
+os.environ['OPENBLAS_NUM_THREADS'] = str(NUM_THREADS)
 
 # TOKENIZERS_PARALLELISMの設定を確認（メモリリーク対策）
 tokenizers_parallelism = os.getenv('TOKENIZERS_PARALLELISM', 'not set')
@@ -54,20 +90,86 @@ sys.stderr.write(f"[DBEngine] TOKENIZERS_PARALLELISM={tokenizers_parallelism}\n"
 pa.set_memory_pool(pa.system_memory_pool())
 
 # 埋め込みモデルをインポート
-from embedding import create_embedding_model
+from embedding import create_embedding_model, pool_embeddings, BACKEND_TORCH
 # スキーマ定義をインポート
 from schemas import (
     get_sections_schema,
     get_index_requests_schema,
     SECTIONS_TABLE,
     INDEX_REQUESTS_TABLE,
-    validate_section,
     validate_index_request
 )
 # ユーティリティをインポート
-from utils.token_utils import estimate_tokens, estimate_total_tokens
-from utils.batch_utils import create_token_aware_batches, get_batch_stats
+from utils.token_utils import TokenEstimator
+from utils.batch_utils import create_length_bucketed_batches, get_batch_stats
+from utils.token_windows import plan_token_windows
+from utils.encode_pool import EncodePool, EncodePoolError, auto_pool_size
+from utils.adaptive_batch import AdaptiveBatchController
+from utils.gc_policy import GcPolicy, DEFAULT_ARROW_THRESHOLD_MB, DEFAULT_EVERY_MB
+from utils.write_pipeline import DEFAULT_FLUSH_ROWS, PipelinedWriter, RowCompletion, StageTimings
+from utils.vector_index import (
+    ACTION_CREATE,
+    ACTION_UPDATE,
+    DEFAULT_UPDATE_ROWS,
+    DEFAULT_MIN_ROWS as DEFAULT_VECTOR_INDEX_MIN_ROWS,
+    DEFAULT_REFINE_FACTORS,
+    INDEX_IVF_PQ,
+    INDEX_TYPES,
+    VectorIndexPolicy,
+    build_vector_index,
+)
 from utils.section_filter import filter_sections_by_token_limit, get_texts_to_encode
+from utils.request_dispatcher import RequestDispatcher, READ_LANE, WRITE_LANE
+from utils.transport import MessageChannel, negotiate_transport
+from utils.cancellation import CancellationRegistry, RequestCancelledError, CANCEL_METHOD
+from utils.socket_server import WorkerSocketServer, parse_listen_address
+from utils.startup import StartupPhases, PhaseNotReadyError
+from utils.embedding_cache import open_embedding_cache, DEFAULT_MAX_ENTRIES
+from utils.arrow_ingest import sections_to_arrow, with_vector_column
+from utils.rank_fusion import reciprocal_rank_fusion
+from utils.section_reuse import match_unchanged_sections, remap_section_ids
+from utils.inflight_paths import InflightPaths, INFLIGHT_STATUSES
+from utils.request_retention import (
+    DEFAULT_PURGE_INTERVAL_SECONDS,
+    DEFAULT_RETENTION_DAYS,
+    TERMINAL_STATUSES,
+    PeriodicTask,
+    RequestRetentionPolicy,
+    directory_size,
+)
+from utils.query_cache import (
+    QueryVectorCache,
+    normalize_query,
+    DEFAULT_QUERY_CACHE_SIZE,
+    DEFAULT_QUERY_CACHE_TTL,
+)
+
+# インポート完了時刻（起動フェーズ 'imports' の終点）
+_IMPORTS_DONE = time.perf_counter()
+
+# バックグラウンドで実行する起動フェーズ
+MODEL_PHASE = 'model'
+# スカラーインデックス（書き込み系のリクエストが完了を待つ）
+INDEXES_PHASE = 'indexes'
+# 全文検索インデックスの作成（完了を待つ処理はなく、作成中の全文検索はベクトル検索に切り替える・再試行を求める）
+FTS_INDEX_PHASE = 'fts_index'
+# 既存のテーブルのベクトルインデックスの作成・再学習（時間がかかるため、完了を待つ処理はない）
+VECTOR_INDEX_PHASE = 'vector_index'
+
+# 検索方法（search / searchBatchのmode）
+SEARCH_MODE_VECTOR = 'vector'
+SEARCH_MODE_FTS = 'fts'
+SEARCH_MODE_HYBRID = 'hybrid'
+SEARCH_MODES = (SEARCH_MODE_VECTOR, SEARCH_MODE_FTS, SEARCH_MODE_HYBRID)
+
+# ハイブリッド検索で、統合前にそれぞれの検索から取る件数（limitの倍率）
+HYBRID_CANDIDATE_FACTOR = 3
+
+# 全文検索インデックスを作成する列
+# 日本語は空白で語が区切られないため、文字のn-gram（2〜3文字）で分割する（識別子も部分一致する）
+FTS_COLUMNS = ('heading', 'content')
+FTS_NGRAM_MIN_LENGTH = 2
+FTS_NGRAM_MAX_LENGTH = 3
 
 
 class PerformanceLogger:
@@ -82,7 +184,7 @@ class PerformanceLogger:
         self.start_time = time.time()
         self.running = False
         self.thread = None
-        self.process = psutil.Process() if PSUTIL_AVAILABLE else None
+        self.process = None  # ログスレッドで生成（psutilのインポートを起動時に行わない）
 
         # メソッド呼び出しカウンタ
         self.method_calls = {
@@ -99,6 +201,29 @@ class PerformanceLogger:
         self.requests_processing = 0
         self.requests_pending = 0
 
+        # レーン別キュー深さの取得元（main()で設定される）
+        self.dispatcher = None
+        # キャンセル・破棄件数の取得元
+        self.cancellation = None
+        # 埋め込みキャッシュのヒット・ミス件数の取得元
+        self.embedding_cache = None
+        # クエリベクトルキャッシュのヒット・ミス件数の取得元
+        self.query_cache = None
+        # add_sectionsのステージ別時間の取得元
+        self.stage_timings = None
+        # バッチのトークン数の自動調整の取得元
+        self.batch_controller = None
+        # GCの実行回数・時間の取得元
+        self.gc_policy = None
+
+    def sample_rss_mb(self) -> Optional[float]:
+        """現在のRSS（MB）を計測（psutilが使えない場合はNone）"""
+        if not PSUTIL_AVAILABLE:
+            return None
+        if self.process is None:
+            self.process = psutil.Process()
+        return self.process.memory_info().rss / 1024 / 1024
+
     def increment_call(self, method_name: str):
         """メソッド呼び出しをカウント"""
         if method_name in self.method_calls:
@@ -123,6 +248,7 @@ class PerformanceLogger:
 
     def _log_loop(self):
         """ログ出力ループ"""
+        self.process = psutil.Process()
         while self.running:
             try:
                 self._output_log()
@@ -155,6 +281,20 @@ class PerformanceLogger:
                     'pending': self.requests_pending,
                 }
             }
+            if self.dispatcher is not None:
+                log_data['lanes'] = self.dispatcher.get_stats()
+            if self.cancellation is not None:
+                log_data['cancellation'] = self.cancellation.get_stats()
+            if self.embedding_cache is not None:
+                log_data['embedding_cache'] = self.embedding_cache.get_stats()
+            if self.query_cache is not None:
+                log_data['query_cache'] = self.query_cache.get_stats()
+            if self.stage_timings is not None:
+                log_data['pipeline'] = self.stage_timings.get_stats()
+            if self.batch_controller is not None:
+                log_data['adaptive_batch'] = self.batch_controller.get_stats()
+            if self.gc_policy is not None:
+                log_data['gc'] = self.gc_policy.get_stats()
 
             # stderrにJSON形式で出力
             json_str = json.dumps(log_data)
@@ -167,38 +307,173 @@ class PerformanceLogger:
 
 
 class SearchDocsWorker:
-    def __init__(self, db_path: str = "./.search-docs/index"):
-        """search-docs LanceDBワーカーの初期化"""
-        Path(db_path).mkdir(parents=True, exist_ok=True)
-        self.db = lancedb.connect(db_path)
+    # 読み取りレーンで処理するメソッド（検索・メタデータ参照）
+    # それ以外（addSections、削除、IndexRequest更新など）は書き込みレーンで処理する
+    READ_METHODS = frozenset([
+        'ping',
+        'search',
+        'searchBatch',
+        'getSectionsByPath',
+        'getSectionById',
+        'findSectionsByPathAndHash',
+        'getDirtySections',
+        'getStats',
+        'findIndexRequests',
+        'countIndexRequests',
+        'getPathsWithStatus',
+    ])
+
+    def __init__(self, db_path: str = "./.search-docs/index", background_startup: bool = False):
+        """search-docs LanceDBワーカーの初期化
 
-        # MPS情報をログ出力
-        if TORCH_AVAILABLE:
-            sys.stderr.write("[MemoryOptimization] PyTorch MPS available, will clear cache after batches\n")
-            sys.stderr.flush()
+        Args:
+            db_path: データベースパス
+            background_startup: Trueの場合、モデルロード・スカラーインデックス構築・全文検索インデックスの作成・ベクトルインデックスの確認を
+                バックグラウンドで実行する（pingやメタデータ参照はすぐに応答し、必要な処理だけが完了を待つ）
+        """
+        # 起動フェーズの追跡（pingで進捗と所要時間を返す）
+        self.startup = StartupPhases(origin=_PROCESS_START)
+        self.startup.record('imports', _PROCESS_START, _IMPORTS_DONE)
+
+        with self.startup.phase('connect'):
+            Path(db_path).mkdir(parents=True, exist_ok=True)
+            self.db = lancedb.connect(db_path)
 
         # モデルを初期化（まだロードしない）
         model_name = self._get_model_name()
-        self.embedding_model = create_embedding_model(model_name)
+        self.embedding_model = create_embedding_model(
+            model_name, backend=self._get_embedding_backend(), num_threads=NUM_THREADS
+        )
+        # キャッシュのキーに使うモデル名（バックエンドを含む）
+        self.model_key = getattr(self.embedding_model, 'cache_key', model_name)
         self.vector_dimension = self.embedding_model.dimension if hasattr(self.embedding_model, 'dimension') else 256
-        self.init_tables()
+
+        # 埋め込みベクトルのキャッシュ（変更のないセクションを再エンコードしない）
+        self.embedding_cache = open_embedding_cache(
+            db_path, self.model_key, self.vector_dimension, self._get_embedding_cache_size()
+        )
+
+        # 検索クエリのベクトルキャッシュ（同じクエリはモデルを通さない）
+        query_cache_size, query_cache_ttl = self._get_query_cache_args()
+        self.query_cache = QueryVectorCache(max_entries=query_cache_size, ttl_seconds=query_cache_ttl)
+
+        with self.startup.phase('tables'):
+            self.init_tables()
 
         # 設定値を取得
         self.max_batch_tokens = self._get_max_batch_tokens()
 
+        # バッチのトークン数の自動調整（--min-batch-tokens指定時、max_batch_tokensまでの範囲で動かす）
+        # 大きすぎるセクションのウィンドウ分割は予算によらずmax_batch_tokensで行う（ベクトルが予算で変わらない）
+        min_batch_tokens, batch_memory_limit_mb = self._get_adaptive_batch_args()
+        self.batch_controller = None
+        if min_batch_tokens is not None and min_batch_tokens < self.max_batch_tokens:
+            self.batch_controller = AdaptiveBatchController(
+                min_batch_tokens, self.max_batch_tokens, batch_memory_limit_mb
+            )
+
+        # マルチプロセスのエンコードプール（--encode-processes、最初に使う時に起動する）
+        self.encode_processes = self._get_encode_processes_arg()
+        self.encode_pool = None
+
+        # add_sectionsのステージ（エンコード・書き込み・書き込み待ち）ごとの累計時間
+        # エンコードの完了した行はwrite_flush_rows行ずつ書き込みスレッドで書き込む
+        self.stage_timings = StageTimings()
+        self.write_flush_rows = DEFAULT_FLUSH_ROWS
+
+        # sections.vectorのANNインデックス（行数がしきい値を超えたら作成し、増えたら追加・再学習する）
+        # 検索のnprobes / refineFactorのデフォルト（nprobesがNoneの場合はLanceDBのデフォルト）
+        vector_index_min_rows, vector_index_type, self.nprobes, self.refine_factor = self._get_vector_index_args()
+        self.vector_index_policy = VectorIndexPolicy(vector_index_min_rows, vector_index_type)
+
+        # heading / contentの全文検索インデックス
+        # _fts_ready: 両方の列のインデックスがある（作成前は全文検索を待たずに打ち切る）
+        # _fts_unindexed_rows: インデックスに入っていない行数の見積もり（しきい値に届くまでテーブルを確認しない）
+        self._background_startup = background_startup
+        self._fts_ready = False
+        self._fts_unindexed_rows = 0
+
+        # index_requestsの保持期間（終了済みの古いリクエストを削除し、コンパクションする）
+        # 定期削除はmain()でrequest_purge_interval秒ごとに書き込みレーンに積む
+        request_retention_days, self.request_purge_interval = self._get_request_retention_args()
+        self.request_retention = RequestRetentionPolicy(request_retention_days)
+
         # テーブルハンドルのキャッシュ（メモリリーク対策）
         # 参考: https://lancedb.github.io/lancedb/python/python/
         # "table = db.open_table() should be called once and used for all subsequent table operations"
         self._sections_table = None
         self._index_requests_table = None
 
+        # インデックス中（pending / processing）のパスの集合（最初に使う時にindex_requestsから読み込み、
+        # 以降はIndexRequestの作成・更新で差分更新する）
+        self.inflight_paths = InflightPaths()
+        self._inflight_lock = threading.Lock()
+
+        # レーン間で共有するリソースのロック
+        # - _table_lock: テーブルハンドルの遅延オープン
+        # - _model_lock: モデルの遅延ロード
+        # - _encode_lock: エンコード・トークン数の計測の呼び出し（HF tokenizerはスレッド間で同時に使えないため）
+        #   add_sectionsはバッチ単位でロックを取るので、検索の待ちは最大1バッチ分
+        # - _index_maintenance_lock: ベクトル・全文検索インデックスの作成・更新（起動フェーズと書き込みレーンで重ねない）
+        self._table_lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self._index_maintenance_lock = threading.Lock()
+
+        # トークン数の計測（モデルのロード後はモデルと共有のトークナイザで数える）
+        self.token_estimator = TokenEstimator(self._get_tokenizer, tokenizer_lock=self._encode_lock)
+
+        # リクエストディスパッチャ（main()で設定される）
+        self.dispatcher: Optional[RequestDispatcher] = None
+
+        # モデルのロード中に受信した、埋め込みモデルを使う読み取りリクエスト（submit_messageで保留する）
+        # 読み取りレーンのスレッドがモデルのロードを待つと、後続のping・メタデータ参照も待たされるため、
+        # ロードが終わるまでレーンに積まない。Noneの場合は保留しない（ロード済み、または同期起動）
+        self._deferred_submits: Optional[List[Callable[[], None]]] = [] if background_startup else None
+        self._deferred_lock = threading.Lock()
+
+        # キャンセル通知・期限の管理（処理中リクエストのトークンはスレッドごとに保持）
+        self.cancellation = CancellationRegistry()
+        self._request_context = threading.local()
+
         # メモリ管理用カウンタ
         self._add_count = 0  # add_sections()の呼び出し回数
 
         # パフォーマンスロガー
         self.perf_logger = PerformanceLogger(interval=1.0)
+        self.perf_logger.cancellation = self.cancellation
+        self.perf_logger.embedding_cache = self.embedding_cache
+        self.perf_logger.query_cache = self.query_cache
+        self.perf_logger.stage_timings = self.stage_timings
+        self.perf_logger.batch_controller = self.batch_controller
+
+        # GCはバッチ・呼び出しの区切りで、メモリ使用量がしきい値を超えた場合だけ実行する
+        gc_every_mb, gc_rss_threshold_mb, gc_arrow_threshold_mb = self._get_gc_args()
+        self.gc_policy = GcPolicy(
+            rss_mb=self.perf_logger.sample_rss_mb,
+            arrow_mb=lambda: pa.total_allocated_bytes() / 1024 / 1024,
+            rss_threshold_mb=gc_rss_threshold_mb,
+            arrow_threshold_mb=gc_arrow_threshold_mb,
+            every_mb=gc_every_mb,
+            # パフォーマンスロガーのスレッドから参照されるため、ワーカー自体は参照させない
+            on_collect=[self.clear_gpu_cache],
+        )
+        self.perf_logger.gc_policy = self.gc_policy
         self.perf_logger.start()
 
+        # 時間のかかるフェーズ（ロック類の初期化後に開始する）
+        if background_startup:
+            self.startup.run_in_background(MODEL_PHASE, self._load_model_in_background)
+            self.startup.run_in_background(INDEXES_PHASE, self.build_scalar_indexes)
+            self.startup.run_in_background(FTS_INDEX_PHASE, self._update_fts_indexes_at_startup)
+            self.startup.run_in_background(VECTOR_INDEX_PHASE, self._update_vector_index_at_startup)
+        else:
+            with self.startup.phase(INDEXES_PHASE):
+                self.build_scalar_indexes()
+            # モデルは従来通り最初に必要になった時点でロードする
+            # 全文検索インデックスは最初の書き込みまたは全文検索の時点で作成する
+            # ベクトルインデックスは最初の書き込みの後に確認する（行数の見積もりがないため必ず確認される）
+
     def log_thread_info(self, label: str):
         """スレッド情報をログ出力（デバッグ用）"""
         # DEBUGモードでのみ有効
@@ -224,11 +499,12 @@ class SearchDocsWorker:
 
         sys.stderr.flush()
 
-    def clear_gpu_cache(self):
+    @staticmethod
+    def clear_gpu_cache():
         """GPU（MPS）キャッシュをクリア"""
-        if TORCH_AVAILABLE:
+        if _torch_mps_available():
             try:
-                torch.mps.empty_cache()
+                sys.modules['torch'].mps.empty_cache()
                 # sys.stderr.write("[MemoryOptimization] MPS cache cleared\n")
                 # sys.stderr.flush()
             except Exception as e:
@@ -254,6 +530,41 @@ class SearchDocsWorker:
 
         return model_name
 
+    @staticmethod
+    def _get_embedding_backend() -> str:
+        """コマンドライン引数から推論バックエンドを取得
+
+        --embedding-backend=torch|onnx|onnx-int8（デフォルト: torch）
+
+        Returns:
+            バックエンド名
+        """
+        for arg in sys.argv[1:]:
+            if arg.startswith('--embedding-backend='):
+                return arg.split('=', 1)[1]
+        return BACKEND_TORCH
+
+    @staticmethod
+    def _get_encode_processes_arg() -> int:
+        """コマンドライン引数からエンコードプールのプロセス数を取得
+
+        --encode-processes=N（0または1でプールを使わない、デフォルト: 0）
+        --encode-processes=auto で「利用可能なコア数 / --num-threads」
+
+        Returns:
+            プロセス数
+        """
+        for arg in sys.argv[1:]:
+            if arg.startswith('--encode-processes='):
+                value = arg.split('=', 1)[1]
+                if value == 'auto':
+                    return auto_pool_size(NUM_THREADS)
+                try:
+                    return max(0, int(value))
+                except ValueError:
+                    pass
+        return 0
+
     @staticmethod
     def _get_db_path() -> str:
         """コマンドライン引数からdb_pathを取得
@@ -283,8 +594,150 @@ class SearchDocsWorker:
         # デフォルト値
         return 4000
 
+    @staticmethod
+    def _get_adaptive_batch_args() -> Tuple[Optional[int], Optional[float]]:
+        """コマンドライン引数からバッチのトークン数の自動調整の設定を取得
+
+        --min-batch-tokens=N（予算の下限、指定しない場合は自動調整しない）
+        --batch-memory-limit-mb=N（RSSの上限、指定しない場合はメモリを見ない）
+
+        Returns:
+            (予算の下限, RSSの上限)のタプル
+        """
+        min_tokens = None
+        memory_limit_mb = None
+        for arg in sys.argv[1:]:
+            try:
+                if arg.startswith('--min-batch-tokens='):
+                    min_tokens = max(1, int(arg.split('=', 1)[1]))
+                elif arg.startswith('--batch-memory-limit-mb='):
+                    memory_limit_mb = float(arg.split('=', 1)[1])
+            except ValueError:
+                pass
+        return min_tokens, memory_limit_mb
+
+    @staticmethod
+    def _get_gc_args() -> Tuple[float, Optional[float], Optional[float]]:
+        """コマンドライン引数からGCのしきい値を取得
+
+        --gc-every-mb=N（前回のGCからの増加量、0で毎回GC、デフォルト: 256）
+        --gc-rss-threshold-mb=N（RSSの上限、デフォルト: なし）
+        --gc-arrow-threshold-mb=N（Arrowのメモリプールの確保量の上限、デフォルト: 1024）
+
+        Returns:
+            (増加量, RSSの上限, Arrowの確保量の上限)のタプル
+        """
+        every_mb = DEFAULT_EVERY_MB
+        rss_threshold_mb = None
+        arrow_threshold_mb = DEFAULT_ARROW_THRESHOLD_MB
+        for arg in sys.argv[1:]:
+            try:
+                if arg.startswith('--gc-every-mb='):
+                    every_mb = max(0.0, float(arg.split('=', 1)[1]))
+                elif arg.startswith('--gc-rss-threshold-mb='):
+                    rss_threshold_mb = float(arg.split('=', 1)[1])
+                elif arg.startswith('--gc-arrow-threshold-mb='):
+                    arrow_threshold_mb = float(arg.split('=', 1)[1])
+            except ValueError:
+                pass
+        return every_mb, rss_threshold_mb, arrow_threshold_mb
+
+    @staticmethod
+    def _get_vector_index_args() -> Tuple[int, str, Optional[int], int]:
+        """コマンドライン引数からベクトルインデックスと検索の設定を取得
+
+        --vector-index-min-rows=N（インデックスを作成する行数、0で作成しない、デフォルト: 10000）
+        --vector-index-type=TYPE（'IVF_PQ' | 'IVF_HNSW_SQ'、デフォルト: IVF_PQ）
+        --nprobes=N（検索するパーティション数のデフォルト）
+        --refine-factor=N（圧縮したベクトルの距離で limit × N 件を選び、元のベクトルで並べ直す。
+            デフォルト: IVF_PQは10、IVF_HNSW_SQは2）
+
+        Returns:
+            (インデックスを作成する行数, インデックスの種類, nprobes, refine_factor)のタプル
+        """
+        min_rows = DEFAULT_VECTOR_INDEX_MIN_ROWS
+        index_type = INDEX_IVF_PQ
+        nprobes = None
+        refine_factor = None
+        for arg in sys.argv[1:]:
+            try:
+                if arg.startswith('--vector-index-min-rows='):
+                    min_rows = int(arg.split('=', 1)[1])
+                elif arg.startswith('--vector-index-type='):
+                    value = arg.split('=', 1)[1].upper()
+                    if value in INDEX_TYPES:
+                        index_type = value
+                elif arg.startswith('--nprobes='):
+                    nprobes = max(1, int(arg.split('=', 1)[1]))
+                elif arg.startswith('--refine-factor='):
+                    refine_factor = max(1, int(arg.split('=', 1)[1]))
+            except ValueError:
+                pass
+        if refine_factor is None:
+            refine_factor = DEFAULT_REFINE_FACTORS[index_type]
+        return min_rows, index_type, nprobes, refine_factor
+
+    @staticmethod
+    def _get_request_retention_args() -> Tuple[float, float]:
+        """コマンドライン引数からindex_requestsの保持期間と定期削除の間隔を取得
+
+        --request-retention-days=N（終了済みのリクエストの保持期間、パスごとの最新は残す、デフォルト: 7）
+        --request-purge-interval=N（定期削除の間隔（秒）、0で定期削除しない、デフォルト: 3600）
+
+        Returns:
+            (保持期間（日）, 定期削除の間隔（秒）)のタプル
+        """
+        retention_days = DEFAULT_RETENTION_DAYS
+        purge_interval = DEFAULT_PURGE_INTERVAL_SECONDS
+        for arg in sys.argv[1:]:
+            try:
+                if arg.startswith('--request-retention-days='):
+                    retention_days = max(0.0, float(arg.split('=', 1)[1]))
+                elif arg.startswith('--request-purge-interval='):
+                    purge_interval = max(0.0, float(arg.split('=', 1)[1]))
+            except ValueError:
+                pass
+        return retention_days, purge_interval
+
+    @staticmethod
+    def _get_embedding_cache_size() -> int:
+        """コマンドライン引数から埋め込みキャッシュの最大件数を取得（0でキャッシュ無効）
+
+        Returns:
+            最大件数
+        """
+        for arg in sys.argv[1:]:
+            if arg.startswith('--embedding-cache-size='):
+                try:
+                    return int(arg.split('=', 1)[1])
+                except ValueError:
+                    pass
+        # デフォルト値
+        return DEFAULT_MAX_ENTRIES
+
+    @staticmethod
+    def _get_query_cache_args() -> Tuple[int, float]:
+        """コマンドライン引数からクエリベクトルキャッシュの最大件数とTTL（秒）を取得
+
+        --query-cache-size=0 でキャッシュ無効、--query-cache-ttl=0 で期限なし
+
+        Returns:
+            (max_entries, ttl_seconds)のタプル
+        """
+        max_entries = DEFAULT_QUERY_CACHE_SIZE
+        ttl_seconds = DEFAULT_QUERY_CACHE_TTL
+        for arg in sys.argv[1:]:
+            try:
+                if arg.startswith('--query-cache-size='):
+                    max_entries = int(arg.split('=', 1)[1])
+                elif arg.startswith('--query-cache-ttl='):
+                    ttl_seconds = float(arg.split('=', 1)[1])
+            except ValueError:
+                pass
+        return max_entries, ttl_seconds
+
     def init_tables(self):
-        """必要なテーブルを初期化"""
+        """必要なテーブルを作成（スカラーインデックスはbuild_scalar_indexes()で作成）"""
         try:
             existing_tables = self.db.table_names()
 
@@ -308,163 +761,319 @@ class SearchDocsWorker:
                     sys.stderr.write(f"Warning: Table {INDEX_REQUESTS_TABLE} already exists, skipping creation\n")
                     sys.stderr.flush()
 
-            # IndexRequestsテーブルのインデックスを作成
-            try:
-                index_requests_table = self.db.open_table(INDEX_REQUESTS_TABLE)
+        except Exception as e:
+            sys.stderr.write(f"Error initializing tables: {str(e)}\n")
+            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
+            sys.stderr.flush()
+            raise
 
-                # 既存のインデックスを確認
-                existing_indices = index_requests_table.list_indices()
-                sys.stderr.write(f"[IndexCheck] Existing indices on {INDEX_REQUESTS_TABLE}: {existing_indices}\n")
-                sys.stderr.flush()
+    def _update_fts_indexes_at_startup(self) -> bool:
+        """起動フェーズ: スカラーインデックスの構築後に、全文検索インデックスを作成・更新する"""
+        self.startup.wait(INDEXES_PHASE)
+        with self._index_maintenance_lock:
+            self._maintain_fts_indexes()
+        return self._fts_ready
 
-                # Phase 1推奨インデックス: status (BITMAP)
-                has_status_index = any(
-                    hasattr(idx, 'columns') and idx.columns == ['status']
-                    for idx in existing_indices
-                )
+    def _update_vector_index_at_startup(self) -> None:
+        """起動フェーズ: 全文検索インデックスの作成後に、既存のテーブルのベクトルインデックスを確認する"""
+        self.startup.wait(FTS_INDEX_PHASE)
+        self.update_vector_index()
+
+    def build_scalar_indexes(self):
+        """スカラーインデックスを作成
+
+        既存のテーブルが大きい場合はインデックスごとにwait_for_indexで待つため時間がかかる。
+        stdioループ経由の起動ではバックグラウンドで実行され、書き込み系のリクエストだけが完了を待つ。
+        """
+        # IndexRequestsテーブルのインデックスを作成
+        try:
+            index_requests_table = self.db.open_table(INDEX_REQUESTS_TABLE)
+
+            # 既存のインデックスを確認
+            existing_indices = index_requests_table.list_indices()
+            sys.stderr.write(f"[IndexCheck] Existing indices on {INDEX_REQUESTS_TABLE}: {existing_indices}\n")
+            sys.stderr.flush()
+
+            # Phase 1推奨インデックス: status (BITMAP)
+            has_status_index = any(
+                hasattr(idx, 'columns') and idx.columns == ['status']
+                for idx in existing_indices
+            )
 
-                if not has_status_index:
-                    sys.stderr.write(f"[IndexCheck] Creating BITMAP index on status column...\n")
+            if not has_status_index:
+                sys.stderr.write(f"[IndexCheck] Creating BITMAP index on status column...\n")
+                sys.stderr.flush()
+                try:
+                    index_requests_table.create_scalar_index("status", index_type="BITMAP")
+                    index_requests_table.wait_for_index(["status_idx"], timeout=timedelta(seconds=60))
+                    sys.stderr.write(f"[IndexCheck] BITMAP index on status created and ready\n")
                     sys.stderr.flush()
-                    try:
-                        index_requests_table.create_scalar_index("status", index_type="BITMAP")
-                        index_requests_table.wait_for_index(["status_idx"], timeout=timedelta(seconds=60))
-                        sys.stderr.write(f"[IndexCheck] BITMAP index on status created and ready\n")
-                        sys.stderr.flush()
-                    except Exception as idx_error:
-                        sys.stderr.write(f"[IndexCheck] Error creating status index: {idx_error}\n")
-                        sys.stderr.flush()
-                else:
-                    sys.stderr.write(f"[IndexCheck] Status index already exists\n")
+                except Exception as idx_error:
+                    sys.stderr.write(f"[IndexCheck] Error creating status index: {idx_error}\n")
                     sys.stderr.flush()
+            else:
+                sys.stderr.write(f"[IndexCheck] Status index already exists\n")
+                sys.stderr.flush()
 
-                # Phase 1推奨インデックス: document_path (BTREE)
-                has_document_path_index = any(
-                    hasattr(idx, 'columns') and idx.columns == ['document_path']
-                    for idx in existing_indices
-                )
+            # Phase 1推奨インデックス: document_path (BTREE)
+            has_document_path_index = any(
+                hasattr(idx, 'columns') and idx.columns == ['document_path']
+                for idx in existing_indices
+            )
 
-                if not has_document_path_index:
-                    sys.stderr.write(f"[IndexCheck] Creating BTREE index on document_path column...\n")
+            if not has_document_path_index:
+                sys.stderr.write(f"[IndexCheck] Creating BTREE index on document_path column...\n")
+                sys.stderr.flush()
+                try:
+                    index_requests_table.create_scalar_index("document_path", index_type="BTREE")
+                    index_requests_table.wait_for_index(["document_path_idx"], timeout=timedelta(seconds=60))
+                    sys.stderr.write(f"[IndexCheck] BTREE index on document_path created and ready\n")
                     sys.stderr.flush()
-                    try:
-                        index_requests_table.create_scalar_index("document_path", index_type="BTREE")
-                        index_requests_table.wait_for_index(["document_path_idx"], timeout=timedelta(seconds=60))
-                        sys.stderr.write(f"[IndexCheck] BTREE index on document_path created and ready\n")
-                        sys.stderr.flush()
-                    except Exception as idx_error:
-                        sys.stderr.write(f"[IndexCheck] Error creating document_path index: {idx_error}\n")
-                        sys.stderr.flush()
-                else:
-                    sys.stderr.write(f"[IndexCheck] document_path index already exists\n")
+                except Exception as idx_error:
+                    sys.stderr.write(f"[IndexCheck] Error creating document_path index: {idx_error}\n")
                     sys.stderr.flush()
+            else:
+                sys.stderr.write(f"[IndexCheck] document_path index already exists\n")
+                sys.stderr.flush()
 
-                # Phase 1推奨インデックス: document_hash (BTREE)
-                has_document_hash_index = any(
-                    hasattr(idx, 'columns') and idx.columns == ['document_hash']
-                    for idx in existing_indices
-                )
+            # Phase 1推奨インデックス: document_hash (BTREE)
+            has_document_hash_index = any(
+                hasattr(idx, 'columns') and idx.columns == ['document_hash']
+                for idx in existing_indices
+            )
 
-                if not has_document_hash_index:
-                    sys.stderr.write(f"[IndexCheck] Creating BTREE index on document_hash column...\n")
+            if not has_document_hash_index:
+                sys.stderr.write(f"[IndexCheck] Creating BTREE index on document_hash column...\n")
+                sys.stderr.flush()
+                try:
+                    index_requests_table.create_scalar_index("document_hash", index_type="BTREE")
+                    index_requests_table.wait_for_index(["document_hash_idx"], timeout=timedelta(seconds=60))
+                    sys.stderr.write(f"[IndexCheck] BTREE index on document_hash created and ready\n")
                     sys.stderr.flush()
-                    try:
-                        index_requests_table.create_scalar_index("document_hash", index_type="BTREE")
-                        index_requests_table.wait_for_index(["document_hash_idx"], timeout=timedelta(seconds=60))
-                        sys.stderr.write(f"[IndexCheck] BTREE index on document_hash created and ready\n")
-                        sys.stderr.flush()
-                    except Exception as idx_error:
-                        sys.stderr.write(f"[IndexCheck] Error creating document_hash index: {idx_error}\n")
-                        sys.stderr.flush()
-                else:
-                    sys.stderr.write(f"[IndexCheck] document_hash index already exists\n")
+                except Exception as idx_error:
+                    sys.stderr.write(f"[IndexCheck] Error creating document_hash index: {idx_error}\n")
                     sys.stderr.flush()
-
-            except Exception as e:
-                sys.stderr.write(f"[IndexCheck] Warning: Error while managing index_requests indices: {e}\n")
+            else:
+                sys.stderr.write(f"[IndexCheck] document_hash index already exists\n")
                 sys.stderr.flush()
 
-            # Sectionsテーブルのインデックスを作成
-            try:
-                sections_table = self.db.open_table(SECTIONS_TABLE)
+        except Exception as e:
+            sys.stderr.write(f"[IndexCheck] Warning: Error while managing index_requests indices: {e}\n")
+            sys.stderr.flush()
 
-                # 既存のインデックスを確認
-                existing_indices = sections_table.list_indices()
-                sys.stderr.write(f"[IndexCheck] Existing indices on {SECTIONS_TABLE}: {existing_indices}\n")
-                sys.stderr.flush()
+        # Sectionsテーブルのインデックスを作成
+        try:
+            sections_table = self.db.open_table(SECTIONS_TABLE)
 
-                # Phase 1推奨インデックス: document_path (BTREE)
-                has_document_path_index = any(
-                    hasattr(idx, 'columns') and idx.columns == ['document_path']
-                    for idx in existing_indices
-                )
+            # 既存のインデックスを確認
+            existing_indices = sections_table.list_indices()
+            sys.stderr.write(f"[IndexCheck] Existing indices on {SECTIONS_TABLE}: {existing_indices}\n")
+            sys.stderr.flush()
+
+            # Phase 1推奨インデックス: document_path (BTREE)
+            has_document_path_index = any(
+                hasattr(idx, 'columns') and idx.columns == ['document_path']
+                for idx in existing_indices
+            )
 
-                if not has_document_path_index:
-                    sys.stderr.write(f"[IndexCheck] Creating BTREE index on document_path column...\n")
+            if not has_document_path_index:
+                sys.stderr.write(f"[IndexCheck] Creating BTREE index on document_path column...\n")
+                sys.stderr.flush()
+                try:
+                    sections_table.create_scalar_index("document_path", index_type="BTREE")
+                    sections_table.wait_for_index(["document_path_idx"], timeout=timedelta(seconds=60))
+                    sys.stderr.write(f"[IndexCheck] BTREE index on document_path created and ready\n")
                     sys.stderr.flush()
-                    try:
-                        sections_table.create_scalar_index("document_path", index_type="BTREE")
-                        sections_table.wait_for_index(["document_path_idx"], timeout=timedelta(seconds=60))
-                        sys.stderr.write(f"[IndexCheck] BTREE index on document_path created and ready\n")
-                        sys.stderr.flush()
-                    except Exception as idx_error:
-                        sys.stderr.write(f"[IndexCheck] Error creating document_path index: {idx_error}\n")
-                        sys.stderr.flush()
-                else:
-                    sys.stderr.write(f"[IndexCheck] document_path index already exists\n")
+                except Exception as idx_error:
+                    sys.stderr.write(f"[IndexCheck] Error creating document_path index: {idx_error}\n")
                     sys.stderr.flush()
+            else:
+                sys.stderr.write(f"[IndexCheck] document_path index already exists\n")
+                sys.stderr.flush()
 
-                # Phase 1推奨インデックス: is_dirty (BITMAP)
-                has_is_dirty_index = any(
-                    hasattr(idx, 'columns') and idx.columns == ['is_dirty']
-                    for idx in existing_indices
-                )
+            # Phase 1推奨インデックス: is_dirty (BITMAP)
+            has_is_dirty_index = any(
+                hasattr(idx, 'columns') and idx.columns == ['is_dirty']
+                for idx in existing_indices
+            )
 
-                if not has_is_dirty_index:
-                    sys.stderr.write(f"[IndexCheck] Creating BITMAP index on is_dirty column...\n")
+            if not has_is_dirty_index:
+                sys.stderr.write(f"[IndexCheck] Creating BITMAP index on is_dirty column...\n")
+                sys.stderr.flush()
+                try:
+                    sections_table.create_scalar_index("is_dirty", index_type="BITMAP")
+                    sections_table.wait_for_index(["is_dirty_idx"], timeout=timedelta(seconds=60))
+                    sys.stderr.write(f"[IndexCheck] BITMAP index on is_dirty created and ready\n")
                     sys.stderr.flush()
-                    try:
-                        sections_table.create_scalar_index("is_dirty", index_type="BITMAP")
-                        sections_table.wait_for_index(["is_dirty_idx"], timeout=timedelta(seconds=60))
-                        sys.stderr.write(f"[IndexCheck] BITMAP index on is_dirty created and ready\n")
-                        sys.stderr.flush()
-                    except Exception as idx_error:
-                        sys.stderr.write(f"[IndexCheck] Error creating is_dirty index: {idx_error}\n")
-                        sys.stderr.flush()
-                else:
-                    sys.stderr.write(f"[IndexCheck] is_dirty index already exists\n")
+                except Exception as idx_error:
+                    sys.stderr.write(f"[IndexCheck] Error creating is_dirty index: {idx_error}\n")
                     sys.stderr.flush()
+            else:
+                sys.stderr.write(f"[IndexCheck] is_dirty index already exists\n")
+                sys.stderr.flush()
 
-                # document_hash (BTREE) - findSectionsByPathAndHash()の高速化
-                has_document_hash_index = any(
-                    hasattr(idx, 'columns') and idx.columns == ['document_hash']
-                    for idx in existing_indices
-                )
+            # document_hash (BTREE) - findSectionsByPathAndHash()の高速化
+            has_document_hash_index = any(
+                hasattr(idx, 'columns') and idx.columns == ['document_hash']
+                for idx in existing_indices
+            )
 
-                if not has_document_hash_index:
-                    sys.stderr.write(f"[IndexCheck] Creating BTREE index on document_hash column...\n")
+            if not has_document_hash_index:
+                sys.stderr.write(f"[IndexCheck] Creating BTREE index on document_hash column...\n")
+                sys.stderr.flush()
+                try:
+                    sections_table.create_scalar_index("document_hash", index_type="BTREE")
+                    sections_table.wait_for_index(["document_hash_idx"], timeout=timedelta(seconds=60))
+                    sys.stderr.write(f"[IndexCheck] BTREE index on document_hash created and ready\n")
                     sys.stderr.flush()
-                    try:
-                        sections_table.create_scalar_index("document_hash", index_type="BTREE")
-                        sections_table.wait_for_index(["document_hash_idx"], timeout=timedelta(seconds=60))
-                        sys.stderr.write(f"[IndexCheck] BTREE index on document_hash created and ready\n")
-                        sys.stderr.flush()
-                    except Exception as idx_error:
-                        sys.stderr.write(f"[IndexCheck] Error creating document_hash index: {idx_error}\n")
-                        sys.stderr.flush()
-                else:
-                    sys.stderr.write(f"[IndexCheck] document_hash index already exists\n")
+                except Exception as idx_error:
+                    sys.stderr.write(f"[IndexCheck] Error creating document_hash index: {idx_error}\n")
                     sys.stderr.flush()
-
-            except Exception as e:
-                sys.stderr.write(f"[IndexCheck] Warning: Error while managing sections indices: {e}\n")
+            else:
+                sys.stderr.write(f"[IndexCheck] document_hash index already exists\n")
                 sys.stderr.flush()
 
         except Exception as e:
-            sys.stderr.write(f"Error initializing tables: {str(e)}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
+            sys.stderr.write(f"[IndexCheck] Warning: Error while managing sections indices: {e}\n")
             sys.stderr.flush()
-            raise
+
+    def update_fts_indexes(self, written_rows: int = 0) -> Optional[str]:
+        """heading / contentの全文検索インデックスを作成、またはインデックスに入っていない行を追加
+
+        インデックスに入っていない行も検索時に走査されるため、追加はDEFAULT_UPDATE_ROWS行ごとにまとめて行う。
+        書き込んだ行数から見積もった行数がしきい値に届かない間は、テーブルを確認せずに戻る。
+        起動フェーズで作成中の場合は待たずに戻る（次の書き込みの後に再び確認する）。
+
+        Args:
+            written_rows: 直前に書き込んだ行数
+
+        Returns:
+            実行した処理（'create' | 'update'）、何もしなかった場合はNone
+        """
+        if self._fts_ready:
+            self._fts_unindexed_rows += written_rows
+            if self._fts_unindexed_rows < DEFAULT_UPDATE_ROWS:
+                return None
+        if not self._index_maintenance_lock.acquire(blocking=False):
+            return None
+        try:
+            return self._maintain_fts_indexes()
+        finally:
+            self._index_maintenance_lock.release()
+
+    def _maintain_fts_indexes(self) -> Optional[str]:
+        """update_fts_indexesの本体（_index_maintenance_lockを取った状態で呼ぶ）"""
+        try:
+            table = self._get_sections_table()
+            fts_indices = {
+                index.columns[0]: index.name
+                for index in table.list_indices()
+                if getattr(index, 'index_type', None) == 'FTS' and len(index.columns) == 1
+            }
+            missing = [column for column in FTS_COLUMNS if column not in fts_indices]
+            if missing:
+                action = ACTION_CREATE
+                start = time.perf_counter()
+                for column in missing:
+                    # 日本語の分かち書きはせず、n-gramで分割する（語幹化・ストップワード除去は英語用なので使わない）
+                    table.create_fts_index(
+                        column,
+                        use_tantivy=False,
+                        replace=True,
+                        base_tokenizer="ngram",
+                        ngram_min_length=FTS_NGRAM_MIN_LENGTH,
+                        ngram_max_length=FTS_NGRAM_MAX_LENGTH,
+                        lower_case=True,
+                        stem=False,
+                        remove_stop_words=False,
+                    )
+            else:
+                unindexed_rows = max(
+                    table.index_stats(name).num_unindexed_rows for name in fts_indices.values()
+                )
+                self._fts_ready = True
+                self._fts_unindexed_rows = unindexed_rows
+                if unindexed_rows < DEFAULT_UPDATE_ROWS:
+                    return None
+                action = ACTION_UPDATE
+                start = time.perf_counter()
+                table.optimize()
+            self._fts_ready = True
+            self._fts_unindexed_rows = 0
+
+            sys.stderr.write(
+                f"[FtsIndex] {action} completed in {time.perf_counter() - start:.2f}s "
+                f"(columns={missing or list(FTS_COLUMNS)})\n"
+            )
+            sys.stderr.flush()
+            return action
+        except Exception as e:
+            sys.stderr.write(f"[FtsIndex] Warning: Could not update full-text index: {e}\n")
+            sys.stderr.flush()
+            return None
+
+    @staticmethod
+    def _vector_index_rows(table, total_rows: int) -> Tuple[Optional[int], int]:
+        """vector列のインデックス済みの行数（インデックスがない場合はNone）と、インデックスに入っていない行数"""
+        for index in table.list_indices():
+            if getattr(index, 'columns', None) == ['vector']:
+                stats = table.index_stats(index.name)
+                if stats is not None:
+                    return stats.num_indexed_rows, stats.num_unindexed_rows
+        return None, total_rows
+
+    def update_vector_index(self, written_rows: int = 0, row_delta: Optional[int] = None) -> Optional[str]:
+        """行数とインデックスの状態に応じて、ベクトルインデックスを作成・追加・再学習
+
+        書き込みレーン（add_sectionsの後）と起動フェーズで実行する。検索は作成中も以前のバージョンで続けられる。
+        書き込んだ行数から見積もった行数がしきい値に届かない間は、テーブルを確認せずに戻る。
+        起動フェーズで作成中の場合は、書き込みレーンでは待たずに戻る（次の書き込みの後に再び確認する）。
+
+        Args:
+            written_rows: 直前に書き込んだ行数
+            row_delta: 直前の書き込みによるテーブルの行数の増減（デフォルト: written_rows）
+
+        Returns:
+            実行した処理（'create' | 'update' | 'retrain'）、何もしなかった場合はNone
+        """
+        policy = self.vector_index_policy
+        policy.record_write(written_rows, row_delta)
+        if not policy.due():
+            return None
+        if not self._index_maintenance_lock.acquire(blocking=False):
+            return None
+        try:
+            table = self._get_sections_table()
+            total_rows = table.count_rows()
+            indexed_rows, unindexed_rows = self._vector_index_rows(table, total_rows)
+            action = policy.plan(total_rows, indexed_rows, unindexed_rows)
+            if action is None:
+                return None
+
+            sys.stderr.write(
+                f"[VectorIndex] {action} {policy.index_type} index "
+                f"(rows={total_rows}, unindexed={unindexed_rows})...\n"
+            )
+            sys.stderr.flush()
+            start = time.perf_counter()
+            if action == ACTION_UPDATE:
+                # 学習済みのパーティションに新しい行を追加する（ファイルの圧縮も行われる）
+                table.optimize()
+            else:
+                build_vector_index(table, policy.index_type, total_rows, self.vector_dimension)
+            elapsed = time.perf_counter() - start
+
+            indexed_rows, _ = self._vector_index_rows(table, total_rows)
+            policy.record(action, indexed_rows if indexed_rows is not None else total_rows, elapsed)
+            sys.stderr.write(f"[VectorIndex] {action} completed in {elapsed:.2f}s (indexed={indexed_rows})\n")
+            sys.stderr.flush()
+            return action
+        except Exception as e:
+            sys.stderr.write(f"[VectorIndex] Warning: Could not update vector index: {e}\n")
+            sys.stderr.flush()
+            return None
+        finally:
+            self._index_maintenance_lock.release()
 
     def _get_sections_table(self):
         """SECTIONSテーブルを取得（キャッシュ付き）
@@ -478,7 +1087,9 @@ class SearchDocsWorker:
             SECTIONSテーブルのハンドル
         """
         if self._sections_table is None:
-            self._sections_table = self.db.open_table(SECTIONS_TABLE)
+            with self._table_lock:
+                if self._sections_table is None:
+                    self._sections_table = self.db.open_table(SECTIONS_TABLE)
         return self._sections_table
 
     def _get_index_requests_table(self):
@@ -488,9 +1099,212 @@ class SearchDocsWorker:
             INDEX_REQUESTSテーブルのハンドル
         """
         if self._index_requests_table is None:
-            self._index_requests_table = self.db.open_table(INDEX_REQUESTS_TABLE)
+            with self._table_lock:
+                if self._index_requests_table is None:
+                    self._index_requests_table = self.db.open_table(INDEX_REQUESTS_TABLE)
         return self._index_requests_table
 
+    def _get_inflight_paths(self) -> InflightPaths:
+        """インデックス中のパスの集合（初回はindex_requestsから読み込む）
+
+        IndexRequestを書き換える前にも呼び、読み込みより後の変更が差分更新から漏れないようにする
+        """
+        if not self.inflight_paths.loaded:
+            with self._inflight_lock:
+                if not self.inflight_paths.loaded:
+                    table = self._get_index_requests_table()
+                    where = " OR ".join(f"status = '{status}'" for status in sorted(INFLIGHT_STATUSES))
+                    rows = table.search().where(where).select(["id", "document_path", "status"]).to_list()
+                    self.inflight_paths.load(
+                        (row["id"], row["document_path"], row["status"]) for row in rows
+                    )
+        return self.inflight_paths
+
+    def _load_model(self) -> bool:
+        """埋め込みモデルをロード（レーン間で排他）"""
+        with self._model_lock:
+            return self.embedding_model.initialize()
+
+    def _load_model_in_background(self) -> bool:
+        """起動フェーズでモデルをロードし、保留していたリクエストをレーンに積む（失敗した場合も積む）"""
+        try:
+            return self._load_model()
+        finally:
+            with self._deferred_lock:
+                deferred, self._deferred_submits = self._deferred_submits, None
+            for submit in deferred or []:
+                submit()
+
+    def _get_tokenizer(self):
+        """ロード済みモデルのトークナイザ（ロード前はNone）"""
+        if not self.embedding_model.available:
+            return None
+        return getattr(self.embedding_model, 'tokenizer', None)
+
+    def _wait_for_phase(self, name: str) -> None:
+        """起動フェーズの完了を待つ（待機中もリクエストのキャンセル・期限を確認する）"""
+        while not self.startup.wait(name, timeout=0.5):
+            self._check_cancelled()
+
+    def _ensure_model(self) -> None:
+        """埋め込みモデルのロード完了を待つ
+
+        バックグラウンドのロードが完了していない場合は待ち、失敗していた場合はここで再度ロードする。
+        """
+        if self.embedding_model.available:
+            return
+        self._wait_for_phase(MODEL_PHASE)
+        if not self.embedding_model.available:
+            self._load_model()
+
+    def _get_encode_pool(self) -> Optional[EncodePool]:
+        """エンコードプール（--encode-processesが2以上の場合のみ。初回呼び出し時に子プロセスを起動する）"""
+        if self.encode_processes < 2:
+            return None
+        with self._model_lock:
+            if self.encode_pool is None:
+                self.encode_pool = EncodePool(
+                    self.embedding_model.model_name,
+                    getattr(self.embedding_model, 'backend', BACKEND_TORCH),
+                    processes=self.encode_processes,
+                    num_threads=NUM_THREADS,
+                )
+            return self.encode_pool
+
+    def close_encode_pool(self) -> None:
+        """エンコードプールの子プロセスを終了する"""
+        if self.encode_pool is not None:
+            self.encode_pool.close()
+            self.encode_pool = None
+
+    def _encode(self, texts, dimension: int):
+        """埋め込みモデルでエンコード（レーン間で排他）"""
+        with self._encode_lock:
+            return self.embedding_model.encode(texts, dimension)
+
+    def _encode_matrix(self, texts: List[str], dimension: int) -> np.ndarray:
+        """埋め込みモデルで(N, dimension)のfloat32行列にエンコード（レーン間で排他）"""
+        with self._encode_lock:
+            # バッチはトークン数の予算で分割済みなので、1回の推論で処理する
+            return self.embedding_model.encode_matrix(texts, dimension, batch_size=len(texts))
+
+    def _encode_query(self, query: str):
+        """検索クエリをベクトル化（クエリベクトルキャッシュを経由）"""
+        query_vector = self.query_cache.get(self.model_key, self.vector_dimension, query)
+        if query_vector is not None:
+            return query_vector
+
+        # モデル初期化
+        self._ensure_model()
+        query_vector = self._encode(normalize_query(query), self.vector_dimension)
+        self.query_cache.put(self.model_key, self.vector_dimension, query, query_vector)
+        return query_vector
+
+    def _encode_queries(self, queries: List[str]) -> List[Any]:
+        """複数の検索クエリをベクトル化（キャッシュにないクエリは1回の推論でまとめてエンコード）"""
+        vectors: List[Any] = [
+            self.query_cache.get(self.model_key, self.vector_dimension, query) for query in queries
+        ]
+
+        # キャッシュにないクエリを正規化後のテキストで重複を除いて集める
+        missing: Dict[str, List[int]] = {}
+        for i, (query, vector) in enumerate(zip(queries, vectors)):
+            if vector is None:
+                missing.setdefault(normalize_query(query), []).append(i)
+        if not missing:
+            return vectors
+
+        # モデル初期化
+        self._ensure_model()
+        texts = list(missing)
+        matrix = self._encode_matrix(texts, self.vector_dimension)
+        for text, row in zip(texts, matrix):
+            vector = row.tolist()
+            for i in missing[text]:
+                vectors[i] = vector
+            self.query_cache.put(self.model_key, self.vector_dimension, text, vector)
+        return vectors
+
+    def _check_cancelled(self) -> None:
+        """処理中のリクエストがキャンセル・期限切れなら打ち切る（チェックポイント）
+
+        Raises:
+            RequestCancelledError: キャンセル通知を受け取っている、または期限を過ぎている場合
+        """
+        token = getattr(self._request_context, 'token', None)
+        if token is not None:
+            token.raise_if_cancelled()
+
+    def accept_message(self, message: Any) -> bool:
+        """受信ループでメッセージを受け付ける（レーンに積む前に受信スレッドで呼ばれる）
+
+        キャンセル通知はここで処理し、レーンには積まない。
+        それ以外のリクエストはキャンセル・期限の追跡対象として登録する。
+
+        Returns:
+            レーンで処理する必要がある場合True
+        """
+        if isinstance(message, dict) and message.get("method") == CANCEL_METHOD:
+            params = message.get("params") or {}
+            self.cancellation.cancel(params.get("id"))
+            return False
+        self.cancellation.register_message(message)
+        return True
+
+    def submit_message(self, message: Any, reply: Callable[[Any], None]) -> None:
+        """受信したメッセージをディスパッチャのレーンに積む（受信スレッドで呼ばれる）
+
+        埋め込みモデルを使う読み取り（vector / hybridの検索）は、バックグラウンドのモデルのロードが
+        終わるまで保留し、ロード後に受信順でレーンに積む。
+        保留中にキャンセル・期限切れになったリクエストは、レーンで実行されずにエラーを返す。
+        """
+        if not self.accept_message(message):
+            return
+
+        def submit():
+            self.dispatcher.submit(message, reply)
+
+        with self._deferred_lock:
+            if self._deferred_submits is not None and self._needs_model(message):
+                self._deferred_submits.append(submit)
+                return
+        submit()
+
+    @staticmethod
+    def _needs_model(message: Any) -> bool:
+        """メッセージ（バッチを含む）がクエリのベクトル化を必要とする検索か"""
+        requests = message if isinstance(message, list) else [message]
+        for request in requests:
+            if not isinstance(request, dict) or request.get("method") not in ("search", "searchBatch"):
+                continue
+            params = request.get("params") or {}
+            if (params.get("mode") or SEARCH_MODE_VECTOR) != SEARCH_MODE_FTS:
+                return True
+        return False
+
+    def lane_for_request(self, request: Any) -> str:
+        """リクエストを処理するレーンを決定
+
+        バッチ（配列）の場合は、全要素が読み取り系のときのみ読み取りレーンで処理する。
+        バッチ内の呼び出しは同じレーンで順番に実行されるため、書き込み後の読み取りも整合する。
+
+        Args:
+            request: JSON-RPCリクエスト（またはバッチ配列）
+
+        Returns:
+            レーン名（READ_LANE または WRITE_LANE）
+        """
+        if isinstance(request, list):
+            if request and all(
+                isinstance(item, dict) and item.get("method") in self.READ_METHODS
+                for item in request
+            ):
+                return READ_LANE
+            return WRITE_LANE
+        if isinstance(request, dict) and request.get("method") in self.READ_METHODS:
+            return READ_LANE
+        return WRITE_LANE
+
     def format_section(self, section: Dict[str, Any]) -> Dict[str, Any]:
         """LanceDBのセクションデータをJSON-serializable形式に変換
 
@@ -524,17 +1338,86 @@ class SearchDocsWorker:
             "section_number": section.get("section_number"),
         }
 
+    def handle_message(self, message: Any) -> Optional[Any]:
+        """受信したJSON-RPCメッセージ（単一リクエストまたはバッチ配列）を処理
+
+        Returns:
+            レスポンス（バッチの場合は配列、返すものがない場合はNone）
+        """
+        if isinstance(message, list):
+            return self.handle_batch(message)
+        if not isinstance(message, dict):
+            return self._invalid_request_response()
+        return self.handle_request(message)
+
+    def handle_batch(self, requests: List[Any]) -> Optional[List[Dict[str, Any]]]:
+        """JSON-RPC 2.0 バッチを処理
+
+        1ドキュメント分のIndexRequest更新・セクション操作などを1往復で処理するため、
+        配列内のリクエストを先頭から順に実行し、レスポンスを1つの配列で返す。
+        各リクエストは独立して実行され、1つが失敗しても残りは実行される。
+
+        Args:
+            requests: JSON-RPCリクエストの配列
+
+        Returns:
+            レスポンスの配列（通知のみのバッチの場合はNone）
+        """
+        if not requests:
+            # 空配列はInvalid Request（仕様上、配列ではなく単一のエラーを返す）
+            return self._invalid_request_response()
+
+        responses = []
+        for request in requests:
+            if not isinstance(request, dict):
+                responses.append(self._invalid_request_response())
+                continue
+
+            response = self.handle_request(request)
+
+            # 通知（idなし）にはレスポンスを返さない
+            if "id" in request:
+                responses.append(response)
+
+        return responses if responses else None
+
+    @staticmethod
+    def _invalid_request_response() -> Dict[str, Any]:
+        """Invalid Requestエラーレスポンスを生成"""
+        return {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {
+                "code": -32600,
+                "message": "Invalid Request"
+            }
+        }
+
     def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """JSON-RPCリクエストを処理"""
         method = request.get("method")
         params = request.get("params", {})
         request_id = request.get("id")
+        token = self.cancellation.get(request_id) if request_id is not None else None
+        started = False
 
         try:
+            if token is not None:
+                # キュー待ちの間にキャンセル・期限切れになったリクエストは実行しない
+                token.raise_if_cancelled()
+            started = True
+            self._request_context.token = token
+
+            # 書き込み系はスカラーインデックスの構築完了だけを待つ（構築中のテーブルへの同時コミットを避ける）
+            # 全文検索・ベクトルインデックスの起動フェーズは待たない（作成中は書き込み後の更新を見送る）
+            if method not in self.READ_METHODS and method != "initModel":
+                self._wait_for_phase(INDEXES_PHASE)
+
             # メソッド呼び出しをカウント（主要メソッドのみ）
             method_map = {
                 'addSections': 'add_sections',
                 'search': 'search',
+                'searchBatch': 'search',
                 'getStats': 'get_stats',
                 'findIndexRequests': 'find_index_requests',
                 'countIndexRequests': 'count_index_requests',
@@ -550,8 +1433,12 @@ class SearchDocsWorker:
                 result = self.init_model()
             elif method == "addSections":
                 result = self.add_sections(params)
+            elif method == "replaceDocumentSections":
+                result = self.replace_document_sections(params)
             elif method == "search":
                 result = self.search(params)
+            elif method == "searchBatch":
+                result = self.search_batch(params)
             elif method == "getSectionsByPath":
                 result = self.get_sections_by_path(params)
             elif method == "getSectionById":
@@ -581,6 +1468,8 @@ class SearchDocsWorker:
                 result = self.update_many_index_requests(params)
             elif method == "getPathsWithStatus":
                 result = self.get_paths_with_status(params)
+            elif method == "purgeIndexRequests":
+                result = self.purge_index_requests(params)
             else:
                 return {
                     "jsonrpc": "2.0",
@@ -597,6 +1486,33 @@ class SearchDocsWorker:
                 "result": result
             }
 
+        except PhaseNotReadyError as e:
+            sys.stderr.write(f"[Startup] {method} (id={request_id}): {e}\n")
+            sys.stderr.flush()
+
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": e.code,
+                    "message": str(e)
+                }
+            }
+
+        except RequestCancelledError as e:
+            self.cancellation.record(e, started)
+            sys.stderr.write(f"[Cancel] {method} (id={request_id}): {e}\n")
+            sys.stderr.flush()
+
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": e.code,
+                    "message": str(e)
+                }
+            }
+
         except Exception as e:
             error_message = str(e)
             error_trace = traceback.format_exc()
@@ -614,100 +1530,269 @@ class SearchDocsWorker:
                 }
             }
 
-    def ping(self) -> Dict[str, str]:
-        """接続確認"""
-        return {"status": "ok"}
+        finally:
+            self._request_context.token = None
+            if token is not None:
+                self.cancellation.release(request_id)
+
+    def ping(self) -> Dict[str, Any]:
+        """接続確認
+
+        起動処理の完了を待たずに応答し、起動フェーズの進捗と所要時間を返す。
+        """
+        startup = self.startup.snapshot()
+        return {
+            "status": "ok",
+            "ready": startup.pop("ready"),
+            "startup": startup,
+        }
 
     def init_model(self) -> Dict[str, Any]:
-        """埋め込みモデルを初期化"""
-        success = self.embedding_model.initialize()
+        """埋め込みモデルを初期化（バックグラウンドのロード中は完了を待つ）"""
+        self._wait_for_phase(MODEL_PHASE)
+        success = self._load_model()
         return {
             "success": success,
             "model_name": self.embedding_model.model_name if hasattr(self.embedding_model, 'model_name') else 'unknown',
+            "backend": getattr(self.embedding_model, 'backend', BACKEND_TORCH),
             "dimension": self.vector_dimension
         }
 
     def _create_token_aware_batches(
         self,
         texts: List[str],
-        indices: List[int]
-    ) -> Tuple[List[Tuple[List[str], List[int]]], List[int]]:
+        indices: List[int],
+        first_window_row: int
+    ) -> Tuple[List[Tuple[List[str], List[int]]], Dict[int, Tuple[List[int], List[int]]]]:
         """
-        トークン量を考慮してバッチを分割し、大きすぎるセクションをスキップ
+        トークン量を考慮してバッチを分割し、大きすぎるセクションはウィンドウに分割
+
+        長さの近いテキスト同士をまとめ、パディング込みのトークン数がmax_batch_tokens以下になるように分割する。
+        各バッチのindicesは元のインデックスのままなので、呼び出し側でベクトルを元の位置に戻す。
+
+        max_batch_tokensを超えるセクションは収まる大きさのウィンドウ（最大DEFAULT_MAX_WINDOWS個）に分割し、
+        通常のテキストと同じバッチでエンコードする。ウィンドウにはfirst_window_rowから順に行番号を割り当てる
+        （呼び出し側はその行のベクトルをpool_embeddingsでまとめる）。
 
         Args:
             texts: エンコードするテキストのリスト
             indices: 各テキストに対応するインデックス
+            first_window_row: ウィンドウに割り当てる最初の行番号
 
         Returns:
-            (batches, skipped_indices)のタプル
+            (batches, windowed)のタプル
             - batches: (texts, indices)のタプルのリスト
-            - skipped_indices: スキップされたセクションのインデックスリスト
+            - windowed: セクションのインデックス -> (ウィンドウの行番号リスト, 各ウィンドウのトークン数リスト)
         """
         max_tokens = self.max_batch_tokens
 
+        # トークン数を数える（トークナイザにはまとめて渡し、結果はテキストごとにメモされる）
+        token_counts = self.token_estimator.count_many(texts)
+
         # デバッグログ: 関数が呼ばれたことを確認
-        estimated_total_tokens = estimate_total_tokens(texts)
+        estimated_total_tokens = sum(token_counts)
         sys.stderr.write(f"[TokenBatch] Processing {len(texts)} texts, ~{estimated_total_tokens} tokens (max: {max_tokens})\n")
         sys.stderr.flush()
 
-        # 大きすぎるセクションをフィルタリング
-        filtered_texts = []
-        filtered_indices = []
-        skipped_indices = []
-
-        for text, idx in zip(texts, indices):
-            token_count = estimate_tokens(text)
-            if token_count > max_tokens:
-                skipped_indices.append(idx)
-                sys.stderr.write(f"[TokenBatch] SKIP: Section too large (~{token_count} tokens > {max_tokens}), index={idx}\n")
-                sys.stderr.flush()
-            else:
-                filtered_texts.append(text)
-                filtered_indices.append(idx)
-
-        # スキップした件数を報告
-        if skipped_indices:
-            sys.stderr.write(f"[TokenBatch] Skipped {len(skipped_indices)} sections (too large)\n")
+        count_tokens = self.token_estimator.count
+
+        # 大きすぎるセクションはウィンドウに分割し、ウィンドウを通常のテキストと同じように扱う
+        encode_texts = []
+        encode_indices = []
+        windowed = {}
+        next_row = first_window_row
+
+        for text, idx, token_count in zip(texts, indices, token_counts):
+            if token_count <= max_tokens:
+                encode_texts.append(text)
+                encode_indices.append(idx)
+                continue
+
+            windows = plan_token_windows(text, max_tokens, count_tokens)
+            rows = list(range(next_row, next_row + len(windows)))
+            next_row += len(windows)
+            windowed[idx] = (rows, [window_tokens for _, window_tokens in windows])
+            encode_texts.extend(window for window, _ in windows)
+            encode_indices.extend(rows)
+            sys.stderr.write(
+                f"[TokenBatch] WINDOW: Section too large (~{token_count} tokens > {max_tokens}), "
+                f"index={idx}, windows={len(windows)}\n"
+            )
+
+        # ウィンドウに分割した件数を報告
+        if windowed:
+            sys.stderr.write(
+                f"[TokenBatch] Split {len(windowed)} large sections into {next_row - first_window_row} windows\n"
+            )
             sys.stderr.flush()
 
-        # バッチ分割（スキップ後のテキストのみ）
-        if not filtered_texts:
-            return ([], skipped_indices)
-
-        batches = create_token_aware_batches(filtered_texts, filtered_indices, max_tokens)
+        # 自動調整が有効な場合はその時点の予算で詰める（max_tokens以下）
+        batch_tokens = self.batch_controller.budget if self.batch_controller is not None else max_tokens
+        batches = create_length_bucketed_batches(encode_texts, encode_indices, batch_tokens, count_tokens)
 
         # バッチ分割のログ出力（デバッグ用）
+        stats = get_batch_stats(batches, count_tokens)
+        sys.stderr.write(
+            f"[TokenBatch] Split into {stats['num_batches']} batches (total texts: {stats['total_texts']}, "
+            f"budget: {batch_tokens}, padding efficiency: {stats['padding_efficiency']:.0%})\n"
+        )
         if len(batches) > 1:
-            stats = get_batch_stats(batches)
-            sys.stderr.write(f"[TokenBatch] Split into {stats['num_batches']} batches (total texts: {stats['total_texts']})\n")
             for batch_info in stats['batches_info']:
                 sys.stderr.write(
                     f"[TokenBatch]   Batch {batch_info['batch_num']}: "
-                    f"{batch_info['num_texts']} texts, ~{batch_info['estimated_tokens']} tokens\n"
+                    f"{batch_info['num_texts']} texts, ~{batch_info['estimated_tokens']} tokens "
+                    f"(padded ~{batch_info['padded_tokens']})\n"
                 )
+        sys.stderr.flush()
+
+        return (batches, windowed)
+
+    def _observe_batch(self, batch_texts: List[str], seconds: float, rss_before_mb: Optional[float]) -> None:
+        """1バッチのスループットとRSSの増加をバッチの予算の自動調整に渡す"""
+        tokens = sum(self.token_estimator.count_many(batch_texts))
+        previous = self.batch_controller.budget
+        budget = self.batch_controller.observe(tokens, seconds, rss_before_mb, self.perf_logger.sample_rss_mb())
+        if budget != previous:
+            sys.stderr.write(f"[AdaptiveBatch] Batch token budget {previous} -> {budget}\n")
             sys.stderr.flush()
 
-        return (batches, skipped_indices)
+    @staticmethod
+    def _write_section_rows(table, arrow_table: pa.Table, vectors: np.ndarray, rows: List[int]) -> None:
+        """セクションの行（Arrowテーブルとベクトル行列の同じ行）をテーブルに追加する（書き込みスレッドで呼ばれる）"""
+        table.add(with_vector_column(arrow_table.take(rows), vectors[rows], table.schema))
+
+    def _rollback_sections(self, table, ids: List[str]) -> None:
+        """途中で打ち切ったadd_sectionsの書き込み済みのセクションを削除する（失敗しても元の例外を優先する）"""
+        if not ids:
+            return
+        try:
+            quoted = ", ".join("'" + section_id.replace("'", "''") + "'" for section_id in ids)
+            table.delete(f"id IN ({quoted})")
+            sys.stderr.write(f"[Pipeline] Rolled back {len(ids)} written sections\n")
+        except Exception as e:
+            sys.stderr.write(f"[Pipeline] Warning: Could not roll back {len(ids)} written sections: {e}\n")
+        sys.stderr.flush()
+
+    def _prepare_vectors(
+        self, sections: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, List[Tuple[List[str], List[int]]], Dict[int, Tuple[List[int], List[int]]], List[int], List[str]]:
+        """セクションのベクトル行列を用意し、エンコードが必要なテキストをバッチに分ける
+
+        キャッシュ・呼び出し元（sectionの"vector"）から得たベクトルはここで行列に設定される。
+        ベクトルは(N, dim)のfloat32行列にまとめ、FixedSizeListとしてtable.addに渡す
+        （セクションごとにPythonのfloatのリストを作らない）。
+        ウィンドウのベクトルはセクションの後ろの行に置き、プーリング後は使わない。
+
+        Returns:
+            (ベクトル行列, バッチ, ウィンドウに分割したセクション, エンコードするセクションの行, そのテキスト)のタプル
+        """
+        # 有効なセクションからベクトル化が必要なテキストを抽出
+        # キャッシュにあるテキスト（前回から変更のないセクション）はここでベクトルが設定される
+        texts_to_encode, indices_to_encode = get_texts_to_encode(sections, cache=self.embedding_cache)
+
+        # トークン数でバッチを分割し、大きすぎるセクションはウィンドウに分割
+        batches = []
+        windowed = {}
+        if texts_to_encode:
+            # モデル初期化（全てキャッシュから取得できた場合はモデルを待たない）
+            self._ensure_model()
+            batches, windowed = self._create_token_aware_batches(
+                texts_to_encode, indices_to_encode, first_window_row=len(sections)
+            )
+
+        window_rows = sum(len(rows) for rows, _ in windowed.values())
+        vectors = np.zeros((len(sections) + window_rows, self.vector_dimension), dtype=np.float32)
+        for i, section in enumerate(sections):
+            vector = section.pop("vector", None)
+            if vector is not None and len(vector) > 0:
+                vectors[i] = vector
+
+        return vectors, batches, windowed, indices_to_encode, texts_to_encode
+
+    def _encode_vectors(
+        self,
+        sections: List[Dict[str, Any]],
+        vectors: np.ndarray,
+        batches: List[Tuple[List[str], List[int]]],
+        windowed: Dict[int, Tuple[List[int], List[int]]],
+        indices_to_encode: List[int],
+        texts_to_encode: List[str],
+        on_ready: Callable[[List[int]], None]
+    ) -> Dict[str, int]:
+        """_prepare_vectorsのバッチをエンコードしてvectorsに書き込む
+
+        ベクトルが揃ったセクションの行を、揃った順にon_readyに渡す
+        （キャッシュ・呼び出し元から得たベクトルの行は最初に渡す）。
 
-    def _normalize_section_data(self, section: Dict[str, Any]) -> None:
-        """セクションデータの正規化（in-place）"""
-        # タイムスタンプをPandas Timestampに変換
-        section["created_at"] = pd.Timestamp(section["created_at"]).floor('ms')
-        section["updated_at"] = pd.Timestamp(section["updated_at"]).floor('ms')
+        Returns:
+            ウィンドウに分割してプーリングしたセクションのID -> ウィンドウ数
+        """
+        completion = RowCompletion(len(sections), windowed)
+        text_by_index = dict(zip(indices_to_encode, texts_to_encode)) if windowed else {}
+        pooled_sections = {}
+        encoded_rows = set()
+
+        def on_batch(batch_texts, batch_rows, batch_vectors):
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(batch_texts, batch_vectors)
+            encoded_rows.update(batch_rows)
+            ready = completion.complete(batch_rows)
+
+            # 大きすぎるセクションは全ウィンドウが揃った時点でトークン数で重み付けしてまとめる
+            pooled = [idx for idx in ready if idx in windowed]
+            for idx in pooled:
+                rows, window_tokens = windowed[idx]
+                vectors[idx] = pool_embeddings(vectors[rows], window_tokens)
+                pooled_sections[sections[idx]["id"]] = len(rows)
+                sys.stderr.write(
+                    f"[WINDOW] Section pooled: '{sections[idx].get('heading', '(no heading)')}' "
+                    f"({len(rows)} windows, ~{sum(window_tokens)} tokens)\n"
+                )
+            if pooled and self.embedding_cache is not None:
+                self.embedding_cache.put_many([text_by_index[idx] for idx in pooled], vectors[pooled])
 
-        # Task 14: 行番号フィールドをnp.int32に変換
-        if "start_line" in section and section["start_line"] is not None:
-            section["start_line"] = np.int32(section["start_line"])
-        if "end_line" in section and section["end_line"] is not None:
-            section["end_line"] = np.int32(section["end_line"])
+            on_ready(ready)
 
-        # section_numberを明示的にnp.int32に変換（JavaScriptのnumberはPython int64として扱われるため）
-        if "section_number" in section and section["section_number"] is not None:
-            # np.int32のままにする（PyArrowがint32として認識できるように）
-            section["section_number"] = [np.int32(n) for n in section["section_number"]]
+        # キャッシュ・呼び出し元から得たベクトルはエンコードを待たずに渡せる
+        pending = set(indices_to_encode)
+        on_ready(completion.complete(i for i in range(len(sections)) if i not in pending))
 
-    def add_sections(self, params: Dict[str, Any]) -> Dict[str, int]:
+        # 複数バッチの場合はエンコードプールの子プロセスに振り分ける
+        encode_pool = self._get_encode_pool() if len(batches) > 1 else None
+        if encode_pool is not None:
+            try:
+                encode_pool.encode_into(
+                    batches, vectors, self.vector_dimension,
+                    check_cancelled=self._check_cancelled, on_batch=on_batch
+                )
+                batches = []
+            except EncodePoolError as e:
+                # プールが使えない場合はこのプロセスでエンコードする（完了済みのバッチは除く）
+                sys.stderr.write(f"[EncodePool] Warning: {e}, encoding in-process\n")
+                sys.stderr.flush()
+                self.close_encode_pool()
+                self.encode_processes = 0
+                batches = [batch for batch in batches if not encoded_rows.issuperset(batch[1])]
+
+        # バッチ処理でベクトル化
+        for batch_texts, batch_indices in batches:
+            # 呼び出し元が諦めたリクエストは残りのバッチをエンコードしない
+            self._check_cancelled()
+            rss_before_mb = self.perf_logger.sample_rss_mb() if self.batch_controller is not None else None
+            encode_start = time.perf_counter()
+            batch_vectors = self._encode_matrix(batch_texts, self.vector_dimension)
+            if self.batch_controller is not None:
+                self._observe_batch(batch_texts, time.perf_counter() - encode_start, rss_before_mb)
+            vectors[batch_indices] = batch_vectors
+            on_batch(batch_texts, batch_indices, batch_vectors)
+            del batch_vectors
+
+            # メモリ使用量がしきい値を超えた場合だけGCとMPSキャッシュクリア
+            self.gc_policy.maybe_collect()
+
+        return pooled_sections
+
+    def add_sections(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """複数のセクションを追加"""
         sections = params.get("sections")
         if not sections:
@@ -716,66 +1801,56 @@ class SearchDocsWorker:
         # スレッド情報（処理前）
         self.log_thread_info(f"BEFORE add_sections (call #{self._add_count + 1})")
 
-        # モデル初期化
-        if not self.embedding_model.available:
-            self.embedding_model.initialize()
-
-        # セクションをバリデーション
-        for section in sections:
-            validate_section(section)
-
-        # 有効なセクションからベクトル化が必要なテキストを抽出
-        texts_to_encode, indices_to_encode = get_texts_to_encode(sections)
+        table = self._get_sections_table()
 
-        # トークン量ベースのバッチ分割でベクトル化（スキップ処理も含む）
-        if texts_to_encode:
-            # トークン数でバッチを分割し、大きすぎるセクションはスキップ
-            batches, skipped_indices = self._create_token_aware_batches(texts_to_encode, indices_to_encode)
-
-            # バッチ処理でベクトル化
-            for batch_texts, batch_indices in batches:
-                vectors = self.embedding_model.encode(batch_texts, self.vector_dimension)
-                for idx, vector in zip(batch_indices, vectors):
-                    sections[idx]["vector"] = vector
-
-                # バッチごとにGCとMPSキャッシュクリア（大きなベクトルオブジェクトとGPUメモリを即座に解放）
-                gc.collect()
-                self.clear_gpu_cache()
-
-            # スキップされたセクションの処理
-            if skipped_indices:
-                for idx in skipped_indices:
-                    section = sections[idx]
-                    heading = section.get("heading", "(no heading)")
-                    token_count = section.get("token_count", 0)
-                    sys.stderr.write(
-                        f"[SKIP] Section skipped (too large): '{heading}' "
-                        f"({token_count} tokens > {self.max_batch_tokens})\n"
-                    )
-                    # 空のベクトルを設定（検索には使われないが、スキーマの整合性を保つ）
-                    sections[idx]["vector"] = np.zeros(self.vector_dimension, dtype=np.float32)
-                sys.stderr.flush()
+        # セクションを列単位でArrowテーブルに変換してバリデーション（エンコード前に不正な入力を弾く）
+        # ベクトル列はエンコード後に追加する
+        arrow_table = sections_to_arrow(sections, table.schema)
 
-        # データ正規化
-        for section in sections:
-            self._normalize_section_data(section)
+        # ベクトル行列を用意し、エンコードが必要なテキストをバッチに分ける
+        vectors, batches, windowed, indices_to_encode, texts_to_encode = self._prepare_vectors(sections)
 
-        # スレッド情報（table.add前）
+        # スレッド情報（書き込み開始前）
         self.log_thread_info("BEFORE table.add()")
 
-        # table.add実行
-        table = self._get_sections_table()
-        table.add(sections)
+        # エンコードの完了したセクションから書き込みスレッドで書き込み、次のバッチのエンコードと重ねる
+        # （writerはclose / abortで書き込み関数を手放すため、ベクトル行列とArrowテーブルは下のdelで解放される）
+        start = time.perf_counter()
+        writer = PipelinedWriter(
+            functools.partial(self._write_section_rows, table, arrow_table, vectors),
+            flush_rows=self.write_flush_rows,
+        )
+        try:
+            pooled_sections = self._encode_vectors(
+                sections, vectors, batches, windowed, indices_to_encode, texts_to_encode, on_ready=writer.submit
+            )
+
+            # 書き込み完了前の最終チェック（ここを過ぎたら最後まで実行する）
+            self._check_cancelled()
+            encode_seconds = time.perf_counter() - start - writer.wait_seconds
+            writer.close()
+        except BaseException:
+            # 途中で失敗・キャンセルした場合は書き込み済みの行を削除する（add_sectionsは全件か0件）
+            writer.abort()
+            self._rollback_sections(table, [sections[row]["id"] for row in writer.written_rows])
+            raise
+        finally:
+            del vectors, arrow_table
+
+        self.stage_timings.record(encode_seconds, writer.write_seconds, writer.wait_seconds, writer.writes)
+        sys.stderr.write(
+            f"[Pipeline] encode={encode_seconds:.2f}s write={writer.write_seconds:.2f}s "
+            f"wait={writer.wait_seconds:.2f}s total={time.perf_counter() - start:.2f}s writes={writer.writes}\n"
+        )
+        sys.stderr.flush()
 
         # スレッド情報（table.add後）
         self.log_thread_info("AFTER table.add()")
 
-        # メモリリーク対策: GCとMPSキャッシュクリアを明示的に実行（1ファイルごと）
-        # LanceDB内部の一時オブジェクトとGPUメモリを解放
-        # 世代2（最古の世代）までスキャンして完全にGC
+        # メモリリーク対策: LanceDB内部の一時オブジェクトとGPUメモリを解放
+        # 毎回ではなく、メモリ使用量がしきい値を超えた場合だけ全世代のGCを実行する
         count = len(sections)
-        gc.collect(2)
-        self.clear_gpu_cache()
+        self.gc_policy.maybe_collect()
 
         # 呼び出し回数をカウント
         self._add_count += 1
@@ -786,43 +1861,137 @@ class SearchDocsWorker:
                 sys.stderr.write(f"Compacting table (add_count={self._add_count})...\n")
                 sys.stderr.flush()
                 table.optimize.compact_files()
-                gc.collect(2)  # compact後もGC（全世代）
-                self.clear_gpu_cache()  # MPSキャッシュもクリア
+                self.gc_policy.collect()  # compact後はGC（全世代）とMPSキャッシュクリア
                 sys.stderr.write(f"Compaction completed\n")
                 sys.stderr.flush()
             except Exception as e:
                 sys.stderr.write(f"Warning: Compaction failed: {e}\n")
                 sys.stderr.flush()
 
+        # 行数がしきい値を超えたらベクトルインデックスを作成し、増えた行を追加・再学習する
+        self.update_vector_index(count)
+        # 全文検索インデックスにも増えた行を追加する（ベクトルインデックスの追加で済んでいる場合は何もしない）
+        self.update_fts_indexes(count)
+
         # スレッド情報（処理後）
         self.log_thread_info(f"AFTER add_sections (call #{self._add_count})")
 
-        return {"count": count}
+        result = {"count": count}
+        if pooled_sections:
+            # ウィンドウに分割してプーリングしたセクションのID -> ウィンドウ数
+            result["pooledSections"] = pooled_sections
+        return result
 
-    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """セクションを検索"""
-        query = params.get("query")
-        limit = params.get("limit", 10)
-        depth = params.get("depth")
-        include_clean_only = params.get("includeCleanOnly", False)
-        include_paths = params.get("includePaths", [])
-        exclude_paths = params.get("excludePaths", [])
+    def replace_document_sections(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """文書のセクションを1回のコミット（merge_insert）で置き換える
 
-        if not query:
-            raise ValueError("query parameter is required")
+        addSections + deleteSectionsByPathExceptHashでは2回のコミットになり、その間の検索には
+        新旧両方のセクションが現れる。ここでは1回のmerge_insertで次をまとめて行う。
 
-        # モデル初期化
-        if not self.embedding_model.available:
-            self.embedding_model.initialize()
+        - 見出し・本文・深さが同じセクションは、既存の行のIDとベクトルを引き継いで更新する（エンコードしない）
+        - それ以外のセクションはエンコードして追加する
+        - 新しいセクションに対応しない既存の行を削除する
 
-        # クエリをベクトル化
-        query_vector = self.embedding_model.encode(query, self.vector_dimension)
+        Args:
+            params: documentPath / documentHash / sections（すべてのセクションが同じパス・ハッシュ）
+
+        Returns:
+            {"count": n, "reused": n, "inserted": n, "deleted": n, "pooledSections": {...}}
+        """
+        document_path = params.get("documentPath")
+        document_hash = params.get("documentHash")
+        sections = params.get("sections")
+
+        if not document_path:
+            raise ValueError("documentPath parameter is required")
+        if not document_hash:
+            raise ValueError("documentHash parameter is required")
+        if not isinstance(sections, list):
+            raise ValueError("sections parameter is required")
+        for section in sections:
+            if section.get("document_path") != document_path or section.get("document_hash") != document_hash:
+                raise ValueError("all sections must have the given documentPath and documentHash")
 
-        # 検索
         table = self._get_sections_table()
-        search_query = table.search(query_vector).limit(limit)
+        path_filter = "document_path = '" + document_path.replace("'", "''") + "'"
+
+        # 既存の行と、内容が同じセクションを対応付ける
+        existing = table.search().where(path_filter).select(
+            ["id", "heading", "content", "depth", "order", "vector"]
+        ).to_arrow()
+        existing_rows = existing.drop_columns(["vector"]).to_pylist()
+        matches = match_unchanged_sections(existing_rows, sections)
+        sections, _ = remap_section_ids(sections, [row["id"] for row in existing_rows], matches)
+
+        arrow_table = sections_to_arrow(sections, table.schema)
+
+        # 引き継ぐ行は既存のベクトルを使い、それ以外だけエンコードする
+        start = time.perf_counter()
+        vectors = np.zeros((len(sections), self.vector_dimension), dtype=np.float32)
+        if matches:
+            existing_vectors = existing.column("vector").combine_chunks().flatten().to_numpy(zero_copy_only=False)
+            existing_vectors = existing_vectors.reshape(len(existing_rows), self.vector_dimension)
+            vectors[list(matches.keys())] = existing_vectors[list(matches.values())]
+        del existing
+
+        new_rows = [i for i in range(len(sections)) if i not in matches]
+        pooled_sections = {}
+        if new_rows:
+            new_sections = [sections[i] for i in new_rows]
+            new_vectors, batches, windowed, indices_to_encode, texts_to_encode = self._prepare_vectors(new_sections)
+            pooled_sections = self._encode_vectors(
+                new_sections, new_vectors, batches, windowed, indices_to_encode, texts_to_encode,
+                on_ready=lambda rows: None
+            )
+            vectors[new_rows] = new_vectors[:len(new_sections)]
+            del new_vectors
+        encode_seconds = time.perf_counter() - start
+
+        # コミット前の最終チェック（ここを過ぎたら最後まで実行する）
+        self._check_cancelled()
+
+        write_start = time.perf_counter()
+        merge_result = table.merge_insert("id") \
+            .when_matched_update_all() \
+            .when_not_matched_insert_all() \
+            .when_not_matched_by_source_delete(path_filter) \
+            .execute(with_vector_column(arrow_table, vectors, table.schema))
+        write_seconds = time.perf_counter() - write_start
+        del vectors, arrow_table
+
+        self.stage_timings.record(encode_seconds, write_seconds, 0.0, 1)
+        sys.stderr.write(
+            f"[Replace] {document_path}: reused={merge_result.num_updated_rows} "
+            f"inserted={merge_result.num_inserted_rows} deleted={merge_result.num_deleted_rows} "
+            f"encode={encode_seconds:.2f}s write={write_seconds:.2f}s\n"
+        )
+        sys.stderr.flush()
+
+        self.gc_policy.maybe_collect()
+        # 引き継いだ行も書き直されるため、インデックスに入っていない行として数える
+        self.update_vector_index(
+            len(sections), merge_result.num_inserted_rows - merge_result.num_deleted_rows
+        )
+        self.update_fts_indexes(len(sections))
+
+        result = {
+            "count": len(sections),
+            "reused": merge_result.num_updated_rows,
+            "inserted": merge_result.num_inserted_rows,
+            "deleted": merge_result.num_deleted_rows,
+        }
+        if pooled_sections:
+            result["pooledSections"] = pooled_sections
+        return result
+
+    def _search_filter(self, params: Dict[str, Any]) -> Optional[str]:
+        """検索パラメータのフィルタ（depth / includeCleanOnly / includePaths / excludePaths / excludeInflight）をWHERE句にする"""
+        depth = params.get("depth")
+        include_clean_only = params.get("includeCleanOnly", False)
+        include_paths = params.get("includePaths", [])
+        exclude_paths = params.get("excludePaths", [])
+        exclude_inflight = params.get("excludeInflight", False)
 
-        # フィルタ適用
         filters = []
         if depth is not None:
             filters.append(f"depth <= {depth}")
@@ -842,35 +2011,238 @@ class SearchDocsWorker:
             for path in exclude_paths:
                 filters.append(f"document_path NOT LIKE '{path}%'")
 
-        if filters:
-            search_query = search_query.where(" AND ".join(filters))
-
-        results = search_query.to_list()
-
-        # 結果を整形（snake_case形式で返す - TypeScript側で変換される）
-        formatted_results = []
-        for result in results:
-            formatted_results.append({
-                "id": result["id"],
-                "document_path": result["document_path"],
-                "document_hash": result["document_hash"],
-                "heading": result["heading"],
-                "depth": result["depth"],
-                "content": result["content"],
-                "score": float(result.get("_distance", 0)),
-                "is_dirty": result["is_dirty"],
-                "token_count": result["token_count"],
-                # Task 14 Phase 2: 新しいフィールドを追加
-                "start_line": result.get("start_line"),
-                "end_line": result.get("end_line"),
-                "section_number": result.get("section_number"),
-            })
+        if exclude_inflight:
+            # インデックス中の文書を除外（完全一致、検索前に適用される）
+            # 例: document_path NOT IN ('docs/a.md', 'docs/b.md')
+            inflight = self._get_inflight_paths().paths()
+            if inflight:
+                quoted = ", ".join("'" + path.replace("'", "''") + "'" for path in sorted(inflight))
+                filters.append(f"document_path NOT IN ({quoted})")
+
+        return " AND ".join(filters) if filters else None
+
+    def _ann_args(self, params: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+        """検索パラメータのnprobes / refineFactor（指定がない場合はワーカーのデフォルト）"""
+        nprobes = params.get("nprobes", self.nprobes)
+        refine_factor = params.get("refineFactor", self.refine_factor)
+        if nprobes is not None and (not isinstance(nprobes, int) or nprobes < 1):
+            raise ValueError("nprobes must be a positive integer")
+        if refine_factor is not None and (not isinstance(refine_factor, int) or refine_factor < 1):
+            raise ValueError("refineFactor must be a positive integer")
+        return nprobes, refine_factor
 
+    @staticmethod
+    def _search_mode(params: Dict[str, Any]) -> str:
+        """検索パラメータのmode（'vector' | 'fts' | 'hybrid'、デフォルト: 'vector'）"""
+        mode = params.get("mode") or SEARCH_MODE_VECTOR
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"mode must be one of {', '.join(SEARCH_MODES)}")
+        return mode
+
+    def _format_search_result(self, result: Dict[str, Any], score: float) -> Dict[str, Any]:
+        """検索結果の行を整形（snake_case形式で返す - TypeScript側で変換される）"""
         return {
-            "results": formatted_results,
-            "total": len(formatted_results)
+            "id": result["id"],
+            "document_path": result["document_path"],
+            "document_hash": result["document_hash"],
+            "heading": result["heading"],
+            "depth": result["depth"],
+            "content": result["content"],
+            "score": score,
+            "is_dirty": result["is_dirty"],
+            "token_count": result["token_count"],
+            # Task 14 Phase 2: 新しいフィールドを追加
+            "start_line": result.get("start_line"),
+            "end_line": result.get("end_line"),
+            "section_number": result.get("section_number"),
+            # インデックス中のリクエストがあるか（サーバーが結果ごとにindex_requestsを引かない）
+            "has_pending_update": result["document_path"] in self.inflight_paths,
         }
 
+    def _vector_search(
+        self,
+        table,
+        query_vector,
+        limit: int,
+        where: Optional[str],
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """ベクトル検索を実行し、距離の昇順の行を返す
+
+        nprobes / refine_factorはベクトルインデックスがある場合だけ効く（ない場合はフラットスキャン）
+        """
+        search_query = table.search(query_vector).limit(limit)
+        if where:
+            search_query = search_query.where(where)
+        if nprobes is not None:
+            search_query = search_query.nprobes(nprobes)
+        if refine_factor is not None:
+            search_query = search_query.refine_factor(refine_factor)
+        return search_query.to_list()
+
+    def _fts_index_available(self) -> bool:
+        """全文検索インデックスを使えるか
+
+        同期起動の場合は、インデックスがなければここで作成する。
+        バックグラウンド起動の場合は読み取りレーンで待たない（起動フェーズ・書き込みレーンで作成される）。
+        """
+        if self._fts_ready:
+            return True
+        if not self._background_startup:
+            self.update_fts_indexes()
+        return self._fts_ready
+
+    def _fts_search(self, table, query: str, limit: int, where: Optional[str]) -> List[Dict[str, Any]]:
+        """heading / contentの全文検索（BM25）を実行し、スコアの降順の行を返す
+
+        Raises:
+            PhaseNotReadyError: 全文検索インデックスがまだ作成されていない場合（作成後に再試行できる）
+        """
+        if not self._fts_index_available():
+            raise PhaseNotReadyError(FTS_INDEX_PHASE, "Full-text index is not ready yet; retry later")
+        # ダブルクォートはフレーズ検索の構文になるため、語の区切りとして扱う
+        text = query.replace('"', ' ').strip()
+        if not text:
+            return []
+        search_query = table.search(text, query_type="fts", fts_columns=list(FTS_COLUMNS)).limit(limit)
+        if where:
+            search_query = search_query.where(where)
+        return search_query.to_list()
+
+    def _search_one(
+        self,
+        table,
+        query: str,
+        query_vector,
+        mode: str,
+        limit: int,
+        where: Optional[str],
+        nprobes: Optional[int],
+        refine_factor: Optional[int]
+    ) -> Dict[str, Any]:
+        """1クエリを検索し、結果とステージごとの時間（ミリ秒）を返す
+
+        scoreはmodeごとに異なる: vectorは距離（小さいほど近い）、ftsはBM25のスコア、
+        hybridはReciprocal Rank Fusionのスコア（大きいほど上位）
+        """
+        timings: Dict[str, float] = {}
+        fts_pending = False
+        # 結果のhas_pending_updateのため、インデックス中のパスを読み込んでおく
+        self._get_inflight_paths()
+
+        if mode == SEARCH_MODE_VECTOR:
+            start = time.perf_counter()
+            rows = self._vector_search(table, query_vector, limit, where, nprobes, refine_factor)
+            timings["vectorMs"] = (time.perf_counter() - start) * 1000
+            results = [self._format_search_result(row, float(row.get("_distance", 0))) for row in rows]
+
+        elif mode == SEARCH_MODE_FTS:
+            start = time.perf_counter()
+            rows = self._fts_search(table, query, limit, where)
+            timings["ftsMs"] = (time.perf_counter() - start) * 1000
+            results = [self._format_search_result(row, float(row.get("_score", 0))) for row in rows]
+
+        else:
+            # それぞれの検索から多めに取り、順位で統合する
+            candidates = limit * HYBRID_CANDIDATE_FACTOR
+            start = time.perf_counter()
+            vector_rows = self._vector_search(table, query_vector, candidates, where, nprobes, refine_factor)
+            timings["vectorMs"] = (time.perf_counter() - start) * 1000
+
+            # 全文検索インデックスの作成中はベクトル検索の順位だけで統合する
+            fts_rows: List[Dict[str, Any]] = []
+            if self._fts_index_available():
+                start = time.perf_counter()
+                fts_rows = self._fts_search(table, query, candidates, where)
+                timings["ftsMs"] = (time.perf_counter() - start) * 1000
+            else:
+                fts_pending = True
+
+            start = time.perf_counter()
+            rows_by_id = {row["id"]: row for row in fts_rows}
+            rows_by_id.update({row["id"]: row for row in vector_rows})
+            fused = reciprocal_rank_fusion(
+                [[row["id"] for row in vector_rows], [row["id"] for row in fts_rows]], limit=limit
+            )
+            results = [self._format_search_result(rows_by_id[section_id], score) for section_id, score in fused]
+            timings["fusionMs"] = (time.perf_counter() - start) * 1000
+
+        response = {
+            "results": results,
+            "total": len(results),
+            "timings": {name: round(ms, 3) for name, ms in timings.items()},
+        }
+        if fts_pending:
+            # 全文検索の結果を含まない（インデックスの作成後に再検索すると順位が変わりうる）
+            response["ftsIndexPending"] = True
+        return response
+
+    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """セクションを検索（mode: 'vector' | 'fts' | 'hybrid'）"""
+        query = params.get("query")
+        limit = params.get("limit", 10)
+
+        if not query:
+            raise ValueError("query parameter is required")
+        mode = self._search_mode(params)
+        nprobes, refine_factor = self._ann_args(params)
+
+        # クエリをベクトル化（キャッシュにある場合はモデルを通さない、全文検索だけの場合は不要）
+        query_vector = None
+        embed_ms = None
+        if mode != SEARCH_MODE_FTS:
+            start = time.perf_counter()
+            query_vector = self._encode_query(query)
+            embed_ms = round((time.perf_counter() - start) * 1000, 3)
+
+        # 検索
+        table = self._get_sections_table()
+        response = self._search_one(
+            table, query, query_vector, mode, limit, self._search_filter(params), nprobes, refine_factor
+        )
+        if embed_ms is not None:
+            response["timings"] = {"embedMs": embed_ms, **response["timings"]}
+        return response
+
+    def search_batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """複数のクエリを共通のフィルタで検索
+
+        キャッシュにないクエリは1回の推論でまとめてベクトル化し、クエリごとに検索する。
+
+        Returns:
+            {"responses": [{"results": [...], "total": n, "timings": {...}}, ...], "timings": {"embedMs": ...}}
+            （responsesはqueriesと同じ順序、embedMsは全クエリのベクトル化の時間）
+        """
+        queries = params.get("queries")
+        limit = params.get("limit", 10)
+
+        if not queries or not isinstance(queries, list):
+            raise ValueError("queries parameter is required")
+        if not all(isinstance(query, str) and query for query in queries):
+            raise ValueError("queries must be non-empty strings")
+        mode = self._search_mode(params)
+        nprobes, refine_factor = self._ann_args(params)
+
+        timings = {}
+        query_vectors: List[Any] = [None] * len(queries)
+        if mode != SEARCH_MODE_FTS:
+            start = time.perf_counter()
+            query_vectors = self._encode_queries(queries)
+            timings["embedMs"] = round((time.perf_counter() - start) * 1000, 3)
+
+        table = self._get_sections_table()
+        where = self._search_filter(params)
+        responses = []
+        for query, query_vector in zip(queries, query_vectors):
+            # 呼び出し元が諦めたリクエストは残りのクエリを検索しない
+            self._check_cancelled()
+            responses.append(
+                self._search_one(table, query, query_vector, mode, limit, where, nprobes, refine_factor)
+            )
+
+        return {"responses": responses, "timings": timings}
+
     def get_sections_by_path(self, params: Dict[str, Any]) -> Dict[str, List]:
         """指定パスのセクションを取得"""
         document_path = params.get("documentPath")
@@ -1010,12 +2382,51 @@ class SearchDocsWorker:
             sys.stderr.flush()
             total_documents = 0
 
-        return {
+        stats = {
             "totalSections": total,
             "dirtyCount": dirty_count,
             "totalDocuments": total_documents
         }
 
+        # レーン別のキュー深さ（stdioループ経由の場合のみ）
+        if self.dispatcher is not None:
+            stats["lanes"] = self.dispatcher.get_stats()
+
+        # キャンセル・期限切れで打ち切った件数
+        stats["cancellation"] = self.cancellation.get_stats()
+
+        # 埋め込みキャッシュのヒット・ミス件数
+        if self.embedding_cache is not None:
+            stats["embeddingCache"] = self.embedding_cache.get_stats()
+
+        # クエリベクトルキャッシュのヒット・ミス件数
+        stats["queryCache"] = self.query_cache.get_stats()
+
+        # エンコードプールのスループット（起動済みの場合のみ）
+        if self.encode_pool is not None:
+            stats["encodePool"] = self.encode_pool.get_stats()
+
+        # add_sectionsのステージ別の累計時間
+        stats["pipeline"] = self.stage_timings.get_stats()
+
+        # GCの実行回数と時間
+        stats["gc"] = self.gc_policy.get_stats()
+
+        # ベクトルインデックスの行数と作成・追加の回数
+        stats["vectorIndex"] = self.vector_index_policy.get_stats()
+
+        # インデックス中のパス数と差分更新の回数
+        stats["inflightPaths"] = self._get_inflight_paths().get_stats()
+
+        # index_requestsの削除・コンパクションの累計
+        stats["requestRetention"] = self.request_retention.get_stats()
+
+        # バッチのトークン数の自動調整の現在の予算（有効な場合のみ）
+        if self.batch_controller is not None:
+            stats["adaptiveBatch"] = self.batch_controller.get_stats()
+
+        return stats
+
     # ========================================
     # IndexRequest操作
     # ========================================
@@ -1026,6 +2437,7 @@ class SearchDocsWorker:
         validate_index_request(params, for_creation=True)
 
         table = self._get_index_requests_table()
+        inflight_paths = self._get_inflight_paths()
 
         # IDを生成
         request_id = str(uuid.uuid4())
@@ -1045,6 +2457,7 @@ class SearchDocsWorker:
 
         # データを追加
         table.add([request_data])
+        inflight_paths.update(request_id, request_data["document_path"], request_data["status"])
 
         # 完全なリクエストオブジェクトを返す（camelCaseに変換）
         return {
@@ -1162,6 +2575,7 @@ class SearchDocsWorker:
             raise ValueError("Missing required field: updates")
 
         table = self._get_index_requests_table()
+        inflight_paths = self._get_inflight_paths()
 
         # タイムスタンプの変換（ミリ秒精度）
         if "started_at" in updates and updates["started_at"]:
@@ -1181,6 +2595,8 @@ class SearchDocsWorker:
             raise ValueError(f"Request not found after update: {request_id}")
 
         req = df.iloc[0].to_dict()
+        if "status" in updates:
+            inflight_paths.update(req["id"], req["document_path"], req["status"])
         return {
             "id": req["id"],
             "documentPath": req["document_path"],
@@ -1201,6 +2617,7 @@ class SearchDocsWorker:
             raise ValueError("Missing required field: updates")
 
         table = self._get_index_requests_table()
+        inflight_paths = self._get_inflight_paths()
 
         # フィルタ条件の構築
         where_clauses = []
@@ -1231,12 +2648,20 @@ class SearchDocsWorker:
         where_str = " AND ".join(where_clauses)
         count = table.count_rows(filter=where_str)
 
+        # statusを変える場合は、インデックス中のパスの差分更新のため対象のIDとパスを取得しておく
+        targets = []
+        if "status" in updates:
+            targets = table.search().where(where_str).select(["id", "document_path"]).to_list()
+
         # 更新実行
         table.update(
             where=where_str,
             values=updates
         )
 
+        for target in targets:
+            inflight_paths.update(target["id"], target["document_path"], updates["status"])
+
         return {"updated": True, "count": count}
 
     def get_paths_with_status(self, params: Dict[str, Any]) -> Dict[str, List]:
@@ -1245,6 +2670,10 @@ class SearchDocsWorker:
         if not statuses:
             raise ValueError("Missing required field: statuses")
 
+        # pending / processingだけの場合はメモリ上の集合から返す（テーブルを走査しない）
+        if set(statuses) <= INFLIGHT_STATUSES:
+            return {"paths": self._get_inflight_paths().paths(statuses)}
+
         table = self._get_index_requests_table()
 
         # statusフィルタの構築
@@ -1259,30 +2688,195 @@ class SearchDocsWorker:
 
         return {"paths": paths}
 
+    def purge_index_requests(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """保持期間を過ぎた終了済みのIndexRequestを削除し、テーブルをコンパクションする
 
-def main():
-    """メインループ"""
-    # 標準入出力をUTF-8で明示的にラップ
-    sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
+        パスごとの最新の終了済みのリクエストと、インデックス中のリクエストは残す。
+        statusの更新ごとに書かれた古いバージョンも、コンパクションの後に削除する。
 
-    db_path = SearchDocsWorker._get_db_path()
-    worker = SearchDocsWorker(db_path=db_path)
+        Args:
+            params: retentionDays（省略時は --request-retention-days の値）
+
+        Returns:
+            {"purgedRows": n, "bytesBefore": n, "bytesAfter": n, "reclaimedBytes": n,
+             "removedVersions": n, "seconds": s}
+        """
+        retention = None
+        if params.get("retentionDays") is not None:
+            retention_days = params["retentionDays"]
+            if not isinstance(retention_days, (int, float)) or retention_days < 0:
+                raise ValueError("retentionDays must be a non-negative number")
+            retention = timedelta(days=retention_days)
+
+        table = self._get_index_requests_table()
+        start = time.perf_counter()
+        bytes_before = directory_size(table.uri)
+        versions_before = len(table.list_versions())
+
+        # 終了済みのリクエストだけを読み、削除する行を選ぶ（created_atはタイムゾーンなしのUTC）
+        where = " OR ".join(f"status = '{status}'" for status in TERMINAL_STATUSES)
+        rows = table.search().where(where).select(["id", "document_path", "status", "created_at"]).to_list()
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        purge_ids = self.request_retention.select_purgeable(rows, now, retention)
+
+        # IN句が長くなりすぎないように分けて削除する
+        for i in range(0, len(purge_ids), 1000):
+            self._check_cancelled()
+            quoted = ", ".join(f"'{request_id}'" for request_id in purge_ids[i:i + 1000])
+            table.delete(f"id IN ({quoted})")
+
+        # 小さなフラグメントをまとめ、古いバージョンを削除する（スカラーインデックスも更新される）
+        table.optimize(cleanup_older_than=self.request_retention.version_retention)
+
+        result = self.request_retention.record(
+            purged_rows=len(purge_ids),
+            bytes_before=bytes_before,
+            bytes_after=directory_size(table.uri),
+            versions_before=versions_before,
+            versions_after=len(table.list_versions()),
+            seconds=time.perf_counter() - start,
+        )
+        sys.stderr.write(
+            f"[RequestRetention] Purged {result['purgedRows']} requests, "
+            f"reclaimed {result['reclaimedBytes']} bytes and {result['removedVersions']} versions "
+            f"in {result['seconds']:.2f}s\n"
+        )
+        sys.stderr.flush()
+        return result
 
-    # 標準入力からJSON-RPCリクエストを読み取る
-    for line in sys.stdin:
+
+def _get_transport_arg() -> Optional[str]:
+    """コマンドライン引数から要求されたトランスポートを取得（--transport=xxx形式）"""
+    for arg in sys.argv[1:]:
+        if arg.startswith('--transport='):
+            return arg.split('=', 1)[1]
+    return None
+
+
+def _get_listen_arg() -> Optional[str]:
+    """コマンドライン引数から待ち受けアドレスを取得（--listen=unix:/path形式）"""
+    for arg in sys.argv[1:]:
+        if arg.startswith('--listen='):
+            return arg.split('=', 1)[1]
+    return None
+
+
+def _serve_stdio(channel: MessageChannel, serve_message) -> None:
+    """標準入力からリクエストを読み取り、閉じられるまで処理する"""
+    while True:
         try:
-            request = json.loads(line)
-            response = worker.handle_request(request)
-            print(json.dumps(response, ensure_ascii=False), flush=True)
-        except json.JSONDecodeError as e:
-            sys.stderr.write(f"Invalid JSON: {e}\n")
+            request = channel.read_message()
+        except EOFError:
+            break
+        except ValueError as e:
+            sys.stderr.write(f"Invalid message: {e}\n")
             sys.stderr.flush()
+            continue
+
+        try:
+            serve_message(request, channel.write_message)
         except Exception as e:
             sys.stderr.write(f"Error: {e}\n")
             sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
             sys.stderr.flush()
 
 
+def _serve_socket(socket_path: str, worker: SearchDocsWorker, serve_message) -> None:
+    """Unixドメインソケットで複数クライアントを受け付け、SIGTERM/SIGINTまで処理する"""
+    server = WorkerSocketServer(
+        socket_path,
+        serve=serve_message,
+        cancel=worker.cancellation.cancel
+    )
+
+    def stop(signum, frame):
+        # serve_forever()と同じスレッドからshutdown()を呼ぶとデッドロックするため別スレッドで止める
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    sys.stderr.write(f"[SocketServer] Listening on {socket_path}\n")
+    sys.stderr.flush()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main():
+    """メインループ
+
+    標準入力からリクエストを読み取り、ディスパッチャでレーンに振り分ける。
+    検索・メタデータ参照は読み取りレーン、addSectionsなどは書き込みレーンで並行に処理され、
+    レスポンスは完了順に標準出力へ書き出される（idで対応付け）。
+    1メッセージがJSON配列の場合はJSON-RPCバッチとして処理し、レスポンスも1つの配列で返す。
+    `$/cancelRequest` 通知は受信スレッドで即座に処理し、キュー待ち・処理中のリクエストを打ち切る。
+
+    `--listen=unix:/path` を指定した場合は標準入力の代わりにUnixドメインソケットで待ち受け、
+    複数のクライアントが1つのワーカー（モデル・テーブルハンドル・レーン）を共有する。
+    """
+    listen = _get_listen_arg()
+    # モデルをロードする前にアドレスを検証する
+    socket_path = parse_listen_address(listen) if listen is not None else None
+
+    channel = None
+    if socket_path is None:
+        # 標準入出力はバイナリのまま扱う（JSON行はUTF-8、msgpackは長さプレフィックス付きフレーム）
+        channel = MessageChannel(sys.stdin.buffer, sys.stdout.buffer)
+
+        # トランスポートのネゴシエーション（要求があった場合のみハンドシェイクを送る）
+        requested_transport = _get_transport_arg()
+        if requested_transport is not None:
+            transport = negotiate_transport(requested_transport)
+            if transport != requested_transport:
+                sys.stderr.write(
+                    f"[Transport] '{requested_transport}' is not available, falling back to '{transport}'\n"
+                )
+            sys.stderr.write(f"[Transport] Using {transport} transport\n")
+            sys.stderr.flush()
+            channel.send_handshake(transport)
+
+    db_path = SearchDocsWorker._get_db_path()
+    # モデルロードとインデックス構築はバックグラウンドで行い、すぐに受信ループを開始する
+    worker = SearchDocsWorker(db_path=db_path, background_startup=True)
+
+    if _import_profiler is not None:
+        # 最初の応答までに必要なインポートのコスト（以降の遅延インポートは都度出力される）
+        _import_profiler.report("imports before first response")
+
+    dispatcher = RequestDispatcher(
+        handler=worker.handle_message,
+        lane_for=worker.lane_for_request
+    )
+    worker.dispatcher = dispatcher
+    worker.perf_logger.dispatcher = dispatcher
+    dispatcher.start()
+
+    # index_requestsの定期削除（他の書き込みと同時にコミットしないよう書き込みレーンで実行する）
+    purge_task = None
+    if worker.request_purge_interval > 0:
+        purge_request = {"jsonrpc": "2.0", "method": "purgeIndexRequests", "params": {}, "id": None}
+        purge_task = PeriodicTask(
+            'request-purge',
+            worker.request_purge_interval,
+            run=lambda: dispatcher.submit(purge_request, reply=lambda response: None),
+        )
+        purge_task.start()
+
+    # キャンセル通知は受信スレッドで処理し、それ以外をレーンに積む
+    # （モデルのロード中は、ベクトル化が必要な検索をロード完了まで保留する）
+    if socket_path is not None:
+        _serve_socket(socket_path, worker, worker.submit_message)
+    else:
+        _serve_stdio(channel, worker.submit_message)
+
+    # 入力が閉じられたら、キューに残った処理を終えてから終了
+    if purge_task is not None:
+        purge_task.stop()
+    dispatcher.shutdown(wait=True)
+    worker.close_encode_pool()
+
+
 if __name__ == "__main__":
     main()
@@ -1,9 +1,11 @@
 import { spawn, ChildProcess } from 'child_process';
 import { EventEmitter } from 'events';
-import type { Section, SearchOptions, SearchResult } from '@search-docs/types';
+import * as net from 'net';
+import type { Section, SearchOptions, SearchResult, SearchTimings } from '@search-docs/types';
 import * as path from 'path';
 import * as fs from 'fs';
 import { fileURLToPath } from 'url';
+import { encodeMsgpack, decodeMsgpack } from './msgpack.js';
 
 /**
  * パッケージルートディレクトリを取得
@@ -31,6 +33,15 @@ interface PendingRequest {
   reject: (error: unknown) => void;
 }
 
+interface JsonRpcRequest {
+  jsonrpc: '2.0';
+  method: string;
+  params?: unknown;
+  id: number;
+  /** 期限（エポックミリ秒）。ワーカーは期限を過ぎたリクエストを実行しない */
+  deadline?: number;
+}
+
 interface JsonRpcResponse {
   id: number;
   result?: unknown;
@@ -49,6 +60,30 @@ export interface DBEngineOptions {
    */
   embeddingModel?: string;
 
+  /**
+   * 埋め込みモデルの推論バックエンド
+   * - 'torch': SentenceTransformer（PyTorch）
+   * - 'onnx': ONNX Runtime（CPU）
+   * - 'onnx-int8': ONNX Runtime + 動的int8量子化（CPU）
+   * ONNXバックエンドには `uv sync --extra onnx` が必要
+   * @default 'torch'
+   */
+  embeddingBackend?: EmbeddingBackend;
+
+  /**
+   * 推論のスレッド数（OMP_NUM_THREADSとONNX Runtimeのスレッド数）
+   * @default 4
+   */
+  numThreads?: number;
+
+  /**
+   * エンコードプールのプロセス数（大量のセクションをnumThreadsスレッドの子プロセスに振り分けてエンコード）
+   * - 0または1: プールを使わない
+   * - 'auto': 利用可能なコア数 / numThreads
+   * @default 0
+   */
+  encodeProcesses?: number | 'auto';
+
   /**
    * データベースパス
    * @default './.search-docs/index'
@@ -61,6 +96,36 @@ export interface DBEngineOptions {
    */
   maxBatchTokens?: number;
 
+  /**
+   * バッチのトークン数の自動調整の下限
+   * 指定するとワーカーがバッチごとのスループットとRSSを計測し、minBatchTokens〜maxBatchTokensの範囲で調整する
+   */
+  minBatchTokens?: number;
+
+  /**
+   * 自動調整でバッチを大きくしないRSS（MB）
+   * @default pythonMaxMemoryMBの80%
+   */
+  batchMemoryLimitMB?: number;
+
+  /**
+   * 前回のGCからRSSとArrowの確保量がこれだけ増えたらGCする（MB、0で毎回GC）
+   * @default 256
+   */
+  gcEveryMB?: number;
+
+  /**
+   * RSSがこれを超えたらGCする（MB）
+   * @default pythonMaxMemoryMBの60%
+   */
+  gcRssThresholdMB?: number;
+
+  /**
+   * Arrowのメモリプールの確保量がこれを超えたらGCする（MB）
+   * @default 1024
+   */
+  gcArrowThresholdMB?: number;
+
   /**
    * Pythonワーカーの最大メモリ使用量（MB）
    * 超過時に自動再起動
@@ -72,29 +137,322 @@ export interface DBEngineOptions {
    * @default 30000
    */
   memoryCheckIntervalMs?: number;
+
+  /**
+   * Pythonワーカーとの通信方式
+   * - 'json': 改行区切りのJSON
+   * - 'msgpack': 長さプレフィックス付きのMessagePackフレーム（大きなセクション本文のエンコード/デコードが軽い）
+   * ワーカー側でmsgpackが利用できない場合は自動的に'json'にフォールバックする
+   * @default 'json'
+   */
+  transport?: WorkerTransport;
+
+  /**
+   * 埋め込みベクトルキャッシュの最大件数（0でキャッシュ無効）
+   * セクションのテキストが前回と同じ場合はエンコードせずにキャッシュのベクトルを使う
+   * @default 200000
+   */
+  embeddingCacheSize?: number;
+
+  /**
+   * セクション数がこれを超えたらベクトルインデックスを作成する（0でインデックスを作成しない）
+   * 作成後はadd_sectionsの後に新しい行を追加し、学習時から2倍になったら再学習する
+   * @default 10000
+   */
+  vectorIndexMinRows?: number;
+
+  /**
+   * ベクトルインデックスの種類
+   * @default 'IVF_PQ'
+   */
+  vectorIndexType?: VectorIndexType;
+
+  /**
+   * 検索するパーティション数のデフォルト（検索ごとにnprobesで上書きできる）
+   */
+  vectorIndexNprobes?: number;
+
+  /**
+   * 検索の再ランキングの倍率のデフォルト（検索ごとにrefineFactorで上書きできる）
+   * @default IVF_PQは10、IVF_HNSW_SQは2
+   */
+  vectorIndexRefineFactor?: number;
+
+  /**
+   * 終了済みのIndexRequestの保持期間（日）。パスごとの最新は期間を過ぎても残す
+   * @default 7
+   */
+  requestRetentionDays?: number;
+
+  /**
+   * IndexRequestの削除とコンパクションの間隔（ミリ秒）。0で定期実行しない
+   * @default 3600000
+   */
+  requestPurgeIntervalMs?: number;
+
+  /**
+   * 共有ワーカーのUnixドメインソケットのパス
+   * 指定した場合はワーカーを起動せず、`worker.py --listen=unix:<path>` で起動済みのワーカーに接続する
+   * （モデルとテーブルハンドルを複数のプロセスで共有する）
+   */
+  socketPath?: string;
+}
+
+export type WorkerTransport = 'json' | 'msgpack';
+
+export type EmbeddingBackend = 'torch' | 'onnx' | 'onnx-int8';
+
+export type VectorIndexType = 'IVF_PQ' | 'IVF_HNSW_SQ';
+
+/**
+ * トランスポートのハンドシェイク通知（ワーカーが起動直後にJSON行で送る）
+ */
+const TRANSPORT_HANDSHAKE_METHOD = '$/transport';
+
+// フレームヘッダ（ペイロード長: uint32 big-endian）のサイズ
+const FRAME_HEADER_BYTES = 4;
+
+/**
+ * リクエストのキャンセル通知（タイムアウトしたリクエストをワーカー側でも打ち切る）
+ */
+const CANCEL_REQUEST_METHOD = '$/cancelRequest';
+
+// sendRequestのタイムアウト（プロセス分離モード考慮）
+const REQUEST_TIMEOUT_MS = 300000;
+
+/**
+ * Pythonワーカーの起動フェーズ
+ * imports / connect / tables は同期的に、model / indexes はバックグラウンドで実行される
+ */
+export interface StartupPhase {
+  status: 'pending' | 'running' | 'done' | 'failed';
+  startMs?: number;  // ワーカープロセス起動からの経過時間
+  durationMs?: number;
+  error?: string;
+}
+
+export interface StartupTimings {
+  elapsedMs: number;
+  phases: Record<string, StartupPhase>;
 }
 
 export interface DBEngineStatus {
   status: 'ok' | 'error';
   model_name?: string;
   dimension?: number;
+  /** 全ての起動フェーズ（モデルロード・インデックス構築を含む）が完了しているか */
+  ready?: boolean;
+  startup?: StartupTimings;
 }
 
 // SearchParams is deprecated. Use SearchOptions from @search-docs/types
 export interface SearchParams extends SearchOptions {
   query: string;
+  /** インデックス中（pending / processing）の文書を除外する（ワーカーのメモリ上の集合で絞り込む） */
+  excludeInflight?: boolean;
 }
 
 // DBEngine returns SearchResponse without 'took' field (added by Server layer)
 export interface DBEngineSearchResponse {
   results: SearchResult[];
   total: number;
+  /** ステージごとの時間（ms） */
+  timings?: SearchTimings;
+  /** hybridで全文検索インデックスの作成中のため、ベクトル検索の結果だけを返した */
+  ftsIndexPending?: boolean;
+}
+
+export interface SearchBatchParams extends SearchOptions {
+  queries: string[];
+  /** インデックス中（pending / processing）の文書を除外する（ワーカーのメモリ上の集合で絞り込む） */
+  excludeInflight?: boolean;
+}
+
+export interface DBEngineSearchBatchResponse {
+  /** クエリごとの結果（queriesと同じ順序） */
+  responses: DBEngineSearchResponse[];
+  /** 全クエリに共通のステージの時間（embedMs） */
+  timings?: SearchTimings;
+}
+
+/**
+ * addSectionsの結果
+ */
+export interface AddSectionsResult {
+  count: number;
+  /** ウィンドウに分割してエンコードしたセクションのID -> ウィンドウ数 */
+  pooledSections?: Record<string, number>;
+}
+
+/**
+ * replaceDocumentSectionsの結果
+ */
+export interface ReplaceDocumentSectionsResult {
+  count: number;
+  /** 内容が同じで既存の行（IDとベクトル）を引き継いだセクション数 */
+  reused: number;
+  /** エンコードして追加したセクション数 */
+  inserted: number;
+  /** 新しいセクションに対応せず削除した既存の行数 */
+  deleted: number;
+  /** ウィンドウに分割してエンコードしたセクションのID -> ウィンドウ数 */
+  pooledSections?: Record<string, number>;
+}
+
+/**
+ * Pythonワーカーのレーン別統計
+ * - read: search / getStats / countIndexRequests などの読み取り系
+ * - write: addSections / IndexRequest更新などの書き込み・埋め込み系
+ */
+export interface LaneStats {
+  queued: number;
+  active: number;
+  completed: number;
+  maxQueued: number;
+}
+
+/**
+ * Pythonワーカーが打ち切ったリクエストの件数
+ * - cancelled: キャンセル通知、または処理中の期限切れで打ち切った件数
+ * - shed: キュー待ちの間に期限切れになり実行しなかった件数
+ * - inflight: 現在キュー待ち・処理中のリクエスト数
+ */
+export interface CancellationStats {
+  cancelled: number;
+  shed: number;
+  inflight: number;
+}
+
+export interface EmbeddingCacheStats {
+  hits: number;
+  misses: number;
+  evictions: number;
+  hitRate: number;
+}
+
+export interface QueryCacheStats {
+  hits: number;
+  misses: number;
+  expired: number;
+  evictions: number;
+  size: number;
+  hitRate: number;
+}
+
+/**
+ * エンコードプールの統計（プールが起動済みの場合のみ）
+ */
+export interface EncodePoolStats {
+  processes: number;
+  batches: number;
+  texts: number;
+  textsPerSecond: number;
+}
+
+/**
+ * addSectionsのステージ別の累計時間（秒）
+ * encodeSecondsとwriteSecondsは重なって進むため、合計は経過時間より大きくなりうる
+ */
+export interface PipelineStats {
+  calls: number;
+  writes: number;
+  encodeSeconds: number;
+  writeSeconds: number;
+  writeWaitSeconds: number;
+}
+
+/**
+ * バッチのトークン数の自動調整の状態（minBatchTokens指定時のみ）
+ */
+export interface AdaptiveBatchStats {
+  batchTokens: number;
+  minTokens: number;
+  maxTokens: number;
+  memoryLimitMB: number | null;
+  tokensPerSecond: number | null;
+  rssMB: number | null;
+  adjustments: number;
+  memoryBackoffs: number;
+}
+
+/**
+ * GCの実行回数と時間（メモリ使用量がしきい値を超えた場合だけ実行）
+ */
+export interface GcStats {
+  checks: number;
+  collections: number;
+  gcSeconds: number;
+  collectedObjects: number;
+  reasons: Partial<Record<'rss' | 'arrow' | 'allocated' | 'forced', number>>;
+}
+
+/**
+ * ベクトルインデックスの状態と、作成・追加の回数と時間
+ */
+export interface VectorIndexStats {
+  indexType: VectorIndexType | null;
+  minRows: number;
+  indexedRows: number | null;
+  unindexedRows: number | null;
+  trainedRows: number | null;
+  builds: number;
+  updates: number;
+  indexSeconds: number;
+}
+
+/**
+ * インデックス中（pending / processing）のパスの集合
+ * - paths / requests: 現在のパス数・リクエスト数
+ * - updates: IndexRequestの作成・更新による差分更新の回数
+ */
+export interface InflightPathsStats {
+  paths: number;
+  requests: number;
+  updates: number;
+}
+
+/**
+ * IndexRequestの削除とコンパクションの結果（1回分）
+ * - reclaimedBytes: index_requestsテーブルのディスク上のサイズの減少量
+ * - removedVersions: 削除した古いバージョンの数
+ */
+export interface PurgeIndexRequestsResult {
+  purgedRows: number;
+  bytesBefore: number;
+  bytesAfter: number;
+  reclaimedBytes: number;
+  removedVersions: number;
+  seconds: number;
+}
+
+/**
+ * IndexRequestの保持期間と、これまでの削除・コンパクションの累計
+ */
+export interface RequestRetentionStats {
+  retentionDays: number;
+  purges: number;
+  purgedRows: number;
+  reclaimedBytes: number;
+  removedVersions: number;
+  purgeSeconds: number;
+  lastPurge: PurgeIndexRequestsResult | null;
 }
 
 export interface StatsResponse {
   totalSections: number;
   dirtyCount: number;
   totalDocuments: number;
+  lanes?: Record<'read' | 'write', LaneStats>;
+  cancellation?: CancellationStats;
+  embeddingCache?: EmbeddingCacheStats;
+  queryCache?: QueryCacheStats;
+  encodePool?: EncodePoolStats;
+  pipeline?: PipelineStats;
+  adaptiveBatch?: AdaptiveBatchStats;
+  gc?: GcStats;
+  vectorIndex?: VectorIndexStats;
+  inflightPaths?: InflightPathsStats;
+  requestRetention?: RequestRetentionStats;
 }
 
 // IndexRequest関連の型定義
@@ -155,20 +513,44 @@ interface PerformanceLog {
     processing: number;
     pending: number;
   };
+  lanes?: Record<'read' | 'write', LaneStats>;
+  cancellation?: CancellationStats;
+  embedding_cache?: EmbeddingCacheStats;
+  query_cache?: QueryCacheStats;
 }
 
 export class DBEngine extends EventEmitter {
   private worker: ChildProcess | null = null;
+  private socket: net.Socket | null = null; // 共有ワーカーへの接続（socketPath指定時）
   private requestId = 0;
   private pendingRequests = new Map<number, PendingRequest>();
   private isReady = false;
-  private buffer = ''; // 受信データのバッファ
-  private options: Pick<Required<DBEngineOptions>, 'embeddingModel' | 'dbPath' | 'maxBatchTokens'>;
+  private buffer: Buffer = Buffer.alloc(0); // 受信データのバッファ
+  private transport: WorkerTransport = 'json'; // 現在の受信・送信トランスポート
+  private pendingWrites: unknown[] | null = null; // ハンドシェイク待ちの送信メッセージ
+  private batchQueue: JsonRpcRequest[] | null = null; // batch()実行中に積まれるリクエスト
+  private options: Pick<Required<DBEngineOptions>, 'embeddingModel' | 'dbPath' | 'maxBatchTokens' | 'transport'>;
   private performanceCsvPath: string | null = null;
   private performanceCsvStream: fs.WriteStream | null = null;
   private memoryCheckInterval: NodeJS.Timeout | null = null;
   private pythonMaxMemoryMB: number | null = null;
   private memoryCheckIntervalMs: number = 30000;
+  private socketPath: string | null = null;
+  private embeddingCacheSize: number | null = null;
+  private embeddingBackend: EmbeddingBackend | null = null;
+  private numThreads: number | null = null;
+  private encodeProcesses: number | 'auto' | null = null;
+  private minBatchTokens: number | null = null;
+  private batchMemoryLimitMB: number | null = null;
+  private gcEveryMB: number | null = null;
+  private gcRssThresholdMB: number | null = null;
+  private gcArrowThresholdMB: number | null = null;
+  private vectorIndexMinRows: number | null = null;
+  private vectorIndexType: VectorIndexType | null = null;
+  private vectorIndexNprobes: number | null = null;
+  private vectorIndexRefineFactor: number | null = null;
+  private requestRetentionDays: number | null = null;
+  private requestPurgeIntervalMs: number | null = null;
 
   // openPromiseパターン: 接続完了を外部から待機可能にする
   private connectedPromise: Promise<void>;
@@ -181,9 +563,26 @@ export class DBEngine extends EventEmitter {
       embeddingModel: options.embeddingModel || 'cl-nagoya/ruri-v3-30m',
       dbPath: options.dbPath || './.search-docs/index',
       maxBatchTokens: options.maxBatchTokens ?? 4000,
+      transport: options.transport ?? 'json',
     };
     this.pythonMaxMemoryMB = options.pythonMaxMemoryMB ?? null;
     this.memoryCheckIntervalMs = options.memoryCheckIntervalMs ?? 30000;
+    this.socketPath = options.socketPath ?? null;
+    this.embeddingCacheSize = options.embeddingCacheSize ?? null;
+    this.embeddingBackend = options.embeddingBackend ?? null;
+    this.numThreads = options.numThreads ?? null;
+    this.encodeProcesses = options.encodeProcesses ?? null;
+    this.minBatchTokens = options.minBatchTokens ?? null;
+    this.batchMemoryLimitMB = options.batchMemoryLimitMB ?? null;
+    this.gcEveryMB = options.gcEveryMB ?? null;
+    this.gcRssThresholdMB = options.gcRssThresholdMB ?? null;
+    this.gcArrowThresholdMB = options.gcArrowThresholdMB ?? null;
+    this.vectorIndexMinRows = options.vectorIndexMinRows ?? null;
+    this.vectorIndexType = options.vectorIndexType ?? null;
+    this.vectorIndexNprobes = options.vectorIndexNprobes ?? null;
+    this.vectorIndexRefineFactor = options.vectorIndexRefineFactor ?? null;
+    this.requestRetentionDays = options.requestRetentionDays ?? null;
+    this.requestPurgeIntervalMs = options.requestPurgeIntervalMs ?? null;
 
     // 接続完了を待機できるPromiseを作成
     this.connectedPromise = new Promise((resolve, reject) => {
@@ -198,14 +597,14 @@ export class DBEngine extends EventEmitter {
   async connect(): Promise<void> {
     console.log('[DBEngine.connect] Starting connection...');
 
-    if (this.worker && this.isReady) {
+    if (this.isConnected() && this.isReady) {
       // 既に接続済みかつ準備完了の場合は何もしない（冪等性）
       console.log('DBEngine: Already connected and ready, skipping reconnection');
       // 既に解決済みのPromiseが返される
       return;
     }
 
-    if (this.worker && !this.isReady) {
+    if (this.isConnected() && !this.isReady) {
       // ワーカーは存在するが準備未完了の場合は待機
       console.log('DBEngine: Worker exists but not ready, waiting for ready state...');
       await this.waitForReady(null, () => false);
@@ -213,6 +612,11 @@ export class DBEngine extends EventEmitter {
       return;
     }
 
+    if (this.socketPath) {
+      await this.connectSocket(this.socketPath);
+      return;
+    }
+
     // パッケージルートを取得（@search-docs/db-engineパッケージのルート）
     const packageRoot = getPackageRoot();
     console.log('[DBEngine.connect] packageRoot:', packageRoot);
@@ -244,17 +648,90 @@ export class DBEngine extends EventEmitter {
       pythonArgs.push(`--model=${this.options.embeddingModel}`);
     }
 
+    // 推論バックエンドとスレッド数（未指定の場合はワーカーのデフォルト）
+    if (this.embeddingBackend !== null) {
+      pythonArgs.push(`--embedding-backend=${this.embeddingBackend}`);
+    }
+    if (this.numThreads !== null) {
+      pythonArgs.push(`--num-threads=${this.numThreads}`);
+    }
+    if (this.encodeProcesses !== null) {
+      pythonArgs.push(`--encode-processes=${this.encodeProcesses}`);
+    }
+
     // maxBatchTokensオプションを追加
     if (this.options.maxBatchTokens !== undefined) {
       pythonArgs.push(`--max-batch-tokens=${this.options.maxBatchTokens}`);
     }
 
+    // バッチのトークン数の自動調整（メモリ上限は自動再起動の上限より手前にする）
+    if (this.minBatchTokens !== null) {
+      pythonArgs.push(`--min-batch-tokens=${this.minBatchTokens}`);
+      const memoryLimitMB =
+        this.batchMemoryLimitMB ??
+        (this.pythonMaxMemoryMB !== null ? Math.floor(this.pythonMaxMemoryMB * 0.8) : null);
+      if (memoryLimitMB !== null) {
+        pythonArgs.push(`--batch-memory-limit-mb=${memoryLimitMB}`);
+      }
+    }
+
+    // GCのしきい値（RSSは自動再起動の上限より手前にする）
+    if (this.gcEveryMB !== null) {
+      pythonArgs.push(`--gc-every-mb=${this.gcEveryMB}`);
+    }
+    const gcRssThresholdMB =
+      this.gcRssThresholdMB ??
+      (this.pythonMaxMemoryMB !== null ? Math.floor(this.pythonMaxMemoryMB * 0.6) : null);
+    if (gcRssThresholdMB !== null) {
+      pythonArgs.push(`--gc-rss-threshold-mb=${gcRssThresholdMB}`);
+    }
+    if (this.gcArrowThresholdMB !== null) {
+      pythonArgs.push(`--gc-arrow-threshold-mb=${this.gcArrowThresholdMB}`);
+    }
+
+    // ベクトルインデックスと検索のデフォルト（未指定の場合はワーカーのデフォルト）
+    if (this.vectorIndexMinRows !== null) {
+      pythonArgs.push(`--vector-index-min-rows=${this.vectorIndexMinRows}`);
+    }
+    if (this.vectorIndexType !== null) {
+      pythonArgs.push(`--vector-index-type=${this.vectorIndexType}`);
+    }
+    if (this.vectorIndexNprobes !== null) {
+      pythonArgs.push(`--nprobes=${this.vectorIndexNprobes}`);
+    }
+    if (this.vectorIndexRefineFactor !== null) {
+      pythonArgs.push(`--refine-factor=${this.vectorIndexRefineFactor}`);
+    }
+
+    // IndexRequestの保持期間と定期削除の間隔（未指定の場合はワーカーのデフォルト）
+    if (this.requestRetentionDays !== null) {
+      pythonArgs.push(`--request-retention-days=${this.requestRetentionDays}`);
+    }
+    if (this.requestPurgeIntervalMs !== null) {
+      pythonArgs.push(`--request-purge-interval=${this.requestPurgeIntervalMs / 1000}`);
+    }
+
+    // 埋め込みキャッシュの最大件数（未指定の場合はワーカーのデフォルト）
+    if (this.embeddingCacheSize !== null) {
+      pythonArgs.push(`--embedding-cache-size=${this.embeddingCacheSize}`);
+    }
+
     // dbPathを絶対パスに解決して追加
     const absoluteDbPath = path.isAbsolute(this.options.dbPath)
       ? this.options.dbPath
       : path.resolve(process.cwd(), this.options.dbPath);
     pythonArgs.push(`--db-path=${absoluteDbPath}`);
 
+    // トランスポートの指定（jsonの場合は従来通りハンドシェイクなし）
+    this.transport = 'json';
+    this.buffer = Buffer.alloc(0);
+    this.pendingWrites = null;
+    if (this.options.transport !== 'json') {
+      pythonArgs.push(`--transport=${this.options.transport}`);
+      // ワーカーからハンドシェイクが届くまで送信を保留する
+      this.pendingWrites = [];
+    }
+
     // デバッグ情報を出力
     console.log('[DBEngine.connect] Starting Python worker with:');
     console.log('  Command:', pythonCmd);
@@ -273,35 +750,8 @@ export class DBEngine extends EventEmitter {
     });
 
     this.worker.stdout?.on('data', (data: Buffer) => {
-      // バッファに追加（UTF-8を明示的に指定）
-      this.buffer += data.toString('utf-8');
-
-      // 改行で分割して処理
-      const lines = this.buffer.split('\n');
-
-      // 最後の要素は不完全な可能性があるので、バッファに残す
-      this.buffer = lines.pop() || '';
-
-      // 完全な行だけを処理
-      for (const line of lines) {
-        if (!line.trim()) continue;
-
-        try {
-          const response = JSON.parse(line) as JsonRpcResponse;
-          const request = this.pendingRequests.get(response.id);
-          if (request) {
-            this.pendingRequests.delete(response.id);
-            if (response.error) {
-              request.reject(new Error(response.error.message));
-            } else {
-              request.resolve(response.result);
-            }
-          }
-        } catch (error) {
-          console.error('Failed to parse response:', error);
-          console.error('Line was:', line);
-        }
-      }
+      this.buffer = this.buffer.length > 0 ? Buffer.concat([this.buffer, data]) : data;
+      this.processBuffer();
     });
 
     // stderrの内容を蓄積
@@ -396,6 +846,180 @@ export class DBEngine extends EventEmitter {
     this.startMemoryMonitoring();
   }
 
+  /**
+   * 起動済みの共有ワーカーにUnixドメインソケットで接続
+   * ワーカーのライフサイクル（起動・メモリ監視・再起動）は管理しない
+   */
+  private async connectSocket(socketPath: string): Promise<void> {
+    console.log('[DBEngine.connect] Connecting to shared worker:', socketPath);
+
+    const socket = net.createConnection(socketPath);
+    await new Promise<void>((resolve, reject) => {
+      socket.once('connect', resolve);
+      socket.once('error', reject);
+    });
+
+    this.socket = socket;
+    this.transport = 'json';
+    this.buffer = Buffer.alloc(0);
+    this.pendingWrites = null;
+
+    let socketClosed = false;
+    socket.on('data', (data: Buffer) => {
+      this.buffer = this.buffer.length > 0 ? Buffer.concat([this.buffer, data]) : data;
+      this.processBuffer();
+    });
+    socket.on('error', (error) => {
+      console.error('Shared worker connection error:', error);
+      this.emit('error', error);
+    });
+    socket.on('close', () => {
+      console.log('Shared worker connection closed');
+      socketClosed = true;
+      this.isReady = false;
+      this.socket = null;
+    });
+
+    if (this.options.transport !== 'json') {
+      // ソケットではクライアントからトランスポートを要求し、ワーカーの応答まで送信を保留する
+      socket.write(JSON.stringify({
+        jsonrpc: '2.0',
+        method: TRANSPORT_HANDSHAKE_METHOD,
+        params: { transport: this.options.transport },
+      }) + '\n');
+      this.pendingWrites = [];
+    }
+
+    await this.waitForReady(null, () => socketClosed);
+
+    // 共有ワーカーでは初回の接続時のみモデルがロードされる
+    const initResult = await this.initModel();
+    if (!initResult.success) {
+      throw new Error(`Failed to initialize embedding model: ${initResult.model_name}.`);
+    }
+    console.log(`[DBEngine.connect] Embedding model initialized: ${initResult.model_name} (${initResult.dimension}d)`);
+  }
+
+  /**
+   * ワーカーと接続しているか（子プロセスまたは共有ワーカーのソケット）
+   */
+  private isConnected(): boolean {
+    return this.worker !== null || this.socket !== null;
+  }
+
+  /**
+   * 受信バッファから完全なメッセージを取り出して処理
+   * jsonの場合は改行区切り、msgpackの場合は長さプレフィックス付きフレームとして読む
+   */
+  private processBuffer(): void {
+    while (this.buffer.length > 0) {
+      let message: unknown;
+
+      if (this.transport === 'msgpack') {
+        if (this.buffer.length < FRAME_HEADER_BYTES) return;
+        const length = this.buffer.readUInt32BE(0);
+        const end = FRAME_HEADER_BYTES + length;
+        if (this.buffer.length < end) return;
+        const payload = this.buffer.subarray(FRAME_HEADER_BYTES, end);
+        this.buffer = this.buffer.subarray(end);
+        try {
+          message = decodeMsgpack(payload);
+        } catch (error) {
+          console.error('Failed to decode msgpack response:', error);
+          continue;
+        }
+      } else {
+        const newline = this.buffer.indexOf(0x0a);
+        if (newline === -1) return;
+        // UTF-8を明示的に指定（行単位でデコードするのでマルチバイト文字が分断されない）
+        const line = this.buffer.toString('utf-8', 0, newline);
+        this.buffer = this.buffer.subarray(newline + 1);
+        if (!line.trim()) continue;
+        try {
+          message = JSON.parse(line);
+        } catch (error) {
+          console.error('Failed to parse response:', error);
+          console.error('Line was:', line);
+          continue;
+        }
+      }
+
+      this.handleMessage(message);
+    }
+  }
+
+  /**
+   * 受信したメッセージ（単一レスポンス / バッチ配列 / 通知）を処理
+   */
+  private handleMessage(message: unknown): void {
+    // バッチの場合はレスポンスも配列で返ってくる
+    if (Array.isArray(message)) {
+      for (const response of message as JsonRpcResponse[]) {
+        this.handleResponse(response);
+      }
+      return;
+    }
+
+    const notification = message as { method?: string; params?: { transport?: WorkerTransport } };
+    if (notification.method === TRANSPORT_HANDSHAKE_METHOD) {
+      this.switchTransport(notification.params?.transport ?? 'json');
+      return;
+    }
+
+    this.handleResponse(message as JsonRpcResponse);
+  }
+
+  /**
+   * ハンドシェイクで通知されたトランスポートに切り替え、保留していたメッセージを送信
+   */
+  private switchTransport(transport: WorkerTransport): void {
+    if (transport !== this.options.transport) {
+      console.warn(`[DBEngine] Worker does not support '${this.options.transport}' transport, using '${transport}'`);
+    }
+    this.transport = transport;
+
+    const pending = this.pendingWrites ?? [];
+    this.pendingWrites = null;
+    for (const message of pending) {
+      this.writeMessage(message);
+    }
+  }
+
+  /**
+   * メッセージを現在のトランスポートでワーカーに送信
+   */
+  private writeMessage(message: unknown): void {
+    if (this.pendingWrites) {
+      this.pendingWrites.push(message);
+      return;
+    }
+
+    const output = this.socket ?? this.worker?.stdin;
+    if (this.transport === 'msgpack') {
+      const payload = encodeMsgpack(message);
+      const header = Buffer.allocUnsafe(FRAME_HEADER_BYTES);
+      header.writeUInt32BE(payload.length, 0);
+      output?.write(Buffer.concat([header, payload]));
+    } else {
+      output?.write(JSON.stringify(message) + '\n');
+    }
+  }
+
+  /**
+   * JSON-RPCレスポンスを対応するリクエストに返す
+   */
+  private handleResponse(response: JsonRpcResponse): void {
+    const request = this.pendingRequests.get(response.id);
+    if (request) {
+      this.pendingRequests.delete(response.id);
+      if (response.error) {
+        request.reject(new Error(response.error.message));
+      } else {
+        request.resolve(response.result);
+      }
+    }
+  }
+
   /**
    * DBが準備完了するまで待つ
    */
@@ -452,7 +1076,7 @@ export class DBEngine extends EventEmitter {
    */
   async ping(): Promise<DBEngineStatus> {
     // isReadyチェックをスキップ（起動中にも呼ばれるため）
-    if (!this.worker) {
+    if (!this.isConnected()) {
       throw new Error('Not connected to database');
     }
 
@@ -462,6 +1086,8 @@ export class DBEngine extends EventEmitter {
       method: 'ping',
       params: {},
       id,
+      // 起動中に溜まった古いpingはワーカー側で破棄される
+      deadline: Date.now() + 5000,
     };
 
     return new Promise((resolve, reject) => {
@@ -475,7 +1101,7 @@ export class DBEngine extends EventEmitter {
         reject(new Error('Ping timeout'));
       }, 5000); // 5秒のタイムアウト
 
-      this.worker!.stdin?.write(JSON.stringify(request) + '\n');
+      this.writeMessage(request);
 
       // タイムアウトをクリア
       const originalResolve = this.pendingRequests.get(id)!.resolve;
@@ -521,7 +1147,7 @@ export class DBEngine extends EventEmitter {
 
     // CSVファイルを作成してヘッダーを書き込む
     this.performanceCsvStream = fs.createWriteStream(outputPath, { flags: 'w' });
-    const header = 'Time(s),Threads,RSS(MB),VMS(MB),AddSections,Search,GetStats,FindRequests,CreateRequest,UpdateRequest,ReqCompleted,ReqProcessing,ReqPending\n';
+    const header = 'Time(s),Threads,RSS(MB),VMS(MB),AddSections,Search,GetStats,FindRequests,CreateRequest,UpdateRequest,ReqCompleted,ReqProcessing,ReqPending,ReadQueue,WriteQueue\n';
     this.performanceCsvStream.write(header);
 
     console.log(`[DBEngine] Performance logging started: ${outputPath}`);
@@ -562,6 +1188,8 @@ export class DBEngine extends EventEmitter {
       log.requests.completed.toString(),
       log.requests.processing.toString(),
       log.requests.pending.toString(),
+      (log.lanes?.read.queued ?? 0).toString(),
+      (log.lanes?.write.queued ?? 0).toString(),
     ].join(',') + '\n';
 
     this.performanceCsvStream.write(row);
@@ -577,11 +1205,21 @@ export class DBEngine extends EventEmitter {
     // パフォーマンスログを停止
     this.stopPerformanceLogging();
 
+    if (this.socket) {
+      // 共有ワーカーは他のクライアントも使っているため、接続だけを閉じる
+      this.socket.end();
+      this.socket = null;
+      this.isReady = false;
+      this.buffer = Buffer.alloc(0);
+      this.pendingWrites = null;
+    }
+
     if (this.worker) {
       this.worker.kill();
       this.worker = null;
       this.isReady = false;
-      this.buffer = ''; // バッファをクリア
+      this.buffer = Buffer.alloc(0); // バッファをクリア
+      this.pendingWrites = null;
     }
   }
 
@@ -722,11 +1360,35 @@ export class DBEngine extends EventEmitter {
 
   /**
    * 複数のセクションを一括追加
+   *
+   * maxBatchTokensを超えるセクションはウィンドウに分割してエンコードし、ベクトルをまとめる。
+   * その場合、結果のpooledSectionsにセクションID -> ウィンドウ数が入る。
    */
-  async addSections(sections: Array<Omit<Section, 'vector'>>): Promise<{ count: number }> {
+  async addSections(sections: Array<Omit<Section, 'vector'>>): Promise<AddSectionsResult> {
     const pythonSections = sections.map((s) => this.convertSectionToPythonFormat(s));
     const result = await this.sendRequest('addSections', { sections: pythonSections });
-    return result as { count: number };
+    return result as AddSectionsResult;
+  }
+
+  /**
+   * 文書のセクションを1回のコミットで置き換える
+   *
+   * 内容が同じセクションは既存の行とベクトルを引き継ぎ、変更されたセクションだけをエンコードする。
+   * 新しいセクションに対応しない既存の行（古いハッシュのセクションを含む）は同じコミットで削除される。
+   * sectionsはすべてdocumentPath / documentHashのセクションであること。
+   */
+  async replaceDocumentSections(
+    documentPath: string,
+    documentHash: string,
+    sections: Array<Omit<Section, 'vector'>>
+  ): Promise<ReplaceDocumentSectionsResult> {
+    const pythonSections = sections.map((s) => this.convertSectionToPythonFormat(s));
+    const result = await this.sendRequest('replaceDocumentSections', {
+      documentPath,
+      documentHash,
+      sections: pythonSections,
+    });
+    return result as ReplaceDocumentSectionsResult;
   }
 
   /**
@@ -734,9 +1396,29 @@ export class DBEngine extends EventEmitter {
    */
   async search(params: SearchParams): Promise<DBEngineSearchResponse> {
     const result = await this.sendRequest('search', params);
+    return this.convertSearchResponse(result);
+  }
+
+  /**
+   * 複数のクエリを共通のフィルタで検索
+   *
+   * キャッシュにないクエリはワーカーで1回の推論にまとめてベクトル化される。
+   * 結果はqueriesと同じ順序で返す。
+   */
+  async searchBatch(params: SearchBatchParams): Promise<DBEngineSearchBatchResponse> {
+    const result = await this.sendRequest('searchBatch', params);
     const response = result as any;
 
-    // Pythonから返された検索結果をTypeScript形式に変換
+    return {
+      responses: response.responses.map((item: any) => this.convertSearchResponse(item)),
+      timings: response.timings,
+    };
+  }
+
+  /**
+   * Pythonから返された検索結果をTypeScript形式に変換
+   */
+  private convertSearchResponse(response: any): DBEngineSearchResponse {
     const convertedResults = response.results.map((result: any): SearchResult => ({
       id: result.id,
       documentPath: result.document_path,
@@ -751,11 +1433,15 @@ export class DBEngine extends EventEmitter {
       startLine: result.start_line,
       endLine: result.end_line,
       sectionNumber: result.section_number,
+      // インデックス中のリクエストがあるか（ワーカーのメモリ上の集合から判定）
+      hasPendingUpdate: result.has_pending_update,
     }));
 
     return {
       results: convertedResults,
       total: response.total,
+      timings: response.timings,
+      ftsIndexPending: response.ftsIndexPending,
     };
   }
 
@@ -851,31 +1537,79 @@ export class DBEngine extends EventEmitter {
     return result as StatsResponse;
   }
 
+  /**
+   * 複数の呼び出しをJSON-RPCバッチとして1回の書き込みで送信
+   *
+   * build内で呼び出したDBEngineのメソッドは個別に送信されず、1つのバッチ配列にまとめて送信される。
+   * Pythonワーカーはバッチ内の呼び出しを先頭から順に実行し、レスポンスを1つの配列で返す。
+   * 各呼び出しは独立して実行される（1つが失敗しても残りは実行される）。
+   *
+   * @example
+   * const [, , sections] = await dbEngine.batch((engine) => [
+   *   engine.updateIndexRequest(id, { status: 'processing' }),
+   *   engine.updateManyIndexRequests(filter, { status: 'skipped' }),
+   *   engine.findSectionsByPathAndHash(path, hash),
+   * ]);
+   */
+  async batch<T extends readonly unknown[] | []>(
+    build: (engine: this) => { [K in keyof T]: Promise<T[K]> }
+  ): Promise<T> {
+    if (this.batchQueue) {
+      throw new Error('Nested batch() is not supported');
+    }
+
+    const queue: JsonRpcRequest[] = [];
+    let promises: { [K in keyof T]: Promise<T[K]> };
+
+    // build内のsendRequest()呼び出しを同期的に収集する
+    this.batchQueue = queue;
+    try {
+      promises = build(this);
+    } finally {
+      this.batchQueue = null;
+      // 収集済みのリクエストは（buildが途中で失敗しても）送信して応答を待つ
+      if (queue.length > 0) {
+        this.writeMessage(queue);
+      }
+    }
+
+    return Promise.all(promises) as Promise<T>;
+  }
+
   /**
    * JSON-RPCリクエストを送信
    */
   private async sendRequest(method: string, params?: unknown): Promise<unknown> {
-    if (!this.worker || !this.isReady) {
+    if (!this.isConnected() || !this.isReady) {
       throw new Error('Not connected to database');
     }
 
     const id = ++this.requestId;
-    const request = {
+    const request: JsonRpcRequest = {
       jsonrpc: '2.0',
       method,
       params,
       id,
+      // タイムアウト後に結果を受け取る相手はいないため、同じ時刻を期限としてワーカーに伝える
+      deadline: Date.now() + REQUEST_TIMEOUT_MS,
     };
+    const batchQueue = this.batchQueue;
 
     return new Promise((resolve, reject) => {
       this.pendingRequests.set(id, { resolve, reject });
 
       const timeout = setTimeout(() => {
         this.pendingRequests.delete(id);
+        this.cancelRequest(id);
         reject(new Error('Request timeout'));
-      }, 300000); // 300秒のタイムアウト（プロセス分離モード考慮）
+      }, REQUEST_TIMEOUT_MS);
 
-      this.worker!.stdin?.write(JSON.stringify(request) + '\n');
+      if (batchQueue) {
+        // batch()実行中はまとめて送信する
+        batchQueue.push(request);
+      } else {
+        this.writeMessage(request);
+      }
 
       // タイムアウトをクリア
       const originalResolve = this.pendingRequests.get(id)!.resolve;
@@ -886,6 +1620,20 @@ export class DBEngine extends EventEmitter {
     });
   }
 
+  /**
+   * ワーカーにキャンセルを通知（キュー待ち・処理中のリクエストを打ち切らせる）
+   */
+  private cancelRequest(id: number): void {
+    if (!this.isConnected()) {
+      return;
+    }
+    this.writeMessage({
+      jsonrpc: '2.0',
+      method: CANCEL_REQUEST_METHOD,
+      params: { id },
+    });
+  }
+
   /**
    * 現在のステータスを取得
    */
@@ -1053,6 +1801,17 @@ export class DBEngine extends EventEmitter {
     const response = result as { paths: string[] };
     return response.paths;
   }
+
+  /**
+   * 保持期間を過ぎた終了済みのIndexRequestを削除し、テーブルをコンパクションする
+   *
+   * ワーカーは requestPurgeIntervalMs ごとに自動で実行する。パスごとの最新の終了済みのリクエストと、
+   * pending/processingのリクエストは削除しない。
+   */
+  async purgeIndexRequests(options: { retentionDays?: number } = {}): Promise<PurgeIndexRequestsResult> {
+    const result = await this.sendRequest('purgeIndexRequests', options);
+    return result as PurgeIndexRequestsResult;
+  }
 }
 
 export default DBEngine;
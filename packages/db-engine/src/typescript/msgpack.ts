@@ -0,0 +1,284 @@
+/**
+ * Pythonワーカーとの通信用の最小限のMessagePackエンコーダ/デコーダ
+ *
+ * JSON-RPCメッセージで使う型（nil / bool / 数値 / 文字列 / 配列 / マップ / バイナリ）のみを扱う。
+ * JSON.stringifyと同じく、undefinedのプロパティは省略し、toJSON()を持つ値（Dateなど）は変換してから書き込む。
+ */
+
+class Writer {
+  private buf: Buffer = Buffer.allocUnsafe(1024);
+  private pos = 0;
+
+  private ensure(size: number): void {
+    if (this.pos + size <= this.buf.length) return;
+    let capacity = this.buf.length * 2;
+    while (capacity < this.pos + size) capacity *= 2;
+    const next = Buffer.allocUnsafe(capacity);
+    this.buf.copy(next, 0, 0, this.pos);
+    this.buf = next;
+  }
+
+  u8(value: number): void {
+    this.ensure(1);
+    this.buf[this.pos++] = value;
+  }
+
+  u16(value: number): void {
+    this.ensure(2);
+    this.buf.writeUInt16BE(value, this.pos);
+    this.pos += 2;
+  }
+
+  u32(value: number): void {
+    this.ensure(4);
+    this.buf.writeUInt32BE(value, this.pos);
+    this.pos += 4;
+  }
+
+  i64(value: number): void {
+    this.ensure(8);
+    this.buf.writeBigInt64BE(BigInt(value), this.pos);
+    this.pos += 8;
+  }
+
+  f64(value: number): void {
+    this.ensure(8);
+    this.buf.writeDoubleBE(value, this.pos);
+    this.pos += 8;
+  }
+
+  utf8(value: string, byteLength: number): void {
+    this.ensure(byteLength);
+    this.buf.write(value, this.pos, byteLength, 'utf-8');
+    this.pos += byteLength;
+  }
+
+  bytes(value: Uint8Array): void {
+    this.ensure(value.length);
+    this.buf.set(value, this.pos);
+    this.pos += value.length;
+  }
+
+  result(): Buffer {
+    return this.buf.subarray(0, this.pos);
+  }
+}
+
+function writeValue(w: Writer, value: unknown): void {
+  if (value === null || value === undefined) {
+    w.u8(0xc0);
+    return;
+  }
+
+  switch (typeof value) {
+    case 'boolean':
+      w.u8(value ? 0xc3 : 0xc2);
+      return;
+    case 'number':
+      writeNumber(w, value);
+      return;
+    case 'string':
+      writeString(w, value);
+      return;
+    case 'object':
+      break;
+    default:
+      // 関数・シンボルなどはJSON.stringifyと同様にnullとして扱う
+      w.u8(0xc0);
+      return;
+  }
+
+  if (Buffer.isBuffer(value) || value instanceof Uint8Array) {
+    const length = value.length;
+    if (length < 0x100) {
+      w.u8(0xc4);
+      w.u8(length);
+    } else if (length < 0x10000) {
+      w.u8(0xc5);
+      w.u16(length);
+    } else {
+      w.u8(0xc6);
+      w.u32(length);
+    }
+    w.bytes(value);
+    return;
+  }
+
+  const withToJSON = value as { toJSON?: () => unknown };
+  if (typeof withToJSON.toJSON === 'function') {
+    writeValue(w, withToJSON.toJSON());
+    return;
+  }
+
+  if (Array.isArray(value)) {
+    writeHeader(w, value.length, 0x90, 0xdc, 0xdd);
+    for (const item of value) {
+      writeValue(w, item);
+    }
+    return;
+  }
+
+  const entries = Object.entries(value as Record<string, unknown>).filter(
+    ([, v]) => v !== undefined
+  );
+  writeHeader(w, entries.length, 0x80, 0xde, 0xdf);
+  for (const [key, v] of entries) {
+    writeString(w, key);
+    writeValue(w, v);
+  }
+}
+
+function writeHeader(w: Writer, length: number, fix: number, c16: number, c32: number): void {
+  if (length < 16) {
+    w.u8(fix | length);
+  } else if (length < 0x10000) {
+    w.u8(c16);
+    w.u16(length);
+  } else {
+    w.u8(c32);
+    w.u32(length);
+  }
+}
+
+function writeNumber(w: Writer, value: number): void {
+  if (!Number.isFinite(value)) {
+    // JSONと同様にNaN/Infinityはnullとする
+    w.u8(0xc0);
+    return;
+  }
+  if (!Number.isSafeInteger(value)) {
+    w.u8(0xcb);
+    w.f64(value);
+    return;
+  }
+  if (value >= 0) {
+    if (value < 0x80) {
+      w.u8(value);
+    } else if (value < 0x10000) {
+      w.u8(0xcd);
+      w.u16(value);
+    } else if (value < 0x100000000) {
+      w.u8(0xce);
+      w.u32(value);
+    } else {
+      w.u8(0xd3);
+      w.i64(value);
+    }
+  } else if (value >= -32) {
+    w.u8(0xe0 | (value + 32));
+  } else {
+    w.u8(0xd3);
+    w.i64(value);
+  }
+}
+
+function writeString(w: Writer, value: string): void {
+  const byteLength = Buffer.byteLength(value, 'utf-8');
+  if (byteLength < 32) {
+    w.u8(0xa0 | byteLength);
+  } else if (byteLength < 0x100) {
+    w.u8(0xd9);
+    w.u8(byteLength);
+  } else if (byteLength < 0x10000) {
+    w.u8(0xda);
+    w.u16(byteLength);
+  } else {
+    w.u8(0xdb);
+    w.u32(byteLength);
+  }
+  w.utf8(value, byteLength);
+}
+
+/**
+ * 値をMessagePackにエンコード
+ */
+export function encodeMsgpack(value: unknown): Buffer {
+  const w = new Writer();
+  writeValue(w, value);
+  return w.result();
+}
+
+class Reader {
+  pos = 0;
+
+  constructor(private readonly buf: Buffer) {}
+
+  read(): unknown {
+    const type = this.buf[this.pos++];
+    if (type === undefined) {
+      throw new RangeError('Unexpected end of MessagePack data');
+    }
+
+    if (type < 0x80) return type;
+    if (type >= 0xe0) return type - 0x100;
+    if ((type & 0xe0) === 0xa0) return this.str(type & 0x1f);
+    if ((type & 0xf0) === 0x90) return this.array(type & 0x0f);
+    if ((type & 0xf0) === 0x80) return this.map(type & 0x0f);
+
+    const buf = this.buf;
+    const at = this.pos;
+    switch (type) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: this.pos += 1; return this.bin(buf.readUInt8(at));
+      case 0xc5: this.pos += 2; return this.bin(buf.readUInt16BE(at));
+      case 0xc6: this.pos += 4; return this.bin(buf.readUInt32BE(at));
+      case 0xca: this.pos += 4; return buf.readFloatBE(at);
+      case 0xcb: this.pos += 8; return buf.readDoubleBE(at);
+      case 0xcc: this.pos += 1; return buf.readUInt8(at);
+      case 0xcd: this.pos += 2; return buf.readUInt16BE(at);
+      case 0xce: this.pos += 4; return buf.readUInt32BE(at);
+      case 0xcf: this.pos += 8; return Number(buf.readBigUInt64BE(at));
+      case 0xd0: this.pos += 1; return buf.readInt8(at);
+      case 0xd1: this.pos += 2; return buf.readInt16BE(at);
+      case 0xd2: this.pos += 4; return buf.readInt32BE(at);
+      case 0xd3: this.pos += 8; return Number(buf.readBigInt64BE(at));
+      case 0xd9: this.pos += 1; return this.str(buf.readUInt8(at));
+      case 0xda: this.pos += 2; return this.str(buf.readUInt16BE(at));
+      case 0xdb: this.pos += 4; return this.str(buf.readUInt32BE(at));
+      case 0xdc: this.pos += 2; return this.array(buf.readUInt16BE(at));
+      case 0xdd: this.pos += 4; return this.array(buf.readUInt32BE(at));
+      case 0xde: this.pos += 2; return this.map(buf.readUInt16BE(at));
+      case 0xdf: this.pos += 4; return this.map(buf.readUInt32BE(at));
+      default:
+        throw new Error(`Unsupported MessagePack type: 0x${type.toString(16)}`);
+    }
+  }
+
+  private str(length: number): string {
+    const value = this.buf.toString('utf-8', this.pos, this.pos + length);
+    this.pos += length;
+    return value;
+  }
+
+  private bin(length: number): Buffer {
+    const value = this.buf.subarray(this.pos, this.pos + length);
+    this.pos += length;
+    return value;
+  }
+
+  private array(length: number): unknown[] {
+    const value = new Array<unknown>(length);
+    for (let i = 0; i < length; i++) {
+      value[i] = this.read();
+    }
+    return value;
+  }
+
+  private map(length: number): Record<string, unknown> {
+    const value: Record<string, unknown> = {};
+    for (let i = 0; i < length; i++) {
+      const key = String(this.read());
+      value[key] = this.read();
+    }
+    return value;
+  }
+}
+
+/**
+ * MessagePackをデコード
+ */
+export function decodeMsgpack(buf: Buffer): unknown {
+  return new Reader(buf).read();
+}
@@ -6,8 +6,49 @@
 import { z } from 'zod';
 import { getStateErrorMessage } from '../state.js';
 import { formatSectionNumber, getPreviewContent } from '../utils.js';
+import type { SearchResult } from '@search-docs/types';
 import type { ToolRegistrationContext, RegisteredTool } from './types.js';
 
+/**
+ * 検索結果の一覧を整形
+ */
+function formatResults(results: SearchResult[], previewLines: number): string {
+  let resultText = '';
+  const total = results.length;
+
+  results.forEach((result, index) => {
+    resultText += '---\n';
+
+    const heading = result.heading || '(no heading)';
+    const hierarchy = formatSectionNumber(result.sectionNumber);
+
+    // 1行目: タイトル + 章節項号
+    if (hierarchy) {
+      resultText += `📄 「${heading}」(${hierarchy})\n`;
+    } else {
+      // depth=0の場合は章節項号なし
+      resultText += `📄 ${heading}\n`;
+    }
+
+    // 2行目: ファイルパス
+    resultText += `   ${result.documentPath}\n`;
+
+    // 3行目: 行数、順位、ID
+    const rank = index + 1;
+    resultText += `   ${result.startLine}-${result.endLine}行目 | ${rank}位/${total}件 | id: ${result.id}\n\n`;
+
+    // コンテンツ（インデント）
+    const preview = getPreviewContent(result.content, previewLines);
+    const indentedContent = preview
+      .split('\n')
+      .map((line) => `   ${line}`)
+      .join('\n');
+    resultText += indentedContent + '\n';
+  });
+
+  return resultText;
+}
+
 /**
  * search ツールを登録
  */
@@ -20,6 +61,14 @@ export function registerSearchTool(context: ToolRegistrationContext): Registered
       description: '文書を検索します。クエリに基づいてVector検索を実行し、関連する文書セクションを返します。検索結果には行番号とセクションIDが含まれます。続きを見るにはget_document(sectionId)を使用してください。limitとpreviewLinesで表示内容を調整できます。',
       inputSchema: {
         query: z.string().describe('検索クエリ'),
+        additionalQueries: z
+          .array(z.string())
+          .optional()
+          .describe('追加の検索クエリ。指定するとqueryと合わせて一括検索し、クエリごとの結果を返します（同じ絞り込み条件を適用）'),
+        mode: z
+          .enum(['vector', 'fts', 'hybrid'])
+          .optional()
+          .describe('検索方法。vector=意味の近さ、fts=キーワード（設定キーや関数名などの識別子に強い）、hybrid=両方の順位を統合（デフォルト: vector）'),
         depth: z
           .number()
           .optional()
@@ -42,6 +91,8 @@ export function registerSearchTool(context: ToolRegistrationContext): Registered
     },
     async (args: {
       query: string;
+      additionalQueries?: string[];
+      mode?: 'vector' | 'fts' | 'hybrid';
       depth?: number;
       limit?: number;
       includeCleanOnly?: boolean;
@@ -54,59 +105,56 @@ export function registerSearchTool(context: ToolRegistrationContext): Registered
         throw new Error(getStateErrorMessage(systemState.state, '文書の検索'));
       }
 
-      const { query, depth, limit, includeCleanOnly, includePaths, excludePaths, previewLines = 5 } = args;
+      const { query, additionalQueries, mode, depth, limit, includeCleanOnly, includePaths, excludePaths, previewLines = 5 } = args;
       const client = systemState.client!;
 
       try {
-        const response = await client.search({
-          query,
-          options: {
-            depth,
-            limit,
-            includeCleanOnly,
-            includePaths,
-            excludePaths,
-          },
-        });
-
-        // 結果を整形
-        let resultText = `検索結果: ${response.total}件\n`;
-        resultText += `処理時間: ${response.took}ms\n\n`;
-
-        if (response.results.length === 0) {
-          resultText += '該当する結果が見つかりませんでした。';
-        } else {
-          const total = response.results.length;
+        const options = {
+          mode,
+          depth,
+          limit,
+          includeCleanOnly,
+          includePaths,
+          excludePaths,
+        };
 
-          response.results.forEach((result, index) => {
-            resultText += '---\n';
+        let resultText = '';
 
-            const heading = result.heading || '(no heading)';
-            const hierarchy = formatSectionNumber(result.sectionNumber);
+        if (additionalQueries && additionalQueries.length > 0) {
+          // 複数クエリはまとめてベクトル化して一括検索
+          const queries = [query, ...additionalQueries];
+          const response = await client.searchBatch({ queries, options });
 
-            // 1行目: タイトル + 章節項号
-            if (hierarchy) {
-              resultText += `📄 「${heading}」(${hierarchy})\n`;
+          resultText += `処理時間: ${response.took}ms\n\n`;
+          response.responses.forEach((item, index) => {
+            resultText += `## クエリ${index + 1}: ${queries[index]}\n`;
+            resultText += `検索結果: ${item.total}件\n\n`;
+            if (item.results.length === 0) {
+              resultText += '該当する結果が見つかりませんでした。\n\n';
             } else {
-              // depth=0の場合は章節項号なし
-              resultText += `📄 ${heading}\n`;
+              resultText += formatResults(item.results, previewLines) + '\n';
             }
+          });
+          return {
+            content: [
+              {
+                type: 'text',
+                text: resultText,
+              },
+            ],
+          };
+        }
 
-            // 2行目: ファイルパス
-            resultText += `   ${result.documentPath}\n`;
+        const response = await client.search({ query, options });
 
-            // 3行目: 行数、順位、ID
-            const rank = index + 1;
-            resultText += `   ${result.startLine}-${result.endLine}行目 | ${rank}位/${total}件 | id: ${result.id}\n\n`;
+        // 結果を整形
+        resultText += `検索結果: ${response.total}件\n`;
+        resultText += `処理時間: ${response.took}ms\n\n`;
 
-            // コンテンツ（インデント）
-            const preview = getPreviewContent(result.content, previewLines);
-            const indentedContent = preview
-              .split('\n')
-              .map((line) => `   ${line}`)
-              .join('\n');
-            resultText += indentedContent + '\n';
-          });
+        if (response.results.length === 0) {
+          resultText += '該当する結果が見つかりませんでした。';
+        } else {
+          resultText += formatResults(response.results, previewLines);
 
           // 検索ヒント
           resultText += '\n💡 検索のヒント:\n';
@@ -114,6 +162,8 @@ export function registerSearchTool(context: ToolRegistrationContext): Registered
           resultText += '   - 続きを見る: get_document(sectionId: "...")\n';
           resultText += '   - 件数調整: search(..., { limit: 20 })\n';
           resultText += '   - 表示行数: search(..., { previewLines: 10 })\n';
+          resultText += '   - 複数の観点で検索: search(..., { additionalQueries: ["..."] })\n';
+          resultText += '   - 識別子（設定キー・関数名など）の検索: search(..., { mode: "hybrid" })\n';
         }
 
         return {
@@ -24,6 +24,12 @@ class MockDBEngine {
   async connect(): Promise<void> {}
   disconnect(): void {}
 
+  async batch<T extends readonly unknown[]>(
+    build: (engine: this) => { [K in keyof T]: Promise<T[K]> }
+  ): Promise<T> {
+    return Promise.all(build(this)) as Promise<T>;
+  }
+
   async createIndexRequest(params: { documentPath: string; documentHash: string }): Promise<IndexRequest> {
     const request: IndexRequest = {
       id: `req-${Date.now()}-${Math.random()}`,
@@ -100,6 +106,17 @@ class MockDBEngine {
       this.sections.push(fullSection);
     }
   }
+
+  async replaceDocumentSections(
+    documentPath: string,
+    documentHash: string,
+    sections: Array<Omit<Section, 'vector'>>
+  ): Promise<{ count: number; reused: number; inserted: number; deleted: number }> {
+    const deleted = this.sections.filter((s) => s.documentPath === documentPath).length;
+    this.sections = this.sections.filter((s) => s.documentPath !== documentPath);
+    await this.addSections(sections);
+    return { count: sections.length, reused: 0, inserted: sections.length, deleted };
+  }
 }
 
 describe('IndexWorker', () => {
@@ -71,9 +71,28 @@ async function main() {
     const dbEngine = new DBEngine({
       dbPath: path.resolve(projectRoot, config.storage.indexPath),
       embeddingModel: config.indexing.embeddingModel,
+      embeddingBackend: config.indexing.embeddingBackend,
+      numThreads: config.worker.numThreads,
+      encodeProcesses: config.worker.encodeProcesses,
       maxBatchTokens: config.worker.maxBatchTokens,
+      minBatchTokens: config.worker.minBatchTokens,
+      batchMemoryLimitMB: config.worker.batchMemoryLimitMB,
+      gcEveryMB: config.worker.gcEveryMB,
+      gcRssThresholdMB: config.worker.gcRssThresholdMB,
+      gcArrowThresholdMB: config.worker.gcArrowThresholdMB,
       pythonMaxMemoryMB: config.worker.pythonMaxMemoryMB,
       memoryCheckIntervalMs: config.worker.memoryCheckIntervalMs,
+      transport: config.worker.transport,
+      embeddingCacheSize: config.worker.embeddingCacheSize,
+      vectorIndexMinRows: config.worker.vectorIndexMinRows,
+      vectorIndexType: config.worker.vectorIndexType,
+      vectorIndexNprobes: config.worker.vectorIndexNprobes,
+      vectorIndexRefineFactor: config.worker.vectorIndexRefineFactor,
+      requestRetentionDays: config.worker.requestRetentionDays,
+      requestPurgeIntervalMs: config.worker.requestPurgeIntervalMs,
+      socketPath: config.worker.socketPath
+        ? path.resolve(projectRoot, config.worker.socketPath)
+        : undefined,
     });
 
     // SearchDocsサーバ初期化
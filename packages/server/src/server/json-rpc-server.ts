@@ -4,6 +4,7 @@ import type { Server } from 'http';
 import type { SearchDocsServer } from './search-docs-server.js';
 import type {
   SearchRequest,
+  SearchBatchRequest,
   GetDocumentRequest,
   IndexDocumentRequest,
   RebuildIndexRequest,
@@ -172,6 +173,9 @@ export class JsonRpcServer {
       case 'search':
         return await this.searchDocsServer.search(params as SearchRequest);
 
+      case 'searchBatch':
+        return await this.searchDocsServer.searchBatch(params as SearchBatchRequest);
+
       case 'getDocument':
         return await this.searchDocsServer.getDocument(params as GetDocumentRequest);
 
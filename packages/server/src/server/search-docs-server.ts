@@ -4,6 +4,10 @@ import * as path from 'path';
 import type {
   SearchRequest,
   SearchResponse,
+  SearchBatchRequest,
+  SearchBatchResponse,
+  SearchResult,
+  SearchOptions,
   GetDocumentRequest,
   GetDocumentResponse,
   IndexDocumentRequest,
@@ -207,32 +211,77 @@ export class SearchDocsServer {
     this.requestStats.search++;
     const startTime = Date.now();
 
-    // indexStatusによるフィルタ処理
-    let autoExcludePaths: string[] | undefined;
-    if (
-      request.options?.indexStatus === 'latest_only' ||
-      request.options?.indexStatus === 'completed_only'
-    ) {
-      // pending/processingのリクエストがあるdocument_pathを除外
-      autoExcludePaths = await this.dbEngine.getPathsWithStatus(['pending', 'processing']);
-    }
-
-    // ユーザー指定のexcludePathsと自動除外パスをマージ
-    const mergedExcludePaths = [
-      ...(request.options?.excludePaths || []),
-      ...(autoExcludePaths || []),
-    ];
-
     const response = await this.dbEngine.search({
       query: request.query,
       ...request.options,
-      excludePaths: mergedExcludePaths.length > 0 ? mergedExcludePaths : undefined,
+      excludeInflight: this.excludesInflight(request.options),
     });
 
-    // 各結果にindex状態情報を付与
-    const resultsWithStatus = await Promise.all(
-      response.results.map(async (section) => {
-        const status = await this.computeIndexStatus(section.documentPath, section.documentHash);
+    return {
+      results: await this.attachIndexStatus(response.results),
+      total: response.total,
+      took: Date.now() - startTime,
+      timings: response.timings,
+      ftsIndexPending: response.ftsIndexPending,
+    };
+  }
+
+  /**
+   * 一括検索API
+   *
+   * 複数のクエリを共通のオプションで検索する（クエリのベクトル化はワーカーで1回の推論にまとめる）
+   */
+  async searchBatch(request: SearchBatchRequest): Promise<SearchBatchResponse> {
+    this.requestStats.total++;
+    this.requestStats.search++;
+    const startTime = Date.now();
+
+    if (!Array.isArray(request.queries) || request.queries.length === 0) {
+      throw new Error('queriesを1つ以上指定してください');
+    }
+
+    const response = await this.dbEngine.searchBatch({
+      queries: request.queries,
+      ...request.options,
+      excludeInflight: this.excludesInflight(request.options),
+    });
+
+    const responses = await Promise.all(
+      response.responses.map(async (item) => ({
+        results: await this.attachIndexStatus(item.results),
+        total: item.total,
+        timings: item.timings,
+        ftsIndexPending: item.ftsIndexPending,
+      }))
+    );
+
+    return {
+      responses,
+      took: Date.now() - startTime,
+      timings: response.timings,
+    };
+  }
+
+  /**
+   * indexStatusにより、pending/processingのリクエストがある文書を除外するか
+   *
+   * 除外はワーカーがメモリ上のインデックス中のパスの集合から行う（検索ごとにindex_requestsを引かない）
+   */
+  private excludesInflight(options?: SearchOptions): boolean {
+    return options?.indexStatus === 'latest_only' || options?.indexStatus === 'completed_only';
+  }
+
+  /**
+   * 各結果にindex状態情報を付与
+   */
+  private async attachIndexStatus(results: SearchResult[]): Promise<SearchResult[]> {
+    return Promise.all(
+      results.map(async (section) => {
+        const status = await this.computeIndexStatus(
+          section.documentPath,
+          section.documentHash,
+          section.hasPendingUpdate
+        );
         return {
           ...section,
           indexStatus: status.status,
@@ -241,12 +290,6 @@ export class SearchDocsServer {
         };
       })
     );
-
-    return {
-      results: resultsWithStatus,
-      total: response.total,
-      took: Date.now() - startTime,
-    };
   }
 
   /**
@@ -418,7 +461,8 @@ export class SearchDocsServer {
    */
   private async computeIndexStatus(
     documentPath: string,
-    sectionHash: string
+    sectionHash: string,
+    knownPendingUpdate?: boolean
   ): Promise<{
     status: 'latest' | 'outdated' | 'updating';
     isLatest: boolean;
@@ -437,12 +481,15 @@ export class SearchDocsServer {
     const isLatest = sectionHash === doc.metadata.fileHash;
 
     // 2. pending/processingのリクエストがあるか確認
-    const pendingRequests = await this.dbEngine.findIndexRequests({
-      documentPath,
-      status: ['pending', 'processing'],
-    });
-
-    const hasPendingUpdate = pendingRequests.length > 0;
+    //    （検索結果にはワーカーが判定した値が付いているので、index_requestsを引かない）
+    let hasPendingUpdate = knownPendingUpdate;
+    if (hasPendingUpdate === undefined) {
+      const pendingRequests = await this.dbEngine.findIndexRequests({
+        documentPath,
+        status: ['pending', 'processing'],
+      });
+      hasPendingUpdate = pendingRequests.length > 0;
+    }
 
     // 3. ステータスを判定
     let status: 'latest' | 'outdated' | 'updating';
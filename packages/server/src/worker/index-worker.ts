@@ -168,24 +168,28 @@ export class IndexWorker {
     console.log(`[IndexWorker] Processing: ${request.documentPath} (${hashPrefix})`);
 
     try {
-      // 1. ステータスを更新
-      await this.dbEngine.updateIndexRequest(request.id, {
-        status: 'processing',
-        startedAt: new Date().toISOString(),
-      });
-
-      // 2. 同じdocument_pathの古いpendingリクエストをskip
-      await this.dbEngine.updateManyIndexRequests(
-        {
-          documentPath: request.documentPath,
-          status: 'pending',
-          createdAt: { $lt: request.createdAt },
-        },
-        {
-          status: 'skipped',
-          completedAt: new Date().toISOString(),
-        }
-      );
+      // 1-2. ステータス更新・古いpendingリクエストのskip・既存indexの確認を1往復（バッチ）で実行
+      const [, , existingSections] = await this.dbEngine.batch((engine) => [
+        // 1. ステータスを更新
+        engine.updateIndexRequest(request.id, {
+          status: 'processing',
+          startedAt: new Date().toISOString(),
+        }),
+        // 2. 同じdocument_pathの古いpendingリクエストをskip
+        engine.updateManyIndexRequests(
+          {
+            documentPath: request.documentPath,
+            status: 'pending',
+            createdAt: { $lt: request.createdAt },
+          },
+          {
+            status: 'skipped',
+            completedAt: new Date().toISOString(),
+          }
+        ),
+        // 既存の同じハッシュのindexがあるか（手順5で使用）
+        engine.findSectionsByPathAndHash(request.documentPath, request.documentHash),
+      ]);
 
       // 3. storageから文書を取得
       const doc = await this.storage.get(request.documentPath);
@@ -205,26 +209,13 @@ export class IndexWorker {
       }
 
       // 5. 既存の同じハッシュのindexがあるかチェック
-      const existingSections = await this.dbEngine.findSectionsByPathAndHash(
-        request.documentPath,
-        request.documentHash
-      );
-
       if (existingSections.length > 0) {
         console.log(
           `[IndexWorker] Index already exists for ${request.documentPath} (${hashPrefix})`
         );
 
-        // 既に存在する場合は、古いindexだけ削除
-        await this.dbEngine.deleteSectionsByPathExceptHash(
-          request.documentPath,
-          request.documentHash
-        );
-
-        await this.dbEngine.updateIndexRequest(request.id, {
-          status: 'completed',
-          completedAt: new Date().toISOString(),
-        });
+        // 既に存在する場合は、古いindexだけ削除して完了マーク（1往復）
+        await this.finalizeRequest(request);
         return;
       }
 
@@ -236,17 +227,16 @@ export class IndexWorker {
         request.documentHash
       );
 
-      // 7. 新しいindexを保存（一括追加）
-      await this.dbEngine.addSections(sections);
-      console.log(`[IndexWorker] Created ${sections.length} sections for ${request.documentPath}`);
-
-      // LanceDBの書き込み完了を待つ（100ms）
-      await new Promise(resolve => setTimeout(resolve, 100));
-
-      // 8. 古いindexを削除
-      await this.dbEngine.deleteSectionsByPathExceptHash(
+      // 7-8. 新しいindexで置き換える（追加と古いindexの削除を1回のコミットで行う）
+      // 内容が変わっていないセクションは既存のベクトルを引き継ぐため、エンコードされない
+      const result = await this.dbEngine.replaceDocumentSections(
         request.documentPath,
-        request.documentHash
+        request.documentHash,
+        sections
+      );
+      console.log(
+        `[IndexWorker] Replaced sections for ${request.documentPath}: ` +
+          `${result.inserted} inserted, ${result.reused} reused, ${result.deleted} deleted`
       );
 
       // 9. リクエストを完了マーク
@@ -267,6 +257,19 @@ export class IndexWorker {
     }
   }
 
+  /**
+   * 古いハッシュのindexを削除し、リクエストを完了マークする（バッチで1往復）
+   */
+  private async finalizeRequest(request: IndexRequest): Promise<void> {
+    await this.dbEngine.batch((engine) => [
+      engine.deleteSectionsByPathExceptHash(request.documentPath, request.documentHash),
+      engine.updateIndexRequest(request.id, {
+        status: 'completed',
+        completedAt: new Date().toISOString(),
+      }),
+    ]);
+  }
+
   /**
    * 待機処理
    */
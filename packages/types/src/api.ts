@@ -14,6 +14,14 @@ export interface SearchRequest {
   options?: SearchOptions;
 }
 
+/**
+ * 検索方法
+ * - vector: ベクトル検索（言い換えに強い）
+ * - fts: heading / contentの全文検索（BM25、設定キーや関数名などの識別子に強い）
+ * - hybrid: 両方の結果を順位で統合（Reciprocal Rank Fusion）
+ */
+export type SearchMode = 'vector' | 'fts' | 'hybrid';
+
 export interface SearchOptions {
   /** 最大深度（0-3: この深度まで検索。0=文書全体のみ、1=章まで、2=節まで、3=項まで） */
   depth?: number;
@@ -33,6 +41,12 @@ export interface SearchOptions {
   excludePaths?: string[];
   /** プレビュー行数（デフォルト: 5） */
   previewLines?: number;
+  /** 検索方法（デフォルト: 'vector'） */
+  mode?: SearchMode;
+  /** ベクトルインデックスで検索するパーティション数（多いほど再現率が上がり遅くなる） */
+  nprobes?: number;
+  /** ベクトルインデックスで limit × refineFactor 件を選び、元のベクトルで並べ直す */
+  refineFactor?: number;
 }
 
 export interface SearchResult {
@@ -59,10 +73,43 @@ export interface SearchResult {
   sectionNumber: number[];
 }
 
+/**
+ * 検索のステージごとの時間（ms、実行したステージのみ）
+ */
+export interface SearchTimings {
+  /** クエリのベクトル化（キャッシュにある場合はほぼ0） */
+  embedMs?: number;
+  vectorMs?: number;
+  ftsMs?: number;
+  /** 順位の統合（hybridのみ） */
+  fusionMs?: number;
+}
+
 export interface SearchResponse {
+  /** scoreはmodeごとに異なる（vector: 距離、fts: BM25スコア、hybrid: RRFスコア） */
   results: SearchResult[];
   total: number;
   took: number; // ms
+  timings?: SearchTimings;
+  /** hybridで全文検索インデックスの作成中のため、ベクトル検索の結果だけを返した */
+  ftsIndexPending?: boolean;
+}
+
+/**
+ * 複数クエリの一括検索（クエリは1回の推論でまとめてベクトル化される）
+ */
+export interface SearchBatchRequest {
+  queries: string[];
+  /** 全クエリに共通の検索オプション */
+  options?: SearchOptions;
+}
+
+export interface SearchBatchResponse {
+  /** クエリごとの結果（queriesと同じ順序） */
+  responses: Array<Omit<SearchResponse, 'took'>>;
+  took: number; // ms
+  /** 全クエリに共通のステージの時間（embedMs） */
+  timings?: SearchTimings;
 }
 
 // ========================================
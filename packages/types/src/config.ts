@@ -41,6 +41,8 @@ export interface IndexingConfig {
   vectorDimension: number;
   /** 埋め込みモデル */
   embeddingModel: string;
+  /** 埋め込みモデルの推論バックエンド（'torch' | 'onnx' | 'onnx-int8'、デフォルト: 'torch'） */
+  embeddingBackend?: 'torch' | 'onnx' | 'onnx-int8';
 }
 
 export interface SearchConfig {
@@ -81,10 +83,48 @@ export interface WorkerConfig {
   delayBetweenDocuments?: number;
   /** バッチ処理の最大トークン数。GPUメモリピークを制御（デフォルト: 4000） */
   maxBatchTokens?: number;
+  /**
+   * バッチのトークン数の自動調整の下限。指定するとスループットとRSSを計測し、
+   * minBatchTokens〜maxBatchTokensの範囲でバッチのトークン数を動かす（デフォルト: 自動調整しない）
+   */
+  minBatchTokens?: number;
+  /** 自動調整でバッチを大きくしないPythonワーカーのRSS（MB）。デフォルト: pythonMaxMemoryMBの80% */
+  batchMemoryLimitMB?: number;
+  /** 前回のGCからRSSとArrowの確保量がこれだけ増えたらGCする（MB）。0で従来通り毎回GC（デフォルト: 256） */
+  gcEveryMB?: number;
+  /** RSSがこれを超えたらGCする（MB）。デフォルト: pythonMaxMemoryMBの60% */
+  gcRssThresholdMB?: number;
+  /** Arrowのメモリプールの確保量がこれを超えたらGCする（MB、デフォルト: 1024） */
+  gcArrowThresholdMB?: number;
   /** Pythonワーカーの最大メモリ使用量（MB）。超過時に自動再起動 */
   pythonMaxMemoryMB?: number;
   /** メモリ監視の間隔（ミリ秒） */
   memoryCheckIntervalMs?: number;
+  /** Pythonワーカーとの通信方式（'json' | 'msgpack'、デフォルト: 'json'） */
+  transport?: 'json' | 'msgpack';
+  /** 推論のスレッド数（デフォルト: 4） */
+  numThreads?: number;
+  /** エンコードプールのプロセス数（0/1でプールなし、'auto'でコア数 / numThreads、デフォルト: 0） */
+  encodeProcesses?: number | 'auto';
+  /** 埋め込みベクトルキャッシュの最大件数。0でキャッシュ無効（デフォルト: 200000） */
+  embeddingCacheSize?: number;
+  /** セクション数がこれを超えたらベクトルインデックスを作成する。0でインデックスを作成しない（デフォルト: 10000） */
+  vectorIndexMinRows?: number;
+  /** ベクトルインデックスの種類（デフォルト: 'IVF_PQ'） */
+  vectorIndexType?: 'IVF_PQ' | 'IVF_HNSW_SQ';
+  /** 検索するパーティション数のデフォルト（デフォルト: LanceDBのデフォルト） */
+  vectorIndexNprobes?: number;
+  /** 検索の再ランキングの倍率のデフォルト（デフォルト: IVF_PQは10、IVF_HNSW_SQは2） */
+  vectorIndexRefineFactor?: number;
+  /** 終了済みのIndexRequestの保持期間（日）。パスごとの最新は残す（デフォルト: 7） */
+  requestRetentionDays?: number;
+  /** IndexRequestの削除とコンパクションの間隔（ミリ秒）。0で定期実行しない（デフォルト: 3600000） */
+  requestPurgeIntervalMs?: number;
+  /**
+   * 共有ワーカーのUnixドメインソケットのパス（`worker.py --listen=unix:<path>` で起動済みのワーカーに接続）
+   * 未指定の場合はサーバーごとにワーカーを起動する
+   */
+  socketPath?: string;
 }
 
 export interface WatcherConfig {
@@ -114,6 +154,7 @@ export const DEFAULT_CONFIG: SearchDocsConfig = {
     maxDepth: 3,
     vectorDimension: 256,
     embeddingModel: 'cl-nagoya/ruri-v3-30m',
+    embeddingBackend: 'torch',
   },
   search: {
     defaultLimit: 10,
@@ -138,6 +179,10 @@ export const DEFAULT_CONFIG: SearchDocsConfig = {
     maxBatchTokens: 4000, // バッチ処理の最大トークン数（GPUメモリピーク制御）
     pythonMaxMemoryMB: 8192, // 8GB
     memoryCheckIntervalMs: 10000, // 10秒
+    transport: 'json',
+    numThreads: 4,
+    encodeProcesses: 0, // 大量の再インデックスでは'auto'を推奨
+    embeddingCacheSize: 200000, // 変更のないセクションを再エンコードしない
   },
   watcher: {
     enabled: true,
@@ -252,6 +252,8 @@ export class ConfigLoader {
           config.indexing?.vectorDimension ?? DEFAULT_CONFIG.indexing.vectorDimension,
         embeddingModel:
           config.indexing?.embeddingModel ?? DEFAULT_CONFIG.indexing.embeddingModel,
+        embeddingBackend:
+          config.indexing?.embeddingBackend ?? DEFAULT_CONFIG.indexing.embeddingBackend,
       },
       search: {
         defaultLimit: config.search?.defaultLimit ?? DEFAULT_CONFIG.search.defaultLimit,
@@ -275,8 +277,24 @@ export class ConfigLoader {
         maxConcurrent: config.worker?.maxConcurrent ?? DEFAULT_CONFIG.worker.maxConcurrent,
         delayBetweenDocuments: config.worker?.delayBetweenDocuments ?? DEFAULT_CONFIG.worker.delayBetweenDocuments,
         maxBatchTokens: config.worker?.maxBatchTokens ?? DEFAULT_CONFIG.worker.maxBatchTokens,
+        minBatchTokens: config.worker?.minBatchTokens,
+        batchMemoryLimitMB: config.worker?.batchMemoryLimitMB,
+        gcEveryMB: config.worker?.gcEveryMB,
+        gcRssThresholdMB: config.worker?.gcRssThresholdMB,
+        gcArrowThresholdMB: config.worker?.gcArrowThresholdMB,
         pythonMaxMemoryMB: config.worker?.pythonMaxMemoryMB ?? DEFAULT_CONFIG.worker.pythonMaxMemoryMB,
         memoryCheckIntervalMs: config.worker?.memoryCheckIntervalMs ?? DEFAULT_CONFIG.worker.memoryCheckIntervalMs,
+        transport: config.worker?.transport ?? DEFAULT_CONFIG.worker.transport,
+        numThreads: config.worker?.numThreads ?? DEFAULT_CONFIG.worker.numThreads,
+        encodeProcesses: config.worker?.encodeProcesses ?? DEFAULT_CONFIG.worker.encodeProcesses,
+        embeddingCacheSize: config.worker?.embeddingCacheSize ?? DEFAULT_CONFIG.worker.embeddingCacheSize,
+        vectorIndexMinRows: config.worker?.vectorIndexMinRows,
+        vectorIndexType: config.worker?.vectorIndexType,
+        vectorIndexNprobes: config.worker?.vectorIndexNprobes,
+        vectorIndexRefineFactor: config.worker?.vectorIndexRefineFactor,
+        requestRetentionDays: config.worker?.requestRetentionDays,
+        requestPurgeIntervalMs: config.worker?.requestPurgeIntervalMs,
+        socketPath: config.worker?.socketPath,
       },
       watcher: {
         enabled: config.watcher?.enabled ?? DEFAULT_CONFIG.watcher.enabled,
@@ -156,6 +156,15 @@ function validateIndexingConfig(indexing: unknown): void {
   if (idx.embeddingModel !== undefined && typeof idx.embeddingModel !== 'string') {
     throw new Error('config.indexing.embeddingModel must be a string');
   }
+
+  if (
+    idx.embeddingBackend !== undefined &&
+    idx.embeddingBackend !== 'torch' &&
+    idx.embeddingBackend !== 'onnx' &&
+    idx.embeddingBackend !== 'onnx-int8'
+  ) {
+    throw new Error("config.indexing.embeddingBackend must be 'torch', 'onnx' or 'onnx-int8'");
+  }
 }
 
 function validateSearchConfig(search: unknown): void {
@@ -269,6 +278,54 @@ function validateWorkerConfig(worker: unknown): void {
     throw new Error('config.worker.maxBatchTokens must be positive');
   }
 
+  if (wrk.minBatchTokens !== undefined && typeof wrk.minBatchTokens !== 'number') {
+    throw new Error('config.worker.minBatchTokens must be a number');
+  }
+
+  if (wrk.minBatchTokens !== undefined && (wrk.minBatchTokens) <= 0) {
+    throw new Error('config.worker.minBatchTokens must be positive');
+  }
+
+  if (
+    wrk.minBatchTokens !== undefined &&
+    wrk.maxBatchTokens !== undefined &&
+    wrk.minBatchTokens > wrk.maxBatchTokens
+  ) {
+    throw new Error('config.worker.minBatchTokens must not exceed maxBatchTokens');
+  }
+
+  if (wrk.batchMemoryLimitMB !== undefined && typeof wrk.batchMemoryLimitMB !== 'number') {
+    throw new Error('config.worker.batchMemoryLimitMB must be a number');
+  }
+
+  if (wrk.batchMemoryLimitMB !== undefined && (wrk.batchMemoryLimitMB) <= 0) {
+    throw new Error('config.worker.batchMemoryLimitMB must be positive');
+  }
+
+  if (wrk.gcEveryMB !== undefined && typeof wrk.gcEveryMB !== 'number') {
+    throw new Error('config.worker.gcEveryMB must be a number');
+  }
+
+  if (wrk.gcEveryMB !== undefined && (wrk.gcEveryMB) < 0) {
+    throw new Error('config.worker.gcEveryMB must be non-negative');
+  }
+
+  if (wrk.gcRssThresholdMB !== undefined && typeof wrk.gcRssThresholdMB !== 'number') {
+    throw new Error('config.worker.gcRssThresholdMB must be a number');
+  }
+
+  if (wrk.gcRssThresholdMB !== undefined && (wrk.gcRssThresholdMB) <= 0) {
+    throw new Error('config.worker.gcRssThresholdMB must be positive');
+  }
+
+  if (wrk.gcArrowThresholdMB !== undefined && typeof wrk.gcArrowThresholdMB !== 'number') {
+    throw new Error('config.worker.gcArrowThresholdMB must be a number');
+  }
+
+  if (wrk.gcArrowThresholdMB !== undefined && (wrk.gcArrowThresholdMB) <= 0) {
+    throw new Error('config.worker.gcArrowThresholdMB must be positive');
+  }
+
   if (wrk.pythonMaxMemoryMB !== undefined && typeof wrk.pythonMaxMemoryMB !== 'number') {
     throw new Error('config.worker.pythonMaxMemoryMB must be a number');
   }
@@ -284,6 +341,90 @@ function validateWorkerConfig(worker: unknown): void {
   if (wrk.memoryCheckIntervalMs !== undefined && (wrk.memoryCheckIntervalMs) <= 0) {
     throw new Error('config.worker.memoryCheckIntervalMs must be positive');
   }
+
+  if (wrk.transport !== undefined && wrk.transport !== 'json' && wrk.transport !== 'msgpack') {
+    throw new Error("config.worker.transport must be 'json' or 'msgpack'");
+  }
+
+  if (wrk.vectorIndexMinRows !== undefined && typeof wrk.vectorIndexMinRows !== 'number') {
+    throw new Error('config.worker.vectorIndexMinRows must be a number');
+  }
+
+  if (wrk.vectorIndexMinRows !== undefined && (wrk.vectorIndexMinRows) < 0) {
+    throw new Error('config.worker.vectorIndexMinRows must be non-negative');
+  }
+
+  if (
+    wrk.vectorIndexType !== undefined &&
+    wrk.vectorIndexType !== 'IVF_PQ' &&
+    wrk.vectorIndexType !== 'IVF_HNSW_SQ'
+  ) {
+    throw new Error("config.worker.vectorIndexType must be 'IVF_PQ' or 'IVF_HNSW_SQ'");
+  }
+
+  if (wrk.vectorIndexNprobes !== undefined && typeof wrk.vectorIndexNprobes !== 'number') {
+    throw new Error('config.worker.vectorIndexNprobes must be a number');
+  }
+
+  if (wrk.vectorIndexNprobes !== undefined && (wrk.vectorIndexNprobes) < 1) {
+    throw new Error('config.worker.vectorIndexNprobes must be at least 1');
+  }
+
+  if (wrk.vectorIndexRefineFactor !== undefined && typeof wrk.vectorIndexRefineFactor !== 'number') {
+    throw new Error('config.worker.vectorIndexRefineFactor must be a number');
+  }
+
+  if (wrk.vectorIndexRefineFactor !== undefined && (wrk.vectorIndexRefineFactor) < 1) {
+    throw new Error('config.worker.vectorIndexRefineFactor must be at least 1');
+  }
+
+  if (wrk.requestRetentionDays !== undefined && typeof wrk.requestRetentionDays !== 'number') {
+    throw new Error('config.worker.requestRetentionDays must be a number');
+  }
+
+  if (wrk.requestRetentionDays !== undefined && (wrk.requestRetentionDays) < 0) {
+    throw new Error('config.worker.requestRetentionDays must be non-negative');
+  }
+
+  if (wrk.requestPurgeIntervalMs !== undefined && typeof wrk.requestPurgeIntervalMs !== 'number') {
+    throw new Error('config.worker.requestPurgeIntervalMs must be a number');
+  }
+
+  if (wrk.requestPurgeIntervalMs !== undefined && (wrk.requestPurgeIntervalMs) < 0) {
+    throw new Error('config.worker.requestPurgeIntervalMs must be non-negative');
+  }
+
+  if (wrk.numThreads !== undefined && typeof wrk.numThreads !== 'number') {
+    throw new Error('config.worker.numThreads must be a number');
+  }
+
+  if (wrk.numThreads !== undefined && (wrk.numThreads) <= 0) {
+    throw new Error('config.worker.numThreads must be positive');
+  }
+
+  if (
+    wrk.encodeProcesses !== undefined &&
+    wrk.encodeProcesses !== 'auto' &&
+    typeof wrk.encodeProcesses !== 'number'
+  ) {
+    throw new Error("config.worker.encodeProcesses must be a number or 'auto'");
+  }
+
+  if (typeof wrk.encodeProcesses === 'number' && wrk.encodeProcesses < 0) {
+    throw new Error('config.worker.encodeProcesses must be non-negative');
+  }
+
+  if (wrk.embeddingCacheSize !== undefined && typeof wrk.embeddingCacheSize !== 'number') {
+    throw new Error('config.worker.embeddingCacheSize must be a number');
+  }
+
+  if (wrk.embeddingCacheSize !== undefined && (wrk.embeddingCacheSize) < 0) {
+    throw new Error('config.worker.embeddingCacheSize must be non-negative');
+  }
+
+  if (wrk.socketPath !== undefined && typeof wrk.socketPath !== 'string') {
+    throw new Error('config.worker.socketPath must be a string');
+  }
 }
 
 function validateWatcherConfig(watcher: unknown): void {
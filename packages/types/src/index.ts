@@ -32,8 +32,12 @@ export {
 export type {
   SearchRequest,
   SearchOptions,
+  SearchMode,
+  SearchTimings,
   SearchResult,
   SearchResponse,
+  SearchBatchRequest,
+  SearchBatchResponse,
   GetDocumentRequest,
   GetDocumentResponse,
   IndexDocumentRequest,